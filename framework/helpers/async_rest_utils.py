@@ -0,0 +1,304 @@
+import asyncio
+import atexit
+import hashlib
+import json
+import threading
+from typing import Optional, Dict, Tuple
+import aiohttp
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from .log_utils import get_logger
+from .rest_utils import async_rest_api_call
+
+logger = get_logger(__name__)
+
+# Maximum number of connections the process-wide pool keeps open, across all the hosts
+pool_limit = 1000
+# Maximum number of connections the pool keeps open to a single host
+pool_limit_per_host = 100
+# Same retry strategy as RestAPIUtil
+retry_total = 3
+backoff_factor = 2
+status_forcelist = [429, 500, 502, 503, 504]
+retry_methods = ["GET", "PUT", "DELETE", "POST"]
+# (connect timeout, read timeout), same as TimeoutHTTPAdapter
+default_timeout = (5, 300)
+
+
+class EventLoopThread:
+    """
+    A single asyncio event loop running in a daemon thread. All the AsyncRestAPIUtil objects in the process schedule
+    their requests on this loop, so thousands of requests can be in flight without a thread per request.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="Thread-AsyncRestLoop", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get_instance(cls) -> 'EventLoopThread':
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = EventLoopThread()
+            return cls._instance
+
+    def in_loop(self) -> bool:
+        return threading.current_thread() is self.thread
+
+    def run(self, coro):
+        """
+        Run the coroutine in the shared loop and block till it is done
+        """
+        if self.in_loop():
+            coro.close()
+            raise RuntimeError("Blocking call made from the shared event loop, use the async variant instead")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def run_async(self, coro):
+        """
+        Await the coroutine in the shared loop, from any event loop
+        """
+        if self.in_loop():
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+
+class AsyncConnectionPool:
+    """
+    Process-wide pool of aiohttp sessions keyed by (host, port, credentials). All the sessions share one connector,
+    hence one set of keep-alive connections.
+    """
+    _sessions: Dict[Tuple, aiohttp.ClientSession] = {}
+    _connector: Optional[aiohttp.TCPConnector] = None
+
+    @staticmethod
+    def get_key(ip_address: str, port: str, user: Optional[str], pwd: Optional[str]) -> Tuple:
+        # Don't keep the password in the key
+        pwd_hash = hashlib.sha256(pwd.encode()).hexdigest() if pwd else None
+        return ip_address, port, user, pwd_hash
+
+    @classmethod
+    async def get_session(cls, ip_address: str, port: str, user: Optional[str],
+                          pwd: Optional[str]) -> aiohttp.ClientSession:
+        # This is always called from the shared loop, so no locking is needed
+        key = cls.get_key(ip_address, port, user, pwd)
+        session = cls._sessions.get(key)
+        if session and not session.closed:
+            return session
+
+        if cls._connector is None or cls._connector.closed:
+            cls._connector = aiohttp.TCPConnector(limit=pool_limit, limit_per_host=pool_limit_per_host)
+        auth = aiohttp.BasicAuth(user, pwd) if user and pwd else None
+        session = aiohttp.ClientSession(connector=cls._connector, connector_owner=False, auth=auth)
+        cls._sessions[key] = session
+        return session
+
+    @classmethod
+    def size(cls) -> int:
+        return len(cls._sessions)
+
+    @classmethod
+    async def close(cls):
+        for session in cls._sessions.values():
+            await session.close()
+        cls._sessions = {}
+        if cls._connector is not None:
+            await cls._connector.close()
+            cls._connector = None
+
+
+@atexit.register
+def close_pool():
+    if EventLoopThread._instance is None:
+        return
+    try:
+        EventLoopThread._instance.run(AsyncConnectionPool.close())
+    except Exception as e:
+        logger.debug(f"Failed to close the connection pool: {e}")
+
+
+def get_client_timeout(timeout) -> aiohttp.ClientTimeout:
+    # requests accepts either a single value or a (connect, read) tuple
+    if isinstance(timeout, (tuple, list)):
+        connect, read = timeout
+        return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+class AsyncRestAPIUtil:
+    """
+    asyncio-native drop-in for RestAPIUtil. The get/post/put/patch/delete methods block like RestAPIUtil, and
+    async_get/async_post/async_put/async_patch/async_delete can be awaited from any event loop.
+    """
+
+    def __init__(self, ip_address: str, user: Optional[str], pwd: Optional[str], headers: dict = None,
+                 secured: bool = True, port: str = "", max_in_flight: Optional[int] = None):
+        self.__IP_ADDRESS = ip_address
+        self.__SSL_ENABLED = bool(secured)
+        self.__PORT = f":{port}" if port else port
+        self.__port = port
+        self.__user = user
+        self.__pwd = pwd
+        self.__headers = headers if headers is not None else {'content-type': 'application/json'}
+        self.__loop_thread = EventLoopThread.get_instance()
+        # Limits the number of requests in flight to the endpoint. The semaphore is created in the shared loop
+        self.__max_in_flight = max_in_flight
+        self.__in_flight: Optional[asyncio.Semaphore] = None
+
+    def __deepcopy__(self, memo):
+        # The session is shared by all the copies of the config data, it is not copied
+        return self
+
+    async def __request(self, method: str, url: str, headers: dict, data=None, verify=False, timeout=None,
+                        files: Optional[Dict] = None, params: Optional[Dict] = None) -> Response:
+        if not self.__max_in_flight:
+            return await self.__send(method, url, headers, data, verify, timeout, files, params)
+        if self.__in_flight is None:
+            self.__in_flight = asyncio.Semaphore(self.__max_in_flight)
+        async with self.__in_flight:
+            return await self.__send(method, url, headers, data, verify, timeout, files, params)
+
+    async def __send(self, method: str, url: str, headers: dict, data=None, verify=False, timeout=None,
+                     files: Optional[Dict] = None, params: Optional[Dict] = None) -> Response:
+        session = await AsyncConnectionPool.get_session(self.__IP_ADDRESS, self.__port, self.__user, self.__pwd)
+        timeout = get_client_timeout(timeout or default_timeout)
+
+        if files:
+            form = aiohttp.FormData()
+            for key, value in (data or {}).items():
+                form.add_field(key, str(value))
+            for key, (file_name, file_obj, content_type) in files.items():
+                form.add_field(key, file_obj, filename=file_name, content_type=content_type)
+            data = form
+            # let aiohttp set the multipart boundary
+            headers = {k: v for k, v in headers.items() if k.lower() != "content-type"}
+
+        # multipart body can't be replayed, so uploads are not retried
+        total = retry_total if method in retry_methods and not files else 0
+        attempt = 0
+        while True:
+            try:
+                async with session.request(method, url, headers=headers, data=data, ssl=bool(verify),
+                                           timeout=timeout, params=params) as resp:
+                    if resp.status in status_forcelist and attempt < total:
+                        logger.debug(f"{method} {url} returned {resp.status}, retrying")
+                    else:
+                        return await self.__build_response(resp)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= total:
+                    raise e
+                logger.debug(f"{method} {url} failed with {e!r}, retrying")
+            attempt += 1
+            # Same as urllib3 Retry: no sleep before the first retry, backoff_factor * 2^(n-1) after that
+            if attempt > 1:
+                await asyncio.sleep(backoff_factor * (2 ** (attempt - 1)))
+
+    @staticmethod
+    async def __build_response(resp: aiohttp.ClientResponse) -> Response:
+        # Build a requests.Response, so that the rest_api_call semantics are the same as RestAPIUtil
+        response = Response()
+        response._content = await resp.read()
+        response.status_code = resp.status
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.url = str(resp.url)
+        response.reason = resp.reason
+        return response
+
+    @async_rest_api_call
+    async def async_post(self, uri: str, headers: dict = None, data: dict = None, jsonify=True, verify=False,
+                         **kwargs):
+        headers = headers if headers is not None else self.__headers
+        data = {} if not data else data
+        url = self.prepare_url(uri)
+
+        logger.debug("POST request for the URL: " + url)
+        logger.debug(kwargs)
+        data = json.dumps(data) if jsonify else data
+
+        if data:
+            logger.debug(f"POST payload: {data}")
+        return await self.__loop_thread.run_async(
+            self.__request("POST", url, headers=headers, data=data, verify=verify, **kwargs))
+
+    @async_rest_api_call
+    async def async_put(self, uri: str, headers: dict = None, data: dict = None, jsonify=True, verify=False,
+                        **kwargs):
+        headers = headers if headers is not None else self.__headers
+        data = {} if not data else data
+        url = self.prepare_url(uri)
+
+        logger.debug("PUT request for the URL: " + url)
+        data = json.dumps(data) if jsonify else data
+
+        if data:
+            logger.debug(f"PUT payload: {data}")
+        return await self.__loop_thread.run_async(
+            self.__request("PUT", url, headers=headers, data=data, verify=verify, **kwargs))
+
+    @async_rest_api_call
+    async def async_get(self, uri: str, headers: dict = None, data: dict = None, verify=False, **kwargs):
+        headers = headers if headers is not None else self.__headers
+        data = {} if not data else data
+        url = self.prepare_url(uri)
+        headers = {} if not headers else headers
+
+        logger.debug("GET request for the URL: " + url)
+        if data:
+            logger.debug(f"GET payload: {data}")
+            request = self.__request("GET", url, headers=headers, data=json.dumps(data), verify=False, **kwargs)
+        else:
+            request = self.__request("GET", url, headers=headers, verify=verify, **kwargs)
+        return await self.__loop_thread.run_async(request)
+
+    @async_rest_api_call
+    async def async_delete(self, uri: str, headers: dict = None, verify=False, **kwargs):
+        headers = headers if headers is not None else self.__headers
+        url = self.prepare_url(uri)
+        headers = {} if not headers else headers
+
+        logger.debug("DELETE request for the URL: " + url)
+        return await self.__loop_thread.run_async(
+            self.__request("DELETE", url, headers=headers, verify=verify, **kwargs))
+
+    @async_rest_api_call
+    async def async_patch(self, uri: str, headers: dict = None, data: dict = None, jsonify=True, verify=False,
+                          **kwargs):
+        headers = headers if headers is not None else self.__headers
+        data = {} if not data else data
+        url = self.prepare_url(uri)
+
+        logger.debug("PATCH request for the URL: " + url)
+        data = json.dumps(data) if jsonify else data
+
+        if data:
+            logger.debug(f"PATCH payload: {data}")
+        return await self.__loop_thread.run_async(
+            self.__request("PATCH", url, headers=headers, data=data or None, verify=verify, **kwargs))
+
+    # Blocking variants, same surface as RestAPIUtil. The request is run in the shared loop, so the calling thread
+    # only waits for the result
+    def post(self, uri: str, **kwargs):
+        return self.__loop_thread.run(self.async_post(uri, **kwargs))
+
+    def put(self, uri: str, **kwargs):
+        return self.__loop_thread.run(self.async_put(uri, **kwargs))
+
+    def get(self, uri: str, **kwargs):
+        return self.__loop_thread.run(self.async_get(uri, **kwargs))
+
+    def delete(self, uri: str, **kwargs):
+        return self.__loop_thread.run(self.async_delete(uri, **kwargs))
+
+    def patch(self, uri: str, **kwargs):
+        return self.__loop_thread.run(self.async_patch(uri, **kwargs))
+
+    def prepare_url(self, uri):
+        return f"{self.get_protocol()}://{self.__IP_ADDRESS}{self.__PORT}/{uri}"
+
+    def get_protocol(self):
+        if self.__SSL_ENABLED <= 0:
+            return 'http'
+        return 'https'
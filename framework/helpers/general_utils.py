@@ -498,16 +498,20 @@ def send_mail_helper(subject: str, body: str, from_mail: str, to_mail: str, smtp
     s.sendmail(from_mail, to_mail.split(","), msg.as_string())
     s.quit()
 
-def get_ip_and_create_host_record(ipam_obj, logger_obj, fqdn: str, subnet: str = None, ip: str = None,) -> tuple:
+def get_ip_and_create_host_record(ipam_obj, logger_obj, fqdn: str, subnet: str = None, ip: str = None,
+                                  allocated_ips: Dict = None) -> tuple:
     """Get IP and create host record in IPAM
     Args:
         fqdn (str): Fully qualified Domain Name to create host record
         subnet (str, optional): Subnet to get free IP from. Defaults to None.
         ip (str, optional): IP Address if already passed in the config file. Defaults to None.
+        allocated_ips (dict, optional): IPs already allocated by allocate_ips_from_ipam, by fqdn
 
     Returns:
-        tuple (str, str): Return IP Address and error message if there is any error.
+        tuple (str, str): Return IP Address and error message if there is any error, else None.
     """
+    if allocated_ips and allocated_ips.get(fqdn):
+        return allocated_ips[fqdn], None
     if ip:
         if ipam_obj.check_host_record_exists(ip):
             logger_obj.warning(f"Host record present for given IP {ip}. Skipping host record creation")
@@ -516,34 +520,85 @@ def get_ip_and_create_host_record(ipam_obj, logger_obj, fqdn: str, subnet: str =
             _, error = ipam_obj.create_host_record(fqdn=fqdn, ip=ip)
             if error:
                 return None, f"Failed to create host record: {error}"
-        return ip, ""
+        return ip, None
     elif subnet:
         logger_obj.info("Fetching Next available free IP from IPAM")
         ip, error = ipam_obj.create_host_record_with_next_available_ip(network=subnet, fqdn=fqdn)
         if error:
             return None, f"Failed to get ip from ipam: {error}"
         logger_obj.info(f"Got IP {ip} from IPAM for fqdn {fqdn}")
-        return ip, ""
+        return ip, None
     else:
         return None, "Neither Subnet or IP was provided to query IPAM"
 
-def assign_ips_from_ipam(node_info: dict, ipam_config: dict, ipam_obj, logger_obj) -> Tuple[bool, Optional[str]]:
+def allocate_ips_from_ipam(ipam_obj, logger_obj, requests: List[Dict]) -> Dict[str, str]:
+    """Allocate the IPs of all the requests from IPAM in bulk, a few IPAM calls per subnet
+
+    Args:
+        requests (list): List of {"fqdn": .., "subnet": .., "ip": ..}, same as get_ip_and_create_host_record
+
+    Returns:
+        dict: Allocated IP by fqdn, to be passed as allocated_ips. The failed requests are not part of it, they are
+            retried one at a time by get_ip_and_create_host_record
+    """
+    from framework.scripts.python.helpers.ipam.bulk_allocator import BulkAllocator
+
+    allocated_ips = {}
+    for fqdn, (ip, error) in BulkAllocator(ipam_obj, logger_obj).allocate(requests).items():
+        if error:
+            logger_obj.warning(f"Failed to allocate IP for {fqdn} in bulk: {error}")
+        else:
+            allocated_ips[fqdn] = ip
+    return allocated_ips
+
+def release_ips_from_ipam(requests: List[Dict], allocated_ips: Dict[str, str]):
+    """Release the IPs allocated from the free IPs of a subnet by allocate_ips_from_ipam, once the deployment they
+    were allocated for is skipped. They are no longer excluded from the free IPs asked to IPAM by the other sites of
+    the run. Their host records are kept, a rerun reuses them for the same fqdns
+
+    Args:
+        requests (list): Requests passed to allocate_ips_from_ipam
+        allocated_ips (dict): Allocated IP by fqdn, returned by allocate_ips_from_ipam
+    """
+    from framework.scripts.python.helpers.ipam.bulk_allocator import ReservationLedger
+
+    ledger = ReservationLedger.get_instance()
+    for request in requests:
+        ip = allocated_ips.get(request["fqdn"])
+        if ip and request.get("subnet") and not request.get("ip"):
+            ledger.release(request["subnet"], [ip])
+
+def get_node_ipam_requests(node_info: dict, ipam_config: dict) -> Dict[str, Dict]:
+    """IPAM requests of the Host, CVM & IPMI IPs of the node
+
+    Returns:
+        dict: {"fqdn": .., "subnet": .., "ip": ..} by IP field of node_info
+    """
+    return {
+        "host_ip": {"fqdn": f"{node_info.get('hypervisor_hostname')}.{ipam_config['domain']}",
+                    "subnet": ipam_config.get("host_subnet"), "ip": node_info.get("host_ip")},
+        "cvm_ip": {"fqdn": f"{node_info['node_serial']}-cvm.{ipam_config['domain']}",
+                   "subnet": ipam_config.get("host_subnet"), "ip": node_info.get("cvm_ip")},
+        "ipmi_ip": {"fqdn": f"{node_info['node_serial']}-ipmi.{ipam_config['domain']}",
+                    "subnet": ipam_config.get("ipmi_subnet"), "ip": node_info.get("ipmi_ip")}
+    }
+
+def assign_ips_from_ipam(node_info: dict, ipam_config: dict, ipam_obj, logger_obj,
+                         allocated_ips: Dict = None) -> Tuple[bool, Optional[str]]:
     hypervisor_hostname = node_info.get("hypervisor_hostname")
     if not hypervisor_hostname:
         return False, "Missing 'hypervisor_hostname' in node_info"
+    requests = get_node_ipam_requests(node_info, ipam_config)
     host_ip, error = get_ip_and_create_host_record(
-        ipam_obj = ipam_obj, logger_obj=logger_obj, fqdn=f"{hypervisor_hostname}.{ipam_config['domain']}",
-        subnet=ipam_config.get("host_subnet"), ip=node_info.get("host_ip"))
+        ipam_obj = ipam_obj, logger_obj=logger_obj, allocated_ips=allocated_ips, **requests["host_ip"])
     if error:
         return False, f"Failed to update Host IP: {error}"
     cvm_ip, error = get_ip_and_create_host_record(
-        ipam_obj = ipam_obj, logger_obj=logger_obj, fqdn=f"{node_info['node_serial']}-cvm.{ipam_config['domain']}",
-        subnet=ipam_config.get("host_subnet"), ip=node_info.get("cvm_ip"))
+        ipam_obj = ipam_obj, logger_obj=logger_obj, allocated_ips=allocated_ips, **requests["cvm_ip"])
     if error:
         return False, f"Failed to update CVM IP: {error}"
     ipmi_ip, error = get_ip_and_create_host_record(
-        ipam_obj = ipam_obj, logger_obj=logger_obj, fqdn=f"{node_info['node_serial']}-ipmi.{ipam_config['domain']}",
-        subnet=ipam_config.get("ipmi_subnet"), ip=node_info.get("ipmi_ip"))
+        ipam_obj = ipam_obj, logger_obj=logger_obj, allocated_ips=allocated_ips, **requests["ipmi_ip"])
     if error:
         logger_obj.warning(f"Failed to update IPMI IP: {error}")
         return True, None
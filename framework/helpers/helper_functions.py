@@ -5,12 +5,11 @@ from time import sleep
 from typing import Optional, Dict
 from .general_utils import validate_schema, get_json_file_contents, copy_file_util, enforce_data_arg, \
     get_yml_file_contents, create_log_dir_push_logs
-from .rest_utils import RestAPIUtil
+from .session_registry import SessionRegistry
 from framework.scripts.python.helpers.ipam.ipam import IPAM
 from .log_utils import get_logger
 from json2table import convert
 from framework.helpers.vault_utils import CyberArk
-from .v4_api_client import ApiClientV4
 
 logger = get_logger(__name__)
 
@@ -253,6 +252,9 @@ def create_pc_objects(data: dict, global_data: Optional[Dict] = None):
     This script does the below actions:
         1. Reads the input configs and creates a "pc_session" from pc_ip, pc_credential from the configs
          that can be used to query the PC
+        2. Sessions are fetched from the SessionRegistry, so calling this again for the same PC and credential
+         returns the same session and v4 client
+        3. "pc_max_in_flight_requests", if specified, limits the number of requests in flight to the PC
 
     Eg config: file1
     ----------------------------------
@@ -297,6 +299,9 @@ def create_pc_objects(data: dict, global_data: Optional[Dict] = None):
             raise Exception("Kindly verify if you've selected the correct vault in 'vault_to_use' in 'global.yml'")
         cred_details = data['vaults'][data['vault_to_use']]['credentials']
 
+    transport = data.get("rest_transport") or global_data.get("rest_transport")
+    max_in_flight = data.get("pc_max_in_flight_requests") or global_data.get("pc_max_in_flight_requests")
+
     # check if pc_username and pc_password in cred_details
     if data.get("pc_credential") or global_data.get("pc_credential"):
         pc_user = data.get("pc_credential") or global_data.get("pc_credential")
@@ -304,20 +309,22 @@ def create_pc_objects(data: dict, global_data: Optional[Dict] = None):
         if not cred_details.get(pc_user, {}).get('username') or not cred_details.get(pc_user, {}).get('password'):
             raise Exception(f"PC credentials not specified for the user {pc_user!r} in 'global.yml'")
 
-        data["pc_session"] = RestAPIUtil(data["pc_ip"],
-                                         user=cred_details[pc_user]['username'],
-                                         pwd=cred_details[pc_user]['password'],
-                                         port="9440", secured=True)
-        data["v4_api_util"] = ApiClientV4(
+        data["pc_session"] = SessionRegistry.get_session(data["pc_ip"],
+                                                         user=cred_details[pc_user]['username'],
+                                                         pwd=cred_details[pc_user]['password'],
+                                                         port="9440", secured=True, transport=transport,
+                                                         max_in_flight=max_in_flight)
+        data["v4_api_util"] = SessionRegistry.get_v4_api_client(
             data["pc_ip"], "9440", cred_details[pc_user]['username'], cred_details[pc_user]['password']
             )
     else:
         logger.warning(f"Using default PC credentials for {data['pc_ip']}!")
         default_pc_password = data.get('default_pc_password')
-        data["pc_session"] = RestAPIUtil(data['pc_ip'], user=DEFAULT_PRISM_USERNAME,
-                                         pwd=default_pc_password or DEFAULT_PRISM_PASSWORD,
-                                         port="9440", secured=True)
-        data["v4_api_util"] = ApiClientV4(
+        data["pc_session"] = SessionRegistry.get_session(data['pc_ip'], user=DEFAULT_PRISM_USERNAME,
+                                                         pwd=default_pc_password or DEFAULT_PRISM_PASSWORD,
+                                                         port="9440", secured=True, transport=transport,
+                                                         max_in_flight=max_in_flight)
+        data["v4_api_util"] = SessionRegistry.get_v4_api_client(
             data["pc_ip"], "9440", DEFAULT_PRISM_USERNAME, default_pc_password or DEFAULT_PRISM_PASSWORD
             )
 
@@ -374,6 +381,8 @@ def create_ndb_objects(data: dict, global_data: Optional[Dict] = None):
             raise Exception("Kindly verify if you've selected the correct vault in 'vault_to_use' in 'global.yml'")
         cred_details = data['vaults'][data['vault_to_use']]['credentials']
 
+    transport = data.get("rest_transport") or global_data.get("rest_transport")
+
     # check if ndb_username and ndb_password in cred_details
     if data.get("ndb_credential") or global_data.get("ndb_credential"):
         ndb_user = data.get("ndb_credential") or global_data.get("ndb_credential")
@@ -381,16 +390,16 @@ def create_ndb_objects(data: dict, global_data: Optional[Dict] = None):
         if not cred_details.get(ndb_user, {}).get('username') or not cred_details.get(ndb_user, {}).get('password'):
             raise Exception(f"Ndb credentials not specified for the user {ndb_user!r} in 'global.yml'")
 
-        data["ndb_session"] = RestAPIUtil(data["ndb_ip"],
-                                          user=cred_details[ndb_user]['username'],
-                                          pwd=cred_details[ndb_user]['password'],
-                                          secured=True)
+        data["ndb_session"] = SessionRegistry.get_session(data["ndb_ip"],
+                                                          user=cred_details[ndb_user]['username'],
+                                                          pwd=cred_details[ndb_user]['password'],
+                                                          secured=True, transport=transport)
     else:
         logger.warning(f"Using default Ndb credentials for {data['ndb_ip']}!")
         default_ndb_password = data.get('default_ndb_password')
-        data["ndb_session"] = RestAPIUtil(data['ndb_ip'], user=DEFAULT_PRISM_USERNAME,
-                                          pwd=default_ndb_password or DEFAULT_PRISM_PASSWORD,
-                                          secured=True)
+        data["ndb_session"] = SessionRegistry.get_session(data['ndb_ip'], user=DEFAULT_PRISM_USERNAME,
+                                                          pwd=default_ndb_password or DEFAULT_PRISM_PASSWORD,
+                                                          secured=True, transport=transport)
 
 
 @enforce_data_arg
@@ -401,6 +410,7 @@ def create_pe_objects(data: dict, global_data: Optional[Dict] = None):
         1. Checks if data has "clusters" entity, if it exists
             i. If "cluster_ip"s are specified as keys, it creates "pe_session" from pe_credential and
             "cluster_info" with cluster details
+            ii. Sessions are fetched from the SessionRegistry, so the same cluster and credential share one session
 
     Eg config: file1
     ----------------------------------
@@ -451,6 +461,8 @@ def create_pe_objects(data: dict, global_data: Optional[Dict] = None):
             raise Exception("Kindly verify if you've selected the correct vault in 'vault_to_use' in 'global.yml'")
         cred_details = data['vaults'][data['vault_to_use']]['credentials']
 
+    transport = data.get("rest_transport") or global_data.get("rest_transport")
+
     # if clusters are specified, get their sessions
     clusters = data.get("clusters", {})
     clusters_map = {}
@@ -468,22 +480,22 @@ def create_pe_objects(data: dict, global_data: Optional[Dict] = None):
             if not cred_details.get(pe_cred, {}).get('username') or not cred_details.get(pe_cred, {}).get('password'):
                 raise Exception(f"PE credentials not specified for the user {pe_cred!r} in 'global.yml'")
 
-            pe_session = RestAPIUtil(cluster_ip,
-                                     user=cred_details[pe_cred]['username'],
-                                     pwd=cred_details[pe_cred]['password'],
-                                     port="9440", secured=True)
-            v4_api_util = ApiClientV4(
+            pe_session = SessionRegistry.get_session(cluster_ip,
+                                                     user=cred_details[pe_cred]['username'],
+                                                     pwd=cred_details[pe_cred]['password'],
+                                                     port="9440", secured=True, transport=transport)
+            v4_api_util = SessionRegistry.get_v4_api_client(
                 cluster_ip, "9440", cred_details[pe_cred]['username'], cred_details[pe_cred]['password']
                 )
         else:
             # use default session
             logger.warning(f"Using default PE credentials for {cluster_ip}!")
             default_pe_password = data.get('default_pe_password')
-            pe_session = RestAPIUtil(cluster_ip,
-                                     user=DEFAULT_PRISM_USERNAME,
-                                     pwd=default_pe_password or DEFAULT_PRISM_PASSWORD,
-                                     port="9440", secured=True)
-            v4_api_util = ApiClientV4(
+            pe_session = SessionRegistry.get_session(cluster_ip,
+                                                     user=DEFAULT_PRISM_USERNAME,
+                                                     pwd=default_pe_password or DEFAULT_PRISM_PASSWORD,
+                                                     port="9440", secured=True, transport=transport)
+            v4_api_util = SessionRegistry.get_v4_api_client(
                 cluster_ip, "9440", DEFAULT_PRISM_USERNAME, default_pe_password or DEFAULT_PRISM_PASSWORD
                 )
         # cluster_op = PeCluster(pe_session)
@@ -550,8 +562,10 @@ def create_ipam_object(data: dict, global_data: Optional[Dict] = None):
 
     # check if ipam username and password in cred_details
     if ip_allocation_method != "static":
-        ipam_account_credential = ipam_config[ip_allocation_method].pop("ipam_credential")
-        username, password = read_creds(data=data, credential=ipam_account_credential)
+        # The local IPAM doesn't need a credential
+        ipam_account_credential = ipam_config[ip_allocation_method].pop("ipam_credential", None)
+        username, password = read_creds(data=data, credential=ipam_account_credential) \
+            if ipam_account_credential else (None, None)
         data["ipam_session"] = IPAM(vendor=ip_allocation_method,
                                     ipam_address=ipam_config[ip_allocation_method]["ipam_address"],
                                     username=username,
@@ -1,4 +1,6 @@
+import contextlib
 import json
+import threading
 import traceback
 import requests
 import requests_cache
@@ -29,6 +31,81 @@ class TimeoutHTTPAdapter(HTTPAdapter):
         return super().send(request, **kwargs)
 
 
+def decode_response(r):
+    """
+    Decode the response returned by the session. JSON content is parsed, everything else is decoded as utf-8 and
+    parsed as json if possible
+
+    Args:
+        r: The requests.Response object
+    :return: The decoded response
+    """
+    if r.headers.get('Content-Type') == 'application/json':
+        try:
+            response = r.json()
+        except Exception as e:
+            # In Case of No or Empty Data .json() gives Exception
+
+            # Added this logic to avoid
+            if str(r) in ['<Response [200]>', '<Response [204]>']:
+                response = r
+            else:
+                raise e
+    else:
+        response = r.content
+        response = response.decode("utf-8")
+        # Sometimes json response is sent back as a string
+        try:
+            response = json.loads(response)
+        except Exception:
+            logger.debug("Cannot parse string response to json")
+
+    logger.debug(f"RESPONSE: {response}")
+    r.raise_for_status()
+    return response
+
+
+def raise_rest_error(r, err):
+    """
+    Convert the exception raised while making/ decoding the call to RestError
+
+    Args:
+        r: The requests.Response object, None if the call itself failed
+        err: The exception that was raised
+    """
+    logger.debug("Got traceback\n{}".format(traceback.format_exc()))
+
+    status_code = r.status_code if hasattr(r, "status_code") else 500
+    error = {"code": status_code}
+
+    if str(status_code).startswith("5") or str(status_code).startswith("4"):
+        if r:
+            error["response"] = r
+
+    if str(status_code) == "401":
+        err_msg = "Unauthorized. Please check your credentials."
+    elif hasattr(r, "json") and callable(getattr(r, "json")):
+        try:
+            err_msg = r.json()
+        except Exception:
+            err_msg = f"{err}"
+    elif hasattr(r, "text"):
+        err_msg = r.text
+    else:
+        err_msg = f"{err}"
+
+    error["error"] = err_msg
+    raise RestError(message=str(error), error="HTTPError")
+
+
+def check_response(response):
+    if str(response) == '<Response [401]>':
+        raise ResponseError(message=str(response), error="LoginFailed")
+    elif str(response) == '<Response [502]>':
+        raise ResponseError(message=str(response), error="BadGateway")
+    return response
+
+
 def rest_api_call(func):
     """
     Decorator function to handle API calls and exceptions
@@ -43,69 +120,47 @@ def rest_api_call(func):
         r = None
         try:
             r = func(*args, **kwargs)
-            if r.headers.get('Content-Type') == 'application/json':
-                try:
-                    response = r.json()
-                except Exception as e:
-                    # In Case of No or Empty Data .json() gives Exception
-
-                    # Added this logic to avoid
-                    if str(r) in ['<Response [200]>', '<Response [204]>']:
-                        response = r
-                    else:
-                        raise e
-            else:
-                response = r.content
-                response = response.decode("utf-8")
-                # Sometimes json response is sent back as a string
-                try:
-                    response = json.loads(response)
-                except Exception:
-                    logger.debug("Cannot parse string response to json")
-
-            logger.debug(f"RESPONSE: {response}")
-            r.raise_for_status()
+            response = decode_response(r)
         # except ConnectionError as e:
         #     error = {"err_msg": e}
         #     raise RestError(message=str(error), error="ConnectionError")
         except Exception as err:
-            logger.debug("Got traceback\n{}".format(traceback.format_exc()))
-
-            status_code = r.status_code if hasattr(r, "status_code") else 500
-            error = {"code": status_code}
-
-            if str(status_code).startswith("5") or str(status_code).startswith("4"):
-                if r:
-                    error["response"] = r
-
-            if str(status_code) == "401":
-                err_msg = "Unauthorized. Please check your credentials."
-            elif hasattr(r, "json") and callable(getattr(r, "json")):
-                try:
-                    err_msg = r.json()
-                except Exception:
-                    err_msg = f"{err}"
-            elif hasattr(r, "text"):
-                err_msg = r.text
-            else:
-                err_msg = f"{err}"
+            raise_rest_error(r, err)
 
-            error["error"] = err_msg
-            raise RestError(message=str(error), error="HTTPError")
+        return check_response(response)
 
-        if str(response) == '<Response [401]>':
-            raise ResponseError(message=str(response), error="LoginFailed")
-        elif str(response) == '<Response [502]>':
-            raise ResponseError(message=str(response), error="BadGateway")
-        return response
+    return make_call
+
+
+def async_rest_api_call(func):
+    """
+    Decorator function to handle async API calls and exceptions, same semantics as rest_api_call
+
+    Args:
+        func: The coroutine function that is making the call, should return requests.Response object
+    :param func:
+    :return:
+    """
+
+    async def make_call(*args, **kwargs):
+        r = None
+        try:
+            r = await func(*args, **kwargs)
+            response = decode_response(r)
+        except Exception as err:
+            raise_rest_error(r, err)
+
+        return check_response(response)
 
     return make_call
 
 
 class RestAPIUtil:
     def __init__(self, ip_address: str, user: Optional[str], pwd: Optional[str], headers: dict = None,
-                 secured: bool = True, port: str = "", cache: bool = False):
+                 secured: bool = True, port: str = "", cache: bool = False, max_in_flight: Optional[int] = None):
         self.__IP_ADDRESS = ip_address
+        # Limits the number of requests in flight to the endpoint, across all the threads sharing this session
+        self.__in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else contextlib.nullcontext()
         self.__SSL_ENABLED = bool(secured)
         self.__PORT = f":{port}" if port else port
         self.__session = requests.Session() if not cache else requests_cache.CachedSession(
@@ -145,6 +200,20 @@ class RestAPIUtil:
 
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+    def __deepcopy__(self, memo):
+        # The session is shared by all the copies of the config data, it is not copied
+        return self
+
+    def get_connection_count(self) -> int:
+        """
+        Number of connections (TCP/ TLS handshakes) opened by this session so far
+        """
+        count = 0
+        for adapter in {id(adapter): adapter for adapter in self.__session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            count += sum(pools[key].num_connections for key in pools.keys())
+        return count
+
     @rest_api_call
     def post(self, uri: str, headers: dict = None, data: dict = None, jsonify=True, verify=False, **kwargs):
         headers = headers if headers is not None else self.__headers
@@ -157,7 +226,8 @@ class RestAPIUtil:
 
         if data:
             logger.debug(f"POST payload: {data}")
-        response = self.__session.post(url, headers=headers, data=data, verify=verify, **kwargs)
+        with self.__in_flight:
+            response = self.__session.post(url, headers=headers, data=data, verify=verify, **kwargs)
         return response
 
     @rest_api_call
@@ -171,7 +241,8 @@ class RestAPIUtil:
 
         if data:
             logger.debug(f"PUT payload: {data}")
-        response = self.__session.put(url, headers=headers, data=data, verify=verify, **kwargs)
+        with self.__in_flight:
+            response = self.__session.put(url, headers=headers, data=data, verify=verify, **kwargs)
         return response
 
     @rest_api_call
@@ -184,9 +255,11 @@ class RestAPIUtil:
         logger.debug("GET request for the URL: " + url)
         if data:
             logger.debug(f"GET payload: {data}")
-            response = self.__session.get(url, headers=headers, data=json.dumps(data), verify=False, **kwargs)
+            with self.__in_flight:
+                response = self.__session.get(url, headers=headers, data=json.dumps(data), verify=False, **kwargs)
         else:
-            response = self.__session.get(url, headers=headers, verify=verify, **kwargs)
+            with self.__in_flight:
+                response = self.__session.get(url, headers=headers, verify=verify, **kwargs)
         return response
 
     @rest_api_call
@@ -196,7 +269,8 @@ class RestAPIUtil:
         headers = {} if not headers else headers
 
         logger.debug("DELETE request for the URL: " + url)
-        response = self.__session.delete(url, headers=headers, verify=verify, **kwargs)
+        with self.__in_flight:
+            response = self.__session.delete(url, headers=headers, verify=verify, **kwargs)
         return response
 
     @rest_api_call
@@ -210,9 +284,11 @@ class RestAPIUtil:
 
         if data:
             logger.debug(f"PATCH payload: {data}")
-            response = self.__session.patch(url, headers=headers, data=data, verify=verify, **kwargs)
+            with self.__in_flight:
+                response = self.__session.patch(url, headers=headers, data=data, verify=verify, **kwargs)
         else:
-            response = self.__session.patch(url, headers=headers, verify=verify, **kwargs)
+            with self.__in_flight:
+                response = self.__session.patch(url, headers=headers, verify=verify, **kwargs)
         return response
 
     def prepare_url(self, uri):
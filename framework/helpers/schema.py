@@ -439,6 +439,24 @@ IMAGING_SCHEMA = {
                 'type': 'string',
                 'required': True
             },
+            'max_parallel_sites': {
+                'type': 'integer',
+                'required': False,
+                'min': 1
+            },
+            'fc_max_in_flight_deployments': {
+                'type': 'integer',
+                'required': False,
+                'min': 1
+            },
+            'dry_run': {
+                'type': 'boolean',
+                'required': False
+            },
+            'imaging_history_file': {
+                'type': 'string',
+                'required': False
+            },
             'pod_blocks': {
                 'type': 'list',
                 'required': True,
@@ -586,6 +604,24 @@ IMAGING_SCHEMA = {
 }
 
 SITE_DEPLOY_SCHEMA = {
+    'max_parallel_sites': {
+        'type': 'integer',
+        'required': False,
+        'min': 1
+    },
+    'fc_max_in_flight_deployments': {
+        'type': 'integer',
+        'required': False,
+        'min': 1
+    },
+    'dry_run': {
+        'type': 'boolean',
+        'required': False
+    },
+    'imaging_history_file': {
+        'type': 'string',
+        'required': False
+    },
     'sites': {
         'type': 'list',
         'required': True,
@@ -712,6 +748,55 @@ SITE_DEPLOY_SCHEMA = {
 }
 
 
+SECTION_STATE_SCHEMA = {
+    'section_state': {
+        'type': 'dict',
+        'schema': {
+            'path': {
+                'type': 'string',
+                'required': True,
+                'empty': False
+            }
+        }
+    }
+}
+
+FILE_UPLOAD_SCHEMA = {
+    'file_upload': {
+        'type': 'dict',
+        'schema': {
+            'state_dir': {
+                'type': 'string',
+                'empty': False
+            },
+            'chunk_size_mib': {
+                'type': 'integer',
+                'min': 1
+            },
+            'max_retries': {
+                'type': 'integer',
+                'min': 0
+            }
+        }
+    }
+}
+
+PC_BATCH_SCHEMA = {
+    'pc_batch': {
+        'type': 'dict',
+        'schema': {
+            'max_in_flight': {
+                'type': 'integer',
+                'min': 1
+            },
+            'chunk_size': {
+                'type': 'integer',
+                'min': 1
+            }
+        }
+    }
+}
+
 EULA_SCHEMA = {
     'eula': {
         'type': 'dict',
@@ -1822,7 +1907,8 @@ CLUSTER_SCHEMA = {
                     }
                 }
             }
-        }
+        },
+    **SECTION_STATE_SCHEMA
 }
 
 NKE_CUSTOM_NODE_CONFIG = {
@@ -2026,6 +2112,8 @@ PC_SCHEMA = {
     **ADDRESS_GROUP_CREATE_SCHEMA,
     **SERVICE_GROUP_CREATE_SCHEMA,
     **SECURITY_POLICIES_CREATE_SCHEMA,
+    **SECTION_STATE_SCHEMA,
+    **PC_BATCH_SCHEMA
 }
 
 POD_CONFIG_SCHEMA = {
@@ -2037,6 +2125,26 @@ POD_CONFIG_SCHEMA = {
                 'type': 'string',
                 'required': True
             },
+            'max_parallel_blocks': {
+                'type': 'integer',
+                'required': False,
+                'min': 1
+            },
+            'pc_max_in_flight_requests': {
+                'type': 'integer',
+                'required': False,
+                'min': 1
+            },
+            'max_worker_threads': {
+                'type': 'integer',
+                'required': False,
+                'min': 1
+            },
+            'nke_max_parallel_deployments': {
+                'type': 'integer',
+                'required': False,
+                'min': 1
+            },
             'pod_blocks': {
                 'type': 'list',
                 'required': True,
@@ -2067,7 +2175,8 @@ POD_CONFIG_SCHEMA = {
                 }
             }
         }
-    }
+    },
+    **SECTION_STATE_SCHEMA
 }
 
 CREATE_VM_WORKLOAD_SCHEMA = {
@@ -2255,7 +2364,14 @@ OVA_UPLOAD_SCHEMA = {
             'schema': {
                 'url': {
                     'type': 'string',
-                    'required': True
+                    'required': True,
+                    'excludes': 'source'
+                },
+                # Path of a local file, uploaded in chunks, instead of the url
+                'source': {
+                    'type': 'string',
+                    'required': True,
+                    'excludes': 'url'
                 },
                 'name': {
                     'type': 'string',
@@ -2293,7 +2409,14 @@ PC_IMAGE_UPLOAD_SCHEMA = {
             "schema": {
                 "url": {
                     "type": "string",
-                    "required": True
+                    "required": True,
+                    "excludes": "source"
+                },
+                # Path of a local file, uploaded in chunks, instead of the url
+                "source": {
+                    "type": "string",
+                    "required": True,
+                    "excludes": "url"
                 },
                 "name": {
                     "type": "string",
@@ -2335,9 +2458,20 @@ PE_IMAGE_UPLOAD_SCHEMA = {
                     "type": "string",
                     "required": True,
                     "allowed": ["DISK_IMAGE", "ISO_IMAGE"]
+                },
+                "checksum": {
+                    "type": "string"
+                },
+                "checksum_algorithm": {
+                    "type": "string",
+                    "allowed": ["SHA_1", "SHA_256"]
                 }
             }
         }
+    },
+    "image_distribution": {
+        "type": "string",
+        "allowed": ["direct", "pc"]
     }
 }
 
@@ -2412,6 +2546,29 @@ DEPLOY_PC_FILES_SCHEMA = {
     }
 }
 
+PC_SOFTWARE_DISTRIBUTION_SCHEMA = {
+    'pc_software_distribution': {
+        'type': 'dict',
+        'schema': {
+            'mode': {
+                'type': 'string',
+                'allowed': ['direct', 'peer', 'cache']
+            },
+            'cache_dir': {
+                'type': 'string'
+            },
+            'bandwidth_limit_mbps': {
+                'type': 'number',
+                'min': 1
+            },
+            'max_uploads_per_source': {
+                'type': 'integer',
+                'min': 1
+            }
+        }
+    }
+}
+
 DEPLOY_PC_CONFIG_SCHEMA = {
     'clusters': {
         'type': 'dict',
@@ -2499,7 +2656,8 @@ DEPLOY_PC_CONFIG_SCHEMA = {
                 }
             }
         }
-    }
+    },
+    **PC_SOFTWARE_DISTRIBUTION_SCHEMA
 }
 
 POD_MANAGEMENT_DEPLOY_SCHEMA = {
@@ -2519,6 +2677,8 @@ POD_MANAGEMENT_DEPLOY_SCHEMA = {
             'pc_credential': CREDENTIAL_SCHEMA,
             **OVA_UPLOAD_SCHEMA,
             **PC_IMAGE_UPLOAD_SCHEMA,
+            **FILE_UPLOAD_SCHEMA,
+            **PC_SOFTWARE_DISTRIBUTION_SCHEMA,
             'ncm': DEPLOY_OVA_AS_VM_SCHEMA,
             **DEPLOY_PC_CONFIG_SCHEMA
         }
@@ -2589,6 +2749,31 @@ CVMF_UPDATE_SCHEMA = {
     }
 }
 
+CVM_FLEET_OPERATION_SCHEMA = {
+    'cvm_credential': {'type': 'string', 'validator': contains_whitespace, 'required': True},
+    'cvm_ips': {
+        'type': 'list',
+        'required': True,
+        'empty': False,
+        'schema': {'type': 'string', 'validator': validate_ip}
+    },
+    'operation': {
+        'type': 'dict',
+        'required': True,
+        'schema': {
+            # Either a helper of SSHCvm (update_resolv_conf, get_foundation_version ...) or a shell command
+            'helper': {'type': 'string', 'excludes': 'command', 'required': True},
+            'command': {'type': 'string', 'excludes': 'helper', 'required': True},
+            'args': {'type': 'dict', 'required': False},
+            'timeout': {'type': 'integer', 'required': False, 'min': 1}
+        }
+    },
+    'max_parallel': {'type': 'integer', 'required': False, 'min': 1},
+    'batch_size': {'type': 'integer', 'required': False, 'min': 1},
+    'max_failures': {'type': 'integer', 'required': False, 'min': 0},
+    'max_failure_percent': {'type': 'number', 'required': False, 'min': 0, 'max': 100}
+}
+
 NDB_COMPUTE_PROFILES = {
     "compute_profiles": {
         "type": "list",
@@ -2800,5 +2985,6 @@ NDB_SCHEMA = {
                 }
             }
         }
-    }
+    },
+    **SECTION_STATE_SCHEMA
 }
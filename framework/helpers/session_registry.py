@@ -0,0 +1,123 @@
+import hashlib
+import threading
+from typing import Optional, Dict, Tuple, Union
+from .async_rest_utils import AsyncRestAPIUtil
+from .rest_utils import RestAPIUtil
+from .v4_api_client import ApiClientV4
+from .log_utils import get_logger
+
+logger = get_logger(__name__)
+
+REQUESTS_TRANSPORT = "requests"
+ASYNC_TRANSPORT = "async"
+
+
+class SessionRegistry:
+    """
+    Process-wide registry of REST sessions and v4 API clients, keyed by endpoint and credential.
+    Identical endpoints are connected once per run, and the same session is handed out to every block/ script that
+    targets the endpoint.
+    """
+    _lock = threading.Lock()
+    _sessions: Dict[Tuple, Union[RestAPIUtil, AsyncRestAPIUtil]] = {}
+    _v4_api_clients: Dict[Tuple, ApiClientV4] = {}
+    _metrics = {
+        "sessions_created": 0,
+        "sessions_reused": 0,
+        "v4_api_clients_created": 0,
+        "v4_api_clients_reused": 0
+    }
+
+    @staticmethod
+    def get_key(ip_address: str, port: str, user: Optional[str], pwd: Optional[str], *args) -> Tuple:
+        # Don't keep the password in the key
+        pwd_hash = hashlib.sha256(pwd.encode()).hexdigest() if pwd else None
+        return (ip_address, str(port), user, pwd_hash) + args
+
+    @classmethod
+    def get_session(cls, ip_address: str, user: Optional[str], pwd: Optional[str], port: str = "",
+                    secured: bool = True, transport: Optional[str] = None,
+                    max_in_flight: Optional[int] = None) -> Union[RestAPIUtil, AsyncRestAPIUtil]:
+        """
+        Get the shared session for the endpoint, create one if it doesn't exist
+
+        Args:
+            ip_address (str): IP/ FQDN of the endpoint
+            user (str): Username
+            pwd (str): Password
+            port (str, optional): Port of the endpoint
+            secured (bool, optional): https or http, https by default
+            transport (str, optional): "requests" or "async", "requests" by default
+            max_in_flight (int, optional): Maximum number of requests in flight to the endpoint, applied when the
+              session is created
+
+        Returns:
+            RestAPIUtil or AsyncRestAPIUtil object
+        """
+        transport = transport or REQUESTS_TRANSPORT
+        if transport not in [REQUESTS_TRANSPORT, ASYNC_TRANSPORT]:
+            raise Exception(f"Invalid rest transport {transport!r}. Supported values are "
+                            f"{REQUESTS_TRANSPORT!r} and {ASYNC_TRANSPORT!r}")
+
+        key = cls.get_key(ip_address, port, user, pwd, bool(secured), transport)
+        with cls._lock:
+            if key in cls._sessions:
+                cls._metrics["sessions_reused"] += 1
+                return cls._sessions[key]
+
+            logger.debug(f"Creating a new {transport} session for {ip_address}")
+            if transport == ASYNC_TRANSPORT:
+                session = AsyncRestAPIUtil(ip_address, user=user, pwd=pwd, port=port, secured=secured,
+                                           max_in_flight=max_in_flight)
+            else:
+                session = RestAPIUtil(ip_address, user=user, pwd=pwd, port=port, secured=secured,
+                                      max_in_flight=max_in_flight)
+            cls._sessions[key] = session
+            cls._metrics["sessions_created"] += 1
+            return session
+
+    @classmethod
+    def get_v4_api_client(cls, ip_address: str, port: str, user: str, pwd: str) -> ApiClientV4:
+        """
+        Get the shared v4 API client for the endpoint, create one if it doesn't exist
+
+        Args:
+            ip_address (str): IP/ FQDN of the endpoint
+            port (str): Port of the endpoint
+            user (str): Username
+            pwd (str): Password
+
+        Returns:
+            ApiClientV4 object
+        """
+        key = cls.get_key(ip_address, port, user, pwd)
+        with cls._lock:
+            if key in cls._v4_api_clients:
+                cls._metrics["v4_api_clients_reused"] += 1
+                return cls._v4_api_clients[key]
+
+            logger.debug(f"Creating a new v4 API client for {ip_address}")
+            v4_api_client = ApiClientV4(ip_address, port, user, pwd)
+            cls._v4_api_clients[key] = v4_api_client
+            cls._metrics["v4_api_clients_created"] += 1
+            return v4_api_client
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        """
+        Reuse counts of the registry and number of connections (TLS handshakes) opened by the shared sessions
+        """
+        with cls._lock:
+            metrics = dict(cls._metrics)
+            sessions = list(cls._sessions.values())
+        metrics["connections_opened"] = sum(
+            session.get_connection_count() for session in sessions if isinstance(session, RestAPIUtil))
+        return metrics
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._sessions = {}
+            cls._v4_api_clients = {}
+            for metric in cls._metrics:
+                cls._metrics[metric] = 0
@@ -1,3 +1,4 @@
+import threading
 import ntnx_microseg_py_client
 import ntnx_networking_py_client
 import ntnx_prism_py_client
@@ -17,6 +18,11 @@ class ApiClientV4:
         self.user = user
         self.pwd = pwd
         self.cache = {}
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # The client is shared by all the copies of the config data, it is not copied
+        return self
 
     def get_api_client(self, client_type, max_retry_attempts=3, backoff_factor=3, verify_ssl=False):
         """
@@ -39,12 +45,13 @@ class ApiClientV4:
         Raises:
             ValueError: If the client_type is invalid.
         """
-        if client_type in self.cache:
-            return self.cache[client_type]
+        with self.lock:
+            if client_type in self.cache:
+                return self.cache[client_type]
 
-        new_client = self._create_api_client(client_type, max_retry_attempts, backoff_factor, verify_ssl)
-        self.cache[client_type] = new_client
-        return new_client
+            new_client = self._create_api_client(client_type, max_retry_attempts, backoff_factor, verify_ssl)
+            self.cache[client_type] = new_client
+            return new_client
 
     def _create_api_client(self, client_type, max_retry_attempts, backoff_factor, verify_ssl):
         """Factory method to create a client based on the client_type.
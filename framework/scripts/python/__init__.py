@@ -91,6 +91,7 @@ from .pe.update.rebuild_capacity_reservation import RebuildCapacityReservation
 from .pe.delete.delete_rolemapping_pe import DeleteRoleMappingPe
 from .objects.objectstore.delete_objectstore import DeleteObjectStore
 from .cvm.update_cvm_foundation import UpdateCvmFoundation
+from .cvm.cvm_fleet_operation import CvmFleetOperation
 from .pc.create.create_vpc_pc import CreateVPC
 from .pc.delete.delete_vpc_pc import DeleteVPC
 from .pc.update.update_vpc_pc import UpdateVPC
@@ -128,4 +129,4 @@ __all__ = ["AddAdServerPe", "PodConfig", "ConnectToAz", "CreateBp", "CreateCateg
            "CreateVmPe", "PowerTransitionVmPe", "NdbConfig", "UpdatePasswordNdb", "RegisterInitClusterNdb", "CreateVmsPc",
            "AddUserGroups", "ImportUsers", "AddAuthorizationPolicy", "AddLocalUsers", "CreateIAMKeys", "AddRoles",
            "AddAuthorizationPolicy", "AddDirectoryServices", "EnableFC", "GenerateFcApiKey", "EnableMarketplace",
-           "IamUser"]
+           "IamUser", "CvmFleetOperation"]
@@ -12,10 +12,13 @@ from framework.scripts.python.ncm.project.create_calm_user import CreateNcmUser
 from framework.scripts.python.ncm.project.create_calm_project import CreateNcmProject
 from framework.scripts.python.nke.create_nke_clusters import CreateKarbonClusterPc
 from .helpers.batch_script import BatchScript
+from .helpers.workflow_script import WorkflowScript
+from .helpers.worker_budget import WorkerBudget
 from framework.scripts.python.ncm.init_calm_dsl import InitCalmDsl
 from .script import Script
 from framework.helpers.log_utils import get_logger
 from framework.helpers.helper_functions import create_pc_objects
+from framework.helpers.session_registry import SessionRegistry
 
 logger = get_logger(__name__)
 
@@ -26,9 +29,8 @@ class PodConfig(Script):
     """
 
     def __init__(self, data: Dict, **kwargs):
-        self.ncm_projects = {}
-        self.nke_scripts = None
-        self.block_batch_scripts = {}
+        self.pod_workflow = None
+        self.block_report = {}
         self.data = data
         self.pod = self.data["pod"]
         self.blocks = self.pod.get("pod_blocks", {})
@@ -37,13 +39,22 @@ class PodConfig(Script):
 
     def execute(self):
         start = time.time()
-        self.block_batch_scripts = {}
+        if self.pod.get("max_worker_threads"):
+            # Threads shared by all the parallel scripts of the pod, however deep they are nested
+            WorkerBudget.configure(max_workers=self.pod["max_worker_threads"])
+        # The whole pod is one workflow. Blocks, and sites within a block, don't wait for each other.
+        # max_parallel_blocks limits the number of blocks in progress at a time
+        self.pod_workflow = WorkflowScript(max_active_groups=self.pod.get("max_parallel_blocks"))
 
         for block in self.blocks:
             block_name = block.get("pod_block_name").replace(" ", "")
-            self.block_batch_scripts[block_name] = BatchScript(results_key=block_name)
-            # Get PC session
+            ncm_projects = {}
+            # Get PC session. The in-flight request limit keeps a block from starving the others sharing the PC
+            if self.pod.get("pc_max_in_flight_requests"):
+                block.setdefault("pc_max_in_flight_requests", self.pod["pc_max_in_flight_requests"])
             create_pc_objects(block, global_data=self.data)
+            pc_ip = block.get("pc_ip")
+            clusters_resource = f"{block_name}/clusters"
             if block.get("edge_sites", []):
                 for edge_site in block["edge_sites"]:
                     site_name = edge_site.get('site_name').replace(" ", "")
@@ -54,64 +65,70 @@ class PodConfig(Script):
                         edge_site["pc_ip"] = block.get("pc_ip")
                         edge_site["pc_credential"] = block.get("pc_credential")
                         edge_site["pc_session"] = block.get("pc_session")
-                        self.block_batch_scripts[block_name].add(
+                        self.pod_workflow.add(
                             ClusterConfig(data=deepcopy(edge_site), global_data=self.data, results_key=site_name,
-                                          log_file=f"{block_name}_{site_name}_pe_ops.log"))
+                                          log_file=f"{block_name}_{site_name}_pe_ops.log"),
+                            scope=f"{block_name}/{site_name}", provides=[clusters_resource],
+                            results_path=[block_name], group=block_name)
 
                         # If ncm subnets are specified, we'll create projects in ncm per cluster
                         for cluster in edge_site["clusters"].values():
                             if cluster.get("ncm_subnets") and cluster.get("ncm_users"):
-                                self.ncm_projects[cluster["name"]] = {
+                                ncm_projects[cluster["name"]] = {
                                     "subnets": cluster["ncm_subnets"],
                                     "users": cluster["ncm_users"]
                                 }
 
-                    # If nke clusters are specified add it to a variable
+                    # nke clusters need the PC config
                     if edge_site.get("nke_clusters", []):
                         edge_site["pc_session"] = block["pc_session"]
-                        self.nke_scripts = self.nke_scripts or BatchScript(parallel=True)
-                        self.nke_scripts.add(CreateKarbonClusterPc(edge_site, global_data=self.data,
-                                                                   log_file=f"{block_name}_pc_ops.log"))
-
-            # configure PC services/ entities
-            self.block_batch_scripts[block_name].add(PcConfig(data=deepcopy(block), global_data=self.data,
-                                                              results_key='pc', log_file=f"{block_name}_pc_ops.log"))
-
-            calm_objects_nke = BatchScript(parallel=True)
+                        if self.pod.get("nke_max_parallel_deployments"):
+                            edge_site.setdefault("nke_max_parallel_deployments",
+                                                 self.pod["nke_max_parallel_deployments"])
+                        self.pod_workflow.add(
+                            CreateKarbonClusterPc(edge_site, global_data=self.data,
+                                                  log_file=f"{block_name}_pc_ops.log"),
+                            scope=f"{block_name}/{site_name}", requires=[f"{block_name}/pc"], endpoint=pc_ip,
+                            results_path=[block_name, "pc"], group=block_name)
+
+            # configure PC services/ entities, once the clusters are configured
+            self.pod_workflow.add(PcConfig(data=deepcopy(block), global_data=self.data, results_key='pc',
+                                           log_file=f"{block_name}_pc_ops.log"),
+                                  scope=block_name, requires=[clusters_resource], provides=[f"{block_name}/pc"],
+                                  endpoint=pc_ip, results_path=[block_name], group=block_name)
 
             # create project for every cluster
-            if self.ncm_projects:
+            if ncm_projects:
                 calm_batch_scripts = BatchScript(results_key='ncm')
                 calm_batch_scripts.add(CalmConfig(data=deepcopy(block), global_data=self.data,
                                                   log_file=f"{block_name}_calm_ops.log"))
-                calm_batch_scripts.add(self.create_ncm_projects(self.ncm_projects, global_data=self.data,
+                calm_batch_scripts.add(self.create_ncm_projects(ncm_projects, global_data=self.data,
                                                                 block_config=block,
                                                                 log_file=f"{block_name}_calm_ops.log"))
-                calm_objects_nke.add(calm_batch_scripts)
-
-            # configure nke_clusters and objects in parallel in the end
-            if self.nke_scripts or block.get("objects", {}).get("objectstores"):
-                nke_objects_batch_scripts = BatchScript(parallel=True, results_key='pc')
-                if self.nke_scripts:
-                    nke_objects_batch_scripts.add(self.nke_scripts)
-
-                # Create objects
-                if block.get("objects", {}).get("objectstores"):
-                    nke_objects_batch_scripts.add(OssConfig(data=deepcopy(block), global_data=self.data,
-                                                            results_key='objects',
-                                                            log_file=f"{block_name}_objects_ops.log"))
-                calm_objects_nke.add(nke_objects_batch_scripts)
-
-            self.block_batch_scripts[block_name].add(calm_objects_nke)
-
-        for block in self.blocks:
-            block_name = block.get("pod_block_name")
-            result = self.block_batch_scripts[block_name].run()
-            self.results.update(result)
-            self.logger.info(json.dumps(result, indent=4))
+                self.pod_workflow.add(calm_batch_scripts, name=f"{block_name}/ncm", requires=[f"{block_name}/pc"],
+                                      endpoint=pc_ip, results_path=[block_name], group=block_name)
+
+            # Create objects
+            if block.get("objects", {}).get("objectstores"):
+                self.pod_workflow.add(OssConfig(data=deepcopy(block), global_data=self.data, results_key='objects',
+                                                log_file=f"{block_name}_objects_ops.log"),
+                                      scope=block_name, requires=[f"{block_name}/pc"], endpoint=pc_ip,
+                                      results_path=[block_name, "pc"], group=block_name)
+
+        self.results.update(self.pod_workflow.run())
+        self.block_report = self.pod_workflow.get_group_report()
+        for block_name, report in self.block_report.items():
+            self.logger.info(json.dumps({block_name: self.results.get(block_name, {})}, indent=4, default=str))
+            duration = f"{report['duration']:.2f} seconds" if report["duration"] is not None else "N/A"
+            self.logger.info(f"Block {block_name!r}: {report['scripts']} scripts, {len(report['failed'])} failed, "
+                             f"duration: {duration}")
+            if report["failed"]:
+                self.logger.error(f"Block {block_name!r}: failed scripts {report['failed']}")
 
         total_time = time.time() - start
         self.logger.info(f"Total time: {total_time:.2f} seconds")
+        self.logger.info(f"Session metrics: {SessionRegistry.get_metrics()}")
+        self.logger.info(f"Worker budget metrics: {WorkerBudget.get_instance().get_metrics()}")
         self.data["json_output"] = self.results
 
     @staticmethod
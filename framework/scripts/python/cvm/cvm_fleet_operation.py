@@ -0,0 +1,59 @@
+from typing import Dict
+from framework.scripts.python.script import Script
+from framework.helpers.log_utils import get_logger
+from framework.helpers.helper_functions import read_creds
+from framework.scripts.python.helpers.cvm.fleet_runner import CvmFleetRunner
+
+logger = get_logger(__name__)
+
+
+class CvmFleetOperation(Script):
+    """
+    Run the same operation, a helper of SSHCvm or a shell command, across a fleet of CVMs in rolling batches
+    """
+
+    def __init__(self, data: Dict, **kwargs):
+        """
+        Args:
+            data (dict):
+                cvm_credential (str): CVM credential to fetch from vault in global.yml
+                cvm_ips (list): CVM IPs
+                operation (dict): helper & args, or command & timeout
+                max_parallel (int, optional): Maximum number of CVMs run at a time
+                batch_size (int, optional): Number of CVMs of a rolling batch
+                max_failures (int, optional): Stop after more than max_failures CVMs have failed
+                max_failure_percent (float, optional): Stop after more than max_failure_percent of the CVMs
+                    have failed
+        """
+        self.data = data
+        self.operation = self.data.get("operation", {})
+        super(CvmFleetOperation, self).__init__(**kwargs)
+        self.logger = self.logger or logger
+
+    def execute(self, **kwargs):
+        try:
+            cvm_username, cvm_password = read_creds(data=self.data, credential=self.data["cvm_credential"])
+            runner = CvmFleetRunner(
+                self.data["cvm_ips"], cvm_username, cvm_password,
+                max_parallel=self.data.get("max_parallel", CvmFleetRunner.DEFAULT_MAX_PARALLEL),
+                batch_size=self.data.get("batch_size"), max_failures=self.data.get("max_failures"),
+                max_failure_percent=self.data.get("max_failure_percent"))
+            if self.operation.get("command"):
+                results = runner.run_command(self.operation["command"], timeout=self.operation.get("timeout", 60))
+            else:
+                results = runner.run(self.operation["helper"], **self.operation.get("args", {}))
+
+            self.results["cvms"] = {self.name: results}
+            self.results["summary"] = runner.get_summary()
+            for cvm_ip, result in results.items():
+                if result["status"] == CvmFleetRunner.FAILED:
+                    self.exceptions.append(f"{cvm_ip}: {result['error']}")
+            if runner.aborted:
+                self.exceptions.append(f"Failure threshold exceeded, {self.results['summary']['SKIPPED']} CVM(s) "
+                                       f"were skipped")
+        except Exception as e:
+            self.exceptions.append(f"Exception occurred while running the operation on the CVMs: {e}")
+
+    def verify(self, **kwargs):
+        # The results of the operation are the verification
+        pass
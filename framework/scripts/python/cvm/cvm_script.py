@@ -1,10 +1,10 @@
 import threading
 import multiprocessing
-import concurrent.futures
 from abc import abstractmethod
 from typing import Dict
 from framework.helpers.log_utils import get_logger
 from framework.scripts.python.script import Script
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
 
 logger = get_logger(__name__)
 
@@ -16,14 +16,16 @@ class CvmScript(Script):
         self.parallel = parallel
         super(CvmScript, self).__init__(**kwargs)
         self.results["cvms"] = {}
-        # Set the value of max_workers based on the number of CPU cores
+        # Set the value of max_workers based on the number of CPU cores, the threads are borrowed from the
+        # process-wide WorkerBudget
         self.max_workers = multiprocessing.cpu_count() + 4
 
     def execute(self, **kwargs):
         if self.parallel:
             try:
-                with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    executor.map(self.execute_single_cvm, self.cvms.keys(), self.cvms.values())
+                WorkerBudget.get_instance().map(self.execute_single_cvm, self.cvms.keys(),
+                                                self.cvms.values(), max_workers=self.max_workers,
+                                                host=lambda ip, _: ip, return_exceptions=True)
             except Exception as e:
                 self.exceptions.append(e)
         else:
@@ -35,8 +37,9 @@ class CvmScript(Script):
 
     def verify(self, **kwargs):
         if self.parallel:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                executor.map(self.verify_single_cvm, self.cvms.keys(), self.cvms.values())
+            WorkerBudget.get_instance().map(self.verify_single_cvm, self.cvms.keys(),
+                                            self.cvms.values(), max_workers=self.max_workers,
+                                            host=lambda ip, _: ip, return_exceptions=True)
         else:
             try:
                 for cvm_ip, cvm_details in self.cvms.items():
@@ -1,8 +1,8 @@
-import concurrent.futures
 import multiprocessing
-from typing import Dict
+from typing import Dict, Optional
 from framework.helpers.log_utils import get_logger
 from ..script import Script
+from .worker_budget import WorkerBudget
 
 logger = get_logger(__name__)
 
@@ -12,13 +12,17 @@ class BatchScript(Script):
     We can group scripts together and execute them in serial or parallel
     """
 
-    def __init__(self, results_key: str = "", parallel: bool = False, **kwargs):
+    def __init__(self, results_key: str = "", parallel: bool = False, state_store=None,
+                 endpoint: Optional[str] = None, **kwargs):
         """
         Constructor for BatchScript.
         Args:
            kwargs(dict):
             parallel(bool, optional): Whether to run the sub-steps in parallel,
               default value is False
+            state_store(SectionStateStore, optional): Skip the scripts whose section is unchanged since their last
+              verified run against the endpoint
+            endpoint(str, optional): PC/ PE the scripts run against
         """
         self.script_list = []
         self._results = {}
@@ -26,10 +30,12 @@ class BatchScript(Script):
         # is passed the return value of the run function would be {"results_key": self._results}, which would be
         # consolidated into results, by results setter in parent BatchScript.
         self.results_key = results_key
-        # Set max_workers that can run in parallel
+        # Set max_workers that can run in parallel, the threads are borrowed from the process-wide WorkerBudget
         self.max_workers = kwargs.get("max_workers") or multiprocessing.cpu_count() + 4
         # If we can run scripts in parallel
         self._parallel = parallel
+        self.state_store = state_store
+        self.endpoint = endpoint
         super(BatchScript, self).__init__(**kwargs)
         self.logger = self.logger or logger
 
@@ -111,6 +117,15 @@ class BatchScript(Script):
 
         return {self.results_key: self.results} if self.results_key else self.results
 
+    def run_script(self, script, endpoint: Optional[str] = None):
+        """
+        Run one script, through the state store if there is one
+        """
+        endpoint = endpoint or self.endpoint
+        if self.state_store and endpoint:
+            return self.state_store.run(script, endpoint)
+        return script.run()
+
     def _sequential_execute(self):
         """
         Execute all the steps in sequential.
@@ -120,7 +135,7 @@ class BatchScript(Script):
         """
         for script in self.script_list:
             try:
-                result = script.run()
+                result = self.run_script(script)
                 self.results = result
             except Exception as e:
                 logger.error(e)
@@ -132,12 +147,12 @@ class BatchScript(Script):
         Returns:
           None
         """
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            for result in executor.map(lambda script: script.run(), self.script_list):
-                try:
-                    self.results = result
-                except Exception as e:
-                    logger.error(e)
+        budget = WorkerBudget.get_instance()
+        for result in budget.map(self.run_script, self.script_list, max_workers=self.max_workers):
+            try:
+                self.results = result
+            except Exception as e:
+                logger.error(e)
 
     def execute(self):
         pass
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Optional
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+MiB = 1024 * 1024
+
+
+class ChunkedUpload:
+    """
+    Upload of a local file in fixed-size chunks, only one chunk is held in memory at a time.
+
+    Every chunk is sent by send_chunk(chunk, offset, total_size), a chunk that fails is sent again up to max_retries
+    times with an exponential backoff. With a state_dir, the offset of the last chunk sent is saved after every chunk,
+    so an upload that is interrupted resumes from that offset the next time, as long as the file didn't change. If
+    the server can tell how much of the file it already has, get_offset() takes precedence over the saved offset.
+    """
+    DEFAULT_CHUNK_SIZE = 16 * MiB
+    DEFAULT_MAX_RETRIES = 3
+    DEFAULT_RETRY_INTERVAL_IN_SEC = 5
+
+    def __init__(self, source: str, send_chunk: Callable[[bytes, int, int], None], key: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_retries: int = DEFAULT_MAX_RETRIES,
+                 retry_interval: float = DEFAULT_RETRY_INTERVAL_IN_SEC, state_dir: Optional[str] = None,
+                 get_offset: Optional[Callable[[], Optional[int]]] = None, checksum_algorithm: Optional[str] = None):
+        """
+        Args:
+          source(str): Path of the file to upload
+          send_chunk(callable): Sends a chunk, called with the chunk, its offset and the size of the file
+          key(str, optional): Identifies the upload in state_dir, e.g. the target url, the path of the file by default
+          chunk_size(int, optional): Size of the chunks in bytes
+          max_retries(int, optional): Number of times a failed chunk is sent again
+          retry_interval(float, optional): Wait before the first retry of a chunk, doubled for every retry
+          state_dir(str, optional): Directory where the progress of the upload is saved to resume it
+          get_offset(callable, optional): Offset the server already has, None if it doesn't know
+          checksum_algorithm(str, optional): hashlib algorithm, e.g. "sha256", the checksum of the file is returned
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size should be greater than 0")
+        self.source = source
+        self.send_chunk = send_chunk
+        self.key = key or os.path.abspath(source)
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_interval = retry_interval
+        self.state_dir = state_dir
+        self.get_offset = get_offset
+        self.checksum_algorithm = checksum_algorithm
+
+    @property
+    def state_file(self) -> Optional[str]:
+        if not self.state_dir:
+            return None
+        return os.path.join(self.state_dir, f"{hashlib.sha256(self.key.encode()).hexdigest()}.upload.json")
+
+    def is_pending(self) -> bool:
+        """
+        Whether a previous upload of the file was interrupted
+        """
+        return bool(self.state_file) and os.path.exists(self.state_file)
+
+    def upload(self) -> Dict:
+        """
+        Upload the file, from the offset of the previous attempt if it was interrupted
+
+        Returns:
+          dict: Metrics of the upload, bytes_sent, seconds, throughput (bytes per second), resumed_from, retries and
+            checksum if checksum_algorithm is set
+        """
+        stat = os.stat(self.source)
+        total_size = stat.st_size
+        offset = self.__get_start_offset(total_size, stat.st_mtime)
+        hasher = hashlib.new(self.checksum_algorithm) if self.checksum_algorithm else None
+        metrics = {"bytes_sent": 0, "seconds": 0.0, "throughput": 0.0, "resumed_from": offset, "retries": 0}
+        if offset:
+            logger.info(f"Resuming the upload of {self.source!r} from {offset}/{total_size} bytes")
+
+        # Recorded before the first chunk, the upload is pending till it completes
+        self.__save_state(offset, total_size, stat.st_mtime)
+        start = time.time()
+        with open(self.source, "rb") as f:
+            if hasher:
+                # The part already uploaded is only read to compute the checksum
+                while f.tell() < offset:
+                    hasher.update(f.read(min(self.chunk_size, offset - f.tell())))
+            f.seek(offset)
+            while offset < total_size:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    raise Exception(f"{self.source!r} was truncated during the upload, at {offset}/{total_size} bytes")
+                metrics["retries"] += self.__send(chunk, offset, total_size)
+                if hasher:
+                    hasher.update(chunk)
+                offset += len(chunk)
+                metrics["bytes_sent"] += len(chunk)
+                self.__save_state(offset, total_size, stat.st_mtime)
+                elapsed = time.time() - start
+                logger.debug(f"Uploaded {offset}/{total_size} bytes of {self.source!r}, "
+                             f"{self.__format_throughput(metrics['bytes_sent'], elapsed)}")
+
+        metrics["seconds"] = time.time() - start
+        metrics["throughput"] = metrics["bytes_sent"] / metrics["seconds"] if metrics["seconds"] else 0.0
+        if hasher:
+            metrics["checksum"] = hasher.hexdigest()
+        self.__clear_state()
+        logger.info(f"Uploaded {self.source!r} ({total_size} bytes, {metrics['retries']} retries) at "
+                    f"{self.__format_throughput(metrics['bytes_sent'], metrics['seconds'])}")
+        return metrics
+
+    def __send(self, chunk: bytes, offset: int, total_size: int) -> int:
+        """
+        Send a chunk, retrying it if it fails
+
+        Returns:
+          int: Number of retries
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.send_chunk(chunk, offset, total_size)
+                return attempt
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise Exception(f"Failed to upload the chunk at {offset}/{total_size} bytes of {self.source!r} "
+                                    f"after {self.max_retries} retries: {e}")
+                wait = self.retry_interval * (2 ** attempt)
+                logger.warning(f"Failed to upload the chunk at {offset}/{total_size} bytes of {self.source!r}, "
+                               f"retrying in {wait} seconds: {e}")
+                time.sleep(wait)
+
+    def __get_start_offset(self, total_size: int, mtime: float) -> int:
+        if self.get_offset:
+            try:
+                offset = self.get_offset()
+                if offset is not None:
+                    return max(0, min(int(offset), total_size))
+            except Exception as e:
+                logger.debug(f"Couldn't get the uploaded offset of {self.source!r} from the server: {e}")
+
+        state = self.__load_state()
+        # The saved offset is only valid for the same file
+        if state and state.get("size") == total_size and state.get("mtime") == mtime and \
+                state.get("source") == os.path.abspath(self.source):
+            return max(0, min(int(state.get("offset", 0)), total_size))
+        return 0
+
+    def __load_state(self) -> Optional[Dict]:
+        if not self.state_file or not os.path.exists(self.state_file):
+            return None
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except Exception as e:
+            logger.debug(f"Ignoring the upload state {self.state_file!r}: {e}")
+            return None
+
+    def __save_state(self, offset: int, total_size: int, mtime: float):
+        if not self.state_file:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        state = {"source": os.path.abspath(self.source), "key": self.key, "size": total_size, "mtime": mtime,
+                 "offset": offset}
+        # Written to a temporary file first, an interruption never leaves a partial state
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def __clear_state(self):
+        if self.state_file and os.path.exists(self.state_file):
+            os.remove(self.state_file)
+
+    @staticmethod
+    def __format_throughput(size: int, seconds: float) -> str:
+        return f"{size / MiB / seconds:.2f} MiB/s" if seconds else "n/a"
+
+
+def get_upload_options(data: Dict, global_data: Optional[Dict] = None) -> Dict:
+    """
+    Options of the chunked uploads configured in "file_upload" of the data or of the global data
+
+    Returns:
+      dict: kwargs of ChunkedUpload, empty if file_upload isn't configured
+    """
+    global_data = global_data or {}
+    config = data.get("file_upload") or global_data.get("file_upload") or {}
+    options = {}
+    if config.get("state_dir"):
+        # Relative paths are relative to the project root, same as the other files in the configs
+        project_root = data.get("project_root") or global_data.get("project_root") or ""
+        options["state_dir"] = os.path.join(str(project_root), config["state_dir"])
+    if config.get("chunk_size_mib"):
+        options["chunk_size"] = int(config["chunk_size_mib"]) * MiB
+    if config.get("max_retries") is not None:
+        options["max_retries"] = config["max_retries"]
+    return options
+
@@ -0,0 +1,181 @@
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.cvm.ssh_cvm import SSHCvm
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
+
+logger = get_logger(__name__)
+
+
+class CvmFleetRunner:
+    """
+    Run the same operation across a fleet of CVMs: a shell command, or one of the SSHCvm helpers
+    (update_cvm_foundation, enable_replication_ports, update_resolv_conf, get_foundation_version ...).
+
+    The CVMs are run in rolling batches, at most max_parallel at a time, on the threads of the WorkerBudget. The
+    commands of a CVM reuse its pooled SSH connection. Once more than max_failures CVMs (or max_failure_percent of the
+    CVMs of the batches run so far) have failed, no CVM is started anymore, the remaining CVMs are SKIPPED.
+    """
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    SKIPPED = "SKIPPED"
+    DEFAULT_MAX_PARALLEL = 32
+    EXIT_STATUS_MARKER = "__fleet_rc="
+
+    def __init__(self, hosts: Union[List[str], Dict[str, Tuple[str, str]]], username: Optional[str] = None,
+                 password: Optional[str] = None, max_parallel: int = DEFAULT_MAX_PARALLEL,
+                 batch_size: Optional[int] = None, max_failures: Optional[int] = None,
+                 max_failure_percent: Optional[float] = None):
+        """
+        Args:
+          hosts(list|dict): CVM IPs, or (username, password) by CVM IP
+          username(str, optional): CVM username of the CVMs without credentials, defaults to the nutanix user
+          password(str, optional): CVM password of the CVMs without credentials
+          max_parallel(int, optional): Maximum number of CVMs run at a time
+          batch_size(int, optional): Number of CVMs of a rolling batch, all the CVMs are in one batch if not set
+          max_failures(int, optional): Stop after more than max_failures CVMs have failed
+          max_failure_percent(float, optional): Stop after more than max_failure_percent of the CVMs run have failed
+        """
+        if not isinstance(hosts, dict):
+            hosts = {host: (username, password) for host in hosts}
+        self.hosts = hosts
+        self.max_parallel = max_parallel
+        self.batch_size = batch_size or len(hosts) or 1
+        self.max_failures = max_failures
+        self.max_failure_percent = max_failure_percent
+        self.lock = threading.Lock()
+        self.results: Dict[str, Dict] = {}
+        self.completed = self.failed = 0
+        self.aborted = False
+
+    def run_command(self, command: str, timeout: int = 60) -> Dict[str, Dict]:
+        """
+        Run a shell command in every CVM. The command is run with a pty, its stderr is merged in its stdout, a CVM
+        SUCCEEDED if the exit status of the command is 0
+
+        Returns:
+          dict: Result by CVM IP, the output of a CVM is the output of the command
+        """
+        # The exit status is echoed after the command, on a new line so that the command can end with ; or &
+        wrapped_command = f"{command}\necho \"{self.EXIT_STATUS_MARKER}$?\""
+
+        def execute(ssh_cvm: SSHCvm):
+            ssh_obj = ssh_cvm.get_ssh_connection(ssh_cvm.cvm_ip, ssh_cvm.cvm_username, ssh_cvm.cvm_password)
+            if not ssh_obj:
+                return False, f"Failed to connect to {ssh_cvm.cvm_ip}"
+            try:
+                out, err = ssh_cvm.execute_command(ssh_obj=ssh_obj, command=wrapped_command, timeout=timeout)
+            finally:
+                ssh_cvm.close_ssh_connection(ssh_obj)
+            output, exit_status = self.__parse_exit_status(out or "")
+            if err:
+                return output, err
+            if exit_status is None:
+                return output, "The exit status of the command is unknown, it was interrupted"
+            if exit_status:
+                return output, f"The command exited with the status {exit_status}"
+            return True, output
+
+        return self.run(execute)
+
+    @classmethod
+    def __parse_exit_status(cls, out: str) -> Tuple[str, Optional[int]]:
+        """
+        Split the output of the command and its echoed exit status
+        """
+        match = re.search(rf"(?:^|\r?\n){re.escape(cls.EXIT_STATUS_MARKER)}(\d+)\s*$", out)
+        if not match:
+            return out, None
+        return out[:match.start()], int(match.group(1))
+
+    def run(self, helper: Union[str, Callable[..., Any]], *args, **kwargs) -> Dict[str, Dict]:
+        """
+        Run a helper in every CVM
+
+        Args:
+          helper(str|callable): Name of the SSHCvm method, or a callable taking the SSHCvm of the CVM
+          args: Arguments of the helper
+          kwargs: Keyword arguments of the helper
+
+        Returns:
+          dict: Result by CVM IP, with the status, output, error, batch & duration_secs
+        """
+        if isinstance(helper, str):
+            if not callable(getattr(SSHCvm, helper, None)):
+                raise Exception(f"{helper!r} is not a helper of SSHCvm")
+            method = helper
+
+            def helper(ssh_cvm: SSHCvm, *helper_args, **helper_kwargs):
+                return getattr(ssh_cvm, method)(*helper_args, **helper_kwargs)
+
+        hosts = list(self.hosts)
+        self.results = {host: {"status": self.SKIPPED, "output": None, "error": None, "batch": None,
+                               "duration_secs": 0} for host in hosts}
+        self.completed = self.failed = 0
+        self.aborted = False
+        for batch, index in enumerate(range(0, len(hosts), self.batch_size)):
+            if self.aborted:
+                break
+            batch_hosts = hosts[index:index + self.batch_size]
+            logger.info(f"Running batch {batch + 1} of {len(batch_hosts)} CVM(s)")
+            WorkerBudget.get_instance().map(lambda host: self.__run_host(host, batch, helper, args, kwargs),
+                                            batch_hosts, max_workers=self.max_parallel, host=lambda host: host,
+                                            return_exceptions=True)
+            with self.lock:
+                self.__check_threshold(check_percent=True)
+        if self.aborted:
+            skipped = [host for host, result in self.results.items() if result["status"] == self.SKIPPED]
+            logger.error(f"Failure threshold exceeded, skipped {len(skipped)} CVM(s)")
+        return self.results
+
+    def get_summary(self) -> Dict:
+        summary = {self.SUCCEEDED: 0, self.FAILED: 0, self.SKIPPED: 0}
+        for result in self.results.values():
+            summary[result["status"]] += 1
+        summary["aborted"] = self.aborted
+        return summary
+
+    def __run_host(self, host: str, batch: int, helper: Callable, args: tuple, kwargs: dict):
+        # Checked before every CVM, the CVMs of the batch not started yet are skipped as well
+        if self.aborted:
+            return
+        start_time = time.time()
+        status, output, error = self.FAILED, None, None
+        try:
+            username, password = self.hosts[host] or (None, None)
+            ssh_cvm = SSHCvm(host, username, password)
+            status, output, error = self.__to_result(helper(ssh_cvm, *args, **kwargs))
+        except Exception as e:
+            error = str(e)
+        if status == self.FAILED:
+            logger.error(f"{host}: {error}")
+
+        with self.lock:
+            self.results[host] = {"status": status, "output": output, "error": error, "batch": batch + 1,
+                                  "duration_secs": round(time.time() - start_time, 2)}
+            self.completed += 1
+            self.failed += status == self.FAILED
+            self.__check_threshold()
+
+    def __check_threshold(self, check_percent: bool = False):
+        # The percentage is only checked at the end of a batch, the first failures of a batch are 100% of the CVMs run
+        if self.max_failures is not None and self.failed > self.max_failures:
+            self.aborted = True
+        if check_percent and self.max_failure_percent is not None and \
+                self.failed * 100 > self.max_failure_percent * self.completed:
+            self.aborted = True
+
+    def __to_result(self, result: Any) -> Tuple[str, Any, Any]:
+        """
+        The SSHCvm helpers return (status, error/ output) or (output, error)
+        """
+        if isinstance(result, tuple) and len(result) == 2:
+            first, second = result
+            if isinstance(first, bool):
+                return (self.SUCCEEDED, second, None) if first else (self.FAILED, None, str(second))
+            return (self.SUCCEEDED, first, None) if second is None else (self.FAILED, first, str(second))
+        if result is False:
+            return self.FAILED, None, None
+        return self.SUCCEEDED, result, None
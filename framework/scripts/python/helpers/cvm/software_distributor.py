@@ -0,0 +1,335 @@
+import contextlib
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple, Any
+import requests
+from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.ssh_pool import SSHConnectionPool
+
+logger = get_logger(__name__)
+
+
+class RateLimiter:
+    """
+    Token bucket capping the throughput of one link
+    """
+
+    def __init__(self, bytes_per_sec: Optional[float] = None):
+        self.bytes_per_sec = bytes_per_sec
+        self.allowance = bytes_per_sec or 0
+        self.last_check = time.time()
+
+    def consume(self, size: int):
+        if not self.bytes_per_sec:
+            return
+        now = time.time()
+        self.allowance = min(self.bytes_per_sec, self.allowance + (now - self.last_check) * self.bytes_per_sec)
+        self.last_check = now
+        self.allowance -= size
+        if self.allowance < 0:
+            time.sleep(-self.allowance / self.bytes_per_sec)
+
+
+class DistributedFile:
+    """
+    One file distributed to the CVMs, and the sources it can be copied from
+    """
+
+    def __init__(self, url: str, md5sum: Optional[str] = None):
+        self.url = url
+        self.md5sum = md5sum
+        self.name = url.split("/")[-1]
+        self.size: Optional[int] = None
+        # sha256sum of the file in the sources, to verify the resumed copies
+        self.sha256sum: Optional[str] = None
+        # A CVM or the cache is downloading the file from the origin web server
+        self.seeding = False
+        # Sources having the verified file, "cache" or the CVM IP
+        self.sources: Dict[str, Any] = {}
+        # Running uploads by source
+        self.uploads: Dict[str, int] = {}
+
+
+class SoftwareDistributor:
+    """
+    Distribute the software bundles (eg the PC tar & metadata files) to many CVMs, downloading them only once from the
+    origin web server.
+
+    Modes:
+      direct: Every CVM downloads the files from the web server, same as without a distributor
+      peer: The first CVM downloads the files from the web server (wget -c, resumed), the other CVMs get them from a
+        CVM having them already, every CVM that gets the file becomes a source for the next ones
+      cache: The files are downloaded once to a local cache directory, the CVMs get them from the cache or from a
+        CVM having them already. The cache is kept across runs
+
+    The checksum is verified once, on the first copy of the file, the copies are verified by size. The copies are
+    SFTP transfers resumed from the size already copied, each link capped to bandwidth_limit_mbps. A resumed copy is
+    verified by its sha256sum against the source, and copied again from the start if it doesn't match. A source serves
+    at most max_uploads_per_source CVMs at a time, the CVMs pick the least busy source.
+    """
+    DIRECT = "direct"
+    PEER = "peer"
+    CACHE = "cache"
+    CACHE_SOURCE = "cache"
+    REMOTE_DIR = "/home/nutanix"
+    CHUNK_SIZE = 1024 * 1024
+    DEFAULT_MAX_UPLOADS_PER_SOURCE = 2
+
+    def __init__(self, mode: str = PEER, cache_dir: Optional[str] = None,
+                 bandwidth_limit_mbps: Optional[float] = None,
+                 max_uploads_per_source: int = DEFAULT_MAX_UPLOADS_PER_SOURCE):
+        """
+        Args:
+          mode(str, optional): direct, peer or cache
+          cache_dir(str, optional): Local directory of the cache, required in cache mode
+          bandwidth_limit_mbps(float, optional): Maximum throughput of a copy, in Mbps
+          max_uploads_per_source(int, optional): Maximum number of copies from the same source at a time
+        """
+        if mode not in [self.DIRECT, self.PEER, self.CACHE]:
+            raise Exception(f"Invalid software distribution mode {mode!r}")
+        if mode == self.CACHE and not cache_dir:
+            raise Exception("cache_dir is required to distribute the software from a local cache")
+        self.mode = mode
+        self.cache_dir = cache_dir
+        self.bytes_per_sec = bandwidth_limit_mbps * 1000 * 1000 / 8 if bandwidth_limit_mbps else None
+        self.max_uploads_per_source = max_uploads_per_source
+        self.condition = threading.Condition()
+        self.files: Dict[str, DistributedFile] = {}
+        self.metrics = {"origin_downloads": 0, "copies": 0, "resumed_copies": 0, "copied_bytes": 0}
+
+    def distribute(self, ssh_cvm, url: str, md5sum: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Get the file in the home directory of the CVM
+
+        Args:
+          ssh_cvm(SSHCvm): SSHCvm of the CVM
+          url(str): URL of the file in the origin web server
+          md5sum(str, optional): md5sum of the file, verified once
+
+        Returns:
+          tuple: status(bool), error_message(str)
+        """
+        try:
+            if self.mode == self.DIRECT:
+                self.__download_from_origin(ssh_cvm, DistributedFile(url, md5sum))
+                return True, None
+
+            with self.condition:
+                distributed_file = self.files.setdefault(url, DistributedFile(url, md5sum))
+            source = self.__acquire_source(distributed_file)
+            if source is None:
+                self.__seed(ssh_cvm, distributed_file)
+                return True, None
+            try:
+                self.__copy(source, ssh_cvm, distributed_file)
+            finally:
+                with self.condition:
+                    distributed_file.uploads[self.__get_key(source)] -= 1
+                    self.condition.notify_all()
+            with self.condition:
+                distributed_file.sources[ssh_cvm.cvm_ip] = ssh_cvm
+                distributed_file.uploads.setdefault(ssh_cvm.cvm_ip, 0)
+                self.condition.notify_all()
+            return True, None
+        except Exception as e:
+            logger.error(f"{ssh_cvm.cvm_ip}: Failed to get {url}: {e}")
+            return False, str(e)
+
+    def get_metrics(self) -> Dict:
+        with self.condition:
+            return dict(self.metrics)
+
+    def __acquire_source(self, distributed_file: DistributedFile) -> Optional[Any]:
+        """
+        Returns:
+          The least busy source with a free upload slot, None if the caller has to seed the file
+        """
+        with self.condition:
+            while True:
+                if not distributed_file.sources and not distributed_file.seeding:
+                    distributed_file.seeding = True
+                    return None
+                candidates = [key for key in distributed_file.sources
+                              if distributed_file.uploads[key] < self.max_uploads_per_source]
+                if candidates:
+                    key = min(candidates, key=lambda source_key: distributed_file.uploads[source_key])
+                    distributed_file.uploads[key] += 1
+                    return distributed_file.sources[key]
+                self.condition.wait()
+
+    def __seed(self, ssh_cvm, distributed_file: DistributedFile):
+        try:
+            if self.mode == self.CACHE:
+                self.__fill_cache(distributed_file)
+                key, source = self.CACHE_SOURCE, self.CACHE_SOURCE
+            else:
+                self.__download_from_origin(ssh_cvm, distributed_file)
+                distributed_file.size = self.__get_remote_size(ssh_cvm, distributed_file)
+                key, source = ssh_cvm.cvm_ip, ssh_cvm
+        except Exception:
+            with self.condition:
+                # One of the waiting CVMs seeds the file instead
+                distributed_file.seeding = False
+                self.condition.notify_all()
+            raise
+        with self.condition:
+            distributed_file.sources[key] = source
+            distributed_file.uploads[key] = 0
+            distributed_file.seeding = False
+            self.condition.notify_all()
+        if self.mode == self.CACHE:
+            # The CVM seeding the cache gets the file from the cache
+            self.distribute(ssh_cvm, distributed_file.url, distributed_file.md5sum)
+
+    def __download_from_origin(self, ssh_cvm, distributed_file: DistributedFile):
+        logger.info(f"{ssh_cvm.cvm_ip}: Downloading {distributed_file.url} from the web server")
+        status, error = ssh_cvm.download_files(url_list=[distributed_file.url])
+        if not status:
+            raise Exception(error)
+        with self.condition:
+            self.metrics["origin_downloads"] += 1
+        if distributed_file.md5sum:
+            remote_path = f"{self.REMOTE_DIR}/{distributed_file.name}"
+            cvm_file_md5sum = ssh_cvm.get_md5sum_from_file_in_cvm(remote_path)
+            if distributed_file.md5sum != cvm_file_md5sum.split()[0]:
+                raise Exception(f"md5sum of file does not match with the file {remote_path!r} downloaded in CVM")
+
+    def __fill_cache(self, distributed_file: DistributedFile):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = os.path.join(self.cache_dir, distributed_file.name)
+        if not os.path.exists(cache_path):
+            part_path = f"{cache_path}.part"
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            logger.info(f"Downloading {distributed_file.url} to the cache {self.cache_dir}")
+            with requests.get(distributed_file.url, headers=headers, stream=True, verify=False, timeout=60) as response:
+                response.raise_for_status()
+                # The web server might not support ranges, the download restarts then
+                with open(part_path, "ab" if response.status_code == 206 else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        f.write(chunk)
+            with self.condition:
+                self.metrics["origin_downloads"] += 1
+            if distributed_file.md5sum and self.__get_checksum(part_path) != distributed_file.md5sum:
+                os.remove(part_path)
+                raise Exception(f"md5sum of file does not match with the file {distributed_file.url!r} downloaded "
+                                f"to the cache")
+            os.replace(part_path, cache_path)
+        elif distributed_file.md5sum and self.__get_checksum(cache_path) != distributed_file.md5sum:
+            os.remove(cache_path)
+            raise Exception(f"md5sum of the cached file {cache_path!r} does not match, removed it from the cache")
+        distributed_file.size = os.path.getsize(cache_path)
+
+    def __copy(self, source, ssh_cvm, distributed_file: DistributedFile):
+        offset = self.__transfer(source, ssh_cvm, distributed_file, resume=True)
+        # The part already in the CVM might be of another file or corrupted, it is only kept if the whole file matches
+        if offset and not self.__is_same_file(source, ssh_cvm, distributed_file):
+            logger.warning(f"{ssh_cvm.cvm_ip}: sha256sum of {distributed_file.name} doesn't match the one of "
+                           f"{self.__get_key(source)}, copying it again from the start")
+            self.__transfer(source, ssh_cvm, distributed_file, resume=False)
+
+    def __transfer(self, source, ssh_cvm, distributed_file: DistributedFile, resume: bool) -> int:
+        """
+        Returns:
+          int: Size of the file already in the CVM, that was kept
+        """
+        remote_path = f"{self.REMOTE_DIR}/{distributed_file.name}"
+        source_name = self.__get_key(source)
+        client = ssh_cvm.get_ssh_connection(ssh_cvm.cvm_ip, ssh_cvm.cvm_username, ssh_cvm.cvm_password)
+        if not client:
+            raise Exception(f"Failed to connect to {ssh_cvm.cvm_ip}")
+        with SSHConnectionPool.get_instance().channel(client):
+            sftp = client.open_sftp()
+            try:
+                offset = self.__stat(sftp, remote_path) if resume else 0
+                if offset == distributed_file.size:
+                    logger.info(f"{ssh_cvm.cvm_ip}: {remote_path} is already copied")
+                    return offset
+                if offset > distributed_file.size:
+                    offset = 0
+                logger.info(f"{ssh_cvm.cvm_ip}: Copying {distributed_file.name} from {source_name}"
+                            + (f", resumed from {offset} bytes" if offset else ""))
+                limiter = RateLimiter(self.bytes_per_sec)
+                copied = 0
+                with self.__open_source(source, distributed_file, offset) as reader, \
+                        sftp.open(remote_path, "ab" if offset else "wb") as writer:
+                    writer.set_pipelined(True)
+                    while chunk := reader.read(self.CHUNK_SIZE):
+                        limiter.consume(len(chunk))
+                        writer.write(chunk)
+                        copied += len(chunk)
+                size = self.__stat(sftp, remote_path)
+            finally:
+                sftp.close()
+        with self.condition:
+            self.metrics["copies"] += 1
+            self.metrics["resumed_copies"] += bool(offset)
+            self.metrics["copied_bytes"] += copied
+        if size != distributed_file.size:
+            raise Exception(f"Size of the copied file {remote_path!r} is {size} bytes, expected "
+                            f"{distributed_file.size} bytes")
+        return offset
+
+    def __is_same_file(self, source, ssh_cvm, distributed_file: DistributedFile) -> bool:
+        remote_path = f"{self.REMOTE_DIR}/{distributed_file.name}"
+        if not distributed_file.sha256sum:
+            # All the sources have the same file, the checksum of the source is computed once
+            if source == self.CACHE_SOURCE:
+                sha256sum = self.__get_checksum(os.path.join(self.cache_dir, distributed_file.name), "sha256")
+            else:
+                sha256sum = source.get_sha256sum_from_file_in_cvm(remote_path).split()[0]
+            with self.condition:
+                distributed_file.sha256sum = sha256sum
+        return ssh_cvm.get_sha256sum_from_file_in_cvm(remote_path).split()[0] == distributed_file.sha256sum
+
+    @contextlib.contextmanager
+    def __open_source(self, source, distributed_file: DistributedFile, offset: int):
+        if source == self.CACHE_SOURCE:
+            with open(os.path.join(self.cache_dir, distributed_file.name), "rb") as reader:
+                reader.seek(offset)
+                yield reader
+            return
+
+        client = source.get_ssh_connection(source.cvm_ip, source.cvm_username, source.cvm_password)
+        if not client:
+            raise Exception(f"Failed to connect to the source {source.cvm_ip}")
+        with SSHConnectionPool.get_instance().channel(client):
+            sftp = client.open_sftp()
+            try:
+                with sftp.open(f"{self.REMOTE_DIR}/{distributed_file.name}", "rb") as reader:
+                    reader.seek(offset)
+                    # Pipelined reads from the offset
+                    reader.prefetch(distributed_file.size)
+                    yield reader
+            finally:
+                sftp.close()
+
+    def __get_remote_size(self, ssh_cvm, distributed_file: DistributedFile) -> int:
+        client = ssh_cvm.get_ssh_connection(ssh_cvm.cvm_ip, ssh_cvm.cvm_username, ssh_cvm.cvm_password)
+        if not client:
+            raise Exception(f"Failed to connect to {ssh_cvm.cvm_ip}")
+        with SSHConnectionPool.get_instance().channel(client):
+            sftp = client.open_sftp()
+            try:
+                return self.__stat(sftp, f"{self.REMOTE_DIR}/{distributed_file.name}")
+            finally:
+                sftp.close()
+
+    def __get_key(self, source) -> str:
+        return source if source == self.CACHE_SOURCE else source.cvm_ip
+
+    def __get_checksum(self, path: str, algorithm: str = "md5") -> str:
+        hasher = hashlib.new(algorithm)
+        with open(path, "rb") as f:
+            while chunk := f.read(self.CHUNK_SIZE):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def __stat(sftp, path: str) -> int:
+        try:
+            return sftp.stat(path).st_size
+        except FileNotFoundError:
+            return 0
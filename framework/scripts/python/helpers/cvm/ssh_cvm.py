@@ -1,8 +1,8 @@
 from typing import Optional, List
 import paramiko
 import time
-import re
 from framework.scripts.python.helpers.ssh_entity import SSHEntity
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
 from framework.helpers.log_utils import get_logger
 
 logger = get_logger(__name__)
@@ -38,17 +38,12 @@ class SSHCvm(SSHEntity):
         self.send_to_interactive_channel(int_chan, stop_foundation)
         time_to_wait = 120
         self.logger.info(f"{self.cvm_ip} - Genesis Stop Foundation...")
-        stop_foundation = False
-        start_time = time.time()
-        while not stop_foundation:
-            if time.time() - start_time > time_to_wait:
-                self.logger.error("Waited for %s mins, task not finished" % (time_to_wait / 60))
-                break
-            receive = self.receive_from_interactive_channel(int_chan)
-            self.logger.debug(receive)
-            if receive is not None and receive != "":
-                stop_foundation = True
-                self.logger.info(f"{self.cvm_ip} - Foundation stopped")
+        stop_foundation, receive = self.wait_for_output(int_chan, timeout=time_to_wait)
+        self.logger.debug(receive)
+        if stop_foundation:
+            self.logger.info(f"{self.cvm_ip} - Foundation stopped")
+        else:
+            self.logger.error("Waited for %s mins, task not finished" % (time_to_wait / 60))
         return stop_foundation
 
     def restart_genesis(self, int_chan: paramiko.SSHClient):
@@ -64,17 +59,14 @@ class SSHCvm(SSHEntity):
         message = "Genesis started on pids"
         self.logger.info("Restarting genesis...")
         self.send_to_interactive_channel(int_chan, restart_genesis)
-        start_time = time.time()
         time_to_wait = 180
-        while True:
-            if time.time() - start_time > time_to_wait:
-                self.logger.error("Waited for %s mins, task not finished" % (time_to_wait / 60))
-                break
-            receive = self.receive_from_interactive_channel(int_chan)
-            self.logger.debug(receive)
-            if receive is not None and receive != "" and message in receive:
-                self.logger.info(f"{self.cvm_ip} - Restarted genesis")
-                return True
+        restarted, receive = self.wait_for_output(int_chan, pattern=message, timeout=time_to_wait)
+        self.logger.debug(receive)
+        if restarted:
+            self.logger.info(f"{self.cvm_ip} - Restarted genesis")
+        else:
+            self.logger.error("Waited for %s mins, task not finished" % (time_to_wait / 60))
+        return restarted
 
     def update_heartbeat_interval_mins(self, interval_min: int = 1):
         """Update the heartbeat interval in CVM FC settings
@@ -284,7 +276,7 @@ class SSHCvm(SSHEntity):
             raise Exception(e)
 
     def upload_pc_deploy_software(self, pc_version: str, metadata_file_url: str = None, file_url: str = None,
-                                  md5sum: str = None, delete_existing_software: bool = False):
+                                  md5sum: str = None, delete_existing_software: bool = False, distributor=None):
         """Upload PC Software to PE
 
         Args:
@@ -294,6 +286,8 @@ class SSHCvm(SSHEntity):
             md5sum (_type_, optional): md5sum to check if file already exists. Defaults to None.
             delete_existing_software (bool, optional): Delete if same pc version is already uploaded.
                                                   Defaults to False.
+            distributor (SoftwareDistributor, optional): Get the files from the distributor, shared by the CVMs,
+                                                  instead of downloading them from the web server. Defaults to None.
 
         Returns:
             tuple: status(bool), error_message(str)
@@ -323,7 +317,9 @@ class SSHCvm(SSHEntity):
         file_path = "/home/nutanix/{}".format(file_url.split("/")[-1])
         try:
             # If file already exists check the MD5SUM, if it doesn't match download files to CVM
-            if self.file_exists(file_path) and self.file_exists(metadata_file_path):
+            # Both checks run at once, on two channels of the same connection
+            files_exist = WorkerBudget.get_instance().map(self.file_exists, [file_path, metadata_file_path])
+            if all(files_exist):
                 if md5sum:
                     self.logger.info(f"Checking MD5SUM of the file: {file_path}")
                     cvm_file_md5sum = self.get_md5sum_from_file_in_cvm(file_path)
@@ -338,8 +334,15 @@ class SSHCvm(SSHEntity):
             raise Exception(f"Failed to check MD5SUM with the error: {e}")
 
         try:
+            # Get the files from the distributor, the md5sum is verified once by the distributor
+            if download_file and distributor:
+                self.logger.info(f"{self.cvm_ip}: Distributing metadata & tar files...")
+                for url, url_md5sum in [(metadata_file_url, None), (file_url, md5sum)]:
+                    status, error = distributor.distribute(self, url, url_md5sum)
+                    if not status:
+                        return False, f"{self.cvm_ip}: Failed to distribute {url!r} to CVM: {error}"
             # Download the files
-            if download_file:
+            elif download_file:
                 self.logger.info(f"{self.cvm_ip}: Downloading metadata & tar files...")
                 self.download_files(url_list=[metadata_file_url, file_url])
                 self.logger.info(f"{self.cvm_ip}: Verifying if the files are downloaded in the CVM")
@@ -401,6 +404,25 @@ class SSHCvm(SSHEntity):
             self.logger.error(e)
         return md5sum_response
 
+    def get_sha256sum_from_file_in_cvm(self, file_path: str):
+        """
+        returns sha256sum from cvm file
+        Args:
+            file_path(str): file path to check sha256sum
+        Returns: sha256sum
+        """
+        cmd = f"source /etc/profile; sha256sum {file_path}"
+        sha256sum_response = "None"
+        try:
+            ssh_obj = self.get_ssh_connection(self.cvm_ip, self.cvm_username, self.cvm_password)
+            out, err = self.execute_command(ssh_obj=ssh_obj, command=cmd, timeout=200)
+            if not err:
+                self.logger.info(f"Sha256sum of file {file_path} is {out}")
+                return out
+        except Exception as e:
+            self.logger.error(e)
+        return sha256sum_response
+
     def enable_replication_ports(self, ports: Optional[list] = None) -> (str, str):
         """
         Enable replication ports in cvms
@@ -413,15 +435,11 @@ class SSHCvm(SSHEntity):
 
         time_to_wait = 120
         self.send_to_interactive_channel(int_chan, cmd)
-        start_time = time.time()
-        receive = ""
-
-        while (time.time() - start_time) <= time_to_wait:
-            receive += self.receive_from_interactive_channel(int_chan)
-            # todo here we are assuming we are opening only for 3 node clusters. Need to modify the logic accordingly
-            if len([m.start() for m in re.finditer("Firewall config updated", receive)]) == 3:
-                return receive, None
-            time.sleep(10)
+        # todo here we are assuming we are opening only for 3 node clusters. Need to modify the logic accordingly
+        updated, receive = self.wait_for_output(int_chan, pattern="Firewall config updated", count=3,
+                                                timeout=time_to_wait)
+        if updated:
+            return receive, None
 
         return receive, "Operation, timed out or failed!"
 
@@ -1,10 +1,12 @@
 import copy
+import os
 from base64 import b64encode
 from typing import Union, List, Dict, Optional
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 from framework.helpers.rest_utils import RestAPIUtil
 from framework.helpers.general_utils import intersection
 from framework.helpers.log_utils import get_logger
+from .chunked_upload import ChunkedUpload
 
 logger = get_logger(__name__)
 
@@ -197,6 +199,63 @@ class Entity:
             timeout=timeout,
         )
 
+    def upload_chunked(
+        self,
+        source,
+        uuid=None,
+        endpoint=None,
+        method="PUT",
+        get_headers=None,
+        timeout=300,
+        **kwargs
+    ):
+        """
+        Upload a local file in chunks, every chunk is a request with the bytes of the chunk as body
+
+        Args:
+          source(str): Path of the file to upload
+          uuid(str, optional): uuid of the entity the file is uploaded to
+          endpoint(str, optional): Endpoint of the entity the file is uploaded to
+          method(str, optional): Method of the chunk requests
+          get_headers(callable, optional): Headers of a chunk, called with its offset, size and the size of the
+            file. Content-Range by default
+          timeout(int, optional): Timeout of every chunk request
+          kwargs: Options of ChunkedUpload, e.g. chunk_size, max_retries, state_dir, get_offset
+
+        Returns:
+          dict: Metrics of the upload
+        """
+        uri = self.resource + "/{0}".format(uuid) if uuid else self.resource
+        if endpoint:
+            uri = uri + "/{0}".format(endpoint)
+        get_headers = get_headers or (lambda offset, size, total_size: {
+            "Content-Range": f"bytes {offset}-{offset + size - 1}/{total_size}"
+        })
+
+        def send_chunk(chunk: bytes, offset: int, total_size: int):
+            headers = {
+                "Content-Type": "application/octet-stream",
+                "Accept": "application/json",
+                **get_headers(offset, len(chunk), total_size)
+            }
+            self.get_response(uri, method=method, headers=headers, data=chunk, jsonify=False, timeout=timeout)
+
+        # An upload is resumed only to the same target
+        kwargs.setdefault("key", f"{uri}|{os.path.abspath(source)}")
+        return ChunkedUpload(source, send_chunk, **kwargs).upload()
+
+    def get_upload_key(self, name: str, source: str) -> str:
+        """
+        Identifies the chunked upload of a local file to the entity with the name, to resume it
+        """
+        return f"{self.session.prepare_url(self.resource)}/{name}|{os.path.abspath(source)}"
+
+    def is_upload_pending(self, name: str, source: str, state_dir: Optional[str] = None) -> bool:
+        """
+        Whether a previous chunked upload of the file to the entity with the name was interrupted
+        """
+        return ChunkedUpload(source, None, key=self.get_upload_key(name, source), state_dir=state_dir).is_pending()
+
     def delete(
         self,
         uuid=None,
@@ -251,20 +310,21 @@ class Entity:
                 filtered_entities.append(entity)
         return filtered_entities
 
-    # upload file in chunks to the given url
+    # upload file as a single multipart body to the given url, see upload_chunked for large files
     def _upload_file(self, uri, source, data, timeout=120):
         headers = {
             'Accept': 'application/json'
         }
-        kwargs = {
-            "data": data,
-            "headers": headers,
-            "files": {'file': ('blob', open(source, 'rb'), 'application/json')},
-            "jsonify": False
-        }
-        if timeout:
-            kwargs["timeout"] = timeout
-        response = self.get_response(uri, method="POST", **kwargs)
+        with open(source, 'rb') as f:
+            kwargs = {
+                "data": data,
+                "headers": headers,
+                "files": {'file': ('blob', f, 'application/json')},
+                "jsonify": False
+            }
+            if timeout:
+                kwargs["timeout"] = timeout
+            response = self.get_response(uri, method="POST", **kwargs)
         return response
 
     # todo make this abstractmethod in future
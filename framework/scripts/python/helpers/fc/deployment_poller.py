@@ -0,0 +1,365 @@
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional
+from framework.helpers.log_utils import get_logger
+from framework.helpers.rest_utils import RestAPIUtil
+from .image_cluster_script import ImageClusterScript
+from .imaged_clusters import ImagedCluster
+from .monitor_fc_deployment import MonitorDeployment
+
+logger = get_logger(__name__)
+
+
+class DeploymentProgress:
+    """
+    Progress of a deployment as last seen by the poller, with the ETA extrapolated from the progress since the first
+    read
+    """
+
+    def __init__(self, cluster_name: str, imaged_cluster_uuid: str):
+        self.cluster_name = cluster_name
+        self.imaged_cluster_uuid = imaged_cluster_uuid
+        self.state = "SUBMITTED"
+        self.percent = 0
+        self.stage = ""
+        self.submitted_at = time.time()
+        self.updated_at = self.submitted_at
+        # First read with the deployment in progress, the ETA is based on the progress since then
+        self.first_sample = None
+
+    def update(self, state: str, percent: int, stage: str) -> bool:
+        """
+        Returns:
+            bool: True if the state, percent or stage changed
+        """
+        now = time.time()
+        if self.first_sample is None and state == "PENDING":
+            self.first_sample = (now, percent)
+        changed = (state, percent, stage) != (self.state, self.percent, self.stage)
+        self.state, self.percent, self.stage = state, percent, stage
+        self.updated_at = now
+        return changed
+
+    @property
+    def eta_secs(self) -> Optional[int]:
+        if self.state != "PENDING" or not self.first_sample:
+            return None
+        first_time, first_percent = self.first_sample
+        if self.percent <= first_percent or self.updated_at <= first_time:
+            return None
+        rate = (self.percent - first_percent) / (self.updated_at - first_time)
+        return round((100 - self.percent) / rate)
+
+    def to_dict(self) -> Dict:
+        return {
+            "cluster_name": self.cluster_name,
+            "imaged_cluster_uuid": self.imaged_cluster_uuid,
+            "state": self.state,
+            "percent_complete": self.percent,
+            "stage": self.stage,
+            "eta_secs": self.eta_secs,
+            "elapsed_secs": round(self.updated_at - self.submitted_at)
+        }
+
+
+class WatchedDeployment:
+    """
+    A deployment submitted through the poller, till its monitoring is over
+    """
+
+    def __init__(self, monitor: MonitorDeployment, first_poll: float, on_progress: Optional[Callable] = None):
+        self.monitor = monitor
+        self.first_poll = first_poll
+        self.next_poll = first_poll
+        self.on_progress = on_progress
+        self.progress = DeploymentProgress(monitor.cluster_name, monitor.imaged_cluster_uuid)
+        self.done = threading.Event()
+
+
+class DeploymentPoller:
+    """
+    One poller per Foundation Central (PC session), shared by all the sites deploying through the FC.
+
+    Instead of a MonitorDeployment thread per cluster reading its imaged cluster every minute, the deployments are
+    registered with the poller. When a deployment is due, a single thread lists the imaged clusters of the FC in one
+    call and updates the monitors of all the deployments being polled, so the load on FC doesn't grow with the number
+    of clusters. The callers only wait for their own deployments.
+
+    A deployment is polled every interval, and more often once it is close to completion (or its ETA is shorter than
+    the interval), so its completion is seen within seconds. Every change of state, percent or stage is sent to the
+    progress callbacks, and get_progress returns the latest progress of all the deployments.
+
+    The number of deployments in flight in the FC is capped with max_in_flight, a deployment is submitted only once
+    one of the previous ones is over.
+    """
+    _lock = threading.Lock()
+    # Dropped along with the session
+    _pollers = weakref.WeakKeyDictionary()
+    DEFAULT_INTERVAL_IN_SEC = 60
+    # Same as the wait before the monitoring starts, FC takes a while to start imaging the nodes
+    DEFAULT_INITIAL_DELAY_IN_SEC = 15 * 60
+    MIN_INTERVAL_IN_SEC = 10
+    # Deployments at this percent or more are polled every min_interval
+    NEAR_COMPLETION_PERCENT = 90
+
+    def __init__(self, pc_session: RestAPIUtil, max_in_flight: Optional[int] = None,
+                 interval: float = DEFAULT_INTERVAL_IN_SEC, initial_delay: float = DEFAULT_INITIAL_DELAY_IN_SEC,
+                 min_interval: float = MIN_INTERVAL_IN_SEC):
+        """
+        Args:
+            pc_session (RestAPIUtil): PC Session object
+            max_in_flight (int, optional): Maximum number of deployments in flight in the FC, no limit by default
+            interval (float, optional): Seconds between two reads of a deployment
+            initial_delay (float, optional): Seconds before the first read of a deployment
+            min_interval (float, optional): Seconds between two reads of a deployment close to completion
+        """
+        self.imaging = ImagedCluster(pc_session)
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.min_interval = min(min_interval, interval)
+        self.slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self.condition = threading.Condition()
+        # Deployments in flight, and the ones that are over till their results are collected by wait
+        self.watched: Dict[str, WatchedDeployment] = {}
+        self.finished: Dict[str, WatchedDeployment] = {}
+        self.subscribers: List[Callable] = []
+        self.thread = None
+        self.metrics = {"submitted": 0, "polls": 0, "list_calls": 0, "reads": 0, "max_in_flight": 0}
+
+    @classmethod
+    def get_instance(cls, pc_session: RestAPIUtil, **kwargs) -> 'DeploymentPoller':
+        """
+        Get the poller of the FC, create one with kwargs if it doesn't exist
+        """
+        with cls._lock:
+            if pc_session not in cls._pollers:
+                cls._pollers[pc_session] = DeploymentPoller(pc_session, **kwargs)
+            return cls._pollers[pc_session]
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._pollers = weakref.WeakKeyDictionary()
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """
+        Call callback with the progress (DeploymentProgress.to_dict) of any deployment, every time it changes
+        """
+        with self.condition:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Dict], None]):
+        with self.condition:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def deploy(self, script: ImageClusterScript, fc_deployment_logger,
+               on_progress: Optional[Callable[[Dict], None]] = None) -> Dict[str, str]:
+        """
+        Run the deployment script once there is a free slot in the FC, and watch the deployment
+
+        Args:
+            script (ImageClusterScript): Deployment to run
+            fc_deployment_logger (Object): Logger object used by the monitor of the deployment
+            on_progress (callable, optional): Called with the progress of the deployment, every time it changes
+
+        Returns:
+            dict: Imaged cluster uuid by cluster name, empty if the deployment failed
+        """
+        if self.slots:
+            self.slots.acquire()
+        try:
+            results = script.run() or {}
+        except Exception as e:
+            logger.error(f"Failed to run the deployment: {e}")
+            results = {}
+        if not results:
+            self.__release_slot()
+            return {}
+
+        for cluster_name, imaged_cluster_uuid in results.items():
+            monitor = MonitorDeployment(pc_session=self.imaging.session, cluster_name=cluster_name,
+                                        imaged_cluster_uuid=imaged_cluster_uuid,
+                                        fc_deployment_logger=fc_deployment_logger)
+            self.watch(monitor, on_progress)
+        return results
+
+    def watch(self, monitor: MonitorDeployment, on_progress: Optional[Callable[[Dict], None]] = None):
+        """
+        Watch a deployment that is already submitted
+        """
+        deployment = WatchedDeployment(monitor, time.time() + self.initial_delay, on_progress)
+        # Sent before the poller can see the deployment, so the callbacks get the progress in order
+        self.__dispatch(deployment)
+        with self.condition:
+            self.watched[monitor.imaged_cluster_uuid] = deployment
+            self.metrics["submitted"] += 1
+            self.metrics["max_in_flight"] = max(self.metrics["max_in_flight"], len(self.watched))
+            if not self.thread or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.__poll, name="Thread-DeploymentPoller", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def wait(self, imaged_cluster_uuids: List[str]) -> Dict:
+        """
+        Wait for the deployments to be over, and verify them
+
+        Args:
+            imaged_cluster_uuids (list): Imaged cluster uuids of the deployments
+
+        Returns:
+            dict: Results of the MonitorDeployment scripts, with the progress of the deployments, by cluster name
+        """
+        with self.condition:
+            watched = [self.watched.get(uuid) or self.finished.get(uuid) for uuid in imaged_cluster_uuids]
+        results = {}
+        for deployment in filter(None, watched):
+            deployment.done.wait()
+            with self.condition:
+                self.finished.pop(deployment.monitor.imaged_cluster_uuid, None)
+            monitor = deployment.monitor
+            try:
+                monitor.verify()
+            except Exception as e:
+                monitor.logger.error(f"Exception occurred during the verification of {monitor.cluster_name!r}: {e}")
+            monitor.results[monitor.cluster_name]["progress"] = deployment.progress.to_dict()
+            results.update(monitor.results)
+        return results
+
+    def wait_any(self, imaged_cluster_uuids: List[str], timeout: Optional[float] = None) -> List[str]:
+        """
+        Wait for at least one of the deployments to be over, their results are then collected with wait
+
+        Args:
+            imaged_cluster_uuids (list): Imaged cluster uuids of the deployments
+            timeout (float, optional): Seconds to wait, no timeout by default
+
+        Returns:
+            list: Imaged cluster uuids of the deployments over, empty on timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self.condition:
+            while True:
+                # Deployments not watched were already collected
+                done = [uuid for uuid in imaged_cluster_uuids if uuid not in self.watched]
+                if done:
+                    return done
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return []
+                self.condition.wait(remaining)
+
+    def get_progress(self) -> List[Dict]:
+        """
+        Latest progress of the deployments in flight, and of the ones over but not waited for yet
+        """
+        with self.condition:
+            deployments = list(self.watched.values()) + list(self.finished.values())
+            return [deployment.progress.to_dict() for deployment in deployments]
+
+    def get_metrics(self) -> Dict:
+        with self.condition:
+            metrics = dict(self.metrics)
+            metrics["in_flight"] = len(self.watched)
+        return metrics
+
+    def __release_slot(self):
+        if self.slots:
+            self.slots.release()
+
+    def __poll(self):
+        while True:
+            with self.condition:
+                if not self.watched:
+                    # Restarted by the next watch
+                    self.thread = None
+                    return
+                next_poll = min(deployment.next_poll for deployment in self.watched.values())
+                wait = next_poll - time.time()
+                if wait > 0:
+                    self.condition.wait(wait)
+                    continue
+                # All the deployments being polled are updated from the same list, not only the ones due
+                now = time.time()
+                polled = [deployment for deployment in self.watched.values() if deployment.first_poll <= now]
+                self.metrics["polls"] += 1
+
+            imaged_clusters = self.__list_imaged_clusters()
+            for deployment in polled:
+                self.__poll_deployment(deployment, imaged_clusters.get(deployment.monitor.imaged_cluster_uuid))
+
+    def __list_imaged_clusters(self) -> Dict[str, Dict]:
+        try:
+            imaged_clusters = self.imaging.list_imaged_clusters()
+        except Exception as e:
+            # The deployments are then read one by one
+            logger.warning(f"Failed to list the imaged clusters: {e}")
+            imaged_clusters = []
+        with self.condition:
+            self.metrics["list_calls"] += 1
+        return {imaged_cluster.get("imaged_cluster_uuid"): imaged_cluster for imaged_cluster in imaged_clusters}
+
+    def __poll_deployment(self, deployment: WatchedDeployment, imaged_cluster: Optional[Dict]):
+        monitor = deployment.monitor
+        try:
+            if not imaged_cluster:
+                # Not in the list, e.g. archived in the meantime
+                imaged_cluster = self.imaging.read(monitor.imaged_cluster_uuid)
+                with self.condition:
+                    self.metrics["reads"] += 1
+            done = monitor.update(imaged_cluster)
+            cluster_status = imaged_cluster["cluster_status"]
+            changed = deployment.progress.update(monitor.state, cluster_status["aggregate_percent_complete"],
+                                                 self.__get_stage(cluster_status))
+        except Exception as e:
+            # Same as a failed read in MonitorDeployment, the monitoring of this deployment is over
+            monitor.logger.error(f"Failed to monitor the deployment of {monitor.cluster_name}: {e}")
+            monitor.results = {monitor.cluster_name: {"result": "FAILED", "status": str(e),
+                                                      "imaged_cluster_uuid": monitor.imaged_cluster_uuid}}
+            changed = deployment.progress.update("FAILED", deployment.progress.percent, deployment.progress.stage)
+            done = True
+
+        with self.condition:
+            if done:
+                self.watched.pop(monitor.imaged_cluster_uuid, None)
+                self.finished[monitor.imaged_cluster_uuid] = deployment
+                self.condition.notify_all()
+            else:
+                deployment.next_poll = time.time() + self.__get_interval(deployment.progress)
+        if changed:
+            self.__dispatch(deployment)
+        if done:
+            self.__release_slot()
+            deployment.done.set()
+
+    def __get_interval(self, progress: DeploymentProgress) -> float:
+        if progress.percent >= self.NEAR_COMPLETION_PERCENT:
+            return self.min_interval
+        eta = progress.eta_secs
+        if eta is not None and eta < self.interval:
+            return max(self.min_interval, eta)
+        return self.interval
+
+    def __dispatch(self, deployment: WatchedDeployment):
+        progress = deployment.progress.to_dict()
+        with self.condition:
+            callbacks = list(self.subscribers)
+        if deployment.on_progress:
+            callbacks.append(deployment.on_progress)
+        for callback in callbacks:
+            try:
+                callback(progress)
+            except Exception as e:
+                logger.warning(f"Progress callback failed for {deployment.monitor.cluster_name}: {e}")
+
+    @staticmethod
+    def __get_stage(cluster_status: Dict) -> str:
+        """Current stage of the deployment, the status of the cluster creation or else of the node imaging"""
+        cluster_progress = cluster_status.get("cluster_progress_details") or {}
+        if cluster_progress.get("status"):
+            return cluster_progress["status"]
+        for node_progress in cluster_status.get("node_progress_details") or []:
+            if node_progress.get("status"):
+                return node_progress["status"]
+        return ""
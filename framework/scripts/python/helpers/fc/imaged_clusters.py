@@ -260,3 +260,23 @@ class ImagedCluster(FcEntity):
         if cluster_info.get("re-image", False):
             cluster_data.update(self.get_aos_ahv_spec(cluster_info["imaging_parameters"]))
         return cluster_data, None
+
+    # Helper function
+    def list_imaged_clusters(self, archived: bool = False, page_size: int = 500) -> List:
+        """List the imaged clusters of Foundation Central, one call for up to page_size imaged clusters
+
+        Args:
+            archived (bool, optional): List the archived imaged clusters, instead of the ones not archived
+            page_size (int, optional): Number of imaged clusters listed per call
+
+        Returns:
+            List: List of imaged clusters
+        """
+        imaged_clusters = []
+        offset = 0
+        while True:
+            page = self.list(data={"filters": {"archived": archived}, "length": page_size, "offset": offset}) or []
+            imaged_clusters.extend(page)
+            if len(page) < page_size:
+                return imaged_clusters
+            offset += page_size
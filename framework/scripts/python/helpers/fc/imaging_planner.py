@@ -0,0 +1,333 @@
+import heapq
+import json
+import math
+import os
+import threading
+from typing import Dict, List, Optional
+from netaddr import IPNetwork
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_HARDWARE_CLASS = "default"
+
+
+def get_hardware_class(node: Dict) -> str:
+    """Hardware class of a FC node, the nodes of the same model image at the same speed"""
+    return node.get("model") or node.get("hardware_attributes", {}).get("model") or DEFAULT_HARDWARE_CLASS
+
+
+def get_locality(node: Dict) -> str:
+    """Network locality of a FC node, the hypervisor subnet, else the block"""
+    if node.get("hypervisor_ip") and node.get("hypervisor_netmask"):
+        try:
+            return str(IPNetwork(f"{node['hypervisor_ip']}/{node['hypervisor_netmask']}").cidr)
+        except Exception:
+            pass
+    return node.get("block_serial") or ""
+
+
+class ImagingThroughput:
+    """
+    Imaging duration of a FC deployment, by hardware class: setup_secs + per_node_secs * number of nodes.
+
+    The model starts from the defaults, and is fitted to the durations measured for the imaging deployments (least
+    squares once there are samples with different node counts, else the defaults scaled to the samples). The samples
+    are kept in history_file if set, so the next runs plan with the throughput measured by the previous ones.
+    """
+    DEFAULT_SETUP_IN_SEC = 30 * 60
+    DEFAULT_PER_NODE_IN_SEC = 5 * 60
+    # Latest samples kept per hardware class
+    MAX_SAMPLES = 50
+
+    def __init__(self, history_file: Optional[str] = None, setup_secs: float = DEFAULT_SETUP_IN_SEC,
+                 per_node_secs: float = DEFAULT_PER_NODE_IN_SEC):
+        """
+        Args:
+            history_file (str, optional): JSON file the measured durations are loaded from and saved to
+            setup_secs (float, optional): Default duration of a deployment, regardless of its number of nodes
+            per_node_secs (float, optional): Default duration added by every node of a deployment
+        """
+        self.history_file = history_file
+        self.setup_secs = setup_secs
+        self.per_node_secs = per_node_secs
+        self.lock = threading.Lock()
+        # [node count, duration] samples by hardware class
+        self.samples: Dict[str, List[List[float]]] = {}
+        if history_file and os.path.exists(history_file):
+            try:
+                with open(history_file) as f:
+                    self.samples = json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring the imaging history {history_file}: {e}")
+
+    def record(self, hardware_class: str, node_count: int, duration_secs: float):
+        """Record the measured duration of an imaging deployment"""
+        with self.lock:
+            samples = self.samples.setdefault(hardware_class, [])
+            samples.append([node_count, duration_secs])
+            del samples[:-self.MAX_SAMPLES]
+            if self.history_file:
+                try:
+                    with open(self.history_file, "w") as f:
+                        json.dump(self.samples, f, indent=2)
+                except Exception as e:
+                    logger.warning(f"Failed to save the imaging history {self.history_file}: {e}")
+
+    def get_model(self, hardware_class: str) -> tuple:
+        """
+        Returns:
+            tuple (float, float): setup_secs, per_node_secs of the hardware class
+        """
+        with self.lock:
+            samples = list(self.samples.get(hardware_class, []))
+        if not samples:
+            return self.setup_secs, self.per_node_secs
+        counts = [count for count, _ in samples]
+        durations = [duration for _, duration in samples]
+        mean_count = sum(counts) / len(counts)
+        mean_duration = sum(durations) / len(durations)
+        variance = sum((count - mean_count) ** 2 for count in counts)
+        if variance:
+            per_node_secs = sum((count - mean_count) * (duration - mean_duration)
+                                for count, duration in samples) / variance
+            setup_secs = mean_duration - per_node_secs * mean_count
+            if per_node_secs >= 0 and setup_secs >= 0:
+                return setup_secs, per_node_secs
+        # Same node count everywhere (or a fit that makes no sense), scale the defaults
+        scale = mean_duration / (self.setup_secs + self.per_node_secs * mean_count)
+        return self.setup_secs * scale, self.per_node_secs * scale
+
+    def estimate(self, hardware_class: str, node_count: int) -> float:
+        setup_secs, per_node_secs = self.get_model(hardware_class)
+        return setup_secs + per_node_secs * node_count
+
+
+class ImagingUnit:
+    """
+    Nodes imaged in the same imaging deployment, the nodes of one cluster deployment run once they are imaged
+    """
+
+    def __init__(self, nodes: List[Dict], deployment: Optional[Dict] = None):
+        self.nodes = nodes
+        self.deployment = deployment
+        self.locality = get_locality(nodes[0])
+        self.hardware_class = get_hardware_class(nodes[0])
+
+
+class ImagingBatch:
+    """
+    One imaging-only FC deployment
+    """
+
+    def __init__(self, units: List[ImagingUnit]):
+        self.units = units
+        self.duration = 0.0
+        self.start = 0.0
+
+    @property
+    def nodes(self) -> List[Dict]:
+        return [node for unit in self.units for node in unit.nodes]
+
+    @property
+    def deployments(self) -> List[Dict]:
+        """Cluster deployments run once the batch is imaged"""
+        return [unit.deployment for unit in self.units if unit.deployment]
+
+
+class ImagingPlan:
+    """
+    Imaging batches, in the order to submit them, and the predicted duration of the imaging & cluster deployments
+    """
+
+    def __init__(self, batches: List[ImagingBatch], makespan: float, max_in_flight: Optional[int]):
+        self.batches = batches
+        self.makespan = makespan
+        self.max_in_flight = max_in_flight
+
+    def to_dict(self) -> Dict:
+        return {
+            "imaging_deployments": [
+                {"nodes": [node.get("node_serial") for node in batch.nodes],
+                 "hardware_class": sorted({unit.hardware_class for unit in batch.units}),
+                 "locality": sorted({unit.locality for unit in batch.units}),
+                 "predicted_start_mins": round(batch.start / 60),
+                 "predicted_duration_mins": round(batch.duration / 60)}
+                for batch in self.batches],
+            "max_in_flight_deployments": self.max_in_flight,
+            "predicted_duration_mins": round(self.makespan / 60)
+        }
+
+    def describe(self) -> str:
+        lines = [f"Imaging plan: {len(self.batches)} imaging deployment(s) of "
+                 f"{sum(len(batch.nodes) for batch in self.batches)} node(s), predicted duration "
+                 f"{round(self.makespan / 60)} mins"]
+        for index, batch in enumerate(self.to_dict()["imaging_deployments"], start=1):
+            lines.append(f"  imaging_nodes_set_{index}: start +{batch['predicted_start_mins']} mins, "
+                         f"{batch['predicted_duration_mins']} mins, {', '.join(batch['hardware_class'])}, "
+                         f"nodes {', '.join(map(str, batch['nodes']))}")
+        return "\n".join(lines)
+
+
+class ImagingPlanner:
+    """
+    Pack the nodes to image into imaging-only FC deployments, with the minimal predicted makespan.
+
+    The nodes of the same hardware class and network locality are imaged together, a deployment takes as long as its
+    slowest node and imaging traffic stays local. Every batch size between 2 nodes and max_nodes_per_deployment is
+    tried, the nodes of every group being split into batches of balanced sizes, and the plans are simulated on the
+    max_in_flight deployment slots of the FC: imaging batches, the cluster deployments run after the imaging of
+    their nodes, and the other cluster deployments of the site, run as soon as they are ready & a slot is free,
+    longest chain first. The plan with the shortest makespan, then the fewest deployments, wins.
+    """
+    # FC doesn't image a single node on its own
+    MIN_NODES_PER_DEPLOYMENT = 2
+    DEFAULT_MAX_NODES_PER_DEPLOYMENT = 8
+    DEFAULT_CLUSTER_CREATION_IN_SEC = 20 * 60
+    # Wait for the imaged nodes to be discovered again, before their cluster deployments
+    POST_IMAGING_DELAY_IN_SEC = 5 * 60
+
+    def __init__(self, throughput: Optional[ImagingThroughput] = None, max_in_flight: Optional[int] = None,
+                 max_nodes_per_deployment: Optional[int] = None,
+                 cluster_creation_secs: float = DEFAULT_CLUSTER_CREATION_IN_SEC):
+        """
+        Args:
+            throughput (ImagingThroughput, optional): Imaging duration model
+            max_in_flight (int, optional): Deployments in flight in the FC at a time, no limit by default
+            max_nodes_per_deployment (int, optional): Maximum number of nodes of an imaging deployment
+            cluster_creation_secs (float, optional): Duration of a cluster deployment, without imaging
+        """
+        self.throughput = throughput or ImagingThroughput()
+        self.max_in_flight = max_in_flight
+        self.max_nodes_per_deployment = max(max_nodes_per_deployment or self.DEFAULT_MAX_NODES_PER_DEPLOYMENT,
+                                            self.MIN_NODES_PER_DEPLOYMENT)
+        self.cluster_creation_secs = cluster_creation_secs
+
+    def plan(self, units: List[ImagingUnit], cluster_deployments: Optional[List[Dict]] = None) -> ImagingPlan:
+        """
+        Args:
+            units (list): Nodes to image, grouped by the cluster deployment they are part of
+            cluster_deployments (list, optional): Other cluster deployments of the site, sharing the FC slots
+
+        Returns:
+            ImagingPlan: Plan with the minimal predicted makespan
+        """
+        node_count = sum(len(unit.nodes) for unit in units)
+        if node_count == 1:
+            raise Exception("Cannot image a single one node using FC.")
+        cluster_durations = [self.__estimate_deployment(deployment) for deployment in cluster_deployments or []]
+        if not node_count:
+            # Only the cluster deployments
+            return ImagingPlan([], self.__simulate([], cluster_durations), self.max_in_flight)
+
+        best_plan, best_key = None, None
+        for batch_size in range(self.MIN_NODES_PER_DEPLOYMENT, min(self.max_nodes_per_deployment, node_count) + 1):
+            batches = self.__pack(units, batch_size)
+            makespan = self.__simulate(batches, cluster_durations)
+            key = (round(makespan), len(batches))
+            if best_key is None or key < best_key:
+                best_plan, best_key = ImagingPlan(batches, makespan, self.max_in_flight), key
+        best_plan.batches.sort(key=lambda batch: batch.start)
+        return best_plan
+
+    def __estimate_batch(self, batch: ImagingBatch) -> float:
+        node_count = len(batch.nodes)
+        return max(self.throughput.estimate(unit.hardware_class, node_count) for unit in batch.units)
+
+    def __estimate_deployment(self, deployment: Dict) -> float:
+        nodes = deployment.get("nodes_list") or []
+        duration = self.cluster_creation_secs
+        if nodes and nodes[0].get("image_now"):
+            duration += self.throughput.estimate(get_hardware_class(nodes[0]), len(nodes))
+        return duration
+
+    def __pack(self, units: List[ImagingUnit], batch_size: int) -> List[ImagingBatch]:
+        groups: Dict[tuple, List[ImagingUnit]] = {}
+        for unit in units:
+            groups.setdefault((unit.locality, unit.hardware_class), []).append(unit)
+
+        batches, leftovers = [], []
+        for key in sorted(groups):
+            for batch_units in self.__split(groups[key], math.ceil(self.__count(groups[key]) / batch_size)):
+                if self.__count(batch_units) < self.MIN_NODES_PER_DEPLOYMENT:
+                    leftovers.extend(batch_units)
+                else:
+                    batches.append(ImagingBatch(batch_units))
+
+        # The leftovers of the same locality are imaged together, whatever their hardware class
+        by_locality: Dict[str, List[ImagingUnit]] = {}
+        for unit in leftovers:
+            by_locality.setdefault(unit.locality, []).append(unit)
+        singles = []
+        for locality in sorted(by_locality):
+            locality_units = by_locality[locality]
+            same_locality = [batch for batch in batches if batch.units[0].locality == locality]
+            if self.__count(locality_units) >= self.MIN_NODES_PER_DEPLOYMENT:
+                batches.extend(ImagingBatch(batch_units) for batch_units in
+                               self.__split(locality_units, self.__count(locality_units) // batch_size))
+            elif same_locality:
+                min(same_locality, key=lambda batch: len(batch.nodes)).units.extend(locality_units)
+            else:
+                singles.extend(locality_units)
+        # Then the nodes alone in their locality, together or else with the smallest batch
+        if self.__count(singles) >= self.MIN_NODES_PER_DEPLOYMENT or (singles and not batches):
+            batches.extend(ImagingBatch(batch_units) for batch_units in
+                           self.__split(singles, self.__count(singles) // batch_size))
+        elif singles:
+            min(batches, key=lambda batch: len(batch.nodes)).units.extend(singles)
+
+        for batch in batches:
+            batch.duration = self.__estimate_batch(batch)
+        return batches
+
+    @staticmethod
+    def __count(units: List[ImagingUnit]) -> int:
+        return sum(len(unit.nodes) for unit in units)
+
+    @staticmethod
+    def __split(units: List[ImagingUnit], count: int) -> List[List[ImagingUnit]]:
+        """Split the units into count lists of balanced number of nodes, the largest units first"""
+        split = [[] for _ in range(max(count, 1))]
+        for unit in sorted(units, key=lambda item: len(item.nodes), reverse=True):
+            min(split, key=lambda batch_units: sum(len(item.nodes) for item in batch_units)).append(unit)
+        return [batch_units for batch_units in split if batch_units]
+
+    def __simulate(self, batches: List[ImagingBatch], cluster_durations: List[float]) -> float:
+        """List scheduling of the deployments on the FC slots, returns the makespan"""
+        follow_up = self.POST_IMAGING_DELAY_IN_SEC + self.cluster_creation_secs
+        # Jobs by ready time, then the ready jobs by critical path: (ready time, -critical path, index, duration, batch)
+        pending = []
+        for index, batch in enumerate(batches):
+            tail = follow_up if batch.deployments else 0
+            pending.append((0.0, -(batch.duration + tail), index, batch.duration, batch))
+        for index, duration in enumerate(cluster_durations, start=len(batches)):
+            pending.append((0.0, -duration, index, duration, None))
+        heapq.heapify(pending)
+        ready = []
+
+        slot_count = self.max_in_flight or len(pending) + sum(len(batch.deployments) for batch in batches)
+        slots = [0.0] * max(slot_count, 1)
+        makespan = 0.0
+        index = len(pending)
+        while pending or ready:
+            free_at = heapq.heappop(slots)
+            while pending and pending[0][0] <= free_at:
+                job = heapq.heappop(pending)
+                heapq.heappush(ready, (job[1], job[2], job[0], job[3], job[4]))
+            if not ready:
+                # Idle till the next job is ready
+                heapq.heappush(slots, pending[0][0])
+                continue
+            _, _, ready_at, duration, batch = heapq.heappop(ready)
+            start = max(free_at, ready_at)
+            finish = start + duration
+            heapq.heappush(slots, finish)
+            makespan = max(makespan, finish)
+            if batch is not None:
+                batch.start = start
+                # The cluster deployments of the imaged nodes are ready once the nodes are discovered again
+                for _ in batch.deployments:
+                    heapq.heappush(pending, (finish + self.POST_IMAGING_DELAY_IN_SEC, -self.cluster_creation_secs,
+                                             index, self.cluster_creation_secs, None))
+                    index += 1
+        return makespan
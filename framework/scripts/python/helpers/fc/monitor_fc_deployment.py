@@ -12,6 +12,7 @@ class MonitorDeployment(Script):
     """
     DEFAULT_USERNAME = "admin"
     DEFAULT_SYSTEM_PASSWORD = "Nutanix/4u"
+    TIMEOUT_IN_SEC = 3 * 60 * 60
 
     def __init__(self, pc_session: RestAPIUtil, cluster_name: str, imaged_cluster_uuid: str, fc_deployment_logger: logging.getLogger):
         """
@@ -24,6 +25,9 @@ class MonitorDeployment(Script):
         self.imaged_cluster_uuid = imaged_cluster_uuid
         self.cluster_name = cluster_name
         self.imaging = ImagedCluster(pc_session)
+        self.state = ""
+        # Monitoring times out after TIMEOUT_IN_SEC
+        self.deadline = None
         super(MonitorDeployment, self).__init__()
         self.logger = fc_deployment_logger
 
@@ -31,35 +35,53 @@ class MonitorDeployment(Script):
         """
         Run Image cluster nodes in Foundation Central
         """
-        state = ""
         delay = 60
-        timeout = time.time() + (3 * 60 * 60)
-        while state not in ["COMPLETED", "FAILED"]:
-            response = self.imaging.read(self.imaged_cluster_uuid)
-            stopped = response["cluster_status"]["imaging_stopped"]
-            aggregate_percent_complete = response["cluster_status"]["aggregate_percent_complete"]
-            if stopped:
-                if aggregate_percent_complete < 100:
-                    message = f"{self.cluster_name} Imaging/Creation stopped/failed before completion. See below details for deployment status:"
-                    status = self._get_deployment_status(response, message)
-                    self.logger.error(status)
-                    state = "FAILED"
-                else:
-                    message = f"{self.cluster_name} Imaging/Creation Completed."
-                    status = self._get_deployment_status(response, message)
-                    self.logger.info(status)
-                    state = "COMPLETED"
+        self.deadline = time.time() + self.TIMEOUT_IN_SEC
+        while not self.update(self.imaging.read(self.imaged_cluster_uuid)):
+            time.sleep(delay)
+
+    def update(self, response: dict) -> bool:
+        """
+        Update the state of the deployment with the imaged cluster read from FC. Used by execute, and by
+        DeploymentPoller which polls the deployments of all the monitors with one thread
+
+        Args:
+            response (dict): Imaged cluster
+
+        Returns:
+            bool: True once the monitoring is over, the results are then set
+        """
+        if self.deadline is None:
+            self.deadline = time.time() + self.TIMEOUT_IN_SEC
+        stopped = response["cluster_status"]["imaging_stopped"]
+        aggregate_percent_complete = response["cluster_status"]["aggregate_percent_complete"]
+        done = True
+        if stopped:
+            if aggregate_percent_complete < 100:
+                message = f"{self.cluster_name} Imaging/Creation stopped/failed before completion. See below details for deployment status:"
+                status = self._get_deployment_status(response, message)
+                self.logger.error(status)
+                state = "FAILED"
+            else:
+                message = f"{self.cluster_name} Imaging/Creation Completed."
+                status = self._get_deployment_status(response, message)
+                self.logger.info(status)
+                state = "COMPLETED"
+        else:
+            state = "PENDING"
+            status = self._get_deployment_status(response)
+            if time.time() > self.deadline:
+                message = f"Failed to poll on image node progress for cluster {self.cluster_name}. Reason: Timeout\nStatus: "
+                status = self._get_deployment_status(response, message)
             else:
-                state = "PENDING"
-                status = self._get_deployment_status(response)
-                if time.time() > timeout:
-                    message = f"Failed to poll on image node progress for cluster {self.cluster_name}. Reason: Timeout\nStatus: "
-                    status = self._get_deployment_status(response, message)
-                    break
+                done = False
                 self.logger.debug(status)
                 self.logger.info(f"Cluster {self.cluster_name} Deployment Percentage Complete: {aggregate_percent_complete}")
-                time.sleep(delay)
-        self.results = {self.cluster_name: {"result": state, "status": status, "imaged_cluster_uuid": self.imaged_cluster_uuid}}
+        self.state = state
+        if done:
+            self.deadline = None
+            self.results = {self.cluster_name: {"result": state, "status": status, "imaged_cluster_uuid": self.imaged_cluster_uuid}}
+        return done
 
     def verify(self):
         """
@@ -0,0 +1,192 @@
+import copy
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_entity_name(entity: Dict) -> Optional[str]:
+    for key in ["spec", "status", "info"]:
+        if entity.get(key, {}).get("name"):
+            return entity[key]["name"]
+    return None
+
+
+def get_entity_uuid(entity: Dict) -> Optional[str]:
+    return entity.get("metadata", {}).get("uuid") or entity.get("uuid") or entity.get("ext_id")
+
+
+class InventorySnapshot:
+    """
+    One listed collection, indexed by name and uuid
+    """
+
+    def __init__(self, entities: List):
+        self.entities = entities
+        self.loaded_at = time.time()
+        self.by_name: Dict[str, Any] = {}
+        self.by_uuid: Dict[str, Any] = {}
+        for entity in entities:
+            if not isinstance(entity, dict):
+                continue
+            name = get_entity_name(entity)
+            uuid = get_entity_uuid(entity)
+            # Keep the first entity, same as a linear search of the list
+            if name and name not in self.by_name:
+                self.by_name[name] = entity
+            if uuid:
+                self.by_uuid[uuid] = entity
+
+    def age(self) -> float:
+        return time.time() - self.loaded_at
+
+
+class InventoryCache:
+    """
+    Run-scoped snapshot of the collections of a PC (clusters, subnets, categories, images ...), shared by all the
+    scripts talking to the PC. A collection is listed once and served from the snapshot till it expires or is
+    invalidated.
+
+    Collections are invalidated when they are mutated through the PC entities, and the whole PC inventory is
+    invalidated when a PC task completes, as the task might have changed any collection.
+    """
+    _lock = threading.Lock()
+    # Dropped along with the session/ client, so a new session never gets the snapshots of an old one
+    _caches = weakref.WeakKeyDictionary()
+    DEFAULT_TTL_IN_SEC = 300
+
+    def __init__(self, ttl: float = DEFAULT_TTL_IN_SEC):
+        """
+        Args:
+          ttl(float, optional): Seconds a snapshot is served before the collection is listed again
+        """
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.snapshots: Dict[str, InventorySnapshot] = {}
+        # One lock per collection, so concurrent callers wait for the same list instead of listing in parallel
+        self.load_locks: Dict[str, threading.Lock] = {}
+        # Incremented on every invalidation, a list started before an invalidation is not cached
+        self.generations: Dict[str, int] = {}
+        self.global_generation = 0
+        self.metrics = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    def get_instance(cls, endpoint) -> 'InventoryCache':
+        """
+        Get the cache of the PC the session/ client talks to, create one if it doesn't exist
+        """
+        with cls._lock:
+            if endpoint not in cls._caches:
+                cls._caches[endpoint] = InventoryCache()
+            return cls._caches[endpoint]
+
+    @classmethod
+    def invalidate_endpoint(cls, endpoint, collection: Optional[str] = None):
+        """
+        Invalidate the cache of the session/ client, if any
+        """
+        with cls._lock:
+            cache = cls._caches.get(endpoint)
+        if cache:
+            cache.invalidate(collection)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._caches = weakref.WeakKeyDictionary()
+
+    def get(self, collection: str, loader: Callable[[], List], refresh: bool = False) -> List:
+        """
+        Get the entities of the collection
+
+        Args:
+          collection(str): Name of the collection, e.g. the resource type of the entity
+          loader(callable): Lists the collection
+          refresh(bool, optional): List the collection even if the snapshot is valid
+
+        Returns:
+          list: Copy of the entities, the callers can modify it
+        """
+        return copy.deepcopy(self.get_snapshot(collection, loader, refresh).entities)
+
+    def get_by_name(self, collection: str, name: str, loader: Callable[[], List]) -> Optional[Dict]:
+        return self.__lookup(collection, loader, lambda snapshot: snapshot.by_name.get(name))
+
+    def get_by_uuid(self, collection: str, uuid: str, loader: Callable[[], List]) -> Optional[Dict]:
+        return self.__lookup(collection, loader, lambda snapshot: snapshot.by_uuid.get(uuid))
+
+    def __lookup(self, collection: str, loader: Callable[[], List],
+                 find: Callable[[InventorySnapshot], Optional[Dict]]) -> Optional[Dict]:
+        requested_at = time.time()
+        snapshot = self.get_snapshot(collection, loader)
+        entity = find(snapshot)
+        if entity is None and snapshot.loaded_at < requested_at:
+            # The entity may have been created outside the scripts since the snapshot was listed
+            entity = find(self.get_snapshot(collection, loader, refresh=True))
+        return copy.deepcopy(entity)
+
+    def get_snapshot(self, collection: str, loader: Callable[[], List], refresh: bool = False) -> InventorySnapshot:
+        requested_at = time.time()
+        with self.lock:
+            snapshot = self.__get_valid_snapshot(collection)
+            if snapshot and not refresh:
+                self.metrics["hits"] += 1
+                return snapshot
+            load_lock = self.load_locks.setdefault(collection, threading.Lock())
+
+        with load_lock:
+            with self.lock:
+                # Listed by another caller while waiting
+                snapshot = self.__get_valid_snapshot(collection)
+                if snapshot and (not refresh or snapshot.loaded_at >= requested_at):
+                    self.metrics["hits"] += 1
+                    return snapshot
+                self.metrics["misses"] += 1
+                generation = self.__get_generation(collection)
+
+            snapshot = InventorySnapshot(loader() or [])
+
+            with self.lock:
+                if generation == self.__get_generation(collection):
+                    self.snapshots[collection] = snapshot
+                else:
+                    logger.debug(f"{collection!r} was invalidated while listing, not caching it")
+        return snapshot
+
+    def invalidate(self, collection: Optional[str] = None):
+        """
+        Invalidate the collection and the collections derived from it ("<collection>/..."). All the collections if
+        collection is not passed
+        """
+        with self.lock:
+            self.metrics["invalidations"] += 1
+            if collection is None:
+                self.global_generation += 1
+                self.snapshots = {}
+                return
+            for name in list(self.snapshots):
+                if name == collection or name.startswith(f"{collection}/"):
+                    self.snapshots.pop(name)
+            self.generations[collection] = self.generations.get(collection, 0) + 1
+
+    def get_metrics(self) -> Dict:
+        with self.lock:
+            metrics = dict(self.metrics)
+            metrics["collections"] = len(self.snapshots)
+        return metrics
+
+    def __get_valid_snapshot(self, collection: str) -> Optional[InventorySnapshot]:
+        snapshot = self.snapshots.get(collection)
+        if snapshot and snapshot.age() > self.ttl:
+            self.snapshots.pop(collection)
+            return None
+        return snapshot
+
+    def __get_generation(self, collection: str) -> Tuple[int, int, int]:
+        # A derived collection is invalidated along with its parent collection
+        parent = collection.split("/")[0] if not collection.startswith("/") else "/" + collection[1:].split("/")[0]
+        return self.global_generation, self.generations.get(parent, 0), self.generations.get(collection, 0)
@@ -0,0 +1,200 @@
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReservationLedger:
+    """
+    Process-wide ledger of the IPs handed out from IPAM in this run, by subnet.
+
+    Free IPs returned by IPAM are not reserved till their host records are created, so the sites allocating from the
+    same subnet at the same time would get the same free IPs. Allocations of a subnet are serialized with the lock of
+    the subnet, and the IPs in the ledger are excluded from the free IPs asked to IPAM.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subnet_locks: Dict[str, threading.Lock] = {}
+        self.reserved: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def get_instance(cls) -> 'ReservationLedger':
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = ReservationLedger()
+            return cls._instance
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._instance = None
+
+    def subnet_lock(self, subnet: str) -> threading.Lock:
+        with self.lock:
+            return self.subnet_locks.setdefault(subnet, threading.Lock())
+
+    def reserve(self, subnet: str, ip_list: List[str]):
+        with self.lock:
+            self.reserved.setdefault(subnet, set()).update(ip_list)
+
+    def release(self, subnet: str, ip_list: List[str]):
+        with self.lock:
+            self.reserved.get(subnet, set()).difference_update(ip_list)
+
+    def get_reserved(self, subnet: str) -> List[str]:
+        with self.lock:
+            return sorted(self.reserved.get(subnet, set()))
+
+
+class BulkAllocator:
+    """
+    Allocate all the IPs of a site from IPAM up front, with a few calls per subnet instead of a few calls per IP.
+
+    Steps:
+        1. Create the host records of the requests with an IP, for the IPs that don't have a host record yet
+        2. Reuse the IP of the fqdns that already have a host record
+        3. For every subnet, get as many free IPs as the remaining requests of the subnet, excluding the IPs of the
+           ledger, and create their host records
+    If a bulk call fails, the requests of the call fall back to one host record at a time, reusing the host records
+    that already exist for their fqdn.
+    """
+
+    def __init__(self, ipam_obj, logger_obj=None, ledger: Optional[ReservationLedger] = None):
+        """
+        Args:
+            ipam_obj (IPAM): IPAM object
+            logger_obj (logger, optional): Logger of the calling script
+            ledger (ReservationLedger, optional): Ledger of the process by default
+        """
+        self.ipam_obj = ipam_obj
+        self.logger = logger_obj or logger
+        self.ledger = ledger or ReservationLedger.get_instance()
+
+    def allocate(self, requests: List[Dict]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Allocate the IPs and create the host records
+
+        Args:
+            requests (list): List of {"fqdn": .., "subnet": .., "ip": ..}. The IP is created as is if passed, else a
+                free IP is allocated from the subnet
+
+        Returns:
+            dict: (IP, error message if there is any error) by fqdn
+        """
+        results = {}
+        given_ips = {}
+        subnet_requests = {}
+        seen = set()
+        for request in requests:
+            fqdn = request["fqdn"]
+            if fqdn in seen:
+                continue
+            seen.add(fqdn)
+            if request.get("ip"):
+                given_ips[fqdn] = request["ip"]
+            elif request.get("subnet"):
+                subnet_requests.setdefault(request["subnet"], []).append(fqdn)
+            else:
+                results[fqdn] = None, "Neither Subnet or IP was provided to query IPAM"
+
+        if given_ips:
+            results.update(self.__create_given_ips(given_ips))
+
+        fqdn_list = [fqdn for fqdns in subnet_requests.values() for fqdn in fqdns]
+        if fqdn_list:
+            existing_records, error = self.ipam_obj.get_host_records(fqdn_list)
+            if error:
+                self.logger.warning(f"Failed to get the host records in bulk, getting them one at a time: {error}")
+                existing_records = {}
+                for fqdn in fqdn_list:
+                    ip, error = self.__get_host_record_ip(fqdn)
+                    if error:
+                        results[fqdn] = None, error
+                    elif ip:
+                        existing_records[fqdn] = ip
+            for fqdn, ip in existing_records.items():
+                self.logger.warning(f"Host record {fqdn} already exists for IP {ip}")
+                results[fqdn] = ip, None
+
+            for subnet, fqdns in subnet_requests.items():
+                fqdns = [fqdn for fqdn in fqdns if fqdn not in existing_records and fqdn not in results]
+                if fqdns:
+                    results.update(self.__allocate_from_subnet(subnet, fqdns))
+        return results
+
+    def __create_given_ips(self, given_ips: Dict[str, str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        existing_ips, error = self.ipam_obj.check_host_records_exist(list(given_ips.values()))
+        if error:
+            self.logger.warning(f"Failed to check the host records in bulk, checking them one at a time: {error}")
+            return {fqdn: self.__create_given_ip(fqdn, ip) for fqdn, ip in given_ips.items()}
+
+        for fqdn, ip in given_ips.items():
+            if ip in existing_ips:
+                self.logger.warning(f"Host record present for given IP {ip}. Skipping host record creation")
+        host_records = {fqdn: ip for fqdn, ip in given_ips.items() if ip not in existing_ips}
+        if host_records:
+            self.logger.info(f"Creating Host records {list(host_records)} for given IPs")
+            _, error = self.ipam_obj.create_host_records(host_records)
+            if error:
+                self.logger.warning(f"Failed to create the host records in bulk, creating them one at a time: {error}")
+                return {fqdn: self.__create_given_ip(fqdn, ip) for fqdn, ip in given_ips.items()}
+        return {fqdn: (ip, None) for fqdn, ip in given_ips.items()}
+
+    def __create_given_ip(self, fqdn: str, ip: str) -> Tuple[Optional[str], Optional[str]]:
+        if not self.ipam_obj.check_host_record_exists(ip):
+            _, error = self.ipam_obj.create_host_record(fqdn=fqdn, ip=ip)
+            if error:
+                return None, f"Failed to create host record: {error}"
+        return ip, None
+
+    def __allocate_from_subnet(self, subnet: str, fqdns: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        with self.ledger.subnet_lock(subnet):
+            self.logger.info(f"Fetching {len(fqdns)} free IPs of {subnet} from IPAM")
+            ip_list, error = self.ipam_obj.get_next_available_ips(subnet, len(fqdns),
+                                                                  self.ledger.get_reserved(subnet))
+            if error or len(ip_list or []) < len(fqdns):
+                self.logger.warning(f"Failed to get the free IPs of {subnet} in bulk, creating the host records one "
+                                    f"at a time: {error or 'not enough free IPs'}")
+                return {fqdn: self.__allocate_one(subnet, fqdn) for fqdn in fqdns}
+
+            ip_list = ip_list[:len(fqdns)]
+            self.ledger.reserve(subnet, ip_list)
+            host_records = dict(zip(fqdns, ip_list))
+            _, error = self.ipam_obj.create_host_records(host_records)
+            if error:
+                self.ledger.release(subnet, ip_list)
+                self.logger.warning(f"Failed to create the host records of {subnet} in bulk, creating them one at a "
+                                    f"time: {error}")
+                return {fqdn: self.__allocate_one(subnet, fqdn) for fqdn in fqdns}
+
+        for fqdn, ip in host_records.items():
+            self.logger.info(f"Got IP {ip} from IPAM for fqdn {fqdn}")
+        return {fqdn: (ip, None) for fqdn, ip in host_records.items()}
+
+    def __get_host_record_ip(self, fqdn: str) -> Tuple[Optional[str], Optional[str]]:
+        try:
+            host_record = self.ipam_obj.get_host_record(fqdn)
+        except Exception as e:
+            return None, f"Failed to get the host record of {fqdn} from ipam: {e}"
+        if host_record:
+            return host_record[0]["ipv4addrs"][0]["ipv4addr"], None
+        return None, None
+
+    def __allocate_one(self, subnet: str, fqdn: str) -> Tuple[Optional[str], Optional[str]]:
+        # The failed bulk call might have created some of the host records, they are reused instead of duplicated
+        ip, error = self.__get_host_record_ip(fqdn)
+        if error:
+            return None, error
+        if ip:
+            self.logger.warning(f"Host record {fqdn} already exists for IP {ip}")
+            return ip, None
+
+        ip, error = self.ipam_obj.create_host_record_with_next_available_ip(
+            network=subnet, fqdn=fqdn, exclude_ip_list=self.ledger.get_reserved(subnet))
+        if error:
+            return None, f"Failed to get ip from ipam: {error}"
+        self.ledger.reserve(subnet, [ip])
+        return ip, None
@@ -1,17 +1,18 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from framework.helpers.rest_utils import RestAPIUtil
 from framework.scripts.python.helpers.entity import Entity
 from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.ipam.ipam_vendor import IpamVendor
 
 logger = get_logger(__name__)
 
 
-class Infoblox(Entity):
+class Infoblox(Entity, IpamVendor):
     __BASEURL__ = "wapi/v2.12"
 
-    def __init__(self, address, username, password):
+    def __init__(self, address, username, password, port: str = "", secured: bool = True):
         resource_type = self.__BASEURL__
-        session = RestAPIUtil(address, user=username, pwd=password)
+        session = RestAPIUtil(address, user=username, pwd=password, port=port, secured=secured)
         super(Infoblox, self).__init__(session=session, resource_type=resource_type)
 
     def get_host_record(self, fqdn: str):
@@ -103,3 +104,85 @@ class Infoblox(Entity):
                 return response["result"]["ipv4addrs"][0]["ipv4addr"], None
             except Exception as e:
                 return None, f"Could not create host record for next available ip address. Error: {e}"
+
+    def get_host_records(self, fqdn_list: List[str]):
+        """Get the host records of the fqdns, in one multi-request
+
+        Args:
+            fqdn_list (list): Fully qualified domain names of the host records
+
+        Returns:
+            (dict, str): (IP of the existing host records by fqdn, Error if not successful)
+        """
+        if not fqdn_list:
+            return {}, None
+        payload = [{"method": "GET", "object": "record:host", "data": {"name": fqdn.lower()}} for fqdn in fqdn_list]
+        try:
+            response = self.create(endpoint="request", data=payload)
+        except Exception as e:
+            return None, f"Could not get host records. Error: {e}"
+        host_records = {}
+        for fqdn, records in zip(fqdn_list, response):
+            if records:
+                host_records[fqdn] = records[0]["ipv4addrs"][0]["ipv4addr"]
+        return host_records, None
+
+    def check_host_records_exist(self, ip_list: List[str]):
+        """Check which of the IPs have a host record, in one multi-request
+
+        Args:
+            ip_list (list): IP addresses to check
+
+        Returns:
+            (set, str): (IPs having a host record, Error if not successful)
+        """
+        if not ip_list:
+            return set(), None
+        payload = [{"method": "GET", "object": "record:host", "data": {"ipv4addr": ip}} for ip in ip_list]
+        try:
+            response = self.create(endpoint="request", data=payload)
+        except Exception as e:
+            return None, f"Could not check host records. Error: {e}"
+        return {ip for ip, records in zip(ip_list, response) if records}, None
+
+    def get_next_available_ips(self, network: str, num: int, exclude_ip_list: Optional[List] = None):
+        """Get the next available IPs of the network. The IPs are not reserved till a host record is created for them
+
+        Args:
+            network (str): Network/Subnet to get the IPs from
+            num (int): Number of IPs
+            exclude_ip_list (list, optional): List of IP addresses to exclude
+
+        Returns:
+            (list, str): (Available IPs, Error if not successful)
+        """
+        try:
+            networks = self.read(endpoint=f"network?network={network}")
+            if not networks:
+                return None, f"Network {network} not found"
+            response = self.create(endpoint=f"{networks[0]['_ref']}?_function=next_available_ip",
+                                   data={"num": num, "exclude": exclude_ip_list or []})
+            return response["ips"], None
+        except Exception as e:
+            return None, f"Could not get next available ip addresses of {network}. Error: {e}"
+
+    def create_host_records(self, host_records: Dict[str, str]):
+        """Create the host records, in one multi-request
+
+        Args:
+            host_records (dict): IP by Fully qualified domain name
+
+        Returns:
+            (bool, str): (True if successful else False, Error if not successful)
+        """
+        if not host_records:
+            return True, None
+        payload = [
+            {"method": "POST", "object": "record:host", "data": {"name": fqdn, "ipv4addrs": [{"ipv4addr": ip}]}}
+            for fqdn, ip in host_records.items()
+        ]
+        try:
+            self.create(endpoint="request", data=payload)
+            return True, None
+        except Exception as e:
+            return False, e
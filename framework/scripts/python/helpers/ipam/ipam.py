@@ -1,5 +1,7 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Type
 from framework.scripts.python.helpers.ipam.infoblox import Infoblox
+from framework.scripts.python.helpers.ipam.ipam_vendor import IpamVendor
+from framework.scripts.python.helpers.ipam.local_ipam import LocalIpam
 
 
 class IPMAMapping:
@@ -7,18 +9,31 @@ class IPMAMapping:
     The class to define IPAM vendors mapping
     """
     IPAM_VENDOR_MAPPING = {
-        "infoblox": Infoblox
+        "infoblox": Infoblox,
+        "local": LocalIpam
         }
 
+    @classmethod
+    def register(cls, vendor: str, vendor_class: Type[IpamVendor]):
+        """Register an IPAM vendor, to be selected with ip_allocation_method
+
+        Args:
+            vendor (str): Name of the vendor in ip_allocation_method
+            vendor_class (IpamVendor): Class implementing the vendor
+        """
+        if not issubclass(vendor_class, IpamVendor):
+            raise Exception(f"{vendor_class.__name__} should implement IpamVendor")
+        cls.IPAM_VENDOR_MAPPING[vendor] = vendor_class
+
 
 class IPAM:
 
-    def __init__(self, vendor: str, ipam_address: str, username: str, password: str) -> None:
-        self.ipam_obj = self.get_ipam_obj(vendor, ipam_address, username, password)
+    def __init__(self, vendor: str, ipam_address: str, username: str, password: str, **kwargs) -> None:
+        self.ipam_obj = self.get_ipam_obj(vendor, ipam_address, username, password, **kwargs)
         if isinstance(self.ipam_obj, str):
             raise Exception(self.ipam_obj)
 
-    def get_ipam_obj(self, vendor: str, ipam_address: str, username: str, password: str):
+    def get_ipam_obj(self, vendor: str, ipam_address: str, username: str, password: str, **kwargs):
         """Get IPAM Object for the given vendor
 
         Args:
@@ -26,6 +41,7 @@ class IPAM:
             ipam_address: Address of IPAM used
             username: IPAM username
             password: IPAM password
+            kwargs: Vendor specific options, e.g. port & secured for Infoblox
 
         Returns:
             Object: IPAM object for the given vendor
@@ -33,11 +49,12 @@ class IPAM:
         try:
             return IPMAMapping.IPAM_VENDOR_MAPPING[vendor](address=ipam_address,
                                                            username=username,
-                                                           password=password)
+                                                           password=password,
+                                                           **kwargs)
         except Exception as e:
             return f"Failed to create IPAM object. Error: {e}"
 
-    def create_host_record_with_next_available_ip(self, network: str, fqdn: str, exclude_ip_list: List = []):
+    def create_host_record_with_next_available_ip(self, network: str, fqdn: str, exclude_ip_list: Optional[List] = None):
         return self.ipam_obj.create_host_record_with_next_available_ip(network, fqdn, exclude_ip_list)
 
     def check_host_record_exists(self, ip: str):
@@ -48,3 +65,15 @@ class IPAM:
 
     def create_host_record(self, fqdn: str, ip: str):
         return self.ipam_obj.create_host_record(fqdn, ip)
+
+    def get_host_records(self, fqdn_list: List[str]):
+        return self.ipam_obj.get_host_records(fqdn_list)
+
+    def check_host_records_exist(self, ip_list: List[str]):
+        return self.ipam_obj.check_host_records_exist(ip_list)
+
+    def get_next_available_ips(self, network: str, num: int, exclude_ip_list: Optional[List] = None):
+        return self.ipam_obj.get_next_available_ips(network, num, exclude_ip_list)
+
+    def create_host_records(self, host_records: Dict[str, str]):
+        return self.ipam_obj.create_host_records(host_records)
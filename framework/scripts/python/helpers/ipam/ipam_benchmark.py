@@ -0,0 +1,195 @@
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from framework.helpers.general_utils import (allocate_ips_from_ipam, assign_ips_from_ipam,
+                                            get_ip_and_create_host_record, get_node_ipam_requests)
+from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.fc.imaged_nodes import ImagedNode
+from framework.scripts.python.helpers.ipam.bulk_allocator import ReservationLedger
+from framework.scripts.python.helpers.ipam.ipam import IPAM
+from framework.scripts.python.helpers.ipam.wapi_stand_in import WapiStandIn
+from framework.scripts.python.pc.fc.foundation_script import FoundationScript
+
+logger = get_logger(__name__)
+
+HOST_SUBNET = "10.0.0.0/20"
+IPMI_SUBNET = "10.1.0.0/20"
+DOMAIN = "benchmark.local"
+# "site": FoundationScript deploying a site, "nodes": the create cluster/ imaging scripts assigning the IPs node by
+# node with assign_ips_from_ipam
+PATHS = ["site", "nodes"]
+
+
+def build_site(site_name: str, node_count: int, cluster_size: int) -> Tuple[Dict, List]:
+    """Build a site config with node_count nodes, and the FC node details of the nodes
+
+    Returns:
+        (dict, list): Site info, as FoundationScript expects it, FC available node list
+    """
+    network = {"domain": DOMAIN, "host_subnet": HOST_SUBNET, "host_gateway": "10.0.0.1",
+               "ipmi_subnet": IPMI_SUBNET, "ipmi_gateway": "10.1.0.1"}
+    site_info = {"use_existing_network_settings": False, "network": network, "re-image": False,
+                 "name_servers_list": [], "ntp_servers_list": [], "clusters": []}
+    fc_available_node_list = []
+    for start in range(0, node_count, cluster_size):
+        node_details = []
+        for index in range(start, min(start + cluster_size, node_count)):
+            node_serial = f"{site_name}-node{index}"
+            node_details.append({"node_serial": node_serial})
+            fc_available_node_list.append({"node_serial": node_serial, "hypervisor_hostname": f"{node_serial}-ahv",
+                                           "hypervisor_ip": None, "cvm_ip": None, "ipmi_ip": None})
+        site_info["clusters"].append({"cluster_name": f"{site_name}-cluster{start // cluster_size}",
+                                      "cluster_size": len(node_details), "node_details": node_details})
+    return site_info, fc_available_node_list
+
+
+def allocate_site(ipam_obj: IPAM, site_info: Dict, fc_available_node_list: List, bulk: bool) -> Dict[str, str]:
+    """Allocate the IPs of the site the same way FoundationScript.get_fc_deployment_payloads does
+
+    Returns:
+        dict: Allocated IPs, by "<node serial>/<field>" & "<cluster name>/cluster_vip"
+    """
+    script = FoundationScript({"ipam_session": ipam_obj})
+    imaged_node_obj = ImagedNode(session=None)
+    if bulk:
+        script.allocate_site_ips(site_info, imaged_node_obj, fc_available_node_list)
+
+    allocated_ips = {}
+    for cluster_info in site_info["clusters"]:
+        cluster_info = script.update_cluster_info_with_site_info(cluster_info, site_info)
+        node_serial_list = [node["node_serial"] for node in cluster_info["node_details"]]
+        existing_node_detail_dict = imaged_node_obj.node_details_by_node_serial(node_serial_list,
+                                                                                fc_available_node_list)
+        node_detail_dict, error = script.update_node_ip_details(existing_node_detail_dict,
+                                                                cluster_info["node_details"], cluster_info["network"],
+                                                                None)
+        if error:
+            raise Exception(error)
+        cluster_vip, error = script.get_ip_and_create_host_record(
+            fqdn=f"{cluster_info['cluster_name']}.{DOMAIN}", subnet=HOST_SUBNET)
+        if error:
+            raise Exception(error)
+        allocated_ips[f"{cluster_info['cluster_name']}/cluster_vip"] = cluster_vip
+        for node_serial, node_info in node_detail_dict.items():
+            for field in ["hypervisor_ip", "cvm_ip", "ipmi_ip"]:
+                allocated_ips[f"{node_serial}/{field}"] = node_info[field]
+    return allocated_ips
+
+
+def allocate_nodes(ipam_obj: IPAM, site_info: Dict, fc_available_node_list: List, bulk: bool) -> Dict[str, str]:
+    """Allocate the IPs of the site the same way CreateCluster.execute does, with assign_ips_from_ipam for every node
+
+    Returns:
+        dict: Allocated IPs, by "<node serial>/<field>" & "<cluster name>/cluster_vip"
+    """
+    ipam_config = {"domain": DOMAIN, "host_subnet": HOST_SUBNET, "ipmi_subnet": IPMI_SUBNET}
+    fc_node_details = {node["node_serial"]: node for node in fc_available_node_list}
+
+    allocated_ips = {}
+    for cluster_info in site_info["clusters"]:
+        node_info_list = [{**fc_node_details[node["node_serial"]], **node} for node in cluster_info["node_details"]]
+        cluster_vip_request = {"fqdn": f"{cluster_info['cluster_name']}.{DOMAIN}", "subnet": HOST_SUBNET}
+        bulk_ips = {}
+        if bulk:
+            ipam_requests = [cluster_vip_request]
+            for node_info in node_info_list:
+                ipam_requests.extend(get_node_ipam_requests(node_info, ipam_config).values())
+            bulk_ips = allocate_ips_from_ipam(ipam_obj, logger, ipam_requests)
+
+        cluster_vip, error = get_ip_and_create_host_record(ipam_obj=ipam_obj, logger_obj=logger,
+                                                           allocated_ips=bulk_ips, **cluster_vip_request)
+        if error:
+            raise Exception(error)
+        allocated_ips[f"{cluster_info['cluster_name']}/cluster_vip"] = cluster_vip
+        for node_info in node_info_list:
+            success, error = assign_ips_from_ipam(node_info=node_info, ipam_config=ipam_config, ipam_obj=ipam_obj,
+                                                  logger_obj=logger, allocated_ips=bulk_ips)
+            if not success:
+                raise Exception(error)
+            for field in ["host_ip", "cvm_ip", "ipmi_ip"]:
+                allocated_ips[f"{node_info['node_serial']}/{field}"] = node_info[field]
+    return allocated_ips
+
+
+def percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))]
+
+
+def run_benchmark(node_count: int, bulk: bool = True, sites: int = 1, cluster_size: int = 4,
+                  latency: float = 0.005, path: str = "site") -> Dict:
+    """Allocate the IPs of node_count nodes, split in sites allocating concurrently, from a WAPI stand-in
+
+    Args:
+        node_count (int): Total number of nodes
+        bulk (bool, optional): Allocate with the BulkAllocator, else one host record at a time
+        sites (int, optional): Number of sites, allocating concurrently
+        cluster_size (int, optional): Number of nodes per cluster
+        latency (float, optional): Latency of every WAPI call, in seconds
+        path (str, optional): One of PATHS, the code path allocating the IPs
+
+    Returns:
+        dict: Calls, call latency percentiles in ms & total allocation time in seconds
+    """
+    ReservationLedger.clear()
+    with WapiStandIn(networks=[HOST_SUBNET, IPMI_SUBNET], latency=latency) as wapi:
+        ipam_obj = IPAM(vendor="infoblox", ipam_address=wapi.address, username="admin", password="admin",
+                        port=wapi.port, secured=False)
+        site_list = [build_site(f"site{site}", len(range(site, node_count, sites)), cluster_size)
+                     for site in range(sites)]
+
+        allocate = allocate_site if path == "site" else allocate_nodes
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=sites) as executor:
+            results = list(executor.map(
+                lambda site: allocate(ipam_obj, site[0], site[1], bulk), site_list))
+        allocation_time = time.time() - start_time
+
+        ips = [ip for result in results for ip in result.values()]
+        if len(ips) != len(set(ips)):
+            raise Exception("The same IP was allocated more than once")
+        metrics = wapi.get_metrics()
+
+    durations = metrics["durations"]
+    return {
+        "nodes": node_count,
+        "path": path,
+        "mode": "bulk" if bulk else "per_record",
+        "sites": sites,
+        "ips": len(ips),
+        "calls": metrics["calls"],
+        "calls_by_object": metrics["calls_by_object"],
+        "latency_ms": {f"p{percent}": round(percentile(durations, percent) * 1000, 2) for percent in [50, 90, 99]},
+        "allocation_time_secs": round(allocation_time, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IPAM allocation against a local Infoblox WAPI stand-in")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10, 100, 1000], help="Number of nodes")
+    parser.add_argument("--sites", type=int, default=1, help="Number of sites allocating concurrently")
+    parser.add_argument("--cluster-size", type=int, default=4, help="Number of nodes per cluster")
+    parser.add_argument("--latency", type=float, default=0.005, help="Latency of every WAPI call, in seconds")
+    parser.add_argument("--mode", choices=["bulk", "per_record", "both"], default="both")
+    parser.add_argument("--path", choices=PATHS + ["both"], default="both",
+                        help="site: FoundationScript, nodes: assign_ips_from_ipam of the create cluster/ imaging scripts")
+    args = parser.parse_args()
+
+    # The scripts log every allocated IP
+    logging.basicConfig(level=logging.WARNING)
+    modes = [True, False] if args.mode == "both" else [args.mode == "bulk"]
+    paths = PATHS if args.path == "both" else [args.path]
+    for path in paths:
+        for node_count in args.nodes:
+            for bulk in modes:
+                print(json.dumps(run_benchmark(node_count, bulk=bulk, sites=args.sites,
+                                               cluster_size=args.cluster_size, latency=args.latency, path=path)))
+
+
+if __name__ == "__main__":
+    main()
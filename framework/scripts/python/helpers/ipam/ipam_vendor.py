@@ -0,0 +1,87 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+
+class IpamVendor(ABC):
+    """
+    Interface of an IPAM vendor, IPAM calls the vendor selected with "ip_allocation_method".
+
+    A vendor needs to implement the single record methods. The bulk methods default to one record at a time, vendors
+    that can do better (e.g. Infoblox multi-requests) override them.
+    """
+
+    @abstractmethod
+    def get_host_record(self, fqdn: str) -> List:
+        """Get host record
+
+        Returns:
+            List: [{"name": fqdn, "ipv4addrs": [{"ipv4addr": ip}]}] if the record exists, else []
+        """
+
+    @abstractmethod
+    def create_host_record(self, fqdn: str, ip: str):
+        """Create Host Record for the given IP
+
+        Returns:
+            (bool, str): (True if successful else False, Error if not successful)
+        """
+
+    @abstractmethod
+    def check_host_record_exists(self, ip: str) -> bool:
+        """Check if host record exists for given ip"""
+
+    @abstractmethod
+    def create_host_record_with_next_available_ip(self, network: str, fqdn: str,
+                                                  exclude_ip_list: Optional[List] = None):
+        """Create a host record for next available IP Address, or get the IP of the existing host record
+
+        Returns:
+            (str, str): (IP, Error if not successful)
+        """
+
+    def get_host_records(self, fqdn_list: List[str]):
+        """Get the host records of the fqdns
+
+        Returns:
+            (dict, str): (IP of the existing host records by fqdn, Error if not successful)
+        """
+        host_records = {}
+        try:
+            for fqdn in fqdn_list:
+                records = self.get_host_record(fqdn.lower())
+                if records:
+                    host_records[fqdn] = records[0]["ipv4addrs"][0]["ipv4addr"]
+        except Exception as e:
+            return None, f"Could not get host records. Error: {e}"
+        return host_records, None
+
+    def check_host_records_exist(self, ip_list: List[str]):
+        """Check which of the IPs have a host record
+
+        Returns:
+            (set, str): (IPs having a host record, Error if not successful)
+        """
+        try:
+            return {ip for ip in ip_list if self.check_host_record_exists(ip)}, None
+        except Exception as e:
+            return None, f"Could not check host records. Error: {e}"
+
+    def get_next_available_ips(self, network: str, num: int, exclude_ip_list: Optional[List] = None):
+        """Get the next available IPs of the network, without reserving them
+
+        Returns:
+            (list, str): (Available IPs, Error if not successful)
+        """
+        return None, f"{type(self).__name__} does not support getting multiple available IPs"
+
+    def create_host_records(self, host_records: Dict[str, str]):
+        """Create the host records, IP by fqdn
+
+        Returns:
+            (bool, str): (True if successful else False, Error if not successful)
+        """
+        for fqdn, ip in host_records.items():
+            success, error = self.create_host_record(fqdn, ip)
+            if not success:
+                return False, error
+        return True, None
@@ -0,0 +1,177 @@
+import contextlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+from netaddr import IPAddress, IPNetwork
+from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.ipam.ipam_vendor import IpamVendor
+
+logger = get_logger(__name__)
+
+
+class LocalIpam(IpamVendor):
+    """
+    IPAM backed by a local SQLite file, for the sites without an IPAM appliance (ip_allocation_method: local).
+
+    The host records are the source of truth in SQLite, the ip column is unique, so two runs sharing the file never
+    allocate the same IP. Allocations are done in an IMMEDIATE transaction, serialized across processes.
+
+    The used IPs of every network are also kept in memory as a bitmap (an int, bit n set if the nth IP of the network
+    is used). The next free IP is the lowest unset bit, found with a couple of int operations instead of walking the
+    records. The bitmap is brought up to date with the records inserted by the other runs at the start of every
+    allocation.
+    """
+    # The network address, the first host (gateway) & the broadcast address are never allocated
+    RESERVED_FIRST_HOSTS = 1
+
+    def __init__(self, address: str, username: Optional[str] = None, password: Optional[str] = None):
+        """
+        Args:
+            address (str): Path of the SQLite file, created if it doesn't exist
+            username (str, optional): Not used
+            password (str, optional): Not used
+        """
+        self.address = address
+        self.lock = threading.Lock()
+        # Transactions are managed explicitly
+        self.connection = sqlite3.connect(address, timeout=60, isolation_level=None, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS host_records ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, ip TEXT NOT NULL UNIQUE)")
+        self.networks: Dict[str, IPNetwork] = {}
+        self.bitmaps: Dict[str, int] = {}
+        # Records up to this id are in the bitmaps
+        self.last_record_id = 0
+
+    def get_host_record(self, fqdn: str) -> List:
+        with self.lock:
+            row = self.connection.execute("SELECT name, ip FROM host_records WHERE name = ?",
+                                          (fqdn.lower(),)).fetchone()
+        return [self.__to_record(*row)] if row else []
+
+    def create_host_record(self, fqdn: str, ip: str):
+        return self.create_host_records({fqdn: ip})
+
+    def check_host_record_exists(self, ip: str) -> bool:
+        with self.lock:
+            row = self.connection.execute("SELECT 1 FROM host_records WHERE ip = ?", (ip,)).fetchone()
+        return bool(row)
+
+    def create_host_record_with_next_available_ip(self, network: str, fqdn: str,
+                                                  exclude_ip_list: Optional[List] = None):
+        host_info = self.get_host_record(fqdn)
+        if host_info:
+            ip_address = host_info[0]["ipv4addrs"][0]["ipv4addr"]
+            logger.warning(f"Host record {fqdn} already exists for IP {ip_address}")
+            return ip_address, None
+        try:
+            with self.lock, self.__transaction():
+                ip = self.__next_available_ips(network, 1, exclude_ip_list)[0]
+                self.connection.execute("INSERT INTO host_records (name, ip) VALUES (?, ?)", (fqdn.lower(), ip))
+            return ip, None
+        except Exception as e:
+            return None, f"Could not create host record for next available ip address. Error: {e}"
+
+    def get_host_records(self, fqdn_list: List[str]):
+        if not fqdn_list:
+            return {}, None
+        names = {fqdn.lower(): fqdn for fqdn in fqdn_list}
+        with self.lock:
+            rows = self.__select_in("SELECT name, ip FROM host_records WHERE name IN ({})", list(names))
+        return {names[name]: ip for name, ip in rows}, None
+
+    def check_host_records_exist(self, ip_list: List[str]):
+        if not ip_list:
+            return set(), None
+        with self.lock:
+            rows = self.__select_in("SELECT ip FROM host_records WHERE ip IN ({})", list(ip_list))
+        return {ip for ip, in rows}, None
+
+    def get_next_available_ips(self, network: str, num: int, exclude_ip_list: Optional[List] = None):
+        try:
+            with self.lock:
+                self.__sync()
+                return self.__next_available_ips(network, num, exclude_ip_list), None
+        except Exception as e:
+            return None, f"Could not get next available ip addresses of {network}. Error: {e}"
+
+    def create_host_records(self, host_records: Dict[str, str]):
+        """Create the host records in one transaction, none of them is created if one fails"""
+        if not host_records:
+            return True, None
+        try:
+            with self.lock, self.__transaction():
+                self.connection.executemany("INSERT INTO host_records (name, ip) VALUES (?, ?)",
+                                            [(fqdn.lower(), ip) for fqdn, ip in host_records.items()])
+            return True, None
+        except Exception as e:
+            return False, e
+
+    @contextlib.contextmanager
+    def __transaction(self):
+        # Takes the write lock of the file, the other runs wait till commit/ rollback
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.__sync()
+            yield
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def __select_in(self, query: str, values: List, chunk_size: int = 500) -> List:
+        rows = []
+        for index in range(0, len(values), chunk_size):
+            chunk = values[index:index + chunk_size]
+            rows.extend(self.connection.execute(query.format(",".join("?" * len(chunk))), chunk).fetchall())
+        return rows
+
+    def __sync(self):
+        """Add the records inserted since the last sync, by this run or others, to the bitmaps"""
+        rows = self.connection.execute("SELECT id, ip FROM host_records WHERE id > ? ORDER BY id",
+                                       (self.last_record_id,)).fetchall()
+        for record_id, ip in rows:
+            self.__mark_used(int(IPAddress(ip)))
+            self.last_record_id = record_id
+
+    def __mark_used(self, ip: int, networks: Optional[List[str]] = None):
+        for cidr in networks or self.networks:
+            network = self.networks[cidr]
+            if network.first <= ip <= network.last:
+                self.bitmaps[cidr] |= 1 << (ip - network.first)
+
+    def __load_network(self, network: str) -> str:
+        cidr = str(IPNetwork(network).cidr)
+        if cidr not in self.networks:
+            ip_network = IPNetwork(cidr)
+            self.networks[cidr] = ip_network
+            bitmap = (1 << (self.RESERVED_FIRST_HOSTS + 1)) - 1
+            if ip_network.size > 2:
+                bitmap |= 1 << (ip_network.size - 1)
+            self.bitmaps[cidr] = bitmap
+            for ip, in self.connection.execute("SELECT ip FROM host_records WHERE id <= ?", (self.last_record_id,)):
+                self.__mark_used(int(IPAddress(ip)), [cidr])
+        return cidr
+
+    def __next_available_ips(self, network: str, num: int, exclude_ip_list: Optional[List] = None) -> List[str]:
+        cidr = self.__load_network(network)
+        ip_network = self.networks[cidr]
+        used = self.bitmaps[cidr]
+        for ip in exclude_ip_list or []:
+            ip = int(IPAddress(ip))
+            if ip_network.first <= ip <= ip_network.last:
+                used |= 1 << (ip - ip_network.first)
+
+        ip_list = []
+        for _ in range(num):
+            # Lowest unset bit
+            offset = (~used & (used + 1)).bit_length() - 1
+            if offset >= ip_network.size:
+                raise Exception(f"Cannot find {num} available IP address(es) in network {cidr}")
+            used |= 1 << offset
+            ip_list.append(str(IPAddress(ip_network.first + offset)))
+        return ip_list
+
+    @staticmethod
+    def __to_record(name: str, ip: str) -> Dict:
+        return {"name": name, "ipv4addrs": [{"ipv4addr": ip}]}
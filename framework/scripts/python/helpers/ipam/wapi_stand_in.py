@@ -0,0 +1,248 @@
+import copy
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, unquote, urlparse
+from netaddr import IPNetwork
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class WapiError(Exception):
+    def __init__(self, text: str, code: str = "Client.Ibap.Data.Conflict", status: int = 400):
+        super(WapiError, self).__init__(text)
+        self.text = text
+        self.code = code
+        self.status = status
+
+
+class WapiStandIn:
+    """
+    Local, in-memory stand-in for the Infoblox WAPI, to measure and regression-test IPAM allocation without an
+    appliance. Supports what the Infoblox class uses:
+        - record:host: GET by name/ ipv4addr, POST with an IP or the next_available_ip object function
+        - network: GET by network, POST <network ref>?_function=next_available_ip with num & exclude
+        - request: multi-request of the above, applied as one transaction
+    Every HTTP call is delayed by latency seconds, to emulate the round trip to a remote appliance.
+
+    Usage:
+        with WapiStandIn(networks=["10.0.0.0/24"], latency=0.01) as wapi:
+            infoblox = Infoblox("127.0.0.1", "admin", "admin", port=wapi.port, secured=False)
+    """
+    BASEURL = "/wapi/v2.12"
+
+    def __init__(self, networks: List[str], latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            networks (list): Networks (CIDR) managed by the stand-in
+            latency (float, optional): Delay added to every HTTP call, in seconds
+            host (str, optional): Address to listen on
+            port (int, optional): Port to listen on, a free port by default
+        """
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.networks: Dict[str, IPNetwork] = {str(IPNetwork(network).cidr): IPNetwork(network)
+                                               for network in networks}
+        # Allocatable IPs of the networks, the network, gateway (first host) & broadcast addresses are not allocated
+        self.hosts: Dict[str, List[str]] = {cidr: [str(ip) for ip in network.iter_hosts()][1:]
+                                            for cidr, network in self.networks.items()}
+        self.first_free: Dict[str, int] = {cidr: 0 for cidr in self.networks}
+        # Host records by name, and the name by IP
+        self.records: Dict[str, Dict] = {}
+        self.ips: Dict[str, str] = {}
+        self.calls: List[Dict] = []
+        self.created: List[str] = []
+        self.server = ThreadingHTTPServer((host, port), self.__get_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def address(self) -> str:
+        return self.server.server_address[0]
+
+    @property
+    def port(self) -> str:
+        return str(self.server.server_address[1])
+
+    def start(self) -> 'WapiStandIn':
+        self.thread = threading.Thread(target=self.server.serve_forever, name="Thread-WapiStandIn", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self) -> 'WapiStandIn':
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def get_metrics(self) -> Dict:
+        """
+        Number of HTTP calls, by method & object, and the duration of the calls as seen by the stand-in
+
+        Returns:
+            dict: {"calls": .., "calls_by_object": {"POST request": ..}, "durations": [..]}
+        """
+        with self.lock:
+            calls = list(self.calls)
+        calls_by_object = {}
+        for call in calls:
+            key = f"{call['method']} {call['object']}"
+            calls_by_object[key] = calls_by_object.get(key, 0) + 1
+        return {"calls": len(calls), "calls_by_object": calls_by_object,
+                "durations": [call["duration"] for call in calls]}
+
+    def reset_metrics(self):
+        with self.lock:
+            self.calls = []
+
+    def handle(self, method: str, path: str, body: Optional[str]):
+        """
+        Handle one WAPI call
+
+        Returns:
+            (int, object): HTTP status & JSON response
+        """
+        url = urlparse(path)
+        if not url.path.startswith(self.BASEURL + "/"):
+            return 404, {"Error": f"Unknown path {url.path}"}
+        wapi_object = unquote(url.path[len(self.BASEURL) + 1:])
+        args = dict(parse_qsl(url.query))
+        data = json.loads(body) if body else {}
+
+        with self.lock:
+            # Records created by this call, removed if the call fails
+            self.created = []
+            try:
+                if wapi_object == "request" and method == "POST":
+                    response = [self.__call(request["method"], request["object"], request.get("data") or {},
+                                            request.get("args") or {}) for request in data]
+                else:
+                    # GET args are the search fields
+                    if method == "GET":
+                        data = {key: value for key, value in args.items() if not key.startswith("_")}
+                    response = self.__call(method, wapi_object, data, args)
+                return 200, response
+            except WapiError as e:
+                # A failed call, or a failed request of a multi-request, changes nothing
+                for name in self.created:
+                    self.ips.pop(self.records.pop(name)["ipv4addrs"][0]["ipv4addr"])
+                if self.created:
+                    self.first_free = {cidr: 0 for cidr in self.networks}
+                return e.status, {"Error": f"{e.code}: {e.text}", "code": e.code, "text": e.text}
+
+    def __call(self, method: str, wapi_object: str, data: Dict, args: Dict):
+        if wapi_object == "record:host":
+            if method == "GET":
+                return self.__search_host_records(data)
+            if method == "POST":
+                return self.__create_host_record(data, args)
+        elif wapi_object == "network" and method == "GET":
+            network = self.networks.get(data.get("network"))
+            return [{"_ref": self.__network_ref(network), "network": str(network.cidr)}] if network else []
+        elif wapi_object.startswith("network/") and method == "POST" and args.get("_function") == "next_available_ip":
+            network = self.networks.get(wapi_object.split(":", 1)[-1].rsplit("/", 1)[0])
+            if not network:
+                raise WapiError(f"Reference {wapi_object} not found", code="Client.Ibap.Data.NotFound", status=404)
+            return {"ips": self.__next_available_ips(network, data.get("num", 1), data.get("exclude", []))}
+        raise WapiError(f"Unsupported call {method} {wapi_object}", code="Client.Ibap.Proto", status=400)
+
+    def __search_host_records(self, data: Dict) -> List[Dict]:
+        if data.get("name"):
+            record = self.records.get(data["name"].lower())
+            return [copy.deepcopy(record)] if record else []
+        if data.get("ipv4addr"):
+            name = self.ips.get(data["ipv4addr"])
+            return [copy.deepcopy(self.records[name])] if name else []
+        return [copy.deepcopy(record) for record in self.records.values()]
+
+    def __create_host_record(self, data: Dict, args: Dict):
+        name = data["name"].lower()
+        if name in self.records:
+            raise WapiError(f"The record '{data['name']}' already exists.")
+        ip = data["ipv4addrs"][0]["ipv4addr"]
+        if isinstance(ip, dict):
+            # next_available_ip object function
+            network = self.networks.get(ip["_object_parameters"]["network"])
+            if not network:
+                raise WapiError(f"Network {ip['_object_parameters']['network']} not found",
+                                code="Client.Ibap.Data.NotFound", status=404)
+            free_ips = self.__next_available_ips(network, 1, ip.get("_parameters", {}).get("exclude", []))
+            ip = free_ips[0]
+        elif ip in self.ips:
+            raise WapiError(f"The IP address {ip} is already used by '{self.ips[ip]}'.")
+
+        record = {"_ref": f"record:host/{len(self.records)}:{name}/default", "name": name,
+                  "ipv4addrs": [{"ipv4addr": ip, "host": name}]}
+        self.records[name] = record
+        self.ips[ip] = name
+        self.created.append(name)
+        if args.get("_return_as_object") == "1":
+            return {"result": copy.deepcopy(record)}
+        return record["_ref"]
+
+    def __next_available_ips(self, network: IPNetwork, num: int, exclude: List[str]) -> List[str]:
+        cidr = str(network.cidr)
+        hosts = self.hosts[cidr]
+        # Skip the IPs in use at the start of the network, once, instead of on every call
+        while self.first_free[cidr] < len(hosts) and hosts[self.first_free[cidr]] in self.ips:
+            self.first_free[cidr] += 1
+
+        excluded = set(exclude)
+        free_ips = []
+        for ip in itertools.islice(hosts, self.first_free[cidr], None):
+            if ip not in self.ips and ip not in excluded:
+                free_ips.append(ip)
+                if len(free_ips) == num:
+                    return free_ips
+        raise WapiError(f"Cannot find {num} available IP address(es) in network {cidr}",
+                        code="Client.Ibap.Data.Conflict")
+
+    @staticmethod
+    def __network_ref(network: IPNetwork) -> str:
+        return f"network/{abs(hash(str(network.cidr)))}:{network.cidr}/default"
+
+    def __get_handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self.__respond("GET")
+
+            def do_POST(self):
+                self.__respond("POST")
+
+            def __respond(self, method: str):
+                start_time = time.time()
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else None
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                status, response = stand_in.handle(method, self.path, body)
+                content = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+                wapi_object = unquote(urlparse(self.path).path)[len(stand_in.BASEURL) + 1:].split("/")[0]
+                with stand_in.lock:
+                    stand_in.calls.append({"method": method, "object": wapi_object,
+                                           "duration": time.time() - start_time})
+
+            def log_message(self, format, *args):
+                logger.debug(f"WAPI stand-in: {format % args}")
+
+        return Handler
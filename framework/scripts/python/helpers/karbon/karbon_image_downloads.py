@@ -0,0 +1,210 @@
+import concurrent.futures
+import contextlib
+import threading
+import weakref
+from typing import Dict, Optional
+from framework.helpers.log_utils import get_logger
+from framework.helpers.rest_utils import RestAPIUtil
+from .karbon_image import KarbonImage
+from ..state_monitor.karbon_image_monitor import KarbonImageDownloadMonitor
+from ..state_monitor.poll_scheduler import PollHandle
+
+logger = get_logger(__name__)
+
+
+class KarbonImageDownloads:
+    """
+    Per-PC tracker of the NKE OS image downloads, shared by all the NKE cluster creations of the PC (the NKE clusters
+    of every edge site are created by their own script).
+
+    The images are listed once. Every image is downloaded once and tracked by a single KarbonImageDownloadMonitor on
+    the PollScheduler, whatever the number of clusters waiting for it. The waiters get a future per OS version, that
+    is resolved as soon as that image is downloaded, so a cluster never waits for the images of the other clusters.
+
+    The number of NKE clusters deployed at a time on the PC is limited by max_parallel_deployments. When the callers of
+    the PC pass different values, the largest one is used. A failed download is forgotten, the next caller downloads
+    the image again.
+    """
+    _lock = threading.Lock()
+    # Dropped along with the session
+    _trackers = weakref.WeakKeyDictionary()
+    DEFAULT_MAX_PARALLEL_DEPLOYMENTS = 4
+
+    def __init__(self, session: RestAPIUtil, max_parallel_deployments: Optional[int] = None):
+        """
+        Args:
+          session(RestAPIUtil): PC session
+          max_parallel_deployments(int, optional): Maximum number of NKE clusters deployed at a time on the PC,
+            DEFAULT_MAX_PARALLEL_DEPLOYMENTS if not passed
+        """
+        self.session = session
+        self.image_op = KarbonImage(session)
+        self.lock = threading.Lock()
+        # OS version -> image, listed once
+        self.images: Optional[Dict[str, Dict]] = None
+        # OS version -> future resolved with the image once it is downloaded
+        self.downloads: Dict[str, concurrent.futures.Future] = {}
+        self.handles: Dict[str, PollHandle] = {}
+        self.max_parallel_deployments = max_parallel_deployments or self.DEFAULT_MAX_PARALLEL_DEPLOYMENTS
+        # Whether max_parallel_deployments was passed by a caller, or is the default
+        self.max_parallel_deployments_set = bool(max_parallel_deployments)
+        self.deployment_slots = threading.Condition(self.lock)
+        self.metrics = {"downloads": 0, "already_downloaded": 0, "shared_waits": 0, "deployments": 0,
+                        "active_deployments": 0, "max_active_deployments": 0}
+
+    @classmethod
+    def get_instance(cls, session: RestAPIUtil, max_parallel_deployments: Optional[int] = None) \
+            -> 'KarbonImageDownloads':
+        """
+        Get the tracker of the PC the session talks to, create one if it doesn't exist. The deployments of a PC share
+        the same slots, see set_max_parallel_deployments
+        """
+        with cls._lock:
+            if session not in cls._trackers:
+                cls._trackers[session] = KarbonImageDownloads(session, max_parallel_deployments)
+                return cls._trackers[session]
+            tracker = cls._trackers[session]
+        if max_parallel_deployments:
+            tracker.set_max_parallel_deployments(max_parallel_deployments)
+        return tracker
+
+    def set_max_parallel_deployments(self, max_parallel_deployments: int):
+        """
+        A value passed by a caller replaces the default, the largest of the values passed by the callers is kept
+        """
+        with self.deployment_slots:
+            if self.max_parallel_deployments_set:
+                if max_parallel_deployments != self.max_parallel_deployments:
+                    logger.warning(f"Different max_parallel_deployments passed for the PC, "
+                                   f"{self.max_parallel_deployments} & {max_parallel_deployments}, using the largest")
+                max_parallel_deployments = max(max_parallel_deployments, self.max_parallel_deployments)
+            self.max_parallel_deployments = max_parallel_deployments
+            self.max_parallel_deployments_set = True
+            self.deployment_slots.notify_all()
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            for tracker in list(cls._trackers.values()):
+                for handle in tracker.handles.values():
+                    handle.cancel()
+            cls._trackers = weakref.WeakKeyDictionary()
+
+    def get_image(self, os_version: str) -> concurrent.futures.Future:
+        """
+        Start the download of the image of the OS version, unless it is already downloaded or being downloaded
+
+        Returns:
+          Future: Resolved with the image once it is downloaded
+        """
+        with self.lock:
+            if os_version in self.downloads:
+                self.metrics["shared_waits"] += 1
+                return self.downloads[os_version]
+            future = concurrent.futures.Future()
+            self.downloads[os_version] = future
+        future.add_done_callback(lambda done: self.__forget_failed(os_version, done))
+        try:
+            self.__start_download(os_version, future)
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def wait_for_image(self, os_version: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Wait till the image of the OS version is downloaded
+
+        Returns:
+          dict: The image
+        """
+        timeout = timeout or KarbonImageDownloadMonitor.DEFAULT_TIMEOUT_IN_SEC
+        future = self.get_image(os_version)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            # Stop tracking the download, the next waiter checks the image again
+            with self.lock:
+                if self.downloads.get(os_version) is future:
+                    self.downloads.pop(os_version)
+                    handle = self.handles.pop(os_version, None)
+                    if handle:
+                        handle.cancel()
+            raise Exception(f"Timed out after {timeout} seconds waiting for the download of the os-image "
+                            f"'{os_version}'")
+
+    @contextlib.contextmanager
+    def deployment_slot(self):
+        """
+        Hold one of the max_parallel_deployments slots of the PC while deploying an NKE cluster
+        """
+        with self.deployment_slots:
+            self.deployment_slots.wait_for(
+                lambda: self.metrics["active_deployments"] < self.max_parallel_deployments)
+            self.metrics["deployments"] += 1
+            self.metrics["active_deployments"] += 1
+            self.metrics["max_active_deployments"] = max(self.metrics["max_active_deployments"],
+                                                         self.metrics["active_deployments"])
+        try:
+            yield
+        finally:
+            with self.deployment_slots:
+                self.metrics["active_deployments"] -= 1
+                self.deployment_slots.notify()
+
+    def get_metrics(self) -> Dict:
+        with self.lock:
+            return dict(self.metrics)
+
+    def __forget_failed(self, os_version: str, future: concurrent.futures.Future):
+        if future.cancelled() or not future.exception():
+            return
+        with self.lock:
+            if self.downloads.get(os_version) is future:
+                # The next caller lists the images and downloads the image again
+                self.downloads.pop(os_version)
+                self.images = None
+
+    def __get_images(self) -> Dict[str, Dict]:
+        with self.lock:
+            if self.images is None:
+                self.images = {image.get("version"): image for image in self.image_op.list() or []
+                               if image.get("version")}
+            return self.images
+
+    def __start_download(self, os_version: str, future: concurrent.futures.Future):
+        image = self.__get_images().get(os_version)
+        if not image:
+            raise Exception(f"Specified '{os_version}' version is not available to download!")
+
+        if image.get("status") != KarbonImage.AVAILABLE or not image.get("uuid"):
+            if image.get("status") == KarbonImage.DOWNLOADED:
+                with self.lock:
+                    self.metrics["already_downloaded"] += 1
+            else:
+                logger.warning(f"os-image '{os_version}' is in {image.get('status')!r} state, not downloading it")
+            future.set_result(image)
+            return
+
+        logger.info(f"Downloading the os-image '{os_version}'...")
+        response = self.image_op.download(image["uuid"])
+        if not response.get("image_uuid"):
+            raise Exception(f"Downloading the os-image '{os_version}' failed. {response}")
+        with self.lock:
+            self.metrics["downloads"] += 1
+
+        def on_downloaded(done: concurrent.futures.Future):
+            with self.lock:
+                self.handles.pop(os_version, None)
+            try:
+                done.result()
+            except Exception as e:
+                future.set_exception(Exception(f"Downloading the os-image '{os_version}' failed. {e}"))
+                return
+            logger.info(f"Downloaded the os-image '{os_version}' successfully")
+            future.set_result({**image, "status": KarbonImage.DOWNLOADED})
+
+        handle = KarbonImageDownloadMonitor(self.session, response["image_uuid"]).monitor_async(
+            callback=on_downloaded)
+        with self.lock:
+            if not handle.done():
+                self.handles[os_version] = handle
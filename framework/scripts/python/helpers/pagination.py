@@ -0,0 +1,41 @@
+import collections
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generator, Iterable, List, Optional
+
+MAX_IN_FLIGHT_PAGES = 4
+
+
+def iter_pages(fetch_page: Callable[[int], List], offsets: Iterable[int], page_size: Optional[int] = None,
+               max_in_flight: int = MAX_IN_FLIGHT_PAGES) -> Generator[List, None, None]:
+    """
+    Fetch the pages at the given offsets, max_in_flight pages at a time, and yield them in the order of the offsets.
+
+    Args:
+      fetch_page(callable): Called with the offset, returns the entities of the page
+      offsets(iterable): Offsets of the pages to fetch
+      page_size(int, optional): Number of entities in a full page. If passed, stops after the first page that is not
+        full, the pages after it are not fetched
+      max_in_flight(int, optional): Maximum number of pages being fetched at a time
+
+    Returns:
+      generator of the entities of every page
+    """
+    offsets = iter(offsets)
+    max_in_flight = max(max_in_flight, 1)
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="Thread-Page") as executor:
+        window = collections.deque(executor.submit(fetch_page, offset)
+                                   for offset in itertools.islice(offsets, max_in_flight))
+        try:
+            while window:
+                page = window.popleft().result() or []
+                yield page
+                if page_size and len(page) < page_size:
+                    break
+                offset = next(offsets, None)
+                if offset is not None:
+                    window.append(executor.submit(fetch_page, offset))
+        finally:
+            # Stopped early or the consumer is gone, don't fetch the pages not started yet
+            for future in window:
+                future.cancel()
@@ -1,13 +1,45 @@
 import copy
 import json
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Callable, Any, Generator, Tuple
 from framework.helpers.log_utils import get_logger
 from framework.helpers.rest_utils import RestAPIUtil
+from .inventory_cache import InventoryCache
 
 logger = get_logger(__name__)
 
 BATCH_TIMEOUT = (5, 6 * 60)
 MAX_BATCH_API_CALLS = 60
+# Number of batch calls in flight at a time. 1 means the chunks are submitted one after another
+MAX_IN_FLIGHT_BATCHES = 1
+
+
+def iter_chunk_results(func: Callable[[List], Any], chunks: List[List],
+                       max_in_flight: int = MAX_IN_FLIGHT_BATCHES) -> Generator[Tuple[int, Any], None, None]:
+    """
+    Call func for every chunk, with at most max_in_flight calls at a time
+    Args:
+      func (callable): Function that submits a chunk
+      chunks (list): List of chunks
+      max_in_flight (int): Number of concurrent calls
+    Returns:
+      generator of (index of the chunk, result), in the order the chunks complete
+    """
+    if max_in_flight <= 1 or len(chunks) <= 1:
+        for index, chunk in enumerate(chunks):
+            yield index, func(chunk)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(chunks)),
+                            thread_name_prefix="Thread-BatchChunk") as executor:
+        futures = {executor.submit(func, chunk): index for index, chunk in enumerate(chunks)}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Don't submit the pending chunks if a chunk failed or the caller stopped iterating
+            for future in futures:
+                future.cancel()
 
 
 class PcBatchOp:
@@ -28,12 +60,14 @@ class PcBatchOp:
           session: PC session object
           base_url (str): URL_BASE of the Entity
           kind (str): V3_KIND of the Entity
+          max_in_flight (int, optional): Number of batch calls in flight at a time, default MAX_IN_FLIGHT_BATCHES
         """
         self.session = session
         # Batch APIs are failing for "api/nutanix/v3" hence adding an escape character for /v
         self.base_url = "api/nutanix//v3"
         self.resource_type = kwargs.get("resource_type")
         self.kind = kwargs.get("kind")
+        self.max_in_flight = kwargs.get("max_in_flight") or MAX_IN_FLIGHT_BATCHES
 
     def batch(self, api_request_list: List):
         """
@@ -41,28 +75,53 @@ class PcBatchOp:
         Args:
           api_request_list (list): Payload for batch
         Returns:
-          list of api_response_list
+          list of api_response_list, in the order of api_request_list
+        """
+        api_response_chunks = dict(self.iter_batch(api_request_list))
+
+        api_response_list = []
+        for index in sorted(api_response_chunks):
+            api_response_list.extend(api_response_chunks[index])
+        return api_response_list
+
+    def iter_batch(self, api_request_list: List) -> Generator[Tuple[int, List], None, None]:
+        """
+        Call batch API, with max_in_flight chunks in flight at a time
+        Args:
+          api_request_list (list): Payload for batch
+        Returns:
+          generator of (index of the chunk, api_response_list of the chunk), in the order the chunks complete
         """
         api_request_chunks = [
             api_request_list[i:i + MAX_BATCH_API_CALLS]
             for i in range(0, len(api_request_list), MAX_BATCH_API_CALLS)
         ]
+        yield from iter_chunk_results(self.__batch_chunk, api_request_chunks, self.max_in_flight)
 
-        api_response_list = []
-        for request_list in api_request_chunks:
-            payload = copy.deepcopy(self.PAYLOAD)
-
-            payload["api_request_list"] = request_list
-            logger.debug("Batch Payload: {}".format(payload))
-
-            batch_response = self.session.post(
-                uri=f"{self.base_url}/{self.BATCH_BASE}",
-                data=payload,
-                timeout=BATCH_TIMEOUT
-            )
-            if batch_response.get('api_response_list', None):
-                api_response_list.extend(batch_response.get('api_response_list'))
-        return api_response_list
+    def iter_task_uuid_chunks(self, api_request_list: List) -> Generator[List, None, None]:
+        """
+        Call batch API, the tasks of a chunk can be monitored while the next chunks are still in flight
+        Args:
+          api_request_list (list): Payload for batch
+        Returns:
+          generator of the Task UUIDs of every chunk, in the order the chunks complete
+        """
+        for _, api_response_list in self.iter_batch(api_request_list):
+            yield get_task_uuid_list(api_response_list)
+
+    def __batch_chunk(self, request_list: List) -> List:
+        # Only api_request_list differs between the chunks, no need to deep copy the template
+        payload = {**self.PAYLOAD, "api_request_list": request_list}
+        logger.debug("Batch Payload: {}".format(payload))
+
+        batch_response = self.session.post(
+            uri=f"{self.base_url}/{self.BATCH_BASE}",
+            data=payload,
+            timeout=BATCH_TIMEOUT
+        )
+        # The entities of the resource type are modified, don't serve them from the inventory snapshot anymore
+        InventoryCache.invalidate_endpoint(self.session, self.resource_type)
+        return batch_response.get('api_response_list', None) or []
 
     def batch_create(self, request_payload_list: Optional[List]):
         """
@@ -75,6 +134,15 @@ class PcBatchOp:
         Returns:
           list:  List of Task UUIDs
         """
+        return get_task_uuid_list(self.batch(self.__get_create_requests(request_payload_list)))
+
+    def iter_batch_create(self, request_payload_list: Optional[List]) -> Generator[List, None, None]:
+        """
+        Same as batch_create, the Task UUIDs are returned chunk by chunk as the chunks complete
+        """
+        yield from self.iter_task_uuid_chunks(self.__get_create_requests(request_payload_list))
+
+    def __get_create_requests(self, request_payload_list: Optional[List]) -> List:
         api_request_payload = {
             "operation": "POST",
             "path_and_params": f"{self.base_url}{self.resource_type}",
@@ -93,9 +161,7 @@ class PcBatchOp:
                 else:
                     api_request["body"] = request_payload
                 api_request_list.append(api_request)
-        api_response_list = self.batch(api_request_list)
-
-        return get_task_uuid_list(api_response_list)
+        return api_request_list
 
     def batch_update(self, entity_update_list: List):
         """
@@ -120,8 +186,7 @@ class PcBatchOp:
                     }
                 }
                 api_request_list.append(request)
-        api_response_list = self.batch(api_request_list)
-        return get_task_uuid_list(api_response_list)
+        return get_task_uuid_list(self.batch(api_request_list))
 
     def batch_delete(self, entity_list: List):
         """
@@ -142,8 +207,7 @@ class PcBatchOp:
                 api_request["path_and_params"] += f"/{entity}"
                 api_request_list.append(api_request)
 
-        api_response_list = self.batch(api_request_list)
-        return get_task_uuid_list(api_response_list)
+        return get_task_uuid_list(self.batch(api_request_list))
 
 
 def get_task_uuid_list(api_response_list: List) -> List:
@@ -181,3 +245,15 @@ def get_task_uuid_list(api_response_list: List) -> List:
             task_uuid_list.append(task_uuid)
 
     return task_uuid_list
+
+
+def get_batch_options(data: Dict) -> Dict:
+    """
+    Options of the batch calls configured in "pc_batch" of the data
+    Args:
+      data (dict): Config of the script
+    Returns:
+      dict: max_in_flight and chunk_size, only the ones configured
+    """
+    config = data.get("pc_batch") or {}
+    return {option: config[option] for option in ("max_in_flight", "chunk_size") if config.get(option)}
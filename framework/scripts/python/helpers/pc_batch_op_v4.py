@@ -1,9 +1,10 @@
 import ntnx_prism_py_client
 import uuid
 
-from typing import List, Optional
+from typing import Generator, List, Optional, Tuple
 from framework.helpers.log_utils import get_logger
 from framework.helpers.v4_api_client import ApiClientV4
+from .pc_batch_op import iter_chunk_results, MAX_IN_FLIGHT_BATCHES
 from ntnx_prism_py_client.models.prism.v4.operations.BatchSpec import BatchSpec
 from ntnx_prism_py_client.models.prism.v4.operations.BatchSpecMetadata import BatchSpecMetadata
 from ntnx_prism_py_client.models.prism.v4.operations.BatchSpecPayload import BatchSpecPayload
@@ -18,6 +19,8 @@ logger = get_logger(__name__)
 
 BATCH_TIMEOUT = (5, 6 * 60)
 MAX_BATCH_API_CALLS = 60
+# Number of operations of a batch PC runs in parallel
+DEFAULT_CHUNK_SIZE = 1
 
 
 class PcBatchOpv4:
@@ -34,9 +37,17 @@ class PcBatchOpv4:
     def __init__(self, v4_api_util: ApiClientV4, **kwargs):
         """
         Default Constructor for PcBatchOp class
+        Args:
+          v4_api_util: v4 API client
+          resource_type (str): URI of the Entity
+          chunk_size (int, optional): Number of operations of a batch PC runs in parallel, default DEFAULT_CHUNK_SIZE
+          max_in_flight (int, optional): Number of batches in flight at a time, default MAX_IN_FLIGHT_BATCHES.
+            When more than 1, the payload is split in batches of MAX_BATCH_API_CALLS
         """
         self.base_url = "/api"
         self.resource_type = kwargs.get("resource_type")
+        self.chunk_size = kwargs.get("chunk_size") or DEFAULT_CHUNK_SIZE
+        self.max_in_flight = kwargs.get("max_in_flight") or MAX_IN_FLIGHT_BATCHES
         self.client = v4_api_util.get_api_client("prism")
         self.batch_api = ntnx_prism_py_client.BatchesApi(
             api_client=self.client
@@ -53,28 +64,23 @@ class PcBatchOpv4:
         Returns:
           list:  List of Task UUIDs
         """
-        unique_id = uuid.uuid1()
-        
-        batch_spec_payload_list = [
-            BatchSpecPayload(data=batch_spec_payload)
-            for batch_spec_payload in request_payload_list
-        ]
+        return self.__submit_batches(ActionType.CREATE, f"{self.base_url}/{self.resource_type}",
+                                     self.__get_create_payload(request_payload_list))
 
-        batch_spec = BatchSpec(
-            metadata=BatchSpecMetadata(
-                action=ActionType.CREATE,
-                name=f"multi_{unique_id}",
-                uri=f"{self.base_url}/{self.resource_type}",
-                stop_on_error=True,
-                chunk_size=1,
-            ),
-            payload=batch_spec_payload_list,
-        )
-        api_response_list = self.batch_api.submit_batch(
-                async_req=False, body=batch_spec
-            )
+    def iter_batch_create(self, request_payload_list: Optional[List]) -> Generator[List, None, None]:
+        """
+        Same as batch_create, the Task UUIDs are returned batch by batch as the batches complete
+        """
+        for _, task_uuid_list in self.__iter_batches(ActionType.CREATE, f"{self.base_url}/{self.resource_type}",
+                                                     self.__get_create_payload(request_payload_list)):
+            yield task_uuid_list
 
-        return get_task_uuid_list(api_response_list)
+    @staticmethod
+    def __get_create_payload(request_payload_list: Optional[List]) -> List:
+        return [
+            BatchSpecPayload(data=batch_spec_payload)
+            for batch_spec_payload in request_payload_list or []
+        ]
 
     def batch_delete(self, entity_list: List):
         """
@@ -86,7 +92,6 @@ class PcBatchOpv4:
         Returns:
           list:  List of Task UUIDs
         """
-        unique_id = uuid.uuid1()
         batch_spec_payload_list = [
             BatchSpecPayload(
             data=None,
@@ -106,21 +111,8 @@ class PcBatchOpv4:
             for batch_spec_payload in entity_list
         ]
 
-        batch_spec = BatchSpec(
-            metadata=BatchSpecMetadata(
-                action=ActionType.DELETE,
-                name=f"multi_{unique_id}",
-                uri=f"{self.base_url}/{self.resource_type}/{{extId}}",
-                stop_on_error=True,
-                chunk_size=1,
-            ),
-            payload=batch_spec_payload_list,
-        )
-        api_response_list = self.batch_api.submit_batch(
-                async_req=False, body=batch_spec
-            )
-
-        return get_task_uuid_list(api_response_list)
+        return self.__submit_batches(ActionType.DELETE, f"{self.base_url}/{self.resource_type}/{{extId}}",
+                                     batch_spec_payload_list)
 
     def batch_update(self, entity_update_list: Optional[List]):
         """
@@ -133,8 +125,6 @@ class PcBatchOpv4:
         Returns:
           list:  List of Task UUIDs
         """
-        unique_id = uuid.uuid1()
-
         batch_spec_payload_list = [
             BatchSpecPayload(
                 data=batch_spec_payload[0],
@@ -156,22 +146,49 @@ class PcBatchOpv4:
             for batch_spec_payload in entity_update_list
         ]
 
-        batch_spec = BatchSpec(
-            metadata=BatchSpecMetadata(
-                action=ActionType.MODIFY,
-                name=f"multi_{unique_id}",
-                uri=f"{self.base_url}/{self.resource_type}/{{extId}}",
-                stop_on_error=True,
-                chunk_size=1,
-            ),
-            payload=batch_spec_payload_list,
-        )
-        
-        api_response_list = self.batch_api.submit_batch(
+        return self.__submit_batches(ActionType.MODIFY, f"{self.base_url}/{self.resource_type}/{{extId}}",
+                                     batch_spec_payload_list)
+
+    def __submit_batches(self, action, uri: str, batch_spec_payload_list: List) -> List:
+        """
+        Submit the payload as one batch, or as max_in_flight concurrent batches of MAX_BATCH_API_CALLS
+        Returns:
+          list: List of Task UUIDs, one per batch
+        """
+        task_uuid_chunks = dict(self.__iter_batches(action, uri, batch_spec_payload_list))
+        return [task_uuid for index in sorted(task_uuid_chunks) for task_uuid in task_uuid_chunks[index]]
+
+    def __iter_batches(self, action, uri: str,
+                       batch_spec_payload_list: List) -> Generator[Tuple[int, List], None, None]:
+        """
+        Returns:
+          generator of (index of the batch, Task UUIDs of the batch), in the order the batches complete
+        """
+        if self.max_in_flight > 1:
+            payload_chunks = [
+                batch_spec_payload_list[i:i + MAX_BATCH_API_CALLS]
+                for i in range(0, len(batch_spec_payload_list), MAX_BATCH_API_CALLS)
+            ]
+        else:
+            payload_chunks = [batch_spec_payload_list]
+
+        def submit_batch(payload_chunk: List) -> List:
+            batch_spec = BatchSpec(
+                metadata=BatchSpecMetadata(
+                    action=action,
+                    name=f"multi_{uuid.uuid1()}",
+                    uri=uri,
+                    stop_on_error=True,
+                    chunk_size=self.chunk_size,
+                ),
+                payload=payload_chunk,
+            )
+            api_response_list = self.batch_api.submit_batch(
                 async_req=False, body=batch_spec
             )
+            return get_task_uuid_list(api_response_list)
 
-        return get_task_uuid_list(api_response_list)
+        yield from iter_chunk_results(submit_batch, payload_chunks, self.max_in_flight)
 
 
 def get_task_uuid_list(api_response_list: List) -> List:
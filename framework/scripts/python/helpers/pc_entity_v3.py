@@ -1,8 +1,10 @@
 import json
 from copy import deepcopy
-from typing import Optional
+from typing import Optional, List, Dict
 from framework.helpers.rest_utils import RestAPIUtil
 from .entity import Entity
+from .inventory_cache import InventoryCache
+from .pagination import iter_pages, MAX_IN_FLIGHT_PAGES
 from .pc_batch_op import PcBatchOp
 
 
@@ -11,6 +13,13 @@ class PcEntity(Entity):
     resource_type = ""
     kind = ""
     V3_LIST_CHUNKSIZE = 500
+    # Number of pages fetched at a time, when more than V3_LIST_CHUNKSIZE entities match
+    LIST_MAX_IN_FLIGHT = MAX_IN_FLIGHT_PAGES
+    # Unfiltered lookups are served from the inventory snapshot of the PC, only for the collections that are
+    # listed over and over and rarely created outside the scripts
+    CACHE_INVENTORY = False
+    # Not a key of the list responses, Entity.list returns the whole response with it
+    __LIST_RESPONSE = "__list_response__"
 
     def __init__(self, session: RestAPIUtil, **kwargs):
         resource_type = self.__BASEURL__ + self.resource_type
@@ -18,34 +27,88 @@ class PcEntity(Entity):
         super(PcEntity, self).__init__(session=session, resource_type=resource_type)
 
     def list(self, **kwargs):
+        """
+        List the entities, all the ones matching the filter unless "length" is passed. The first page tells how many
+        entities match (total_matches), the next pages are fetched concurrently
+        """
+        length = kwargs.pop("length", None)
+        payload = self.__get_list_payload(kwargs)
+        entity_type = kwargs.pop("entity_type", None) or self.entity_type
+        custom_filters = kwargs.pop("custom_filters", None)
+        page_size = min(length, self.V3_LIST_CHUNKSIZE) if length else self.V3_LIST_CHUNKSIZE
+        end = payload["offset"] + length if length else None
+
+        response = super(PcEntity, self).list(data={**payload, "length": page_size},
+                                              entity_type=self.__LIST_RESPONSE, **kwargs)
+        if not isinstance(response, dict) or entity_type not in response:
+            return response
+        entities = response[entity_type]
+        if custom_filters:
+            entities = self._filter_entities(entities, custom_filters)
+
+        total_matches = (response.get("metadata") or {}).get("total_matches") or 0
+        if end is not None:
+            total_matches = min(total_matches, end)
+        offsets = range(payload["offset"] + page_size, total_matches, page_size)
+        if not offsets:
+            return entities
+
+        def fetch_page(offset: int) -> List:
+            return super(PcEntity, self).list(data={**payload, "offset": offset,
+                                                    "length": min(page_size, total_matches - offset)},
+                                              entity_type=entity_type, custom_filters=custom_filters, **kwargs)
+
+        for page in iter_pages(fetch_page, offsets, max_in_flight=self.LIST_MAX_IN_FLIGHT):
+            entities.extend(page)
+        return entities
+
+    def __get_list_payload(self, kwargs: Dict) -> Dict:
         payload = {
             "kind": kwargs.pop("kind", self.kind),
             "offset": kwargs.pop("offset", 0),
-            "filter": kwargs.pop("filter", ""),
-            "length": kwargs.pop("length", self.V3_LIST_CHUNKSIZE),
-            #"sort_order": kwargs.pop("sort_order", None),
-            #"sort_attribute": kwargs.pop("sort_attribute", None)
+            "filter": kwargs.pop("filter", "")
         }
-        if kwargs.pop("sort_order", None):
-            payload["sort_order"] = kwargs.pop("sort_order")
-        if kwargs.pop("sort_attribute", None):
-            payload["sort_attribute"] = kwargs.pop("sort_attribute")
-
-        if payload["length"] > self.V3_LIST_CHUNKSIZE:
-            length = payload["length"]
-            payload["length"] = self.V3_LIST_CHUNKSIZE
-            resp = {self.entity_type: []}
-            while True and payload["offset"] <= length:
-                sub_resp = super(PcEntity, self).list(data=payload, **kwargs)
-                if not sub_resp:
-                    break
-                resp[self.entity_type].extend(sub_resp)
-                payload["offset"] += self.V3_LIST_CHUNKSIZE
-            return resp[self.entity_type]
-
-        return super(PcEntity, self).list(data=payload, **kwargs)
+        sort_order = kwargs.pop("sort_order", None)
+        if sort_order:
+            payload["sort_order"] = sort_order
+        sort_attribute = kwargs.pop("sort_attribute", None)
+        if sort_attribute:
+            payload["sort_attribute"] = sort_attribute
+        return payload
+
+    def list_cached(self, refresh: bool = False) -> List:
+        """
+        Same as list without filters, served from the inventory snapshot of the PC
+        Args:
+          refresh(bool, optional): List the entities even if the snapshot is valid
+        """
+        return InventoryCache.get_instance(self.session).get(self.resource_type, self.list, refresh=refresh)
+
+    def invalidate_inventory(self):
+        InventoryCache.invalidate_endpoint(self.session, self.resource_type)
+
+    def create(self, *args, **kwargs):
+        try:
+            return super(PcEntity, self).create(*args, **kwargs)
+        finally:
+            self.invalidate_inventory()
+
+    def update(self, *args, **kwargs):
+        try:
+            return super(PcEntity, self).update(*args, **kwargs)
+        finally:
+            self.invalidate_inventory()
+
+    def delete(self, *args, **kwargs):
+        try:
+            return super(PcEntity, self).delete(*args, **kwargs)
+        finally:
+            self.invalidate_inventory()
 
     def get_entity_by_name(self, entity_name: str, **kwargs):
+        if self.CACHE_INVENTORY and not kwargs:
+            return InventoryCache.get_instance(self.session).get_by_name(self.resource_type, entity_name, self.list)
+
         entities = self.list(**kwargs)
 
         for entity in entities:
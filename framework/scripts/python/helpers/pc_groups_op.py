@@ -1,5 +1,6 @@
-from typing import Optional, Union
+from typing import Optional, Union, Dict, Generator, List
 from framework.helpers.rest_utils import RestAPIUtil
+from .pagination import iter_pages, MAX_IN_FLIGHT_PAGES
 
 GROUP_MEMBER_COUNT_THRESHOLD = 500
 
@@ -10,18 +11,31 @@ class PcGroupsOp:
     """
     GROUP_BASE = "groups"
 
-    def __init__(self, session: RestAPIUtil, base_path: Optional[str] = None):
+    def __init__(self, session: RestAPIUtil, base_path: Optional[str] = None,
+                 max_in_flight: int = MAX_IN_FLIGHT_PAGES):
         """
         Default Constructor for PcGroupsOp class
         Args:
           session: PC session object
+          base_path(str, optional): Base path of the groups API
+          max_in_flight(int, optional): Number of pages fetched at a time, after the first page
         """
         self.session = session
         self.base_path = base_path
+        self.max_in_flight = max_in_flight
 
-    def list_entities(self, **kwargs):
+    def list_entities(self, **kwargs) -> List[Dict]:
         """
-        Get all the entities
+        Get all the entities, same args as iter_entities
+        Returns:
+          list<dict>: The entity list.
+        """
+        return list(self.iter_entities(**kwargs))
+
+    def iter_entities(self, **kwargs) -> Generator[Dict, None, None]:
+        """
+        Get all the entities. The first page gives the total count, the rest of the pages are fetched concurrently
+        and the entities are yielded in order, as the pages are received
 
         Args(kwargs):
           attributes(list<str>): The list of attributes to return
@@ -30,7 +44,7 @@ class PcGroupsOp:
           filter_criteria(csv): filter criteria list as a string
             example - "filter_criteria":"vm_name==name1,vm_name==name2"
         Returns:
-          list<dict>: The event list.
+          generator of the entities
         """
         group_member_offset = 0
         # Note - this will work even if entity count is less than 2500
@@ -39,13 +53,12 @@ class PcGroupsOp:
         # max is 500
         group_member_count_threshold = min(group_member_count_threshold,
                                            GROUP_MEMBER_COUNT_THRESHOLD)
-        entities_json = []
         obtained_entities_count = kwargs.pop("obtained_entities_count", None)
         response = self.__groups_post_call(
             group_member_offset, group_member_count_threshold, **kwargs)
-        entities_json.extend(self.__parse_response(response))
+        yield from self.__parse_response(response)
         if not response.get("group_results"):
-            return entities_json
+            return
 
         total_entity_count = response["group_results"][0].get("total_entity_count")
         filtered_entity_count = response["group_results"][0].get("filtered_entity_count", None)
@@ -59,14 +72,13 @@ class PcGroupsOp:
         if obtained_entities_count:
             total_entity_count = min(total_entity_count, obtained_entities_count)
         if total_entity_count > group_member_count_threshold:
-            while True:
-                group_member_offset = group_member_offset + group_member_count_threshold
-                if group_member_offset >= total_entity_count:
-                    break
-                response = self.__groups_post_call(
-                    group_member_offset, group_member_count_threshold, **kwargs)
-                entities_json.extend(self.__parse_response(response))
-        return entities_json
+            def fetch_page(offset: int) -> List[Dict]:
+                return self.__parse_response(self.__groups_post_call(offset, group_member_count_threshold, **kwargs))
+
+            offsets = range(group_member_offset + group_member_count_threshold, total_entity_count,
+                            group_member_count_threshold)
+            for page in iter_pages(fetch_page, offsets, max_in_flight=self.max_in_flight):
+                yield from page
 
     def list_dvs(self, cluster_uuid: str):
         """
@@ -84,9 +96,12 @@ class PcGroupsOp:
                                   attributes=attributes,
                                   filter_criteria=filter_criteria)
 
-    def list_events(self, start_time: Union[int, float]):
+    def list_events(self, start_time: Union[int, float], stream: bool = False):
         """
         Get the events from the PC
+        Args:
+          start_time(int): Only the events after start_time (usecs) are listed
+          stream(bool, optional): Return a generator, to process the events as the pages are received
         Returns:
           list<dict>: The event list.
         """
@@ -95,14 +110,18 @@ class PcGroupsOp:
                       "source_entity_type", "operation_type", "info"]
         filter_criteria = (f"classification==.*[u|U][s|S][e|E][r|R][a|A][c|C][t|T][i|I][o|O][n|N].*;"
                            f"_created_timestamp_usecs_=ge={start_time}")
-        return self.list_entities(entity_type="event",
-                                  attributes=attributes,
-                                  filter_criteria=filter_criteria,
-                                  group_member_sort_order="DESCENDING")
+        list_entities = self.iter_entities if stream else self.list_entities
+        return list_entities(entity_type="event",
+                             attributes=attributes,
+                             filter_criteria=filter_criteria,
+                             group_member_sort_order="DESCENDING")
 
-    def list_audits(self, start_time: Union[int, float]):
+    def list_audits(self, start_time: Union[int, float], stream: bool = False):
         """
         Get the audit list from the PC
+        Args:
+          start_time(int): Only the audits after start_time (usecs) are listed
+          stream(bool, optional): Return a generator, to process the audits as the pages are received
         Returns:
           list<dict>: The event list.
         """
@@ -111,10 +130,11 @@ class PcGroupsOp:
                       'target_entity_uuid', 'default_message', 'component', 'user', 'client_ip', 'status', 'type_id',
                       'entity_name_list', 'entity_type_list', 'entity_uuid_list']
         filter_criteria = f"type_id!=RecoveryPlanJobAudit;op_start_timestamp_usecs=ge={start_time}"
-        return self.list_entities(entity_type="audit",
-                                  attributes=attributes,
-                                  filter_criteria=filter_criteria,
-                                  group_member_sort_order="DESCENDING")
+        list_entities = self.iter_entities if stream else self.list_entities
+        return list_entities(entity_type="audit",
+                             attributes=attributes,
+                             filter_criteria=filter_criteria,
+                             group_member_sort_order="DESCENDING")
 
     def __groups_post_call(self, group_member_offset, group_member_count, **kwargs):
         """
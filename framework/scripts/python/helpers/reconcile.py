@@ -0,0 +1,231 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from framework.helpers.log_utils import get_logger
+from .inventory_cache import get_entity_name
+from .section_state import get_hash
+
+logger = get_logger(__name__)
+
+
+def to_state(entity: Any) -> Any:
+    """
+    Plain dict/ list of an entity, a v3 response or a v4 SDK model, without the unset (None) fields
+    """
+    if hasattr(entity, "to_dict"):
+        entity = entity.to_dict()
+    if isinstance(entity, dict):
+        return {key: to_state(value) for key, value in entity.items() if value is not None}
+    if isinstance(entity, (list, tuple)):
+        return [to_state(value) for value in entity]
+    return entity
+
+
+def get_entity_state(entity: Any, key: Optional[str] = None) -> Any:
+    """
+    State of a listed entity. The v3 entities listed like groups (address groups, service groups) are nested under
+    their kind, e.g. {"address_group": {...}, "uuid": ...}
+
+    Args:
+      entity: Listed entity
+      key(str, optional): Kind the state is nested under
+    """
+    state = to_state(entity)
+    if key and isinstance(state, dict):
+        return state.get(key, state)
+    return state
+
+
+def get_state_name(state: Any) -> Optional[str]:
+    if not isinstance(state, dict):
+        return None
+    return state.get("name") or get_entity_name(state)
+
+
+def get_differences(desired: Any, current: Any, path: str = "") -> List[str]:
+    """
+    Fields of the desired state that are different in the current state. The fields only in the current state
+    (defaults & read-only fields set by PC) are ignored, the lists are compared irrespective of the order.
+
+    Returns:
+      list: Paths of the different fields, e.g. "resources.app_rule.action"
+    """
+    if isinstance(desired, dict):
+        if not isinstance(current, dict):
+            return [path or "."]
+        differences = []
+        for key, value in desired.items():
+            field = f"{path}.{key}" if path else key
+            if value is None:
+                continue
+            if key not in current:
+                differences.append(field)
+                continue
+            differences.extend(get_differences(value, current[key], field))
+        return differences
+    if isinstance(desired, (list, tuple)):
+        if not isinstance(current, (list, tuple)) or len(desired) != len(current):
+            return [path or "."]
+        remaining = list(current)
+        for value in desired:
+            match = next((index for index, candidate in enumerate(remaining)
+                          if not get_differences(value, candidate)), None)
+            if match is None:
+                return [path or "."]
+            remaining.pop(match)
+        return []
+    return [] if desired == current else [path or "."]
+
+
+def get_spec_differences(desired: Dict, current: Dict) -> List[str]:
+    """
+    Differences of the spec of a v3 payload ({"api_version", "metadata", "spec"}) with the spec of the current entity
+    """
+    return get_differences(desired.get("spec", {}), current.get("spec", {}), "spec")
+
+
+class Change:
+    """
+    Change needed for one entity to reach its desired state
+    """
+    CREATE = "CREATE"
+    UPDATE = "UPDATE"
+    NO_OP = "NO_OP"
+    DELETE = "DELETE"
+
+    def __init__(self, action: str, name: str, desired: Any = None, current: Any = None,
+                 differences: Optional[List] = None):
+        self.action = action
+        self.name = name
+        # Desired state/ config of the entity, None for a DELETE
+        self.desired = desired
+        # State of the current entity, None for a CREATE
+        self.current = current
+        # Different fields of an UPDATE
+        self.differences = differences or []
+
+    def __repr__(self):
+        return f"Change({self.action}, {self.name!r}, {self.differences})"
+
+
+class ReconcilePlan:
+    """
+    Typed diff of the desired state of a kind against its current state
+    """
+
+    def __init__(self, kind: str, changes: List[Change]):
+        self.kind = kind
+        self.changes = changes
+
+    def get_changes(self, action: str) -> List[Change]:
+        return [change for change in self.changes if change.action == action]
+
+    @property
+    def creates(self) -> List[Change]:
+        return self.get_changes(Change.CREATE)
+
+    @property
+    def updates(self) -> List[Change]:
+        return self.get_changes(Change.UPDATE)
+
+    @property
+    def no_ops(self) -> List[Change]:
+        return self.get_changes(Change.NO_OP)
+
+    @property
+    def deletes(self) -> List[Change]:
+        return self.get_changes(Change.DELETE)
+
+    @property
+    def is_converged(self) -> bool:
+        return all(change.action == Change.NO_OP for change in self.changes)
+
+    def summary(self) -> Dict[str, List[str]]:
+        """
+        Names of the entities by action, e.g. {"CREATE": ["sg-1"], "NO_OP": ["sg-2"]}
+        """
+        summary = {}
+        for change in self.changes:
+            summary.setdefault(change.action, []).append(change.name)
+        return summary
+
+    def log(self, pc_ip: str):
+        counts = ", ".join(f"{len(names)} {action}" for action, names in self.summary().items())
+        logger.info(f"{self.kind} in {pc_ip!r}: {counts or 'nothing to reconcile'}")
+        for change in self.updates:
+            logger.warning(f"{self.kind} {change.name!r} in {pc_ip!r} differs from the config: "
+                           f"{', '.join(change.differences)}")
+
+
+class Reconciler:
+    """
+    Diff the desired state of a kind of PC entities (categories, address groups, service groups, security policies,
+    protection rules, recovery plans ...) against their current state, to only send the changes to PC.
+
+    The current state is listed once and kept as the snapshot of the reconcile, the same snapshot serves the diff &
+    the verification of the entities that didn't change. A re-run on a converged PC only lists the entities.
+    """
+
+    def __init__(self, kind: str, load_current: Callable[[], List], get_state: Callable[[Any], Any] = to_state,
+                 compare: Callable[[Any, Any], List[str]] = get_differences, prune: bool = False):
+        """
+        Args:
+          kind(str): Kind of the entities, used in the logs
+          load_current(callable): Lists the current entities
+          get_state(callable, optional): State of a current entity compared with the desired state, the entity is
+            named by the name of its state
+          compare(callable, optional): Differences between the desired & the current state
+          prune(bool, optional): DELETE the current entities that are not in the desired state
+        """
+        self.kind = kind
+        self.load_current = load_current
+        self.get_state = get_state
+        self.compare = compare
+        self.prune = prune
+        self.snapshot: Optional[Dict[str, Any]] = None
+
+    def get_snapshot(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        State of the current entities by name, listed once. Pass refresh once the entities were created or changed,
+        till then the snapshot is still valid
+        """
+        if self.snapshot is None or refresh:
+            self.snapshot = {}
+            for entity in self.load_current() or []:
+                state = self.get_state(entity)
+                name = get_state_name(state)
+                # Keep the first entity, same as a lookup by name
+                if name and name not in self.snapshot:
+                    self.snapshot[name] = state
+        return self.snapshot
+
+    def plan(self, desired: Dict[str, Any]) -> ReconcilePlan:
+        """
+        Args:
+          desired(dict): Desired state by entity name
+
+        Returns:
+          ReconcilePlan: One change per desired entity, plus the DELETEs if pruning
+        """
+        snapshot = self.get_snapshot()
+        changes = []
+        for name, desired_state in desired.items():
+            current = snapshot.get(name)
+            if current is None:
+                changes.append(Change(Change.CREATE, name, desired=desired_state))
+                continue
+            differences = self.compare(to_state(desired_state), current)
+            action = Change.UPDATE if differences else Change.NO_OP
+            changes.append(Change(action, name, desired=desired_state, current=current, differences=differences))
+        if self.prune:
+            changes.extend(Change(Change.DELETE, name, current=current)
+                           for name, current in snapshot.items() if name not in desired)
+        return ReconcilePlan(self.kind, changes)
+
+    def exists(self, name: str, refresh: bool = False) -> bool:
+        return name in self.get_snapshot(refresh)
+
+    def get_fingerprint(self, names: Iterable[str], refresh: bool = False) -> str:
+        """
+        Hash of the current state of the named entities, changes if any of them is created, modified or deleted
+        """
+        snapshot = self.get_snapshot(refresh)
+        return get_hash({name: snapshot.get(name) for name in names})
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_hash(value: Any) -> str:
+    """
+    sha256 of the canonical json of a value, the same for equal dicts irrespective of the order of the keys
+    """
+    dump = json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(dump.encode()).hexdigest()
+
+
+def get_section_inputs(script) -> Optional[Dict]:
+    """
+    Config section a script applies, i.e. the keys in SECTION_KEYS of the script, at the top level of its data and
+    in every cluster of its data
+
+    Returns:
+      dict: Inputs of the section, None if the script doesn't declare a section
+    """
+    keys = getattr(script, "SECTION_KEYS", None)
+    data = getattr(script, "data", None)
+    if not keys or not isinstance(data, dict):
+        return None
+
+    inputs = {"script": script.name, "section": {key: data.get(key) for key in keys}}
+    clusters = data.get("clusters")
+    if isinstance(clusters, dict):
+        inputs["clusters"] = {
+            cluster_ip: {key: details.get(key) for key in keys} if isinstance(details, dict) else None
+            for cluster_ip, details in clusters.items()
+        }
+    return inputs
+
+
+def is_verified(script, results: Any) -> bool:
+    """
+    A run is verified if the script has no exceptions and none of its verifications failed
+    """
+    if getattr(script, "exceptions", None):
+        return False
+
+    def has_failure(value: Any) -> bool:
+        if isinstance(value, dict):
+            return any(has_failure(item) for item in value.values())
+        if isinstance(value, (list, tuple)):
+            return any(has_failure(item) for item in value)
+        return value in ("FAIL", "CAN'T VERIFY")
+
+    return not has_failure(results)
+
+
+class SectionStateStore:
+    """
+    Local store of the config sections applied to every PC/ PE endpoint, backed by a SQLite file.
+
+    A section is the config a script applies, the keys in SECTION_KEYS of the script. Once the script is run, the
+    hash of the section, the fingerprint of the remote state and whether the run was verified are recorded. The next
+    run skips the script, and returns the recorded results, if the section didn't change, the last run was verified
+    and the remote state is still the same. Scripts without a remote fingerprint are always run, a change done outside
+    of the config can't be detected.
+
+    The scripts that configure PC/ PE only run their sections through the store if section_state is configured, the
+    file is kept across the runs, at the path configured relative to the project root.
+    """
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    _instances: Dict[str, 'SectionStateStore'] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path: str):
+        """
+        Args:
+          path(str): Path of the SQLite file, created if it doesn't exist
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        # Every statement is committed on its own
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sections ("
+            "endpoint TEXT NOT NULL, section TEXT NOT NULL, input_hash TEXT NOT NULL, fingerprint TEXT, "
+            "outcome TEXT NOT NULL, results TEXT, applied_at REAL NOT NULL, PRIMARY KEY (endpoint, section))")
+        self.metrics_lock = threading.Lock()
+        self.metrics = {"skipped": 0, "applied": 0, "failed": 0}
+
+    @classmethod
+    def get_instance(cls, path: str) -> 'SectionStateStore':
+        """
+        Store of the file, shared by all the scripts of the process
+        """
+        path = os.path.abspath(path)
+        with cls._lock:
+            if path not in cls._instances:
+                cls._instances[path] = SectionStateStore(path)
+            return cls._instances[path]
+
+    @classmethod
+    def from_config(cls, data: Dict, global_data: Optional[Dict] = None) -> Optional['SectionStateStore']:
+        """
+        Store configured in "section_state" of the data or of the global data
+
+        Returns:
+          SectionStateStore: None if section_state isn't configured, the scripts are always applied
+        """
+        global_data = global_data or {}
+        config = data.get("section_state") or global_data.get("section_state")
+        if not config or not config.get("path"):
+            return None
+        # Relative paths are relative to the project root, same as the other files in the configs
+        project_root = data.get("project_root") or global_data.get("project_root") or ""
+        return cls.get_instance(os.path.join(str(project_root), config["path"]))
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            for store in cls._instances.values():
+                store.connection.close()
+            cls._instances = {}
+
+    def get_record(self, endpoint: str, section: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT input_hash, fingerprint, outcome, results, applied_at FROM sections "
+                "WHERE endpoint = ? AND section = ?", (endpoint, section)).fetchone()
+        if not row:
+            return None
+        return {
+            "input_hash": row[0],
+            "fingerprint": row[1],
+            "outcome": row[2],
+            "results": json.loads(row[3]) if row[3] else {},
+            "applied_at": row[4]
+        }
+
+    def save_record(self, endpoint: str, section: str, input_hash: str, fingerprint: Optional[str], outcome: str,
+                    results: Any):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sections "
+                "(endpoint, section, input_hash, fingerprint, outcome, results, applied_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (endpoint, section, input_hash, fingerprint, outcome, json.dumps(results or {}, default=str),
+                 time.time()))
+
+    def forget(self, endpoint: str, section: Optional[str] = None):
+        """
+        Remove the records of an endpoint, or of one section, the next run applies them again
+        """
+        with self.lock:
+            if section:
+                self.connection.execute("DELETE FROM sections WHERE endpoint = ? AND section = ?",
+                                        (endpoint, section))
+            else:
+                self.connection.execute("DELETE FROM sections WHERE endpoint = ?", (endpoint,))
+
+    def is_unchanged(self, record: Optional[Dict], input_hash: str, fingerprint: Optional[str]) -> bool:
+        """
+        Whether the section of the record can be skipped, never without a fingerprint of the remote state
+        """
+        if not record or record["input_hash"] != input_hash or record["outcome"] != self.SUCCEEDED:
+            return False
+        return fingerprint is not None and fingerprint == record["fingerprint"]
+
+    def run(self, script, endpoint: str, runner: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Run a script, unless its section is unchanged since its last verified run against the endpoint
+
+        Args:
+          script(Script): Script to run
+          endpoint(str): PC/ PE the script applies its section to
+          runner(callable, optional): Runs the script, script.run by default
+
+        Returns:
+          Results of the script, the recorded results if the script is skipped
+        """
+        runner = runner or script.run
+        inputs = get_section_inputs(script)
+        if inputs is None:
+            return runner()
+
+        section = script.name
+        input_hash = get_hash(inputs)
+        record = self.get_record(endpoint, section)
+        if record and record["input_hash"] == input_hash and record["outcome"] == self.SUCCEEDED:
+            try:
+                fingerprint = script.get_remote_fingerprint()
+            except Exception as e:
+                # Can't tell if the remote state changed, apply the section
+                logger.debug(f"{section}: failed to get the fingerprint of {endpoint!r}: {e}")
+            else:
+                if self.is_unchanged(record, input_hash, fingerprint):
+                    logger.info(f"{section}: config & state of {endpoint!r} unchanged since the last run, "
+                                f"skipping...")
+                    with self.metrics_lock:
+                        self.metrics["skipped"] += 1
+                    return record["results"]
+
+        try:
+            results = runner()
+        except Exception:
+            # The outcome of the last run no longer holds
+            self.forget(endpoint, section)
+            raise
+
+        outcome = self.SUCCEEDED if is_verified(script, results) else self.FAILED
+        try:
+            fingerprint = script.get_remote_fingerprint() if outcome == self.SUCCEEDED else None
+        except Exception as e:
+            logger.debug(f"{section}: failed to get the fingerprint of {endpoint!r}: {e}")
+            fingerprint = None
+        self.save_record(endpoint, section, input_hash, fingerprint, outcome, results)
+        with self.metrics_lock:
+            self.metrics["applied" if outcome == self.SUCCEEDED else "failed"] += 1
+        return results
+
+    def get_metrics(self) -> Dict:
+        with self.metrics_lock:
+            return dict(self.metrics)
@@ -1,7 +1,6 @@
 from typing import Optional, List
 import paramiko
 import time
-import re
 from .ssh_entity import SSHEntity
 from framework.helpers.log_utils import get_logger
 
@@ -38,16 +37,12 @@ class SSHCVM(SSHEntity):
         self.send_to_interactive_channel(int_chan, stop_foundation)
         time_to_wait = 120
         self.logger.info(f"{self.cvm_ip} - Genesis Stop Foundation...")
-        stop_foundation = False
-        start_time = time.time()
-        while not stop_foundation:
-            if time.time() - start_time > time_to_wait:
-                self.logger.error("Waited for %s mins, task not finished" % (time_to_wait / 60))
-            receive = self.receive_from_interactive_channel(int_chan)
-            self.logger.debug(receive)
-            if receive is not None and receive != "":
-                stop_foundation = True
-                self.logger.info(f"{self.cvm_ip} - Foundation stopped")
+        stop_foundation, receive = self.wait_for_output(int_chan, timeout=time_to_wait)
+        self.logger.debug(receive)
+        if stop_foundation:
+            self.logger.info(f"{self.cvm_ip} - Foundation stopped")
+        else:
+            self.logger.error("Waited for %s mins, task not finished" % (time_to_wait / 60))
         return stop_foundation
 
     def restart_genesis(self, int_chan: paramiko.SSHClient):
@@ -63,16 +58,14 @@ class SSHCVM(SSHEntity):
         message = "Genesis started on pids"
         self.logger.info("Restarting genesis...")
         self.send_to_interactive_channel(int_chan, restart_genesis)
-        start_time = time.time()
         time_to_wait = 180
-        while True:
-            if time.time() - start_time > time_to_wait:
-                self.logger.error("Waited for %s mins, task not finished" % (time_to_wait / 60))
-            receive = self.receive_from_interactive_channel(int_chan)
-            self.logger.debug(receive)
-            if receive is not None and receive != "" and message in receive:
-                self.logger.info(f"{self.cvm_ip} - Restarted genesis")
-                return True
+        restarted, receive = self.wait_for_output(int_chan, pattern=message, timeout=time_to_wait)
+        self.logger.debug(receive)
+        if restarted:
+            self.logger.info(f"{self.cvm_ip} - Restarted genesis")
+        else:
+            self.logger.error("Waited for %s mins, task not finished" % (time_to_wait / 60))
+        return restarted
 
     def update_heartbeat_interval_mins(self, interval_min: int = 1):
         """Update the heartbeat interval in CVM FC settings
@@ -400,15 +393,11 @@ class SSHCVM(SSHEntity):
 
         time_to_wait = 120
         self.send_to_interactive_channel(int_chan, cmd)
-        start_time = time.time()
-        receive = ""
-
-        while (time.time() - start_time) <= time_to_wait:
-            receive += self.receive_from_interactive_channel(int_chan)
-            # todo here we are assuming we are opening only for 3 node clusters. Need to modify the logic accordingly
-            if len([m.start() for m in re.finditer("Firewall config updated", receive)]) == 3:
-                return receive, None
-            time.sleep(10)
+        # todo here we are assuming we are opening only for 3 node clusters. Need to modify the logic accordingly
+        updated, receive = self.wait_for_output(int_chan, pattern="Firewall config updated", count=3,
+                                                timeout=time_to_wait)
+        if updated:
+            return receive, None
 
         return receive, "Operation, timed out or failed!"
 
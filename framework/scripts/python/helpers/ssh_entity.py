@@ -1,13 +1,18 @@
-import select
 import paramiko
 import time
 import logging
+from typing import Iterator, Optional, Tuple
 from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.ssh_pool import SSHConnectionPool
+from framework.scripts.python.helpers.ssh_stream import ChannelSession, SSHCommandLoop
 
 logger = get_logger(__name__)
 
 
 class SSHEntity:
+    # Interactive shells can run for long, only the end of their output is kept
+    MAX_SHELL_OUTPUT_BYTES = 1024 * 1024
+
     def __init__(self, ip: str, username: str, password: str):
         """
         Args:
@@ -24,73 +29,110 @@ class SSHEntity:
         logging.getLogger("paramiko").setLevel(logging.WARNING)
 
     def get_ssh_connection(self, ip: str, username: str, password: str) -> paramiko.SSHClient:
-        try:
-            # Open new SSH client
+        """Get the SSH client of the host from the SSHConnectionPool, the transport is shared with the other
+        users of the host, and only authenticated the first time
 
-            ssh_obj = paramiko.SSHClient()
-            # Disable host key check
-            ssh_obj.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh_obj.connect(ip, username=username, password=password)
-            return ssh_obj
+        Args:
+            ip (str): IP Address
+            username (str): Username
+            password (str): Password
+
+        Returns:
+            paramiko.SSHClient: ssh client object, None if the connection fails
+        """
+        try:
+            return SSHConnectionPool.get_instance().get_client(ip, username, password)
         except Exception as e:
             self.logger.error(e)
 
     def close_ssh_connection(self, ssh_obj: paramiko.SSHClient):
-        """Close SSH connection
+        """Close SSH connection. A pooled connection is given back to the pool and stays connected
 
         Args:
             ssh_obj (paramiko.SSHClient): ssh client object
         """
         try:
-            ssh_obj.close()
+            if not SSHConnectionPool.get_instance().release(ssh_obj):
+                ssh_obj.close()
         except Exception as e:
             self.logger.error(f"Error while closing SSH connection: {e}")
 
-    def execute_command(self, ssh_obj: paramiko.SSHClient, command, timeout=60):
+    def execute_command(self, ssh_obj: paramiko.SSHClient, command, timeout=60, idle_timeout: Optional[float] = None):
         """
-        Execute command in non-interactive mode
+        Execute command in non-interactive mode. By default, waits till the command exits, even if it has no output
+        for a long time
         """
-        self.logger.debug(command)
-        stdin, stdout, stderr = ssh_obj.exec_command(command, timeout, get_pty=True)
-        # get the shared channel for stdout/stderr/stdin
-        channel = stdout.channel
+        with SSHConnectionPool.get_instance().channel(ssh_obj):
+            return self.__execute_command(ssh_obj, command, timeout, idle_timeout)
+
+    def stream_command(self, ssh_obj: paramiko.SSHClient, command, timeout=60,
+                       idle_timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Execute command in non-interactive mode, and stream its output
+
+        Args:
+            ssh_obj (paramiko.SSHClient): ssh client object
+            command (str): Command to execute
+            timeout (int, optional): Timeout of the SSH channel, in secs
+            idle_timeout (float, optional): The command times out if it has no output for idle_timeout secs. Waits
+                till the command exits by default
 
-        # we do not need stdin.
+        Returns:
+            iterator: Lines of output, as soon as they are complete
+        """
+        with SSHConnectionPool.get_instance().channel(ssh_obj):
+            session = self.__open_command(ssh_obj, command, timeout, idle_timeout)
+            try:
+                for _, line in self.__get_loop(session).iter_lines():
+                    yield line
+            finally:
+                self.__close_command(session, command)
+
+    def __execute_command(self, ssh_obj: paramiko.SSHClient, command, timeout=60, idle_timeout=None):
+        session = self.__open_command(ssh_obj, command, timeout, idle_timeout)
+        try:
+            self.__get_loop(session).run()
+        finally:
+            self.__close_command(session, command)
+        return session.stdout, session.stderr
+
+    def __open_command(self, ssh_obj: paramiko.SSHClient, command, timeout, idle_timeout) -> ChannelSession:
+        self.logger.debug(command)
+        stdin, stdout, _ = ssh_obj.exec_command(command, timeout, get_pty=True)
+        # we do not need stdin, indicate that we're not going to write to the channel anymore
         stdin.close()
-        # indicate that we're not going to write to that channel anymore
-        channel.shutdown_write()
+        stdout.channel.shutdown_write()
+        return ChannelSession(stdout.channel, idle_timeout=idle_timeout)
 
-        # set buffer size
-        bufsize = 4096
-        # read stdout/stderr in order to prevent read block hangs
-        stdout_chunks, stderr_chunks = "", ""
-        stdout_chunks += stdout.channel.recv(bufsize).decode('utf-8')
-        stderr_chunks += stderr.channel.recv(bufsize).decode('utf-8')
-        # stop if channel was closed prematurely, and there is no data in the buffers.
-        while not channel.closed or channel.recv_ready() or channel.recv_stderr_ready():
-            got_chunk = False
-            readq, _, _ = select.select([stdout.channel], [], [], timeout)
-            for c in readq:
-                if c.recv_ready():
-                    stdout_chunks += stdout.channel.recv(bufsize).decode('utf-8')
-                    got_chunk = True
-                if c.recv_stderr_ready():
-                    stderr_chunks += stderr.channel.recv_stderr(bufsize).decode('utf-8')
-                    got_chunk = True
-
-            if not got_chunk \
-                and stdout.channel.exit_status_ready() \
-                and not stderr.channel.recv_stderr_ready() \
-                and not stdout.channel.recv_ready():
-                stdout.channel.shutdown_read()
-                # close the channel
-                stdout.channel.close()
-                break
-
-        # close all the pseudofiles
-        stdout.close()
-        stderr.close()
-        return stdout_chunks, stderr_chunks
+    def __close_command(self, session: ChannelSession, command):
+        session.channel.close()
+        if session.state == ChannelSession.TIMED_OUT:
+            raise TimeoutError(f"{self.ip}: No output from command '{command}' for {session.idle_timeout} secs")
+
+    @staticmethod
+    def __get_loop(session: ChannelSession) -> SSHCommandLoop:
+        loop = SSHCommandLoop()
+        loop.sessions[session.channel] = session
+        return loop
+
+    def wait_for_output(self, interactive_channel, pattern: Optional[str] = None, count: int = 1,
+                        timeout=60) -> Tuple[bool, str]:
+        """Wait for the output of the interactive channel, without polling it
+
+        Args:
+            interactive_channel (obj): paramiko SSHClient shell object
+            pattern (str, optional): Pattern to wait for, the first output if not set
+            count (int, optional): Number of occurrences of the pattern to wait for
+            timeout (int, optional): Time to wait, in secs
+
+        Returns:
+            tuple: True if the pattern was received before the timeout else False, the output received
+        """
+        loop = SSHCommandLoop()
+        session = loop.add(self.ip, interactive_channel, pattern=pattern, count=count, until_output=not pattern,
+                           timeout=timeout, max_bytes=self.MAX_SHELL_OUTPUT_BYTES)
+        loop.run()
+        return session.state == ChannelSession.MATCHED, session.stdout + session.stderr
 
     def get_interactive_shell(self, ssh_obj: paramiko.SSHClient):
         """Get the interactive shell
@@ -102,7 +144,9 @@ class SSHEntity:
             obj: Interactive shell
         """
         try:
-            return ssh_obj.invoke_shell()
+            interactive_channel = ssh_obj.invoke_shell()
+            SSHConnectionPool.get_instance().track_shell(ssh_obj, interactive_channel)
+            return interactive_channel
         except Exception as e:
             self.logger.error("Error while getting interactive channel: {0} for {1}".format(e, self.ip))
             return None
@@ -119,24 +163,16 @@ class SSHEntity:
             _type_: _description_
         """
         try:
-            response = ""
             timeout = 60
             self.send_to_interactive_channel(command=command,
                                              interactive_channel=interactive_channel,
                                              timeout=timeout)
-            wait_time = timeout
-            poll_frequency = 0.1
-            while wait_time > 0:
-                response += self.receive_from_interactive_channel(
-                    interactive_channel=interactive_channel)
-                if pattern in response:
-                    self.logger.debug("response>> '{response}'".format(response=response))
-                    return response
-                time.sleep(poll_frequency)
-                wait_time -= poll_frequency
+            matched, response = self.wait_for_output(interactive_channel, pattern=pattern, timeout=timeout)
+            if matched:
+                self.logger.debug("response>> '{response}'".format(response=response))
             else:
                 self.logger.error("Error: Time out waiting for command '{0}' in CVM {1}".format(command, self.ip))
-                return response
+            return response
         except Exception as e:
             self.logger.error("Error while executing command '{0}' in {1}. Error: {2}".format(command, self.ip, e))
 
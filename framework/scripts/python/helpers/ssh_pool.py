@@ -0,0 +1,225 @@
+import contextlib
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import paramiko
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class PooledConnection:
+    """
+    One authenticated SSH client of the pool, shared by all the threads talking to the host
+    """
+
+    def __init__(self, client: paramiko.SSHClient, max_channels: int):
+        self.client = client
+        # sshd limits the sessions (channels) of a connection, MaxSessions is 10 by default
+        self.channels = threading.BoundedSemaphore(max_channels)
+        self.open_channels = 0
+        self.shells: List[paramiko.Channel] = []
+        self.last_used = time.time()
+
+    def is_idle(self, idle_timeout: float) -> bool:
+        self.shells = [shell for shell in self.shells if not shell.closed]
+        return not self.open_channels and not self.shells and time.time() - self.last_used > idle_timeout
+
+
+class SSHConnectionPool:
+    """
+    Process-wide pool of SSH connections, one authenticated transport per (host, username, password).
+
+    SSHEntity gets its clients from the pool, so the helpers of a flow (check_software_exists, file_exists,
+    download_files, upload_software ...) reuse the same transport instead of doing a TCP connect, key exchange and
+    authentication for every command. Every command runs on its own channel of the transport, so independent commands
+    can run concurrently against the same host, up to max_channels_per_host at a time.
+
+    The transports are kept alive with SSH keepalives, a dead transport is replaced on the next get_client. Clients
+    with no open channel for idle_timeout secs are closed.
+    """
+    _instance = None
+    _lock = threading.Lock()
+    DEFAULT_MAX_CHANNELS_PER_HOST = 8
+    KEEPALIVE_IN_SEC = 30
+    IDLE_TIMEOUT_IN_SEC = 900
+
+    def __init__(self, max_channels_per_host: int = DEFAULT_MAX_CHANNELS_PER_HOST,
+                 keepalive: int = KEEPALIVE_IN_SEC, idle_timeout: float = IDLE_TIMEOUT_IN_SEC):
+        """
+        Args:
+          max_channels_per_host(int, optional): Maximum number of commands running at a time on a transport
+          keepalive(int, optional): Interval of the SSH keepalive packets, in secs
+          idle_timeout(float, optional): Clients with no open channel for this long are closed, in secs
+        """
+        self.max_channels_per_host = max_channels_per_host
+        self.keepalive = keepalive
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.connections: Dict[Tuple[str, str, str], PooledConnection] = {}
+        self.clients: Dict[paramiko.SSHClient, PooledConnection] = {}
+        # Connecting to a host doesn't block the threads connecting to the other hosts
+        self.connect_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self.metrics = {"connects": 0, "reuses": 0, "reconnects": 0, "evictions": 0, "channels": 0,
+                        "max_open_channels": 0}
+
+    @classmethod
+    def get_instance(cls) -> 'SSHConnectionPool':
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = SSHConnectionPool()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, max_channels_per_host: Optional[int] = None) -> 'SSHConnectionPool':
+        """
+        Replace the process-wide pool, to be called before the scripts are started
+        """
+        with cls._lock:
+            if cls._instance:
+                cls._instance.close_all()
+            cls._instance = SSHConnectionPool(
+                max_channels_per_host=max_channels_per_host or cls.DEFAULT_MAX_CHANNELS_PER_HOST)
+            return cls._instance
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            if cls._instance:
+                cls._instance.close_all()
+            cls._instance = None
+
+    def get_client(self, ip: str, username: str, password: str) -> paramiko.SSHClient:
+        """
+        Get the pooled client of the host, connecting if there is none or its transport is dead
+
+        Args:
+          ip(str): IP of the host
+          username(str): Username
+          password(str): Password, only used to connect
+
+        Returns:
+          paramiko.SSHClient: Authenticated client, shared with the other users of the host with the same credentials
+        """
+        # A client authenticated with another password is not reused, only the hash of the password is kept
+        key = (ip, username, hashlib.sha256(password.encode()).hexdigest() if password else "")
+        with self.lock:
+            self.__evict_idle()
+            connect_lock = self.connect_locks.setdefault(key, threading.Lock())
+
+        with connect_lock:
+            with self.lock:
+                connection = self.connections.get(key)
+            if connection and self.__is_active(connection.client):
+                with self.lock:
+                    connection.last_used = time.time()
+                    self.metrics["reuses"] += 1
+                return connection.client
+            if connection:
+                logger.debug(f"{ip}: SSH transport is not active anymore, reconnecting")
+                self.__discard(key, connection)
+                with self.lock:
+                    self.metrics["reconnects"] += 1
+
+            client = paramiko.SSHClient()
+            # Disable host key check
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect(ip, username=username, password=password)
+            transport = client.get_transport()
+            if transport:
+                transport.set_keepalive(self.keepalive)
+            with self.lock:
+                connection = PooledConnection(client, self.max_channels_per_host)
+                self.connections[key] = connection
+                self.clients[client] = connection
+                self.metrics["connects"] += 1
+            return client
+
+    def release(self, client: paramiko.SSHClient) -> bool:
+        """
+        Give back a client got from the pool, the client stays connected for the next users
+
+        Returns:
+          bool: False if the client is not from the pool
+        """
+        with self.lock:
+            connection = self.clients.get(client)
+            if not connection:
+                return False
+            connection.last_used = time.time()
+            return True
+
+    @contextlib.contextmanager
+    def channel(self, client: paramiko.SSHClient):
+        """
+        Hold one of the channels of the client, while a command is running on it. No-op for a client not from the
+        pool.
+        """
+        with self.lock:
+            connection = self.clients.get(client)
+        if not connection:
+            yield
+            return
+
+        connection.channels.acquire()
+        with self.lock:
+            connection.open_channels += 1
+            self.metrics["channels"] += 1
+            self.metrics["max_open_channels"] = max(self.metrics["max_open_channels"], connection.open_channels)
+        try:
+            yield
+        finally:
+            with self.lock:
+                connection.open_channels -= 1
+                connection.last_used = time.time()
+            connection.channels.release()
+
+    def track_shell(self, client: paramiko.SSHClient, shell: paramiko.Channel):
+        """
+        Interactive shells are closed by their users, the client is not evicted till they are
+        """
+        with self.lock:
+            connection = self.clients.get(client)
+            if connection:
+                connection.shells.append(shell)
+
+    def close_all(self):
+        with self.lock:
+            connections = list(self.connections.items())
+        for key, connection in connections:
+            self.__discard(key, connection)
+
+    def get_metrics(self) -> Dict:
+        with self.lock:
+            metrics = dict(self.metrics)
+            metrics["connections"] = len(self.connections)
+        return metrics
+
+    def __evict_idle(self):
+        for key, connection in list(self.connections.items()):
+            if connection.is_idle(self.idle_timeout):
+                logger.debug(f"{key[0]}: Closing idle SSH connection")
+                self.connections.pop(key, None)
+                self.clients.pop(connection.client, None)
+                self.metrics["evictions"] += 1
+                self.__close(connection.client)
+
+    def __discard(self, key: Tuple[str, str, str], connection: PooledConnection):
+        with self.lock:
+            if self.connections.get(key) is connection:
+                self.connections.pop(key)
+            self.clients.pop(connection.client, None)
+        self.__close(connection.client)
+
+    @staticmethod
+    def __is_active(client: paramiko.SSHClient) -> bool:
+        transport = client.get_transport()
+        return bool(transport and transport.is_active())
+
+    @staticmethod
+    def __close(client: paramiko.SSHClient):
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug(f"Error while closing SSH connection: {e}")
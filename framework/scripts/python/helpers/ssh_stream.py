@@ -0,0 +1,220 @@
+import codecs
+import select
+import time
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+import paramiko
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class OutputBuffer:
+    """
+    Output of one stream of a channel. The reads are appended to a bytearray, so a chatty command costs O(n) instead
+    of the O(n^2) of concatenating strings, and are decoded incrementally into lines (a multibyte character split
+    across two reads is decoded once complete).
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """
+        Args:
+          max_bytes(int, optional): Only the last max_bytes of the output are kept, the whole output if not set
+        """
+        self.data = bytearray()
+        self.max_bytes = max_bytes
+        self.truncated_bytes = 0
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.partial_line = ""
+
+    def feed(self, data: bytes) -> Tuple[str, List[str]]:
+        """
+        Returns:
+          tuple: The decoded text, the lines completed by it
+        """
+        self.data += data
+        if self.max_bytes and len(self.data) > self.max_bytes:
+            excess = len(self.data) - self.max_bytes
+            del self.data[:excess]
+            self.truncated_bytes += excess
+        text = self.decoder.decode(data)
+        lines = (self.partial_line + text).split("\n")
+        self.partial_line = lines.pop()
+        return text, [line.rstrip("\r") for line in lines]
+
+    def flush(self) -> List[str]:
+        line = self.partial_line + self.decoder.decode(b"", final=True)
+        self.partial_line = ""
+        return [line.rstrip("\r")] if line else []
+
+    def getvalue(self) -> str:
+        return self.data.decode("utf-8", errors="replace")
+
+
+class ChannelSession:
+    """
+    A command or an interactive shell running on a channel, read by SSHCommandLoop
+    """
+    RUNNING = "RUNNING"
+    MATCHED = "MATCHED"
+    EXITED = "EXITED"
+    TIMED_OUT = "TIMED_OUT"
+    CHUNK_SIZE = 32768
+
+    def __init__(self, channel: paramiko.Channel, pattern: Optional[str] = None, count: int = 1,
+                 until_output: bool = False, timeout: Optional[float] = None, idle_timeout: Optional[float] = None,
+                 max_bytes: Optional[int] = None, on_line: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+          channel(paramiko.Channel): Channel of the command/ shell
+          pattern(str, optional): The session is done once the output has the pattern count times
+          count(int, optional): Number of occurrences of the pattern to wait for
+          until_output(bool, optional): The session is done on the first output
+          timeout(float, optional): The session times out after timeout secs
+          idle_timeout(float, optional): The session times out if there is no output for idle_timeout secs
+          max_bytes(int, optional): Maximum number of bytes of output kept, per stream
+          on_line(callable, optional): Called with every line of stdout, as soon as it is complete
+        """
+        self.channel = channel
+        self.pattern = pattern
+        self.count = count
+        self.until_output = until_output
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.on_line = on_line
+        self.stdout_buffer = OutputBuffer(max_bytes)
+        self.stderr_buffer = OutputBuffer(max_bytes)
+        self.state = self.RUNNING
+        self.matches = 0
+        # Only the end of the previous read can be the start of an occurrence, so the output is never searched again
+        self.tail = ""
+        self.start_time = self.last_output = time.time()
+
+    @property
+    def stdout(self) -> str:
+        return self.stdout_buffer.getvalue()
+
+    @property
+    def stderr(self) -> str:
+        return self.stderr_buffer.getvalue()
+
+    @property
+    def done(self) -> bool:
+        return self.state != self.RUNNING
+
+    def get_deadline(self) -> Optional[float]:
+        deadlines = []
+        if self.timeout is not None:
+            deadlines.append(self.start_time + self.timeout)
+        if self.idle_timeout is not None:
+            deadlines.append(self.last_output + self.idle_timeout)
+        return min(deadlines) if deadlines else None
+
+    def read(self) -> List[str]:
+        """
+        Read the available output without blocking, and update the state of the session
+
+        Returns:
+          list: The stdout lines completed by the read
+        """
+        lines = []
+        got_output = False
+        while self.channel.recv_ready():
+            data = self.channel.recv(self.CHUNK_SIZE)
+            if not data:
+                break
+            got_output = True
+            text, new_lines = self.stdout_buffer.feed(data)
+            lines.extend(new_lines)
+            self.__search(text)
+        while self.channel.recv_stderr_ready():
+            data = self.channel.recv_stderr(self.CHUNK_SIZE)
+            if not data:
+                break
+            got_output = True
+            text, _ = self.stderr_buffer.feed(data)
+            self.__search(text)
+
+        now = time.time()
+        if got_output:
+            self.last_output = now
+        if (self.pattern and self.matches >= self.count) or (self.until_output and got_output):
+            self.state = self.MATCHED
+        elif (self.channel.closed or self.channel.exit_status_ready()) and not self.channel.recv_ready() and \
+                not self.channel.recv_stderr_ready():
+            self.state = self.EXITED
+        elif (deadline := self.get_deadline()) is not None and now >= deadline:
+            self.state = self.TIMED_OUT
+        if self.done:
+            lines.extend(self.stdout_buffer.flush())
+        if self.on_line:
+            for line in lines:
+                self.on_line(line)
+        return lines
+
+    def __search(self, text: str):
+        if not self.pattern or self.matches >= self.count:
+            return
+        window = self.tail + text
+        self.matches += window.count(self.pattern)
+        self.tail = window[-(len(self.pattern) - 1):] if len(self.pattern) > 1 else ""
+
+
+class SSHCommandLoop:
+    """
+    Drive the commands and interactive shells of many hosts from one thread. The loop sleeps in select till one of
+    the channels has output or the next session times out, instead of a thread per host polling its channel.
+    """
+    # Output on stderr doesn't wake up select, the channels are read at least that often
+    POLL_INTERVAL_IN_SEC = 1
+
+    def __init__(self):
+        self.sessions: Dict[Hashable, ChannelSession] = {}
+
+    def add(self, key: Hashable, channel: paramiko.Channel, **kwargs) -> ChannelSession:
+        """
+        Args:
+          key(hashable): Key of the session in the results, eg the host
+          channel(paramiko.Channel): Channel of the command/ shell
+          kwargs: Arguments of ChannelSession
+
+        Returns:
+          ChannelSession: The session
+        """
+        self.sessions[key] = ChannelSession(channel, **kwargs)
+        return self.sessions[key]
+
+    def iter_lines(self) -> Iterator[Tuple[Hashable, str]]:
+        """
+        Run the sessions till they are all done
+
+        Returns:
+          iterator: (key, line) of every line of stdout, as soon as it is complete
+        """
+        while True:
+            pending = []
+            for key, session in self.sessions.items():
+                if session.done:
+                    continue
+                for line in session.read():
+                    yield key, line
+                if not session.done:
+                    pending.append(session)
+            if not pending:
+                return
+
+            wait = self.POLL_INTERVAL_IN_SEC
+            for session in pending:
+                if (deadline := session.get_deadline()) is not None:
+                    wait = min(wait, max(deadline - time.time(), 0))
+            select.select([session.channel for session in pending], [], [], wait)
+
+    def run(self) -> Dict[Hashable, ChannelSession]:
+        """
+        Run the sessions till they are all done
+
+        Returns:
+          dict: The sessions, by key
+        """
+        for _ in self.iter_lines():
+            pass
+        return self.sessions
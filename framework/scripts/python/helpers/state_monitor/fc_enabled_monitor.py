@@ -21,6 +21,10 @@ class FcEnabledMonitor(StateMonitor):
         """
         self.session = session
 
+    def get_poll_key(self):
+        # Same query for all the monitors of this PC, it is made once per poll
+        return type(self), id(self.session)
+
     def check_status(self):
         """
         Checks the task is in expected state or not
@@ -23,6 +23,12 @@ class KarbonImageDownloadMonitor(StateMonitor):
         self.session = session
         self.uuid = image_uuid
 
+    def get_poll_key(self):
+        return type(self), id(self.session), self.uuid
+
+    def get_progress(self, response):
+        return response.get("status") if isinstance(response, dict) else response
+
     def check_status(self) -> (Dict, bool):
         """
         Checks the task is in expected state or not
@@ -19,6 +19,10 @@ class ObjectsEnabledMonitor(StateMonitor):
         """
         self.session = pc_session
 
+    def get_poll_key(self):
+        # Same query for all the monitors of this PC, it is made once per poll
+        return type(self), id(self.session)
+
     def check_status(self) -> (None, bool):
         """
         Checks the task is in expected state or not
@@ -27,6 +27,13 @@ class ObjectstoreMonitor(StateMonitor):
         self.progress_states = ['PENDING', 'SCALING_OUT', 'REPLACING_CERT', 'DELETING_INPUT']
         self.os_name = os_name
 
+    def get_poll_key(self):
+        return type(self), id(self.session), self.os_name
+
+    def get_progress(self, response):
+        # Only the state of the objectstore being monitored matters
+        return response.get(self.os_name) if isinstance(response, dict) else response
+
     def check_status(self) -> (List, bool):
         """
         Check whether the given objectstores is not in progress(PENDING).
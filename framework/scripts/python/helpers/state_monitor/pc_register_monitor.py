@@ -33,7 +33,7 @@ class PcRegisterMonitor(StateMonitor):
           bool: True
         """
         pc_cluster = PcCluster(self.session)
-        pc_cluster.get_pe_info_list()
+        pc_cluster.get_pe_info_list(refresh=True)
         pc_cluster_uuids = pc_cluster.name_uuid_map.values()
 
         if not pc_cluster_uuids:
@@ -3,6 +3,8 @@ from framework.helpers.log_utils import get_logger
 from framework.helpers.rest_utils import RestAPIUtil
 from .state_monitor import StateMonitor
 from ..v3.task import Task
+from .task_tracker import TaskTracker
+from ..inventory_cache import InventoryCache
 
 logger = get_logger(__name__)
 
@@ -29,6 +31,8 @@ class PcTaskMonitor(StateMonitor):
         self.completed_task_list = []
         self.failed_task_list = []
         self.task_op = Task(self.session)
+        # Shared with the other monitors of the PC, so that the tasks are polled together
+        self.task_tracker = TaskTracker.get_instance(self.task_op)
 
     def check_status(self) -> (Optional[str], bool):
         """
@@ -48,7 +52,7 @@ class PcTaskMonitor(StateMonitor):
         self.completed_task_list = []
         self.failed_task_list = []        
         for subset_uuid_list in self.__uuid_list_chunks(self.task_uuid_list):
-            completed_tasks = self.task_op.poll(subset_uuid_list)
+            completed_tasks = self.task_tracker.poll(subset_uuid_list)
             for completed_task in completed_tasks:
                 if completed_task.get("status") == "FAILED":
                     self.failed_task_list.append(completed_task)
@@ -61,10 +65,23 @@ class PcTaskMonitor(StateMonitor):
             completed = True
             response = f"{self.failed_task_list}"
 
+        if completed and self.task_uuid_list:
+            # The tasks might have changed any collection of the PC
+            InventoryCache.invalidate_endpoint(self.session)
+
         logger.info("[{}/{}] Tasks Completed".format(len(self.completed_task_list),
                                                      len(self.task_uuid_list)))
         return response, completed
 
+    def get_progress(self, response):
+        # Any task reaching a terminal state is progress
+        return len(self.completed_task_list), len(self.failed_task_list)
+
+    def get_completion(self, response):
+        if not self.task_uuid_list:
+            return None
+        return (len(self.completed_task_list) + len(self.failed_task_list)) / len(self.task_uuid_list)
+
     @staticmethod
     def __uuid_list_chunks(uuid_list: List, chunk_size=100) -> Generator[List, None, None]:
         """
@@ -0,0 +1,196 @@
+import concurrent.futures
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Optional, Dict, Callable, Any, List
+
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class PollHandle:
+    """
+    Handle returned to the waiter of a monitor. "future" is resolved with (response, status) once the target status
+    is matched, and "wait" wakes up the waiter after every poll of the monitor.
+    """
+
+    def __init__(self, scheduler: 'PollScheduler', callback: Optional[Callable[[concurrent.futures.Future], Any]] = None):
+        self.scheduler = scheduler
+        self.future = concurrent.futures.Future()
+        self.updated = threading.Event()
+        self.last_response = None
+        if callback:
+            self.future.add_done_callback(callback)
+
+    def notify(self, response):
+        self.last_response = response
+        self.updated.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait till the next poll of the monitor or till the monitor is done
+
+        Returns:
+          bool: True if the monitor is done
+        """
+        self.updated.wait(timeout)
+        self.updated.clear()
+        return self.future.done()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+
+class PollEntry:
+    """
+    One scheduled query. Monitors with the same poll key share an entry, so the query is made once for all of them.
+    """
+
+    def __init__(self, monitor, key):
+        self.monitor = monitor
+        self.key = key
+        self.handles: List[PollHandle] = []
+        self.interval = monitor.get_min_check_interval()
+        self.last_progress = None
+        self.polls = 0
+
+
+class PollScheduler:
+    """
+    Central poll scheduler that multiplexes all the outstanding monitors of a run on one scheduler thread and a
+    bounded pool of workers.
+
+    The first poll is made immediately, then the interval starts at the monitor's minimum interval and backs off
+    towards its maximum interval as long as no progress is observed. Any progress resets the interval to the minimum,
+    which is shorter once the monitor reports its work as nearly complete.
+    Each interval gets a random jitter, so monitors started together don't poll together.
+    """
+    _instance = None
+    _lock = threading.Lock()
+    DEFAULT_MAX_WORKERS = 16
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.condition = threading.Condition()
+        self.queue = []
+        self.counter = itertools.count()
+        self.entries: Dict[Any, PollEntry] = {}
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                              thread_name_prefix="Thread-PollWorker")
+        self.metrics = {"polls": 0, "coalesced": 0}
+        self.thread = threading.Thread(target=self._run, name="Thread-PollScheduler", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get_instance(cls) -> 'PollScheduler':
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = PollScheduler()
+            return cls._instance
+
+    def submit(self, monitor, callback: Optional[Callable[[concurrent.futures.Future], Any]] = None) -> PollHandle:
+        """
+        Start polling the monitor
+
+        Args:
+          monitor(StateMonitor): The monitor to poll
+          callback(callable, optional): Called with the future once the monitor is done
+
+        Returns:
+          PollHandle
+        """
+        handle = PollHandle(self, callback)
+        key = monitor.get_poll_key()
+        with self.condition:
+            if key is not None and key in self.entries:
+                # Identical query is already scheduled, just wait for its result
+                self.entries[key].handles.append(handle)
+                self.metrics["coalesced"] += 1
+                return handle
+
+            entry = PollEntry(monitor, key if key is not None else object())
+            entry.handles.append(handle)
+            self.entries[entry.key] = entry
+            self._schedule(entry, 0)
+        return handle
+
+    def cancel(self, handle: PollHandle):
+        """
+        Stop waiting for the monitor. The query is dropped once nobody is waiting for it
+        """
+        with self.condition:
+            for key, entry in list(self.entries.items()):
+                if handle in entry.handles:
+                    entry.handles.remove(handle)
+                    if not entry.handles:
+                        self.entries.pop(key)
+                    break
+
+    def get_metrics(self) -> Dict:
+        with self.condition:
+            metrics = dict(self.metrics)
+            metrics["outstanding"] = len(self.entries)
+        return metrics
+
+    def _schedule(self, entry: PollEntry, delay: float):
+        heapq.heappush(self.queue, (time.monotonic() + delay, next(self.counter), entry))
+        self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.queue or self.queue[0][0] > time.monotonic():
+                    timeout = self.queue[0][0] - time.monotonic() if self.queue else None
+                    self.condition.wait(timeout)
+                _, _, entry = heapq.heappop(self.queue)
+                if self.entries.get(entry.key) is not entry:
+                    # Nobody is waiting anymore
+                    continue
+            self.executor.submit(self._poll, entry)
+
+    def _poll(self, entry: PollEntry):
+        try:
+            response, status = entry.monitor.check_status()
+        except Exception as e:
+            with self.condition:
+                handles = entry.handles
+                self.entries.pop(entry.key, None)
+            for handle in handles:
+                handle.future.set_exception(e)
+                handle.notify(None)
+            return
+
+        with self.condition:
+            self.metrics["polls"] += 1
+            entry.polls += 1
+            handles = list(entry.handles)
+            if status:
+                self.entries.pop(entry.key, None)
+            elif self.entries.get(entry.key) is entry:
+                self._schedule(entry, self._next_interval(entry, response))
+
+        for handle in handles:
+            if status:
+                handle.future.set_result((response, status))
+            handle.notify(response)
+
+    @staticmethod
+    def _next_interval(entry: PollEntry, response) -> float:
+        monitor = entry.monitor
+        progress = monitor.get_progress(response)
+        if entry.polls == 1 or progress != entry.last_progress:
+            # Things are moving, check again soon
+            entry.interval = monitor.get_min_check_interval(monitor.get_completion(response))
+        else:
+            entry.interval = min(entry.interval * monitor.BACKOFF_FACTOR, monitor.get_max_check_interval())
+        entry.last_progress = progress
+        jitter = entry.interval * monitor.JITTER
+        return max(0.0, entry.interval + random.uniform(-jitter, jitter))
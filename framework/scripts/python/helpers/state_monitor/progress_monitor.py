@@ -76,6 +76,15 @@ class TaskMonitor(StateMonitor):
                                                      len(self.task_uuid_list)))
         return response, completed
 
+    def get_progress(self, response):
+        # Any task reaching a terminal state is progress
+        return len(self.completed_task_list), len(self.failed_task_list)
+
+    def get_completion(self, response):
+        if not self.task_uuid_list:
+            return None
+        return (len(self.completed_task_list) + len(self.failed_task_list)) / len(self.task_uuid_list)
+
     @staticmethod
     def __uuid_list_chunks(uuid_list: List, chunk_size=100) -> Generator[List, None, None]:
         """
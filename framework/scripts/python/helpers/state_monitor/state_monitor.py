@@ -1,8 +1,10 @@
 import time
-from typing import Optional, Union, Dict
+from concurrent.futures import Future
+from typing import Optional, Union, Dict, Callable, Any
 
 from framework.helpers.log_utils import get_logger
 from abc import abstractmethod, ABC
+from .poll_scheduler import PollScheduler, PollHandle
 
 logger = get_logger(__name__)
 
@@ -13,12 +15,23 @@ class StateMonitor(ABC):
     """
     DEFAULT_TIMEOUT_IN_SEC = 1800
     DEFAULT_CHECK_INTERVAL_IN_SEC = 5
+    # The poll interval starts at MIN_CHECK_INTERVAL_IN_SEC and backs off by BACKOFF_FACTOR till
+    # MAX_CHECK_INTERVAL_IN_SEC while no progress is observed. Both default to the DEFAULT_CHECK_INTERVAL_IN_SEC,
+    # so a monitor never polls less often than it used to. Once the completion reaches NEAR_COMPLETION_RATIO,
+    # the minimum interval is divided by NEAR_COMPLETION_SPEEDUP, so the end of the work is noticed sooner
+    MIN_CHECK_INTERVAL_IN_SEC = None
+    MAX_CHECK_INTERVAL_IN_SEC = None
+    NEAR_COMPLETION_RATIO = 0.8
+    NEAR_COMPLETION_SPEEDUP = 2
+    BACKOFF_FACTOR = 1.5
+    JITTER = 0.1
 
     def monitor(self, query_retries=True) -> (Optional[Union[Dict, str]], bool):
         """
         Keep waiting until target status is matched. No Exceptions will be raised
         when timed out, False is return instead. It is up to the caller to make
         decision about what to do when timed out.
+        The status is checked by the PollScheduler, this thread only waits for the result.
 
         Args:
         query_retries(bool): False means monitor won't retry with timeout.
@@ -26,6 +39,10 @@ class StateMonitor(ABC):
         Returns:
           bool: True if target status is matched, False otherwise.
         """
+        if not query_retries:
+            _, status_matched = self.check_status()
+            return status_matched
+
         start_time = time.time()
         status_matched = False
         response = {}
@@ -33,18 +50,19 @@ class StateMonitor(ABC):
         is_timeout = False
 
         logger.info("Started monitoring the state...")
-        while not is_timeout and not status_matched:
-            response, status_matched = self.check_status()
-            if not query_retries:
-                return status_matched
-
-            if not status_matched:
-                logger.info(f"Wait {self.DEFAULT_CHECK_INTERVAL_IN_SEC} seconds for the next check...")
-                time.sleep(self.DEFAULT_CHECK_INTERVAL_IN_SEC)
+        handle = self.monitor_async()
+        try:
+            while not is_timeout and not status_matched:
+                if handle.wait(self.DEFAULT_TIMEOUT_IN_SEC - elapsed_time):
+                    response, status_matched = handle.result()
+                else:
+                    logger.debug(f"{type(self).__name__}: status not matched yet")
 
-            elapsed_time = time.time() - start_time
-            if elapsed_time >= self.DEFAULT_TIMEOUT_IN_SEC:
-                is_timeout = True
+                elapsed_time = time.time() - start_time
+                if elapsed_time >= self.DEFAULT_TIMEOUT_IN_SEC:
+                    is_timeout = True
+        finally:
+            handle.cancel()
 
         if status_matched:
             logger.info(f"Completed {type(self).__name__} in duration: {elapsed_time:.2f} seconds")
@@ -54,6 +72,47 @@ class StateMonitor(ABC):
             logger.error(timeout_message)
             return None, False
 
+    def monitor_async(self, callback: Optional[Callable[[Future], Any]] = None) -> PollHandle:
+        """
+        Start monitoring without blocking. handle.future is resolved with (response, True) once target status is
+        matched. There is no timeout, the caller cancels the handle when it stops waiting.
+
+        Args:
+        callback(callable, optional): Called with the future once target status is matched.
+
+        Returns:
+          PollHandle
+        """
+        return PollScheduler.get_instance().submit(self, callback=callback)
+
+    def get_poll_key(self):
+        """
+        Monitors returning the same key make the same query, the query is made once and the result is shared.
+        None means the query is not shared with any other monitor.
+        """
+        return None
+
+    def get_progress(self, response):
+        """
+        Value used to detect the progress between two checks, the poll interval is reset when it changes
+        """
+        return response
+
+    def get_completion(self, response) -> Optional[float]:
+        """
+        Fraction of the work that is done, between 0 and 1. None means the monitor can't tell
+        """
+        return None
+
+    def get_min_check_interval(self, completion: Optional[float] = None) -> float:
+        interval = self.MIN_CHECK_INTERVAL_IN_SEC or self.DEFAULT_CHECK_INTERVAL_IN_SEC
+        if completion is not None and completion >= self.NEAR_COMPLETION_RATIO:
+            interval /= self.NEAR_COMPLETION_SPEEDUP
+        return interval
+
+    def get_max_check_interval(self) -> float:
+        return self.MAX_CHECK_INTERVAL_IN_SEC or self.DEFAULT_CHECK_INTERVAL_IN_SEC
+
     @abstractmethod
     def check_status(self):
         """
@@ -1,8 +1,11 @@
-from typing import List, Optional, Generator
+import time
+from typing import Iterable, List, Optional, Generator
 from framework.helpers.log_utils import get_logger
 from framework.helpers.rest_utils import RestAPIUtil
 from .state_monitor import StateMonitor
 from ..v3.task import Task
+from .task_tracker import TaskTracker
+from ..inventory_cache import InventoryCache
 
 logger = get_logger(__name__)
 
@@ -29,6 +32,8 @@ class PcTaskMonitor(StateMonitor):
         self.completed_task_list = []
         self.failed_task_list = []
         self.task_op = task_op or Task(self.session)
+        # Shared with the other monitors of the PC, so that the tasks are polled together
+        self.task_tracker = TaskTracker.get_instance(self.task_op)
 
     def check_status(self) -> (Optional[str], bool):
         """
@@ -48,7 +53,7 @@ class PcTaskMonitor(StateMonitor):
         self.completed_task_list = []
         self.failed_task_list = []        
         for subset_uuid_list in self.__uuid_list_chunks(self.task_uuid_list):
-            completed_tasks = self.task_op.poll(subset_uuid_list)
+            completed_tasks = self.task_tracker.poll(subset_uuid_list)
             for completed_task in completed_tasks:
                 if completed_task.get("status") in ["FAILED", "CANCELED"]:
                     self.failed_task_list.append(completed_task)
@@ -61,10 +66,26 @@ class PcTaskMonitor(StateMonitor):
             completed = True
             response = f"{self.failed_task_list}"
 
+        if completed and self.task_uuid_list:
+            # The tasks might have changed any collection of the PC, the v4 helpers cache them per API client
+            InventoryCache.invalidate_endpoint(self.session)
+            client = getattr(self.task_op, "client", None)
+            if client is not None:
+                InventoryCache.invalidate_endpoint(client)
+
         logger.info("[{}/{}] Tasks Completed".format(len(self.completed_task_list),
                                                      len(self.task_uuid_list)))
         return response, completed
 
+    def get_progress(self, response):
+        # Any task reaching a terminal state is progress
+        return len(self.completed_task_list), len(self.failed_task_list)
+
+    def get_completion(self, response):
+        if not self.task_uuid_list:
+            return None
+        return (len(self.completed_task_list) + len(self.failed_task_list)) / len(self.task_uuid_list)
+
     @staticmethod
     def __uuid_list_chunks(uuid_list: List, chunk_size=100) -> Generator[List, None, None]:
         """
@@ -77,3 +98,56 @@ class PcTaskMonitor(StateMonitor):
         """
         for i in range(0, len(uuid_list), chunk_size):
             yield uuid_list[i:i + chunk_size]
+
+
+class PcBatchTaskMonitor:
+    """
+    The class to wait for the tasks of a batch call whose chunks complete one after another. The tasks of a chunk
+    are monitored as soon as the chunk completes, while the next chunks are still in flight
+    """
+
+    def __init__(self, session: RestAPIUtil, task_op=None):
+        """
+        Args:
+          session: request pc session to query the API
+          task_op(optional): Task helper, v3 Task by default
+        """
+        self.session = session
+        self.task_op = task_op
+        self.task_uuid_list = []
+
+    def monitor(self, task_uuid_chunks: Iterable[List]) -> (Optional[str], bool):
+        """
+        Monitor the tasks of every chunk, each chunk has the timeout of PcTaskMonitor from the time it completes
+
+        Args:
+          task_uuid_chunks(iterable): Task UUIDs of every chunk, e.g. PcBatchOp.iter_batch_create
+
+        Returns:
+          (str, bool): The failed tasks if any, and True if all the tasks completed in time
+        """
+        handles = []
+        failed_tasks = []
+        completed = True
+        try:
+            for task_uuid_list in task_uuid_chunks:
+                if not task_uuid_list:
+                    continue
+                self.task_uuid_list.extend(task_uuid_list)
+                monitor = PcTaskMonitor(self.session, task_uuid_list=task_uuid_list, task_op=self.task_op)
+                handles.append((monitor.monitor_async(), time.time() + monitor.DEFAULT_TIMEOUT_IN_SEC))
+
+            for handle, deadline in handles:
+                while not handle.done() and time.time() < deadline:
+                    handle.wait(deadline - time.time())
+                if not handle.done():
+                    logger.error("Timed out waiting for the tasks of a batch chunk")
+                    completed = False
+                    continue
+                response, _ = handle.result()
+                if response:
+                    failed_tasks.append(response)
+        finally:
+            for handle, _ in handles:
+                handle.cancel()
+        return ", ".join(failed_tasks) or None, completed
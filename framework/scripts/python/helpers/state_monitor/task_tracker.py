@@ -0,0 +1,135 @@
+import threading
+from typing import List, Dict, Optional, Set, Tuple, Generator
+
+from framework.helpers.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class TaskTracker:
+    """
+    Per-PC tracker of tasks, shared by all the scripts polling tasks on the PC.
+
+    The task uuids requested by all the concurrent callers are merged into shared tasks/poll batches. One caller polls
+    for everybody while the others wait for the result. Terminal tasks are remembered, so they are never polled again.
+    """
+    _lock = threading.Lock()
+    _trackers: Dict[Tuple, 'TaskTracker'] = {}
+    POLL_CHUNK_SIZE = 100
+
+    def __init__(self, task_op):
+        """
+        Args:
+          task_op: v3 or v4 Task object, used to call tasks/poll
+        """
+        self.task_op = task_op
+        self.condition = threading.Condition()
+        # uuid -> task, for the tasks that reached a terminal state
+        self.terminal_tasks: Dict[str, Dict] = {}
+        # uuids requested since the last poll round started
+        self.pending: Set[str] = set()
+        self.polling = False
+        self.rounds_started = 0
+        self.rounds_completed = 0
+        self.failed_round: Optional[Tuple[int, Exception]] = None
+        self.metrics = {"requests": 0, "poll_calls": 0, "tasks_polled": 0, "terminal_hits": 0}
+
+    @staticmethod
+    def get_key(task_op) -> Tuple:
+        # v3 Task is bound to a RestAPIUtil session, v4 Task to the prism API client
+        endpoint = getattr(task_op, "session", None) or getattr(task_op, "client", None) or task_op
+        return type(task_op), id(endpoint)
+
+    @classmethod
+    def get_instance(cls, task_op) -> 'TaskTracker':
+        """
+        Get the tracker for the PC the task_op talks to, create one if it doesn't exist
+        """
+        key = cls.get_key(task_op)
+        with cls._lock:
+            if key not in cls._trackers:
+                cls._trackers[key] = TaskTracker(task_op)
+            return cls._trackers[key]
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._trackers = {}
+
+    def poll(self, task_uuid_list: List[str], poll_timeout_secs: Optional[int] = None) -> List[Dict]:
+        """
+        Same as Task.poll, but the uuids are polled along with the ones of the other callers, and the tasks already
+        known to be terminal are not polled again.
+        Args:
+          task_uuid_list (list): List of Task UUIDs to Poll
+          poll_timeout_secs (int, optional): tasks/poll timeout, only used by the v3 Task
+
+        Returns:
+          List of the terminal tasks in task_uuid_list
+        """
+        leader = False
+        with self.condition:
+            self.metrics["requests"] += 1
+            pending = [uuid for uuid in task_uuid_list if uuid not in self.terminal_tasks]
+            self.metrics["terminal_hits"] += len(task_uuid_list) - len(pending)
+            if pending:
+                self.pending.update(pending)
+                # The round in progress, if any, doesn't include these uuids. Wait for the next one
+                target_round = self.rounds_started + 1
+                while self.rounds_completed < target_round:
+                    if not self.polling:
+                        self.polling = True
+                        self.rounds_started += 1
+                        batch = list(self.pending)
+                        self.pending = set()
+                        leader = True
+                        break
+                    self.condition.wait()
+
+                if not leader and self.failed_round and self.failed_round[0] >= target_round:
+                    raise self.failed_round[1]
+
+        if leader:
+            self.__poll_round(batch, poll_timeout_secs)
+
+        with self.condition:
+            return [self.terminal_tasks[uuid] for uuid in task_uuid_list if uuid in self.terminal_tasks]
+
+    def get_metrics(self) -> Dict:
+        with self.condition:
+            metrics = dict(self.metrics)
+            metrics["terminal_tasks"] = len(self.terminal_tasks)
+        return metrics
+
+    def __poll_round(self, batch: List[str], poll_timeout_secs: Optional[int]):
+        completed_tasks = []
+        error = None
+        try:
+            for chunk in self.__uuid_list_chunks(batch, self.POLL_CHUNK_SIZE):
+                if poll_timeout_secs:
+                    completed_tasks.extend(self.task_op.poll(chunk, poll_timeout_secs=poll_timeout_secs))
+                else:
+                    completed_tasks.extend(self.task_op.poll(chunk))
+                with self.condition:
+                    self.metrics["poll_calls"] += 1
+                    self.metrics["tasks_polled"] += len(chunk)
+        except Exception as e:
+            error = e
+        finally:
+            with self.condition:
+                for task in completed_tasks:
+                    uuid = task.get("uuid") or task.get("ext_id") or task.get("extId")
+                    if uuid:
+                        self.terminal_tasks[uuid] = task
+                if error:
+                    self.failed_round = (self.rounds_started, error)
+                self.rounds_completed = self.rounds_started
+                self.polling = False
+                self.condition.notify_all()
+        if error:
+            raise error
+
+    @staticmethod
+    def __uuid_list_chunks(uuid_list: List, chunk_size: int) -> Generator[List, None, None]:
+        for i in range(0, len(uuid_list), chunk_size):
+            yield uuid_list[i:i + chunk_size]
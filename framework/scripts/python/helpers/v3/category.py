@@ -1,11 +1,14 @@
-from typing import List
+from typing import Generator, List
 
 from framework.helpers.rest_utils import RestAPIUtil
+from ..inventory_cache import InventoryCache
+from ..pc_batch_op import get_task_uuid_list
 from ..pc_entity_v3 import PcEntity
 
 
 class Category(PcEntity):
     kind = "category"
+    CACHE_INVENTORY = True
 
     def __init__(self, session: RestAPIUtil):
         self.resource_type = "/categories"
@@ -43,6 +46,10 @@ class Category(PcEntity):
         self.update(endpoint=name, data=data)
 
     def categories_with_values(self) -> List:
+        return InventoryCache.get_instance(self.session).get(f"{self.resource_type}/values",
+                                                             self.__list_categories_with_values)
+
+    def __list_categories_with_values(self) -> List:
         category_entity_list = self.list()
         for category in category_entity_list:
             category["values"] = [value.get("value")
@@ -51,6 +58,17 @@ class Category(PcEntity):
         return category_entity_list
 
     def batch_values_add(self, category_list: List, **kwargs):
+        requests = self.__get_values_add_requests(category_list, **kwargs)
+        api_response_list = self.batch_op.batch(api_request_list=requests)
+        return get_task_uuid_list(api_response_list)
+
+    def iter_batch_values_add(self, category_list: List, **kwargs) -> Generator[List, None, None]:
+        """
+        Same as batch_values_add, the Task UUIDs are returned chunk by chunk as the batch chunks complete
+        """
+        yield from self.batch_op.iter_task_uuid_chunks(self.__get_values_add_requests(category_list, **kwargs))
+
+    def __get_values_add_requests(self, category_list: List, **kwargs) -> List:
         requests = []
 
         for category in category_list:
@@ -69,9 +87,7 @@ class Category(PcEntity):
                         "path_and_params": f"{base_url}/{value}"
                     }
                 )
-
-        api_response_list =  self.batch_op.batch(api_request_list=requests)
-        return self.batch_op.get_task_uuid_list(api_response_list)
+        return requests
 
     def batch_delete_values(self, category_name: str, values: List, **kwargs):
         requests = []
@@ -87,4 +103,4 @@ class Category(PcEntity):
             )
 
         api_response_list = self.batch_op.batch(api_request_list=requests)
-        return self.batch_op.get_task_uuid_list(api_response_list)
+        return get_task_uuid_list(api_response_list)
@@ -4,6 +4,7 @@ from ..pc_entity_v3 import PcEntity
 
 class Cluster(PcEntity):
     kind = "cluster"
+    CACHE_INVENTORY = True
 
     def __init__(self, session: RestAPIUtil):
         self.uuid_ip_map = {}
@@ -13,11 +14,13 @@ class Cluster(PcEntity):
         self.resource_type = "/clusters"
         super(Cluster, self).__init__(session=session)
 
-    def get_pe_info_list(self):
+    def get_pe_info_list(self, refresh: bool = False):
         """
         Set name: uuid and ip: name mapping for all the registered clusters
+        Args:
+          refresh(bool, optional): List the clusters even if the inventory snapshot of the PC is valid
         """
-        clusters = self.list()
+        clusters = self.list_cached(refresh=refresh)
 
         for cluster in clusters:
             if "PRISM_CENTRAL" in cluster["status"]["resources"]["config"]["service_list"]:
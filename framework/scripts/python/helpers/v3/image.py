@@ -1,7 +1,9 @@
-from typing import List
+import os
+from typing import Dict, List
 from framework.helpers.log_utils import get_logger
 from framework.helpers.rest_utils import RestAPIUtil
 from ..pc_entity_v3 import PcEntity
+from ..state_monitor.task_monitor import PcTaskMonitor
 from ..v3.cluster import Cluster as PcCluster
 
 logger = get_logger(__name__)
@@ -9,6 +11,7 @@ logger = get_logger(__name__)
 
 class Image(PcEntity):
     kind = "image"
+    CACHE_INVENTORY = True
 
     def __init__(self, session: RestAPIUtil):
         self.resource_type = "/images"
@@ -27,16 +30,23 @@ class Image(PcEntity):
                                 'description': '',
                                 'image_type': 'DISK_IMAGE' or 'ISO_IMAGE',
                                 'url': 'http://where-the-file-is-present',
-                                'cluster_name_list': ['cluster-name1', 'cluster-name2']
+                                'cluster_name_list': ['cluster-name1', 'cluster-name2'],
+                                # Optional, instead of cluster_name_list
+                                'cluster_uuid_list': ['cluster-uuid1'],
+                                # Optional, PC verifies the downloaded image
+                                'checksum': 'sha256 of the image',
+                                'checksum_algorithm': 'SHA_256' or 'SHA_1'
                             }
                         ]
         """
         payload_list = []
         pc_cluster = PcCluster(self.session)
-        pc_cluster.get_pe_info_list()
+        if not all(image_config.get("cluster_uuid_list") for image_config in image_config_list):
+            pc_cluster.get_pe_info_list()
         for image_config in image_config_list:
-            cluster_uuid_mappings = [{'kind': 'cluster', 'uuid': pc_cluster.name_uuid_map.get(cluster_name)}
-                                     for cluster_name in image_config["cluster_name_list"]]
+            cluster_uuid_list = image_config.get("cluster_uuid_list") or [
+                pc_cluster.name_uuid_map.get(cluster_name) for cluster_name in image_config["cluster_name_list"]]
+            cluster_uuid_mappings = [{'kind': 'cluster', 'uuid': cluster_uuid} for cluster_uuid in cluster_uuid_list]
             payload = {
                     "spec": {
                         "name": image_config["name"],
@@ -51,5 +61,83 @@ class Image(PcEntity):
                         "kind": "image"
                     }
                 }
+            if image_config.get("checksum"):
+                payload["spec"]["resources"]["checksum"] = {
+                    "checksum_algorithm": image_config.get("checksum_algorithm") or "SHA_256",
+                    "checksum_value": image_config["checksum"]
+                }
             payload_list.append(payload)
         return self.batch_op.batch_create(request_payload_list=payload_list)
+
+    def file_upload(self, image_config: Dict, **kwargs) -> Dict:
+        """
+        Upload a local image file to PC cluster(s), e.g. when the images can't be downloaded from a web server in
+        a dark site. The image is created first, then its file is uploaded in chunks. If the image already exists, e.g.
+        a previous upload was interrupted, the file is uploaded to it.
+
+        Args:
+            image_config (dict): Same as in url_upload, with the path of the file instead of the url
+                image_config = {
+                                'name': 'image_name',
+                                'description': '',
+                                'image_type': 'DISK_IMAGE' or 'ISO_IMAGE',
+                                'source': '/path/to/the/image.qcow2',
+                                'cluster_name_list': ['cluster-name1', 'cluster-name2'],
+                                # Optional, instead of cluster_name_list
+                                'cluster_uuid_list': ['cluster-uuid1']
+                            }
+            kwargs: Options of the chunked upload, e.g. chunk_size, max_retries, state_dir
+
+        Returns:
+            dict: Metrics of the upload, with the uuid of the image
+        """
+        name = image_config["name"]
+        kwargs.setdefault("key", self.get_upload_key(name, image_config["source"]))
+        if not os.path.isfile(image_config["source"]):
+            raise Exception(f"Image file {image_config['source']!r} of {name!r} doesn't exist")
+
+        image = self.get_entity_by_name(name)
+        if image:
+            image_uuid = self.get_uuid_by_name(entity_data=image)
+            logger.info(f"Image {name!r} already exists, uploading its file to {image_uuid!r}")
+        else:
+            image_uuid = self.__create_image(image_config)
+
+        metrics = self.upload_chunked(image_config["source"], uuid=image_uuid, endpoint="file", **kwargs)
+        return {**metrics, "uuid": image_uuid}
+
+    def __create_image(self, image_config: Dict) -> str:
+        cluster_uuid_list = image_config.get("cluster_uuid_list")
+        if not cluster_uuid_list:
+            pc_cluster = PcCluster(self.session)
+            pc_cluster.get_pe_info_list()
+            cluster_uuid_list = [pc_cluster.name_uuid_map.get(cluster_name)
+                                 for cluster_name in image_config.get("cluster_name_list", [])]
+        payload = {
+            "spec": {
+                "name": image_config["name"],
+                "description": image_config.get("description", ""),
+                "resources": {
+                    "image_type": image_config["image_type"],
+                    "initial_placement_ref_list": [{'kind': 'cluster', 'uuid': cluster_uuid}
+                                                   for cluster_uuid in cluster_uuid_list]
+                }
+            },
+            "metadata": {
+                "kind": "image"
+            }
+        }
+        response = self.create(data=payload)
+        image_uuid = response.get("metadata", {}).get("uuid") if isinstance(response, dict) else None
+        if not image_uuid:
+            raise Exception(f"Could not create the Image {image_config['name']!r}. Error: {response}")
+
+        # The file can only be uploaded once the image is created
+        task_uuid = response.get("status", {}).get("execution_context", {}).get("task_uuid")
+        if task_uuid:
+            task_op = PcTaskMonitor(self.session, task_uuid_list=[task_uuid])
+            task_op.DEFAULT_TIMEOUT_IN_SEC = 3600
+            app_response, status = task_op.monitor()
+            if app_response or not status:
+                raise Exception(f"Creation of the Image {image_config['name']!r} failed. {app_response}")
+        return image_uuid
@@ -5,6 +5,7 @@ from ..pc_entity_v3 import PcEntity
 
 class Network(PcEntity):
     kind = "subnet"
+    CACHE_INVENTORY = True
 
     def __init__(self, session: RestAPIUtil):
         self.resource_type = "/subnets"
@@ -1,7 +1,9 @@
-from typing import List
+import os
+from typing import Dict, List, Optional
 from framework.helpers.log_utils import get_logger
 from framework.helpers.rest_utils import RestAPIUtil
 from ..pc_entity_v3 import PcEntity
+from ..state_monitor.task_monitor import PcTaskMonitor
 from ..v3.cluster import Cluster as PcCluster
 
 logger = get_logger(__name__)
@@ -9,6 +11,7 @@ logger = get_logger(__name__)
 
 class Ova(PcEntity):
     kind = "ova"
+    CACHE_INVENTORY = True
 
     def __init__(self, session: RestAPIUtil):
         self.resource_type = "/ovas"
@@ -49,6 +52,84 @@ class Ova(PcEntity):
             requests.append(payload)
         return self.batch_op.batch_create(request_payload_list=requests)
 
+    def file_upload(self, ova_config: Dict, **kwargs) -> Dict:
+        """
+        Upload a local OVA file to PC cluster(s). The OVA is created first, its file is uploaded in chunks, then the
+        chunks are concatenated and verified with the SHA_1 checksum of the file. If the OVA already exists, e.g. a
+        previous upload was interrupted, the file is uploaded to it.
+
+        Args:
+            ova_config (dict): Same as in url_upload, with the path of the file instead of the url
+                ova_config = {
+                        source: '/path/to/the/vm.ova',
+                        name: 'ova-name',
+                        cluster_name_list: ['cluster1', 'cluster2']
+                    }
+            kwargs: Options of the chunked upload, e.g. chunk_size, max_retries, state_dir
+
+        Returns:
+            dict: Metrics of the upload, with the uuid of the OVA
+        """
+        name = ova_config["name"]
+        kwargs.setdefault("key", self.get_upload_key(name, ova_config["source"]))
+        if not os.path.isfile(ova_config["source"]):
+            raise Exception(f"OVA file {ova_config['source']!r} of {name!r} doesn't exist")
+
+        ova = self.get_entity_by_name(name)
+        if ova:
+            ova_uuid = self.get_uuid_by_name(entity_data=ova)
+            logger.info(f"OVA {name!r} already exists, uploading its file to {ova_uuid!r}")
+        else:
+            pc_cluster = PcCluster(self.session)
+            pc_cluster.get_pe_info_list()
+            payload = {
+                "name": name,
+                "upload_cluster_ref_list": [{'kind': 'cluster', 'uuid': pc_cluster.name_uuid_map.get(cluster_name)}
+                                            for cluster_name in ova_config["cluster_name_list"]]
+            }
+            response = self.create(data=payload)
+            ova_uuid = self.__get_response_value(response, "uuid")
+            if not ova_uuid:
+                raise Exception(f"Could not create the OVA {name!r}. Error: {response}")
+            self.__wait_for_task(response, f"Creation of the OVA {name!r}")
+
+        metrics = self.upload_chunked(
+            ova_config["source"], uuid=ova_uuid, endpoint="chunks", checksum_algorithm="sha1",
+            get_headers=lambda offset, size, _: {"X-Nutanix-Upload-Offset": str(offset),
+                                                 "X-Nutanix-Upload-Size": str(size)},
+            **kwargs)
+
+        # Concatenates the chunks into the OVA, the checksum is verified by PC
+        payload = {
+            "name": name,
+            "checksum": {
+                "checksum_algorithm": "SHA_1",
+                "checksum_value": metrics["checksum"]
+            }
+        }
+        response = self.create(endpoint=f"{ova_uuid}/chunks/concatenate", data=payload)
+        self.__wait_for_task(response, f"Upload of the OVA {name!r}")
+        return {**metrics, "uuid": ova_uuid}
+
+    @staticmethod
+    def __get_response_value(response, key: str) -> Optional[str]:
+        if not isinstance(response, dict):
+            return None
+        if key == "task_uuid":
+            return response.get("task_uuid") or response.get("status", {}).get("execution_context", {}).get(
+                "task_uuid")
+        return response.get(key) or response.get("metadata", {}).get(key)
+
+    def __wait_for_task(self, response, action: str):
+        task_uuid = self.__get_response_value(response, "task_uuid")
+        if not task_uuid:
+            return
+        task_op = PcTaskMonitor(self.session, task_uuid_list=[task_uuid])
+        task_op.DEFAULT_TIMEOUT_IN_SEC = 3600
+        app_response, status = task_op.monitor()
+        if app_response or not status:
+            raise Exception(f"{action} failed. {app_response}")
+
     def get_vm_spec_from_ova_uuid(self, ova_uuid):
         """
         Get vm creation spec from OVA
@@ -1,5 +1,6 @@
-from typing import List
+from typing import Generator, List
 from framework.helpers.v4_api_client import ApiClientV4
+from ..inventory_cache import InventoryCache
 from ..pc_batch_op_v4 import PcBatchOpv4
 
 import ntnx_prism_py_client
@@ -45,6 +46,10 @@ class Category:
         #Skipping This Method as it is not required in v4 API but only in v3 API
 
     def categories_with_values(self) -> List:
+        return InventoryCache.get_instance(self.client).get(f"{self.resource_type}/values",
+                                                            self.__list_categories_with_values)
+
+    def __list_categories_with_values(self) -> List:
         categories_response = self.get_categories()
         category_value_dict = {}
         for category in categories_response["data"]:
@@ -57,6 +62,18 @@ class Category:
 
     def batch_values_add(self, category_list: List):
         # This method does Create Values with Category.
+        batch_payload = self.__get_values_add_payload(category_list)
+        InventoryCache.invalidate_endpoint(self.client, self.resource_type)
+        return self.batch_op.batch_create(request_payload_list = batch_payload)
+
+    def iter_batch_values_add(self, category_list: List) -> Generator[List, None, None]:
+        # Same as batch_values_add, the Task UUIDs are returned batch by batch as the batches complete
+        batch_payload = self.__get_values_add_payload(category_list)
+        InventoryCache.invalidate_endpoint(self.client, self.resource_type)
+        yield from self.batch_op.iter_batch_create(request_payload_list=batch_payload)
+
+    @staticmethod
+    def __get_values_add_payload(category_list: List) -> List:
         batch_payload = []
         
         for category in category_list:
@@ -70,7 +87,7 @@ class Category:
                 if description:
                     data["description"] = description
                 batch_payload.append(data)
-        return self.batch_op.batch_create(request_payload_list = batch_payload)
+        return batch_payload
 
     def batch_delete_values(self, category_name: str, values: List):
         # This method does Delete Values with Category.
@@ -80,6 +97,7 @@ class Category:
             category_obj = self.categories_api.get_category_by_id(extId)
             etag = self.client.get_etag(category_obj.data)
             batch_payload.append((extId, etag))
+        InventoryCache.invalidate_endpoint(self.client, self.resource_type)
         return self.batch_op.batch_delete(batch_payload)
 
     @staticmethod
@@ -0,0 +1,208 @@
+import collections
+import concurrent.futures
+import contextlib
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Any
+
+from framework.helpers.log_utils import get_logger
+from framework.helpers.rest_utils import pool_maxsize
+
+logger = get_logger(__name__)
+
+
+class WorkerBudget:
+    """
+    Process-wide budget of worker threads, shared by all the parallel BatchScripts, ClusterScripts and CvmScripts.
+
+    Every map call runs its items on the calling thread plus as many helper threads as the budget has free. Nested
+    maps (pod -> block -> PC -> NKE ...) borrow helpers from the same budget instead of creating their own pool, so
+    the total number of threads is bounded, and as the caller always runs items itself, a nested map never waits
+    for a worker held by its parent.
+
+    Items can be tagged with a host. At most max_per_host items run at a time against the same host, aligned with the
+    connection pool size of a session, so the threads don't stall on pool_block waiting for a free connection.
+    """
+    _instance = None
+    _lock = threading.Lock()
+    DEFAULT_MAX_WORKERS = 32
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_per_host: int = pool_maxsize):
+        """
+        Args:
+          max_workers(int, optional): Maximum number of helper threads shared by all the maps
+          max_per_host(int, optional): Maximum number of items running at a time against the same host
+        """
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.slots = threading.Semaphore(max_workers)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                              thread_name_prefix="Thread-Worker")
+        self.host_lock = threading.Lock()
+        self.host_slots: Dict[str, threading.Semaphore] = {}
+        # Hosts whose slot is held by the current thread, nested items against the same host don't take another one
+        self.local = threading.local()
+        self.metrics_lock = threading.Lock()
+        self.metrics = {"maps": 0, "items": 0, "helpers": 0, "helpers_denied": 0, "queued": 0, "max_queued": 0,
+                        "queue_wait_secs": 0.0, "max_queue_wait_secs": 0.0, "host_wait_secs": 0.0}
+
+    @classmethod
+    def get_instance(cls) -> 'WorkerBudget':
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = WorkerBudget()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, max_workers: Optional[int] = None, max_per_host: Optional[int] = None) -> 'WorkerBudget':
+        """
+        Replace the process-wide budget, to be called before the scripts are started
+        """
+        with cls._lock:
+            cls._instance = WorkerBudget(max_workers=max_workers or cls.DEFAULT_MAX_WORKERS,
+                                         max_per_host=max_per_host or pool_maxsize)
+            return cls._instance
+
+    def map(self, func: Callable, *iterables: Iterable, max_workers: Optional[int] = None,
+            host: Optional[Callable[..., Optional[str]]] = None, return_exceptions: bool = False) -> List:
+        """
+        Same as ThreadPoolExecutor.map, but the items are run on the calling thread and on the helpers of the budget
+
+        Args:
+          func(callable): Function called with one item of every iterable
+          max_workers(int, optional): Maximum number of items of this map running at a time, including the caller
+          host(callable, optional): Called with the same arguments as func, returns the host the item runs against
+          return_exceptions(bool, optional): Return the exceptions in the results instead of raising the first one
+
+        Returns:
+          list: Results in the order of the items
+        """
+        items = collections.deque(enumerate(zip(*iterables)))
+        results: List[Any] = [None] * len(items)
+        errors: Dict[int, Exception] = {}
+        if not items:
+            return results
+
+        queue_lock = threading.Lock()
+        # The helpers work on behalf of the caller, they hold the same hosts
+        held_hosts = set(self.__get_held_hosts())
+        start_time = time.time()
+        self.__record_queued(len(items))
+
+        def worker():
+            while True:
+                with queue_lock:
+                    if not items:
+                        return
+                    index, args = items.popleft()
+                self.__record_wait(time.time() - start_time)
+                try:
+                    with self.__host_slot(host(*args) if host else None):
+                        results[index] = func(*args)
+                except Exception as e:
+                    errors[index] = e
+
+        helpers = []
+        for _ in range(min(max_workers or len(items), len(items)) - 1):
+            if not self.slots.acquire(blocking=False):
+                self.__record_helpers(0, denied=1)
+                break
+            helpers.append(self.executor.submit(self.__helper, worker, held_hosts))
+        self.__record_helpers(len(helpers))
+
+        worker()
+        concurrent.futures.wait(helpers)
+
+        if return_exceptions:
+            for index, error in errors.items():
+                results[index] = error
+        elif errors:
+            raise errors[min(errors)]
+        return results
+
+    def submit(self, func: Callable, *args, host: Optional[str] = None) -> Optional[concurrent.futures.Future]:
+        """
+        Run one item on a helper of the budget, for the callers scheduling their own items, e.g. WorkflowScript
+
+        Args:
+          func(callable): Function called with args
+          host(str, optional): Host the item runs against, same as in map
+
+        Returns:
+          Future: Resolved with the result of func, None if the budget has no free helper
+        """
+        if not self.slots.acquire(blocking=False):
+            self.__record_helpers(0, denied=1)
+            return None
+        self.__record_helpers(1)
+        held_hosts = set(self.__get_held_hosts())
+
+        def item():
+            self.local.hosts = set(held_hosts)
+            try:
+                with self.__host_slot(host):
+                    return func(*args)
+            finally:
+                self.local.hosts = set()
+                self.slots.release()
+
+        return self.executor.submit(item)
+
+    def get_metrics(self) -> Dict:
+        with self.metrics_lock:
+            metrics = dict(self.metrics)
+        metrics["free_workers"] = self.slots._value
+        return metrics
+
+    def __helper(self, worker: Callable, held_hosts: Set[str]):
+        self.local.hosts = set(held_hosts)
+        try:
+            worker()
+        finally:
+            self.local.hosts = set()
+            self.slots.release()
+
+    def __get_held_hosts(self) -> Set[str]:
+        if not hasattr(self.local, "hosts"):
+            self.local.hosts = set()
+        return self.local.hosts
+
+    @contextlib.contextmanager
+    def __host_slot(self, host: Optional[str]):
+        held = self.__get_held_hosts()
+        if not host or host in held:
+            yield
+            return
+
+        with self.host_lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.Semaphore(self.max_per_host)
+            semaphore = self.host_slots[host]
+        start_time = time.time()
+        semaphore.acquire()
+        with self.metrics_lock:
+            self.metrics["host_wait_secs"] += time.time() - start_time
+        held.add(host)
+        try:
+            yield
+        finally:
+            held.discard(host)
+            semaphore.release()
+
+    def __record_queued(self, count: int):
+        with self.metrics_lock:
+            self.metrics["maps"] += 1
+            self.metrics["items"] += count
+            self.metrics["queued"] += count
+            self.metrics["max_queued"] = max(self.metrics["max_queued"], self.metrics["queued"])
+
+    def __record_wait(self, wait: float):
+        with self.metrics_lock:
+            self.metrics["queued"] -= 1
+            self.metrics["queue_wait_secs"] += wait
+            self.metrics["max_queue_wait_secs"] = max(self.metrics["max_queue_wait_secs"], wait)
+
+    def __record_helpers(self, count: int, denied: int = 0):
+        with self.metrics_lock:
+            self.metrics["helpers"] += count
+            self.metrics["helpers_denied"] += denied
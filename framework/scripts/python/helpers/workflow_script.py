@@ -0,0 +1,331 @@
+import concurrent.futures
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Iterable
+from framework.helpers.log_utils import get_logger
+from .batch_script import BatchScript
+from .worker_budget import WorkerBudget
+
+logger = get_logger(__name__)
+
+
+class WorkflowNode:
+    """
+    A script in the workflow, with its prerequisites
+    """
+
+    def __init__(self, script, name: str, scope: str, depends_on: Iterable[str], requires: Iterable[str],
+                 provides: Iterable[str], endpoint: Optional[str], weight: float, results_path: Iterable[str],
+                 group: Optional[str]):
+        self.script = script
+        self.name = name
+        self.scope = scope
+        self.depends_on = set(depends_on)
+        self.requires = set(requires)
+        self.provides = set(provides)
+        self.endpoint = endpoint
+        self.weight = weight
+        self.results_path = list(results_path)
+        self.group = group
+        # Filled while building the graph
+        self.prerequisites = set()
+        self.dependants = set()
+        # Longest path (sum of weights) from this node to the end of the workflow
+        self.priority = 0
+        # Timing
+        self.start_time = None
+        self.end_time = None
+        self.status = "PENDING"
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.start_time is None or self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+
+class WorkflowScript(BatchScript):
+    """
+    Run scripts as a DAG. Every script starts as soon as its prerequisites are done, instead of waiting for the whole
+    stage of a nested BatchScript to complete.
+
+    Prerequisites of a script are
+      - the script names in the DEPENDS_ON attribute of the script, in the same scope
+      - the node names passed in depends_on while adding the script
+      - all the nodes providing a resource that the script requires
+    Prerequisites that are not part of the workflow are ignored, as the script is not configured.
+
+    Ready scripts are started in the order of the longest path to the end of the workflow (critical path first),
+    within the limits of max_workers, max_per_endpoint and max_active_groups. They run on the helpers of the
+    WorkerBudget, so they count against the process-wide and per-host limits like the maps of the other scripts.
+    """
+
+    def __init__(self, results_key: str = "", max_per_endpoint: Optional[int] = None,
+                 max_active_groups: Optional[int] = None, **kwargs):
+        """
+        Constructor for WorkflowScript.
+        Args:
+          results_key(str, optional): Same as BatchScript
+          max_per_endpoint(int, optional): Maximum number of scripts running at a time against the same endpoint
+          max_active_groups(int, optional): Maximum number of groups in progress at a time. A group is in progress
+            from the start of its first script till the end of its last script
+          kwargs(dict):
+            max_workers(int, optional): Maximum number of scripts running at a time
+            state_store(SectionStateStore, optional): Same as BatchScript, the endpoint of every node is used
+        """
+        super(WorkflowScript, self).__init__(results_key=results_key, parallel=True, **kwargs)
+        self.max_per_endpoint = max_per_endpoint
+        self.max_active_groups = max_active_groups
+        self.nodes: Dict[str, WorkflowNode] = {}
+
+    def add(self, script, name: Optional[str] = None, scope: str = "", depends_on: Iterable[str] = (),
+            requires: Iterable[str] = (), provides: Iterable[str] = (), endpoint: Optional[str] = None,
+            weight: float = 1, results_path: Iterable[str] = (), group: Optional[str] = None) -> Optional[str]:
+        """
+        Add one script
+
+        Args:
+          script(Script): The script object to be added to the workflow
+          name(str, optional): Name of the node, "<scope>/<script name>" by default
+          scope(str, optional): DEPENDS_ON of the script is resolved with the scripts in the same scope
+          depends_on(list, optional): Names of the nodes that need to complete before this script
+          requires(list, optional): Resources that need to be ready before this script
+          provides(list, optional): Resources that are ready once this script is complete
+          endpoint(str, optional): Endpoint the script runs against, used for max_per_endpoint
+          weight(float, optional): Estimated duration of the script, used to find the critical path
+          results_path(list, optional): Keys under which the results of the script are consolidated
+          group(str, optional): Group of the script, used for max_active_groups and get_group_report
+
+        Returns:
+          str: Name of the node
+        """
+        if not script:
+            logger.error("Script is none, returning.")
+            return None
+        name = name or self.get_node_name(scope, getattr(script, "name", type(script).__name__))
+        if name in self.nodes:
+            raise Exception(f"Script {name!r} is already added to the workflow")
+
+        self.nodes[name] = WorkflowNode(script, name, scope, depends_on, requires, provides, endpoint, weight,
+                                        results_path, group)
+        self.script_list.append(script)
+        return name
+
+    def add_all(self, script_list, **kwargs):
+        """
+        Add a list of scripts, with the same prerequisites
+
+        Returns:
+          list: Names of the nodes
+        """
+        return [self.add(script, **kwargs) for script in script_list or []]
+
+    @staticmethod
+    def get_node_name(scope: str, script_name: str) -> str:
+        return f"{scope}/{script_name}" if scope else script_name
+
+    def get_timings(self) -> List[Dict]:
+        """
+        Start, end and duration of the nodes in the order they were started
+        """
+        timings = [
+            {
+                "name": node.name,
+                "status": node.status,
+                "start_time": node.start_time,
+                "end_time": node.end_time,
+                "duration": node.duration
+            }
+            for node in self.nodes.values()
+        ]
+        return sorted(timings, key=lambda timing: (timing["start_time"] is None, timing["start_time"] or 0))
+
+    def get_group_report(self) -> Dict[str, Dict]:
+        """
+        Start, end, duration and failed scripts of every group
+        """
+        report = {}
+        for node in self.nodes.values():
+            if not node.group:
+                continue
+            group = report.setdefault(node.group, {"scripts": 0, "failed": [], "start_time": None,
+                                                   "end_time": None, "duration": None})
+            group["scripts"] += 1
+            if node.status == "FAILED":
+                group["failed"].append(node.name)
+            if node.start_time is not None:
+                group["start_time"] = min(group["start_time"] or node.start_time, node.start_time)
+            if node.end_time is not None:
+                group["end_time"] = max(group["end_time"] or node.end_time, node.end_time)
+        for group in report.values():
+            if group["start_time"] is not None and group["end_time"] is not None:
+                group["duration"] = group["end_time"] - group["start_time"]
+        return report
+
+    def run(self):
+        """
+        Execute all the scripts in the order of the DAG
+
+        Returns:
+          Same as BatchScript
+        """
+        if self.nodes:
+            self._build_graph()
+            self._graph_execute()
+            self._log_timings()
+
+        return {self.results_key: self.results} if self.results_key else self.results
+
+    def _build_graph(self):
+        providers = {}
+        for node in self.nodes.values():
+            for resource in node.provides:
+                providers.setdefault(resource, set()).add(node.name)
+
+        for node in self.nodes.values():
+            declared = {self.get_node_name(node.scope, dependency)
+                        for dependency in getattr(node.script, "DEPENDS_ON", [])}
+            for dependency in declared | node.depends_on:
+                if dependency in self.nodes:
+                    node.prerequisites.add(dependency)
+                else:
+                    logger.debug(f"{node.name}: prerequisite {dependency!r} is not part of the workflow, ignoring")
+            for resource in node.requires:
+                node.prerequisites.update(providers.get(resource, set()) - {node.name})
+            for prerequisite in node.prerequisites:
+                self.nodes[prerequisite].dependants.add(node.name)
+
+        # Longest path to the end of the workflow, in reverse topological order. Also detects cycles
+        for name in reversed(self._topological_order()):
+            node = self.nodes[name]
+            node.priority = node.weight + max(
+                (self.nodes[dependant].priority for dependant in node.dependants), default=0)
+
+    def _topological_order(self) -> List[str]:
+        pending = {name: len(node.prerequisites) for name, node in self.nodes.items()}
+        ready = [name for name, count in pending.items() if not count]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependant in self.nodes[name].dependants:
+                pending[dependant] -= 1
+                if not pending[dependant]:
+                    ready.append(dependant)
+
+        if len(order) != len(self.nodes):
+            cycle = sorted(set(self.nodes) - set(order))
+            raise Exception(f"Cyclic dependency between the scripts {cycle}")
+        return order
+
+    def _graph_execute(self):
+        pending = {name: len(node.prerequisites) for name, node in self.nodes.items()}
+        counter = itertools.count()
+        ready = []
+        for name, count in pending.items():
+            if not count:
+                heapq.heappush(ready, (-self.nodes[name].priority, next(counter), name))
+
+        running: Dict[concurrent.futures.Future, WorkflowNode] = {}
+        endpoint_usage: Dict[str, int] = {}
+        # Scripts of the group that are not complete yet, and the groups in progress
+        group_remaining: Dict[str, int] = {}
+        for node in self.nodes.values():
+            if node.group:
+                group_remaining[node.group] = group_remaining.get(node.group, 0) + 1
+        active_groups = set()
+
+        # The nodes run on the helpers of the process-wide budget, along with the maps of the other scripts
+        while ready or running:
+            deferred = []
+            while ready and len(running) < self.max_workers:
+                item = heapq.heappop(ready)
+                node = self.nodes[item[2]]
+                if (self.max_per_endpoint and node.endpoint and
+                        endpoint_usage.get(node.endpoint, 0) >= self.max_per_endpoint):
+                    deferred.append(item)
+                    continue
+                if (self.max_active_groups and node.group and node.group not in active_groups and
+                        len(active_groups) >= self.max_active_groups):
+                    deferred.append(item)
+                    continue
+                if not self.__start(node, running, endpoint_usage, active_groups):
+                    # No free helper in the budget, wait for a running node
+                    deferred.append(item)
+                    break
+            if not running and deferred:
+                # Either a group is waiting on a group that can't start or the budget has no free helper, don't
+                # block forever, the node runs on this thread if needed
+                item = deferred.pop(0)
+                self.__start(self.nodes[item[2]], running, endpoint_usage, active_groups, inline=True)
+            for item in deferred:
+                heapq.heappush(ready, item)
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                node.end_time = time.time()
+                if node.endpoint:
+                    endpoint_usage[node.endpoint] -= 1
+                if node.group:
+                    group_remaining[node.group] -= 1
+                    if not group_remaining[node.group]:
+                        active_groups.discard(node.group)
+                try:
+                    result = future.result()
+                    for key in reversed(node.results_path):
+                        result = {key: result}
+                    self.results = result
+                    # Script.run catches the errors of the script in its exceptions
+                    node.status = "FAILED" if getattr(node.script, "exceptions", None) else "COMPLETED"
+                except Exception as e:
+                    # Same as BatchScript, the dependants still run
+                    node.status = "FAILED"
+                    logger.error(f"{node.name}: {e}")
+
+                for dependant in node.dependants:
+                    pending[dependant] -= 1
+                    if not pending[dependant]:
+                        heapq.heappush(ready, (-self.nodes[dependant].priority, next(counter), dependant))
+
+    def __start(self, node: WorkflowNode, running: Dict[concurrent.futures.Future, WorkflowNode],
+                endpoint_usage: Dict[str, int], active_groups: set, inline: bool = False) -> bool:
+        """
+        Start the node on a helper of the WorkerBudget
+
+        Args:
+          inline(bool, optional): Run the node on the calling thread if the budget has no free helper
+
+        Returns:
+          bool: False if the node isn't started, the budget has no free helper
+        """
+        start_time = time.time()
+        future = WorkerBudget.get_instance().submit(self.run_script, node.script, node.endpoint, host=node.endpoint)
+        if future is None:
+            if not inline:
+                return False
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(self.run_script(node.script, node.endpoint))
+            except Exception as e:
+                future.set_exception(e)
+
+        if node.endpoint:
+            endpoint_usage[node.endpoint] = endpoint_usage.get(node.endpoint, 0) + 1
+        if node.group:
+            active_groups.add(node.group)
+        node.status = "RUNNING"
+        node.start_time = start_time
+        running[future] = node
+        return True
+
+    def _log_timings(self):
+        timings = self.get_timings()
+        started = [timing for timing in timings if timing["start_time"] is not None]
+        if not started:
+            return
+        wall_time = max(timing["end_time"] for timing in started) - started[0]["start_time"]
+        for timing in started:
+            logger.debug(f"{timing['name']}: {timing['status']} in {timing['duration']:.2f} seconds")
+        logger.info(f"Workflow {self.results_key or self.name!r}: {len(started)} scripts in {wall_time:.2f} seconds")
@@ -11,6 +11,7 @@ class AddDirectoryServices(Script):
     """
     Class that adds DirectoryService in Objects
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.data = data
         self.v4_api_util = self.data["v4_api_util"]
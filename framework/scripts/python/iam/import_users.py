@@ -11,6 +11,7 @@ class ImportUsers(Script):
     """
     Class that imports Users to PC
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.data = data
         self.v4_api_util = self.data["v4_api_util"]
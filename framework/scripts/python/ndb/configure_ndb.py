@@ -1,6 +1,6 @@
 import traceback
 from copy import deepcopy
-from typing import Dict
+from typing import Dict, Optional
 from framework.helpers.rest_utils import RestAPIUtil
 from framework.scripts.python.helpers.ndb.operations import Operation
 from framework.scripts.python.helpers.ndb.profiles import Profile
@@ -12,6 +12,7 @@ from framework.scripts.python.pe.upload.upload_image import UploadImagePe
 from framework.scripts.python.pe.create.create_vm_pe import CreateVmPe
 from framework.scripts.python.pe.other_ops.power_transition_vm_pe import PowerTransitionVmPe
 from framework.scripts.python.helpers.batch_script import BatchScript
+from framework.scripts.python.helpers.section_state import SectionStateStore, get_hash
 from framework.scripts.python.helpers.ndb.auth import Auth
 from framework.scripts.python.helpers.ndb.clusters import Cluster
 from framework.scripts.python.helpers.ndb.config import Config
@@ -31,6 +32,7 @@ class NdbConfig(Script):
 
     DEFAULT_USERNAME = "admin"
     DEFAULT_SYSTEM_PASSWORD = "Nutanix/4u"
+    SECTION_KEYS = ["ndb"]
 
     def __init__(self, data: Dict, **kwargs):
         self.ndb_ip = self.config_op = self.resource_op = self.cluster_op = self.ndb_session = self.setting_op = \
@@ -41,6 +43,37 @@ class NdbConfig(Script):
         self.ndb_config = self.data.get("ndb")
         self.logger = self.logger or logger
 
+    def run(self, **kwargs):
+        # Skip the whole NDB config if it is unchanged since its last verified run, if section_state is configured
+        state_store = SectionStateStore.from_config(self.data)
+        deployment_config = (self.ndb_config or {}).get("deployment_cluster") or {}
+        endpoint = deployment_config.get("ndb_vm_name")
+        if not state_store or not endpoint:
+            return super(NdbConfig, self).run(**kwargs)
+        return state_store.run(self, endpoint, runner=lambda: super(NdbConfig, self).run(**kwargs))
+
+    def get_remote_fingerprint(self) -> Optional[str]:
+        """
+        Clusters and profiles registered in NDB, None if the NDB VM doesn't have an IP yet
+        """
+        deployment_config = self.ndb_config["deployment_cluster"]
+        cluster_ip = deployment_config["cluster_ip"]
+        data = {"clusters": {cluster_ip: {"pe_credential": deployment_config["pe_credential"]}}}
+        create_pe_objects(data=data, global_data=self.data)
+        vm_info = VM(data["clusters"][cluster_ip]["pe_session"]).get_vm_info(
+            vm_name_list=[deployment_config["ndb_vm_name"]])
+        if not vm_info or not vm_info[0].get("ipAddresses"):
+            return None
+
+        ndb_config = {**self.ndb_config, "ndb_ip": vm_info[0]["ipAddresses"][0]}
+        create_ndb_objects(ndb_config, global_data=self.data)
+        ndb_session = ndb_config["ndb_session"]
+        return get_hash({
+            "clusters": sorted(cluster.get("name") or "" for cluster in Cluster(ndb_session).list()),
+            "profiles": sorted((profile.get("type") or "", profile.get("name") or "")
+                               for profile in Profile(ndb_session).list())
+        })
+
     def execute(self):
         try:
             if not self.ndb_config:
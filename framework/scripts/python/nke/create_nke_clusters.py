@@ -2,9 +2,9 @@ from copy import deepcopy
 from typing import Dict
 from framework.helpers.log_utils import get_logger
 from framework.scripts.python.helpers.karbon.karbon_clusters import KarbonCluster, KarbonClusterV1
-from framework.scripts.python.helpers.karbon.karbon_image import KarbonImage
-from framework.scripts.python.helpers.state_monitor.karbon_image_monitor import KarbonImageDownloadMonitor
+from framework.scripts.python.helpers.karbon.karbon_image_downloads import KarbonImageDownloads
 from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
 from framework.scripts.python.script import Script
 
 logger = get_logger(__name__)
@@ -18,6 +18,7 @@ class CreateKarbonClusterPc(Script):
     def __init__(self, data: Dict, global_data: Dict = None, **kwargs):
         self.task_uuid_list = []
         self.response = None
+        self.karbon_cluster_v1 = self.image_downloads = None
         self.data = data
         self.global_data = deepcopy(global_data) if global_data else {}
         self.pc_session = self.data["pc_session"]
@@ -25,7 +26,6 @@ class CreateKarbonClusterPc(Script):
         self.logger = self.logger or logger
 
     def execute(self, **kwargs):
-        pass
         try:
             if not self.data.get("nke_clusters"):
                 self.logger.warning(f"Skipping NKE Clusters creation in {self.data['pc_ip']!r}")
@@ -35,86 +35,58 @@ class CreateKarbonClusterPc(Script):
             if not self.data.get("vault_to_use"):
                 self.data["vault_to_use"] = self.global_data.get("vault_to_use")
             karbon_cluster = KarbonCluster(self.pc_session)
-            karbon_cluster_v1 = KarbonClusterV1(self.pc_session, self.data)
+            self.karbon_cluster_v1 = KarbonClusterV1(self.pc_session, self.data)
             existing_clusters_list = karbon_cluster.list()
             existing_clusters_name_list = [existing_cluster.get("cluster_metadata", {}).get("name")
                                            for existing_cluster in existing_clusters_list]
 
-            image_op = KarbonImage(self.pc_session)
-            available_images = image_op.list()
-            available_images_version_list = {available_image.get("version"): available_image
-                                             for available_image in available_images if available_image.get("version")}
-
-            # First download the os_images in all nke_clusters
-            images_to_download = set()
-            for cluster_to_create in self.data["nke_clusters"]:
-                os_version = cluster_to_create.get("host_os")
-                if os_version not in available_images_version_list:
-                    continue
-
-                image_obj = available_images_version_list[os_version]
-                if image_obj.get("status") == KarbonImage.AVAILABLE and image_obj.get("uuid"):
-                    images_to_download.add(image_obj["uuid"])
-
-            for image_to_download in images_to_download:
-                self.logger.info(f"Downloading the os-image '{image_to_download}'...")
-                response = image_op.download(image_to_download)
-                if not response.get("image_uuid"):
-                    self.logger.error("Downloading image failed")
-                    continue
-                image_uuid = response["image_uuid"]
-                response, status = KarbonImageDownloadMonitor(self.pc_session, image_uuid).monitor()
-
-                if not status:
-                    self.logger.error(f"Downloading image failed. {response}")
-                self.logger.error("Downloaded the image successfully")
-
+            clusters_to_create = []
             for cluster_to_create in self.data["nke_clusters"]:
                 name = cluster_to_create.get("name")
+                if name in existing_clusters_name_list:
+                    self.logger.warning(f"NKE cluster with name '{name}' already exists in {self.data['pc_ip']!r}!")
+                    continue
+                clusters_to_create.append(cluster_to_create)
+            if not clusters_to_create:
+                return
 
-                cluster_exists = name in existing_clusters_name_list
-
-                try:
-                    # Category is already there, just need to add values to the category
-                    if cluster_exists:
-                        self.logger.warning(f"NKE cluster with name '{name}' already exists in {self.data['pc_ip']!r}!")
-                        continue
-                    else:
-
-                        os_version = cluster_to_create.get("host_os")
-                        if os_version not in available_images_version_list:
-                            self.logger.warning(f"Specified '{os_version}' version is not available to download!")
-                            continue
-
-                        image_obj = available_images_version_list[os_version]
-                        if image_obj.get("status") != KarbonImage.DOWNLOADED:
-                            self.logger.error("Image doesn't exist!")
-
-                        # create nke cluster
-                        self.logger.info(f"Creating new NKE cluster '{name}'")
-                        spec = karbon_cluster_v1.get_payload(cluster_to_create)
-                        response = karbon_cluster_v1.create(data=spec)
-
-                        if response.get("task_uuid"):
-                            self.task_uuid_list.append(response.get("task_uuid"))
-
-                        cluster_uuid = response.get("cluster_uuid")
-                        self.logger.debug(cluster_uuid)
-                except Exception as e:
-                    self.exceptions.append(f"Failed to create NKE cluster {name}: {e}")
+            # The downloads are shared with the NKE clusters of the other edge sites of the PC. All the images are
+            # requested first, then every cluster is created as soon as its own image is downloaded
+            self.image_downloads = KarbonImageDownloads.get_instance(
+                self.pc_session, self.data.get("nke_max_parallel_deployments"))
+            for cluster_to_create in clusters_to_create:
+                self.image_downloads.get_image(cluster_to_create.get("host_os"))
+
+            results = WorkerBudget.get_instance().map(self.__create_cluster, clusters_to_create,
+                                                      max_workers=len(clusters_to_create), return_exceptions=True)
+            for cluster_to_create, result in zip(clusters_to_create, results):
+                if isinstance(result, Exception):
+                    self.exceptions.append(f"Failed to create NKE cluster {cluster_to_create.get('name')}: {result}")
+        except Exception as e:
+            self.exceptions.append(e)
 
-            if self.task_uuid_list:
-                app_response, status = TaskMonitor(self.pc_session,
-                                                   task_uuid_list=self.task_uuid_list).monitor()
+    def __create_cluster(self, cluster_to_create: Dict):
+        name = cluster_to_create.get("name")
+        self.image_downloads.wait_for_image(cluster_to_create.get("host_os"))
 
-                if app_response:
-                    self.exceptions.append(f"Some tasks have failed. {app_response}")
+        with self.image_downloads.deployment_slot():
+            # create nke cluster
+            self.logger.info(f"Creating new NKE cluster '{name}'")
+            spec = self.karbon_cluster_v1.get_payload(cluster_to_create)
+            response = self.karbon_cluster_v1.create(data=spec)
+            self.logger.debug(response.get("cluster_uuid"))
 
-                if not status:
-                    self.exceptions.append(
-                        "Timed out. Creating NKE Clusters in PC didn't happen in the prescribed timeframe")
-        except Exception as e:
-            self.exceptions.append(e)
+            task_uuid = response.get("task_uuid")
+            if not task_uuid:
+                return
+            self.task_uuid_list.append(task_uuid)
+            # The deployment slot is held till the cluster is deployed
+            app_response, status = TaskMonitor(self.pc_session, task_uuid_list=[task_uuid]).monitor()
+
+            if app_response:
+                raise Exception(f"Deployment task has failed. {app_response}")
+            if not status:
+                raise Exception("Timed out. Creating NKE Cluster in PC didn't happen in the prescribed timeframe")
 
     def verify(self, **kwargs):
         if not self.data.get("nke_clusters"):
@@ -11,6 +11,7 @@ class CreateBucket(Script):
     """
     Class that creates buckets
     """
+
     OWNER_UID = 19395
     OWNER_GID = 10000
     FILE_PERMISSION = "rw-rw-rw-"
@@ -7,6 +7,7 @@ from framework.scripts.python.iam.import_users import ImportUsers
 from framework.scripts.python.objects.buckets.create_bucket import CreateBucket
 from framework.scripts.python.objects.buckets.share_bucket import ShareBucket
 from framework.scripts.python.helpers.batch_script import BatchScript
+from framework.scripts.python.helpers.section_state import SectionStateStore
 from framework.scripts.python.script import Script
 from framework.helpers.log_utils import get_logger
 
@@ -17,6 +18,8 @@ class OssConfig(Script):
     """
     Configure Objects with below configs
     """
+    # The objectstore deployment resolves and syncs time through the DNS and NTP servers of the PC
+    DEPENDS_ON = ["AddNtpServersPc", "AddNameServersPc"]
 
     def __init__(self, data: Dict, global_data: Dict, results_key: str = "", log_file: Optional[str] = None, **kwargs):
         self.data = deepcopy(data)
@@ -32,7 +35,9 @@ class OssConfig(Script):
         if not self.data.get("vault_to_use"):
             self.data["vault_to_use"] = self.global_data.get("vault_to_use")
 
-        objects_batch_scripts = BatchScript(results_key=self.results_key)
+        objects_batch_scripts = BatchScript(results_key=self.results_key,
+                                            state_store=SectionStateStore.from_config(self.data, self.global_data),
+                                            endpoint=self.data.get("pc_ip"))
 
         if "enable_objects" in self.data and self.data["enable_objects"] is True:
             objects_batch_scripts.add(EnableObjects(self.data, log_file=self.log_file))
@@ -1,7 +1,8 @@
-from typing import Dict
+from typing import Dict, Optional
 from framework.helpers.log_utils import get_logger
 from framework.scripts.python.helpers.state_monitor.objectstore_monitor import ObjectstoreMonitor
 from framework.scripts.python.helpers.objects.objectstore import ObjectStore
+from framework.scripts.python.helpers.section_state import get_hash
 from framework.scripts.python.script import Script
 
 logger = get_logger(__name__)
@@ -11,6 +12,7 @@ class CreateObjectStore(Script):
     """
     Class that creates Objectstores
     """
+    SECTION_KEYS = ["objects"]
 
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid_list = []
@@ -49,6 +51,11 @@ class CreateObjectStore(Script):
         except Exception as e:
             self.exceptions.append(e)
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        names = {object_store["name"] for object_store in self.object_stores_to_create}
+        return get_hash({object_store.get("name"): object_store.get("state")
+                         for object_store in ObjectStore(self.pc_session).list() if object_store.get("name") in names})
+
     def verify(self, **kwargs):
         if not self.object_stores_to_create:
             return
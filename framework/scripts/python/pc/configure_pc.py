@@ -19,7 +19,8 @@ from framework.scripts.python.pc.enable.enable_network_controller import EnableN
 from framework.scripts.python.pc.enable.enable_nke_pc import EnableNke
 from framework.scripts.python.pc.enable.enable_marketplace import EnableMarketplace
 from framework.scripts.python.pc.enable.enable_foundation_central import EnableFC
-from framework.scripts.python.helpers.batch_script import BatchScript
+from framework.scripts.python.helpers.section_state import SectionStateStore
+from framework.scripts.python.helpers.workflow_script import WorkflowScript
 from framework.scripts.python.script import Script
 from framework.scripts.python.pc.create.add_ad_server_pc import AddAdServerPc
 from framework.scripts.python.pc.create.add_name_server_pc import AddNameServersPc
@@ -56,91 +57,82 @@ class PcConfig(Script):
             if not self.data.get("pc_session"):
                 create_pc_objects(self.data, global_data=self.global_data)
 
-            pc_batch_scripts = BatchScript(results_key=self.results_key)
+            pc_workflow = WorkflowScript(results_key=self.results_key,
+                                         state_store=SectionStateStore.from_config(self.data, self.global_data))
+            endpoint = self.data.get("pc_ip")
 
             # Initial PC config
             # Assumed this is already taken care in management config
+            initial_nodes = []
             if "new_pc_admin_credential" in self.data:
                 # todo this will change for a CMSP PC. Need to check
-                pc_batch_scripts.add(ChangeDefaultAdminPasswordPc(self.data, log_file=self.log_file))
+                initial_nodes.append(pc_workflow.add(ChangeDefaultAdminPasswordPc(self.data, log_file=self.log_file),
+                                                     endpoint=endpoint))
             if "eula" in self.data:
-                pc_batch_scripts.add(AcceptEulaPc(self.data, log_file=self.log_file))
-            if "enable_pulse" in self.data:
-                pc_batch_scripts.add(UpdatePulsePc(self.data, log_file=self.log_file))
+                initial_nodes.append(pc_workflow.add(AcceptEulaPc(self.data, log_file=self.log_file),
+                                                     depends_on=initial_nodes, endpoint=endpoint))
 
+            # Everything else needs the initial PC config. The dependencies between the scripts are declared in the
+            # DEPENDS_ON of the scripts
+            # Add Role-mappings -> needs AddAdServer
+            # Add Security Policies -> needs CreateAddressGroups, CreateServiceGroups
+            # create PP -> needs EnableDR
+            # create RP -> needs CreateProtectionPolicy
+            # Objects -> needs AddNtpServersPc, AddNameServersPc
+            pc_scripts = []
+            if "enable_pulse" in self.data:
+                pc_scripts.append(UpdatePulsePc(self.data, log_file=self.log_file))
             if "pc_directory_services" in self.data or "directory_services" in self.data:
-                # Add Auth -> needs PC config
-                pc_batch_scripts.add(AddAdServerPc(self.data, log_file=self.log_file))
+                pc_scripts.append(AddAdServerPc(self.data, log_file=self.log_file))
             if "pc_saml_idp_configs" in self.data or "saml_idp_configs" in self.data:
-                pc_batch_scripts.add(CreateIdp(self.data, log_file=self.log_file))
+                pc_scripts.append(CreateIdp(self.data, log_file=self.log_file))
             if "enable_marketplace" in self.data and self.data["enable_marketplace"] is True:
-                pc_batch_scripts.add(EnableMarketplace(self.data, log_file=self.log_file))
+                pc_scripts.append(EnableMarketplace(self.data, log_file=self.log_file))
 
-            # Add Role-mappings -> needs AddAdServer
-            # Add NTP servers -> InitialPcConfig
-            # Add Name servers -> InitialPcConfig
-            pc_enable_scripts = BatchScript(parallel=True)
             if "enable_microsegmentation" in self.data and self.data["enable_microsegmentation"] is True:
-                pc_enable_scripts.add(EnableMicrosegmentation(self.data, log_file=self.log_file))
+                pc_scripts.append(EnableMicrosegmentation(self.data, log_file=self.log_file))
             if "enable_dr" in self.data and self.data["enable_dr"] is True:
-                pc_enable_scripts.add(EnableDR(self.data, log_file=self.log_file))
+                pc_scripts.append(EnableDR(self.data, log_file=self.log_file))
             if "enable_nke" in self.data and self.data["enable_nke"] is True:
-                pc_enable_scripts.add(EnableNke(self.data, log_file=self.log_file))
+                pc_scripts.append(EnableNke(self.data, log_file=self.log_file))
             if "enable_fc" in self.data and self.data["enable_fc"] is True:
-                pc_enable_scripts.add(EnableFC(self.data, log_file=self.log_file))
+                pc_scripts.append(EnableFC(self.data, log_file=self.log_file))
             if "remote_azs" in self.data:
-                pc_enable_scripts.add(ConnectToAz(self.data, log_file=self.log_file))
+                pc_scripts.append(ConnectToAz(self.data, log_file=self.log_file))
             if "ntp_servers_list" in self.data or "pc_ntp_servers_list" in self.data:
-                pc_enable_scripts.add(AddNtpServersPc(self.data, log_file=self.log_file))
+                pc_scripts.append(AddNtpServersPc(self.data, log_file=self.log_file))
             if "name_servers_list" in self.data or "pc_name_servers_list" in self.data:
-                pc_enable_scripts.add(AddNameServersPc(self.data, log_file=self.log_file))
+                pc_scripts.append(AddNameServersPc(self.data, log_file=self.log_file))
             if "pc_directory_services" in self.data or "directory_services" in self.data:
-                pc_enable_scripts.add(CreateRoleMappingPc(self.data, log_file=self.log_file))
+                pc_scripts.append(CreateRoleMappingPc(self.data, log_file=self.log_file))
             if "enable_network_controller" in self.data and self.data["enable_network_controller"] is True:
-                pc_enable_scripts.add(EnableNetworkController(self.data, log_file=self.log_file))
-            if pc_enable_scripts.script_list:
-                pc_batch_scripts.add(pc_enable_scripts)
+                pc_scripts.append(EnableNetworkController(self.data, log_file=self.log_file))
 
-            # Entities without any dependencies
-            # Create Categories in PC
-            # Create AddressGroups
-            # Create ServiceGroups
-            pc_create_scripts = BatchScript(parallel=True)
             if "categories" in self.data:
-                pc_create_scripts.add(CreateCategoryPc(self.data, log_file=self.log_file))
+                pc_scripts.append(CreateCategoryPc(self.data, log_file=self.log_file))
             if "address_groups" in self.data:
-                pc_create_scripts.add(CreateAddressGroups(self.data, log_file=self.log_file))
+                pc_scripts.append(CreateAddressGroups(self.data, log_file=self.log_file))
             if "service_groups" in self.data:
-                pc_create_scripts.add(CreateServiceGroups(self.data, log_file=self.log_file))
+                pc_scripts.append(CreateServiceGroups(self.data, log_file=self.log_file))
             if "generate_fc_api_key" in self.data and self.data["generate_fc_api_key"] is True:
-                pc_create_scripts.add(GenerateFcApiKey(self.data, log_file=self.log_file))
+                pc_scripts.append(GenerateFcApiKey(self.data, log_file=self.log_file))
 
-            if pc_create_scripts.script_list:
-                pc_batch_scripts.add(pc_create_scripts)
-
-            # Entities with dependencies
-            # Add Security Policies -> needs CreateAddressGroups, CreateServiceGroups
-            # create PP -> needs EnableDR
-            pc_dependant_scripts = BatchScript(parallel=True)
             if "security_policies" in self.data:
-                pc_dependant_scripts.add(CreateNetworkSecurityPolicy(self.data, log_file=self.log_file))
+                pc_scripts.append(CreateNetworkSecurityPolicy(self.data, log_file=self.log_file))
             if "protection_rules" in self.data:
-                pc_dependant_scripts.add(CreateProtectionPolicy(self.data, log_file=self.log_file))
-
-            if pc_dependant_scripts.script_list:
-                pc_batch_scripts.add(pc_dependant_scripts)
-
-            # create RP -> needs CreateProtectionPolicy
+                pc_scripts.append(CreateProtectionPolicy(self.data, log_file=self.log_file))
             if "recovery_plans" in self.data:
-                pc_batch_scripts.add(CreateRecoveryPlan(self.data, log_file=self.log_file))
+                pc_scripts.append(CreateRecoveryPlan(self.data, log_file=self.log_file))
 
             if "objects" in self.data or "enable_objects" in self.data:
                 # Create objects
                 if self.data.get("objects", {}).get("objectstores"):
-                    pc_batch_scripts.add(OssConfig(data=deepcopy(self.data), global_data=self.data,
-                                                   results_key="objects",
-                                                   log_file="objects_ops.log"))
-            self.results.update(pc_batch_scripts.run())
+                    pc_scripts.append(OssConfig(data=deepcopy(self.data), global_data=self.data,
+                                                results_key="objects",
+                                                log_file="objects_ops.log"))
+            pc_workflow.add_all(pc_scripts, depends_on=initial_nodes, endpoint=endpoint)
+
+            self.results.update(pc_workflow.run())
             self.data["json_output"] = self.results
         except Exception as e:
             self.exceptions.append(e)
@@ -1,5 +1,6 @@
-from typing import Dict
+from typing import Dict, Optional
 from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.section_state import get_hash
 from framework.scripts.python.helpers.v1.cluster import Cluster as PcCluster
 from framework.scripts.python.script import Script
 
@@ -10,6 +11,8 @@ class AddNameServersPc(Script):
     """
     Class that adds nameservers in PC
     """
+    SECTION_KEYS = ["name_servers_list", "pc_name_servers_list"]
+
     def __init__(self, data: Dict, **kwargs):
         self.data = data
         self.pc_session = self.data["pc_session"]
@@ -34,6 +37,9 @@ class AddNameServersPc(Script):
         except Exception as e:
             self.exceptions.append(e)
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        return get_hash(sorted(PcCluster(self.pc_session).get_name_servers()))
+
     def verify(self, **kwargs):
         if not self.name_servers_list:
             return
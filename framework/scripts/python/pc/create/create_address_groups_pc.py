@@ -1,7 +1,8 @@
 import time
-from typing import Dict
+from typing import Dict, List, Optional
 from framework.helpers.log_utils import get_logger
-from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
+from framework.scripts.python.helpers.reconcile import Reconciler, get_entity_state
+from framework.scripts.python.helpers.state_monitor.task_monitor import PcBatchTaskMonitor as BatchTaskMonitor
 from framework.scripts.python.pc.pc_script import PcScript
 
 logger = get_logger(__name__)
@@ -11,6 +12,7 @@ class CreateAddressGroups(PcScript):
     """
     Class that creates Address Groups
     """
+    SECTION_KEYS = ["address_groups"]
 
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid_list = None
@@ -21,49 +23,57 @@ class CreateAddressGroups(PcScript):
         super(CreateAddressGroups, self).__init__(**kwargs)
         self.logger = self.logger or logger
         self.address_group_util = self.import_helpers_with_version_handling("AddressGroup")
+        self.plan = None
+        self.reconciler = Reconciler("Address groups", self.__list_address_groups,
+                                     get_state=lambda entity: get_entity_state(entity, "address_group"))
 
     def execute(self):
         try:
-            address_group_name_list = self.address_group_util.get_name_list()
             if not self.address_groups:
                 self.logger.warning(f"No Address Groups to create in {self.data['pc_ip']!r}. Skipping...")
                 return
 
-            ags_to_create = []
+            desired = {}
             for ag in self.address_groups:
-                if ag["name"] in address_group_name_list:
-                    self.logger.warning(f"'{ag['name']}' Address Group already exists in {self.data['pc_ip']!r}!")
-                    continue
                 try:
-                    self.logger.info(f"Creating Address Group '{ag['name']}' in {self.data['pc_ip']!r}")
-                    ags_to_create.append(self.address_group_util.create_address_group_spec(ag))
+                    desired[ag["name"]] = self.address_group_util.create_address_group_spec(ag)
                 except Exception as e:
+                    if self.reconciler.exists(ag["name"]):
+                        self.logger.warning(f"Cannot compare '{ag['name']}' with the config: {e}")
+                        desired[ag["name"]] = {}
+                        continue
                     self.exceptions.append(f"Failed to create address_group '{ag['name']}': {e}")
 
+            self.plan = self.reconciler.plan(desired)
+            self.plan.log(self.data["pc_ip"])
+            self.results["Reconcile_Address_groups"] = self.plan.summary()
+            for change in self.plan.no_ops + self.plan.updates:
+                self.logger.warning(f"'{change.name}' Address Group already exists in {self.data['pc_ip']!r}!")
+
+            ags_to_create = [change.desired for change in self.plan.creates]
             if not ags_to_create:
                 self.logger.warning(f"No Address Groups to create in {self.data['pc_ip']!r}. Skipping...")
                 return
+            for change in self.plan.creates:
+                self.logger.info(f"Creating Address Group '{change.name}' in {self.data['pc_ip']!r}")
             self.logger.info(f"Trigger batch create API for Address groups in {self.data['pc_ip']!r}")
-            self.task_uuid_list = self.address_group_util.batch_op.batch_create(request_payload_list=ags_to_create)
-            
-            # Monitor the tasks
-            if self.task_uuid_list:
-                app_response, status = PcTaskMonitor(
-                    self.pc_session,
-                    task_uuid_list=self.task_uuid_list,
-                    task_op=self.import_helpers_with_version_handling('Task')).monitor()
-
-                if app_response:
-                    self.exceptions.append(f"Some tasks have failed. {app_response}")
-
-                if not status:
-                    self.exceptions.append("Timed out. Creation of Address Groups in PC didn't happen in the"
-                                           " prescribed timeframe")        
-    
-            
+            task_monitor = BatchTaskMonitor(self.pc_session, task_op=self.import_helpers_with_version_handling('Task'))
+            app_response, status = task_monitor.monitor(
+                self.address_group_util.batch_op.iter_batch_create(request_payload_list=ags_to_create))
+            self.task_uuid_list = task_monitor.task_uuid_list
+
+            if app_response:
+                self.exceptions.append(f"Some tasks have failed. {app_response}")
+
+            if not status:
+                self.exceptions.append("Timed out. Creation of Address Groups in PC didn't happen in the"
+                                       " prescribed timeframe")
         except Exception as e:
             self.exceptions.append(e)
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        return self.reconciler.get_fingerprint(ag["name"] for ag in self.address_groups or [])
+
     def verify(self):
         if not self.address_groups:
             return
@@ -71,17 +81,24 @@ class CreateAddressGroups(PcScript):
         # Initial status
         self.results["Create_Address_groups"] = {}
 
-        # There is no monitor option for creation. Hence, waiting for creation before verification
-        time.sleep(5)
-        address_group_name_list = []
+        if self.task_uuid_list:
+            # There is no monitor option for creation. Hence, waiting for creation before verification
+            time.sleep(5)
+        refresh = bool(self.plan and self.plan.creates)
 
         for ag in self.address_groups:
             # Initial status
             self.results["Create_Address_groups"][ag.get("name")] = "CAN'T VERIFY"
 
-            address_group_name_list = address_group_name_list or self.address_group_util.get_name_list()
-
-            if ag["name"] in address_group_name_list:
+            if self.reconciler.exists(ag["name"], refresh=refresh):
                 self.results["Create_Address_groups"][ag["name"]] = "PASS"
             else:
                 self.results["Create_Address_groups"][ag["name"]] = "FAIL"
+            refresh = False
+
+    def __list_address_groups(self) -> List:
+        address_groups = self.address_group_util.list()
+        # v4 returns the response, with the address groups in data
+        if isinstance(address_groups, dict):
+            return address_groups.get("data") or []
+        return address_groups
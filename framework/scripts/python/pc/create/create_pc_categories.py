@@ -1,7 +1,8 @@
 import time
-from typing import Dict
+from typing import Dict, List, Optional
 from framework.helpers.log_utils import get_logger
-from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
+from framework.scripts.python.helpers.reconcile import Change, Reconciler
+from framework.scripts.python.helpers.state_monitor.task_monitor import PcBatchTaskMonitor as BatchTaskMonitor
 from framework.scripts.python.pc.pc_script import PcScript
 
 logger = get_logger(__name__)
@@ -11,6 +12,8 @@ class CreateCategoryPc(PcScript):
     """
     Class that creates Categories in PC
     """
+    SECTION_KEYS = ["categories"]
+
     def __init__(self, data: Dict, **kwargs):
         self.response = None
         self.task_uuid_list = []
@@ -21,6 +24,9 @@ class CreateCategoryPc(PcScript):
         super(CreateCategoryPc, self).__init__(**kwargs)
         self.logger = self.logger or logger
         self.category_util = self.import_helpers_with_version_handling("Category")
+        self.plan = None
+        self.reconciler = Reconciler("Categories", self.category_util.categories_with_values,
+                                     compare=self.__get_missing_values)
 
     def execute(self):
         try:
@@ -28,23 +34,20 @@ class CreateCategoryPc(PcScript):
                 self.logger.warning(f"No categories to create. Skipping category creation in {self.data['pc_ip']!r}")
                 return
 
-            existing_categories_list = self.category_util.categories_with_values()
+            desired = {category["name"]: {"values": category.get("values") or []} for category in self.categories}
+            self.plan = self.reconciler.plan(desired)
+            self.plan.log(self.data["pc_ip"])
+            self.results["Reconcile_Categories"] = self.plan.summary()
+            descriptions = {category["name"]: category.get("description") for category in self.categories}
 
             category_list = []
-            for category_to_create in self.categories:
-                name = category_to_create.get("name")
-                description = category_to_create.get("description")
-                values = category_to_create.get("values")
-
-                category_exists = next((existing_category for existing_category in existing_categories_list
-                                        if existing_category["name"] == name), None)
-
+            for change in self.plan.creates + self.plan.updates:
+                name = change.name
+                description = descriptions[name]
+                # Values to add, all the values of a new category
+                values = change.differences or change.desired["values"]
                 try:
-                    # Category is already there, just need to add values to the category
-                    if category_exists:
-                        values = [value_to_create for value_to_create in values
-                                  if value_to_create not in category_exists["values"]]
-                    else:
+                    if change.action == Change.CREATE:
                         # create category first
                         self.logger.info(f"Creating category {name} in {self.data['pc_ip']!r}")
                         self.category_util.create_category(name, description)
@@ -65,23 +68,22 @@ class CreateCategoryPc(PcScript):
                 return
 
             self.logger.info(f"Trigger batch create API for Categories in {self.data['pc_ip']!r}")
-            self.task_uuid_list = self.category_util.batch_values_add(category_list)
-            # Monitor the tasks
-            if self.task_uuid_list:
-                app_response, status = PcTaskMonitor(
-                    self.pc_session,
-                    task_uuid_list=self.task_uuid_list,
-                    task_op=self.import_helpers_with_version_handling('Task')).monitor()
-
-                if app_response:
-                    self.exceptions.append(f"Some tasks have failed. {app_response}")
-
-                if not status:
-                    self.exceptions.append("Timed out. Creation of Categories in PC didn't happen in the"
-                                           " prescribed timeframe")
+            task_monitor = BatchTaskMonitor(self.pc_session, task_op=self.import_helpers_with_version_handling('Task'))
+            app_response, status = task_monitor.monitor(self.category_util.iter_batch_values_add(category_list))
+            self.task_uuid_list = task_monitor.task_uuid_list
+
+            if app_response:
+                self.exceptions.append(f"Some tasks have failed. {app_response}")
+
+            if not status:
+                self.exceptions.append("Timed out. Creation of Categories in PC didn't happen in the"
+                                       " prescribed timeframe")
         except Exception as e:
             self.exceptions.append(e)
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        return self.reconciler.get_fingerprint(category["name"] for category in self.categories or [])
+
     def verify(self):
         if not self.categories:
             return
@@ -89,26 +91,26 @@ class CreateCategoryPc(PcScript):
         # Initial status
         self.results["Create_Categories"] = {}
 
-        # There is no monitor option for creation. Hence, waiting for creation before verification
-        time.sleep(5)
+        refresh = bool(self.task_uuid_list) or bool(self.plan and self.plan.creates)
+        if refresh:
+            # There is no monitor option for creation. Hence, waiting for creation before verification
+            time.sleep(5)
 
         # todo modify verifications to include values
-        existing_categories_list = []
         for category_to_create in self.categories:
-            existing_categories_list = existing_categories_list or self.category_util.categories_with_values() 
             name = category_to_create.get("name")
-            values = category_to_create.get("values")
+            values = category_to_create.get("values") or []
             # Initial status
             self.results["Create_Categories"][name] = "CAN'T VERIFY"
-            
-            category_exists = False
-            
-            for existing_category in existing_categories_list:
-                if ( existing_category["name"] == name and 
-                all(item in existing_category["values"] for item in values) ):
-                    category_exists = True
-                    break
-            if category_exists:
+
+            existing_category = self.reconciler.get_snapshot(refresh=refresh).get(name)
+            refresh = False
+            if existing_category and all(item in existing_category["values"] for item in values):
                 self.results["Create_Categories"][name] = "PASS"
             else:
                 self.results["Create_Categories"][name] = "FAIL"
+
+    @staticmethod
+    def __get_missing_values(desired: Dict, current: Dict) -> List:
+        # Values are only added, the values of the category not in the config are kept
+        return [value for value in desired["values"] if value not in current.get("values", [])]
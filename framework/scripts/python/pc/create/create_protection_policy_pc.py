@@ -1,6 +1,7 @@
-from typing import Dict
+from typing import Dict, Optional
 from framework.helpers.log_utils import get_logger
 from framework.helpers.rest_utils import RestAPIUtil
+from framework.scripts.python.helpers.reconcile import Reconciler, get_spec_differences
 from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
 from framework.scripts.python.helpers.v3.cluster import Cluster as PcCluster
 from framework.scripts.python.helpers.v3.protection_rule import ProtectionRule
@@ -14,6 +15,9 @@ class CreateProtectionPolicy(Script):
     """
     Class that creates PP
     """
+    # Protection policies need DR and the remote AZs
+    DEPENDS_ON = ["EnableDR", "ConnectToAz", "CreateCategoryPc"]
+    SECTION_KEYS = ["protection_rules", "remote_azs"]
 
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid_list = None
@@ -21,6 +25,10 @@ class CreateProtectionPolicy(Script):
         self.pc_session = self.data["pc_session"]
         super(CreateProtectionPolicy, self).__init__(**kwargs)
         self.logger = self.logger or logger
+        self.protection_policy = ProtectionRule(self.pc_session)
+        self.plan = None
+        self.reconciler = Reconciler("Protection policies", self.protection_policy.list,
+                                     compare=get_spec_differences)
 
     def execute(self, **kwargs):
         try:
@@ -28,11 +36,6 @@ class CreateProtectionPolicy(Script):
                 self.logger.warning(f"Skipping creation of Protection policies in {self.data['pc_ip']!r}")
                 return
 
-            protection_policy = ProtectionRule(self.pc_session)
-            protection_policy_list = protection_policy.list()
-            protection_policy_name_list = [pp.get("spec", {}).get("name")
-                                           for pp in protection_policy_list if pp.get("spec", {}).get("name")]
-
             source_pc_cluster = PcCluster(self.pc_session)
             source_pc_cluster.get_pe_info_list()
             source_pe_clusters = {
@@ -63,24 +66,31 @@ class CreateProtectionPolicy(Script):
             # destination cluster can be from local az as well
             remote_pe_clusters.update(source_pe_clusters)
 
-            pp_list = []
+            desired = {}
             for pp in self.data["protection_rules"]:
-                if pp['name'] in protection_policy_name_list:
-                    self.logger.warning(f"{pp['name']} Protection Policy already exists in {self.data['pc_ip']!r}!")
-                    continue
-
                 try:
-                    spec = protection_policy.get_payload(pp, source_pe_clusters, remote_pe_clusters)
-                    pp_list.append(spec)
+                    desired[pp['name']] = self.protection_policy.get_payload(pp, source_pe_clusters,
+                                                                             remote_pe_clusters)
                 except Exception as e:
+                    if self.reconciler.exists(pp['name']):
+                        self.logger.warning(f"Cannot compare {pp['name']} with the config: {e}")
+                        desired[pp['name']] = {}
+                        continue
                     self.exceptions.append(f"Failed to create Protection policy {pp['name']}: {e}")
 
+            self.plan = self.reconciler.plan(desired)
+            self.plan.log(self.data["pc_ip"])
+            self.results["Reconcile_Protection_policies"] = self.plan.summary()
+            for change in self.plan.no_ops + self.plan.updates:
+                self.logger.warning(f"{change.name} Protection Policy already exists in {self.data['pc_ip']!r}!")
+
+            pp_list = [change.desired for change in self.plan.creates]
             if not pp_list:
                 self.logger.warning(f"No Protection policies to create in {self.data['pc_ip']!r}")
                 return
 
             logger.info(f"Trigger batch create API for Protection policies in {self.data['pc_ip']!r}")
-            self.task_uuid_list = protection_policy.batch_op.batch_create(request_payload_list=pp_list)
+            self.task_uuid_list = self.protection_policy.batch_op.batch_create(request_payload_list=pp_list)
 
             # Monitor the tasks
             if self.task_uuid_list:
@@ -96,6 +106,9 @@ class CreateProtectionPolicy(Script):
         except Exception as e:
             self.exceptions.append(e)
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        return self.reconciler.get_fingerprint(pp["name"] for pp in self.data.get("protection_rules") or [])
+
     def verify(self, **kwargs):
         if not self.data.get("protection_rules"):
             return
@@ -103,19 +116,14 @@ class CreateProtectionPolicy(Script):
         # Initial status
         self.results["Create_Protection_policies"] = {}
 
-        protection_policy = ProtectionRule(self.pc_session)
-        protection_policy_list = []
-        protection_policy_name_list = []
+        refresh = bool(self.plan and self.plan.creates)
 
         for pp in self.data["protection_rules"]:
             # Initial status
             self.results["Create_Protection_policies"][pp['name']] = "CAN'T VERIFY"
 
-            protection_policy_list = protection_policy_list or protection_policy.list()
-            protection_policy_name_list = protection_policy_name_list or [pp.get("spec", {}).get("name")
-                                                                          for pp in protection_policy_list if
-                                                                          pp.get("spec", {}).get("name")]
-            if pp['name'] in protection_policy_name_list:
+            if self.reconciler.exists(pp['name'], refresh=refresh):
                 self.results["Create_Protection_policies"][pp['name']] = "PASS"
             else:
                 self.results["Create_Protection_policies"][pp['name']] = "FAIL"
+            refresh = False
@@ -1,8 +1,9 @@
-from typing import Dict
+from typing import Dict, Optional
 
 from framework.helpers.helper_functions import read_creds
 from framework.helpers.log_utils import get_logger
 from framework.helpers.rest_utils import RestAPIUtil
+from framework.scripts.python.helpers.reconcile import Reconciler, get_spec_differences
 from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
 from framework.scripts.python.helpers.v3.cluster import Cluster as PcCluster
 from framework.scripts.python.helpers.v3.recovery_plan import RecoveryPlan
@@ -15,6 +16,8 @@ class CreateRecoveryPlan(Script):
     """
     Class that creates RP
     """
+    DEPENDS_ON = ["CreateProtectionPolicy"]
+    SECTION_KEYS = ["recovery_plans", "remote_azs"]
 
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid_list = None
@@ -22,14 +25,12 @@ class CreateRecoveryPlan(Script):
         self.pc_session = self.data["pc_session"]
         super(CreateRecoveryPlan, self).__init__(**kwargs)
         self.logger = self.logger or logger
+        self.recovery_plan = RecoveryPlan(self.pc_session)
+        self.plan = None
+        self.reconciler = Reconciler("Recovery plans", self.recovery_plan.list, compare=get_spec_differences)
 
     def execute(self, **kwargs):
         try:
-            recovery_plan = RecoveryPlan(self.pc_session)
-            recovery_plan_list = recovery_plan.list()
-            recovery_plan_name_list = [rp.get("spec", {}).get("name")
-                                       for rp in recovery_plan_list if rp.get("spec", {}).get("name")]
-
             if not self.data.get("recovery_plans"):
                 self.logger.warning(f"Skipping creation of Recovery plans in {self.data['pc_ip']!r}")
                 return
@@ -64,24 +65,30 @@ class CreateRecoveryPlan(Script):
             # destination cluster can be from local az as well
             remote_pe_clusters.update(source_pe_clusters)
 
-            rp_list = []
+            desired = {}
             for rp in self.data["recovery_plans"]:
-                if rp['name'] in recovery_plan_name_list:
-                    self.logger.warning(f"{rp['name']} already exists in {self.data['pc_ip']!r}!")
-                    continue
-
                 try:
-                    spec = recovery_plan.get_payload(rp, source_pe_clusters, remote_pe_clusters)
-                    rp_list.append(spec)
+                    desired[rp['name']] = self.recovery_plan.get_payload(rp, source_pe_clusters, remote_pe_clusters)
                 except Exception as e:
+                    if self.reconciler.exists(rp['name']):
+                        self.logger.warning(f"Cannot compare {rp['name']} with the config: {e}")
+                        desired[rp['name']] = {}
+                        continue
                     self.exceptions.append(f"Failed to create Recovery plan {rp['name']}: {e}")
 
+            self.plan = self.reconciler.plan(desired)
+            self.plan.log(self.data["pc_ip"])
+            self.results["Reconcile_Recovery_plans"] = self.plan.summary()
+            for change in self.plan.no_ops + self.plan.updates:
+                self.logger.warning(f"{change.name} already exists in {self.data['pc_ip']!r}!")
+
+            rp_list = [change.desired for change in self.plan.creates]
             if not rp_list:
                 self.logger.warning(f"No recovery plans to create in {self.data['pc_ip']!r}")
                 return
 
             logger.info(f"Trigger batch create API for Recovery plans in {self.data['pc_ip']!r}")
-            self.task_uuid_list = recovery_plan.batch_op.batch_create(request_payload_list=rp_list)
+            self.task_uuid_list = self.recovery_plan.batch_op.batch_create(request_payload_list=rp_list)
 
             if self.task_uuid_list:
                 app_response, status = TaskMonitor(self.pc_session,
@@ -96,6 +103,9 @@ class CreateRecoveryPlan(Script):
         except Exception as e:
             self.exceptions.append(e)
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        return self.reconciler.get_fingerprint(rp["name"] for rp in self.data.get("recovery_plans") or [])
+
     def verify(self, **kwargs):
         if not self.data.get("recovery_plans"):
             return
@@ -103,18 +113,13 @@ class CreateRecoveryPlan(Script):
         # Initial status
         self.results["Create_Recovery_plans"] = {}
 
-        recovery_plan = RecoveryPlan(self.pc_session)
-        recovery_plan_list = []
-        recovery_plan_name_list = []
+        refresh = bool(self.plan and self.plan.creates)
         for rp in self.data["recovery_plans"]:
             # Initial status
             self.results["Create_Recovery_plans"][rp['name']] = "CAN'T VERIFY"
 
-            recovery_plan_list = recovery_plan_list or recovery_plan.list()
-            recovery_plan_name_list = recovery_plan_name_list or [rp.get("spec", {}).get("name")
-                                                                  for rp in recovery_plan_list if
-                                                                  rp.get("spec", {}).get("name")]
-            if rp['name'] in recovery_plan_name_list:
+            if self.reconciler.exists(rp['name'], refresh=refresh):
                 self.results["Create_Recovery_plans"][rp['name']] = "PASS"
             else:
                 self.results["Create_Recovery_plans"][rp['name']] = "FAIL"
+            refresh = False
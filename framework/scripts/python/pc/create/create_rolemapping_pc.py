@@ -10,6 +10,9 @@ class CreateRoleMappingPc(Script):
     """
     The Script to create role mapping in PC
     """
+    # Role-mappings need the directory service
+    DEPENDS_ON = ["AddAdServerPc"]
+
     LOAD_TASK = False
     DEFAULT_ROLE_MAPPINGS = [
         {
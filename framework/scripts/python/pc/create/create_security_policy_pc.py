@@ -1,6 +1,7 @@
-from typing import Dict
+from typing import Dict, Optional
 from framework.helpers.log_utils import get_logger
-from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
+from framework.scripts.python.helpers.reconcile import Reconciler
+from framework.scripts.python.helpers.state_monitor.task_monitor import PcBatchTaskMonitor as BatchTaskMonitor
 from framework.scripts.python.pc.pc_script import PcScript
 
 
@@ -11,6 +12,9 @@ class CreateNetworkSecurityPolicy(PcScript):
     """
     Class that creates Security policies
     """
+    # Policies refer to the categories, address groups and service groups
+    DEPENDS_ON = ["EnableMicrosegmentation", "CreateCategoryPc", "CreateAddressGroups", "CreateServiceGroups"]
+    SECTION_KEYS = ["security_policies"]
 
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid_list = None
@@ -21,6 +25,8 @@ class CreateNetworkSecurityPolicy(PcScript):
         super(CreateNetworkSecurityPolicy, self).__init__(**kwargs)
         self.logger = self.logger or logger
         self.security_policy_util = self.import_helpers_with_version_handling("SecurityPolicy")
+        self.plan = None
+        self.reconciler = Reconciler("Security policies", self.security_policy_util.list)
 
     def execute(self):
         try:
@@ -28,53 +34,58 @@ class CreateNetworkSecurityPolicy(PcScript):
                 self.logger.warning(f"No security_policies to create in {self.data['pc_ip']!r}. Skipping...")
                 return
 
-            security_policy_name_list = self.security_policy_util.get_name_list()
-            sps_to_create = []
+            desired = {}
             for sg in self.security_policies:
-                if sg["name"] in security_policy_name_list:
-                    self.logger.warning(f" Security Policy with name {sg['name']} already exists in {self.data['pc_ip']!r}!")
-                    continue
                 try:
-                    sps_to_create.append(self.security_policy_util.create_security_policy_spec(sg))
+                    desired[sg["name"]] = self.security_policy_util.create_security_policy_spec(sg)
                 except Exception as e:
+                    if self.reconciler.exists(sg["name"]):
+                        self.logger.warning(f"Cannot compare '{sg['name']}' with the config: {e}")
+                        desired[sg["name"]] = {}
+                        continue
                     self.exceptions.append(f"Failed to create Security policy {sg['name']}: {e}")
 
+            self.plan = self.reconciler.plan(desired)
+            self.plan.log(self.data["pc_ip"])
+            self.results["Reconcile_Security_policies"] = self.plan.summary()
+            for change in self.plan.no_ops + self.plan.updates:
+                self.logger.warning(f" Security Policy with name {change.name} already exists in {self.data['pc_ip']!r}!")
+
+            sps_to_create = [change.desired for change in self.plan.creates]
             if not sps_to_create:
                 self.logger.warning(f"No security_policies to create in {self.data['pc_ip']!r}. Skipping...")
                 return
             self.logger.info(f"Trigger batch create API for Security Policies in {self.data['pc_ip']!r}")
-            self.task_uuid_list = self.security_policy_util.batch_op.batch_create(request_payload_list=sps_to_create)
-
-            # Monitor the tasks
-            if self.task_uuid_list:
-                app_response, status = TaskMonitor(
-                    self.pc_session,
-                    task_uuid_list=self.task_uuid_list,
-                    task_op=self.import_helpers_with_version_handling('Task')).monitor()
+            task_monitor = BatchTaskMonitor(self.pc_session, task_op=self.import_helpers_with_version_handling('Task'))
+            app_response, status = task_monitor.monitor(
+                self.security_policy_util.batch_op.iter_batch_create(request_payload_list=sps_to_create))
+            self.task_uuid_list = task_monitor.task_uuid_list
 
-                if app_response:
-                    self.exceptions.append(f"Some tasks have failed. {app_response}")
+            if app_response:
+                self.exceptions.append(f"Some tasks have failed. {app_response}")
 
-                if not status:
-                    self.exceptions.append("Timed out. Creation of Security policies in PC didn't happen in the"
-                                           " prescribed timeframe")
+            if not status:
+                self.exceptions.append("Timed out. Creation of Security policies in PC didn't happen in the"
+                                       " prescribed timeframe")
         except Exception as e:
             self.exceptions.append(e)
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        return self.reconciler.get_fingerprint(policy["name"] for policy in self.security_policies or [])
+
     def verify(self):
         if not self.security_policies:
             return
 
         # Initial status
         self.results["Create_Security_policies"] = {}
-        security_policy_name_list = []
+        refresh = bool(self.plan and self.plan.creates)
 
         for sg in self.security_policies:
             self.results["Create_Security_policies"][sg['name']] = "CAN'T VERIFY"
 
-            security_policy_name_list = security_policy_name_list or self.security_policy_util.get_name_list()
-
-            if sg["name"] in security_policy_name_list:
+            if self.reconciler.exists(sg["name"], refresh=refresh):
                 self.results["Create_Security_policies"][sg['name']] = "PASS"
             else:
                 self.results["Create_Security_policies"][sg['name']] = "FAIL"
+            refresh = False
@@ -1,6 +1,7 @@
 import time
-from typing import Dict
+from typing import Dict, Optional
 from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.reconcile import Reconciler, get_entity_state
 from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
 from framework.scripts.python.helpers.v3.service_group import ServiceGroup
 from framework.scripts.python.pc.pc_script import PcScript
@@ -12,6 +13,7 @@ class CreateServiceGroups(PcScript):
     """
     Class that creates Service Groups
     """
+    SECTION_KEYS = ["service_groups"]
 
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid_list = None
@@ -22,6 +24,9 @@ class CreateServiceGroups(PcScript):
         super(CreateServiceGroups, self).__init__(**kwargs)
         self.logger = self.logger or logger
         self.service_group_util = self.import_helpers_with_version_handling("ServiceGroup")
+        self.plan = None
+        self.reconciler = Reconciler("Service groups", self.service_group_util.list,
+                                     get_state=lambda entity: get_entity_state(entity, "service_group"))
 
     def execute(self):
         try:
@@ -29,18 +34,24 @@ class CreateServiceGroups(PcScript):
                 self.logger.warning(f"No service_groups to create in {self.data['pc_ip']!r}. Skipping...")
                 return
 
-            service_group_name_list = self.service_group_util.get_name_list()
-            
-            sgs_to_create = []
+            desired = {}
             for sg in self.service_groups:
-                if sg["name"] in service_group_name_list:
-                    self.logger.warning(f"{sg['name']} already exists!")
-                    continue
                 try:
-                    sgs_to_create.append(self.service_group_util.create_service_group_spec(sg))
+                    desired[sg["name"]] = self.service_group_util.create_service_group_spec(sg)
                 except Exception as e:
+                    if self.reconciler.exists(sg["name"]):
+                        self.logger.warning(f"Cannot compare '{sg['name']}' with the config: {e}")
+                        desired[sg["name"]] = {}
+                        continue
                     self.exceptions.append(f"Failed to create Service Group {sg['name']}: {e}")
 
+            self.plan = self.reconciler.plan(desired)
+            self.plan.log(self.data["pc_ip"])
+            self.results["Reconcile_Service_groups"] = self.plan.summary()
+            for change in self.plan.no_ops + self.plan.updates:
+                self.logger.warning(f"{change.name} already exists!")
+
+            sgs_to_create = [change.desired for change in self.plan.creates]
             if not sgs_to_create:
                 self.logger.warning(f"No service_groups to create in {self.data['pc_ip']!r}. Skipping...")
                 return
@@ -64,6 +75,9 @@ class CreateServiceGroups(PcScript):
         except Exception as e:
             self.exceptions.append(e)
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        return self.reconciler.get_fingerprint(sg["name"] for sg in self.service_groups or [])
+
     def verify(self):
         if not self.service_groups:
             return
@@ -71,15 +85,13 @@ class CreateServiceGroups(PcScript):
         # Initial status
         self.results["Create_Service_groups"] = {}
 
-        # There is no monitor option for creation. Hence, waiting for creation before verification
-        
-        service_group_name_list = []
+        refresh = bool(self.plan and self.plan.creates)
         for sg in self.service_groups:
             # Initial status
-            service_group_name_list = service_group_name_list or self.service_group_util.get_name_list()
             self.results["Create_Service_groups"][sg["name"]] = "CAN'T VERIFY"
-    
-            if sg["name"] in service_group_name_list:
+
+            if self.reconciler.exists(sg["name"], refresh=refresh):
                 self.results["Create_Service_groups"][sg["name"]] = "PASS"
             else:
                 self.results["Create_Service_groups"][sg["name"]] = "FAIL"
+            refresh = False
@@ -11,6 +11,7 @@ class EnableDR(Script):
     """
     Class that enables Leap/ DR
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid = None
         self.data = data
@@ -11,6 +11,7 @@ class EnableMicrosegmentation(Script):
     """
     Class that enables microseg/ Flow
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid = None
         self.data = data
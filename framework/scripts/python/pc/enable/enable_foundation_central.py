@@ -12,6 +12,7 @@ class EnableFC(Script):
     """
     Class that enables Foundation Central
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.status = False
         self.data = data
@@ -11,6 +11,7 @@ class EnableMarketplace(Script):
     """
     Class that enables Marketplace on a Prism Central
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid = None
         self.data = data
@@ -12,6 +12,7 @@ class EnableNetworkController(PcScript):
     """
     Class that enables Network Controller in PC
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.response = None
         self.task_uuid_list = []
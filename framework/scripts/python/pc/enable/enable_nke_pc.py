@@ -11,6 +11,7 @@ class EnableNke(Script):
     """
     Class that enables Karbon/ NKE
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.status = False
         self.data = data
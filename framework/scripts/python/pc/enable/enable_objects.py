@@ -12,6 +12,7 @@ class EnableObjects(Script):
     """
     Class that enables Objects/ OSS
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.task_uuid = None
         self.data = data
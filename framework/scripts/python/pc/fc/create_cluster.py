@@ -8,7 +8,9 @@ from framework.scripts.python.helpers.fc.imaged_nodes import ImagedNode
 from framework.scripts.python.helpers.fc.monitor_fc_deployment import MonitorDeployment
 from framework.scripts.python.helpers.fc.update_fc_heartbeat_interval import UpdateFCHeartbeatInterval
 from framework.helpers.helper_functions import read_creds
-from framework.helpers.general_utils import get_ip_and_create_host_record, assign_ips_from_ipam, update_network_info_in_existing_node_dict
+from framework.helpers.general_utils import (get_ip_and_create_host_record, assign_ips_from_ipam,
+                                            update_network_info_in_existing_node_dict, allocate_ips_from_ipam,
+                                            get_node_ipam_requests, release_ips_from_ipam)
 
 logger = get_logger(__name__)
 
@@ -64,17 +66,30 @@ class CreateCluster(Script):
                     
                     cluster_data["nodes_list"] = list(existing_node_detail_dict.values())
 
+                    ipam_requests, allocated_ips = [], {}
                     if not self.ipam_obj:
                         if not cluster.get("cluster_external_ip"):
                             cluster_name = cluster.get('cluster_name', 'Unknown Cluster')
                             self.logger.warning(f"Cluster External IP not provided. Proceeding without Cluster VIP "
                                 f"for cluster {cluster_name}")
                     else:
+                        # Allocate the cluster VIP & all the node IPs of the cluster from IPAM in bulk
+                        cluster_vip_request = {
+                            "fqdn": f"{cluster['cluster_name']}.{self.data['ipam_config']['domain']}",
+                            "subnet": self.data["ipam_config"].get("host_subnet"),
+                            "ip": cluster.get("cluster_external_ip")
+                        }
+                        ipam_requests = [cluster_vip_request]
+                        for node in nodes_list:
+                            node_info = {**existing_node_detail_dict[node["node_serial"]], **node}
+                            if node_info.get("hypervisor_hostname"):
+                                ipam_requests.extend(
+                                    get_node_ipam_requests(node_info, self.data["ipam_config"]).values())
+                        allocated_ips = allocate_ips_from_ipam(self.ipam_obj, self.logger, ipam_requests)
+
                         cluster_vip, cluster_vip_error = get_ip_and_create_host_record(
-                            ipam_obj = self.ipam_obj, logger_obj = self.logger,
-                            fqdn=f"{cluster['cluster_name']}.{self.data['ipam_config']['domain']}",
-                            subnet=self.data["ipam_config"].get("host_subnet"),
-                            ip=cluster.get("cluster_external_ip"))
+                            ipam_obj = self.ipam_obj, logger_obj = self.logger, allocated_ips=allocated_ips,
+                            **cluster_vip_request)
 
                         if cluster_vip_error:
                             self.exceptions.append(cluster_vip_error)
@@ -87,6 +102,7 @@ class CreateCluster(Script):
                         if not existing_node_detail_dict[nodes_list[0]["node_serial"]]["hardware_attributes"].get("one_node_cluster"):
                             self.logger.error(f"One Node Cluster is not enabled in the Node for the cluster {cluster['cluster_name']}.")
                             self.exceptions.append(f"One Node Cluster is not enabled in the Node for the cluster {cluster['cluster_name']}.")
+                            release_ips_from_ipam(ipam_requests, allocated_ips)
                             continue
                     
                     # If the cluster is a two node cluster, check if two node cluster is supported
@@ -95,8 +111,10 @@ class CreateCluster(Script):
                            not existing_node_detail_dict[nodes_list[1]["node_serial"]].get("hardware_attributes", {}).get("two_node_cluster"):
                             self.logger.error(f"Two Node Cluster is not enabled in either of the Nodes for the cluster {cluster['cluster_name']}.")
                             self.exceptions.append(f"Two Node Cluster is not enabled in either of the Nodes for the cluster {cluster['cluster_name']}.")
+                            release_ips_from_ipam(ipam_requests, allocated_ips)
                             continue
 
+                    ip_assignment_failed = False
                     for node in nodes_list:
                         for key, value in node.items():
                             if key != "node_serial":
@@ -107,13 +125,17 @@ class CreateCluster(Script):
                         if self.ipam_obj:
                             success, error_message = assign_ips_from_ipam(
                                 node_info=existing_node_detail_dict[node["node_serial"]], ipam_config=self.data["ipam_config"],
-                                ipam_obj=self.ipam_obj, logger_obj=self.logger
+                                ipam_obj=self.ipam_obj, logger_obj=self.logger, allocated_ips=allocated_ips
                             )
                             if not success:
                                 self.logger.error(f"Failed to assign IPs from IPAM for node {node['node_serial']}: {error_message}")
                                 self.exceptions.append(error_message)
+                                ip_assignment_failed = True
                                 break # Skip the cluster deployment if IP assignment fails
-                    
+                    if ip_assignment_failed:
+                        release_ips_from_ipam(ipam_requests, allocated_ips)
+                        continue
+
                     # Add the FC deployment operation to the batch script
                     create_cluster_op.add(ImageClusterScript(
                             pc_session=self.pc_session, cluster_data=cluster_data,
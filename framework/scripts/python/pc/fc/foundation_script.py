@@ -4,14 +4,18 @@ import logging
 from copy import deepcopy
 from typing import Dict, List
 from framework.helpers.log_utils import get_logger
-from framework.helpers.general_utils import divide_chunks, get_subnet_mask
+from framework.helpers.general_utils import (get_subnet_mask, allocate_ips_from_ipam,
+                                            get_node_ipam_requests, release_ips_from_ipam)
 from framework.helpers.helper_functions import create_pc_objects
 from framework.scripts.python.helpers.fc.imaged_nodes import ImagedNode
 from framework.scripts.python.helpers.fc.imaged_clusters import ImagedCluster
 from framework.scripts.python.script import Script
 from framework.scripts.python.helpers.fc.image_cluster_script import ImageClusterScript
-from framework.scripts.python.helpers.fc.monitor_fc_deployment import MonitorDeployment
+from framework.scripts.python.helpers.fc.deployment_poller import DeploymentPoller
+from framework.scripts.python.helpers.fc.imaging_planner import ImagingPlanner, ImagingThroughput, ImagingUnit
 from framework.scripts.python.helpers.batch_script import BatchScript
+from framework.scripts.python.helpers.inventory_cache import InventoryCache
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
 from framework.scripts.python.helpers.fc.update_fc_heartbeat_interval import UpdateFCHeartbeatInterval
 from framework.scripts.python.helpers.fc.enable_one_node import EnableOneNode
 
@@ -30,6 +34,10 @@ class FoundationScript(Script):
     """
     NUTANIX_DEFAULT_USERNAME = "nutanix"
     NUTANIX_DEFAULT_PASSWORD = "nutanix/4u"
+    # Sites of a block deployed at a time, overridden with max_parallel_sites
+    DEFAULT_MAX_PARALLEL_SITES = 4
+    # Deployments submitted to FC at a time, by a site
+    MAX_PARALLEL_SUBMISSIONS = 10
 
     def __init__(self, data: Dict):
         self.data = data
@@ -37,7 +45,22 @@ class FoundationScript(Script):
         self.blocks = self.pod.get("pod_blocks", {})
         self.sites = self.data.get("sites")
         self.ipam_obj = self.data.get("ipam_session")
+        # IPs allocated from IPAM in bulk for the site, by fqdn
+        self.allocated_ips = {}
+        # IPAM requests of the bulk allocation, by cluster name
+        self.ipam_requests = {}
         self.cred_details = {}
+        # Latest progress of the FC deployments, by cluster name
+        self.deployment_progress = self.data.setdefault("fc_deployment_progress", {})
+        # Deployments in flight in a Foundation Central, unlimited if not set
+        self.max_in_flight_deployments = self.pod.get("fc_max_in_flight_deployments",
+                                                      self.data.get("fc_max_in_flight_deployments"))
+        # Plan the site deployments without running them
+        self.dry_run = self.pod.get("dry_run", self.data.get("dry_run", False))
+        self.imaging_throughput = ImagingThroughput(
+            history_file=self.pod.get("imaging_history_file", self.data.get("imaging_history_file")))
+        self.max_parallel_sites = self.pod.get("max_parallel_sites", self.data.get("max_parallel_sites")) or \
+            self.DEFAULT_MAX_PARALLEL_SITES
         super(FoundationScript, self).__init__()
         self.logger = self.logger or logger
 
@@ -50,8 +73,15 @@ class FoundationScript(Script):
             ip (str, optional): IP Address if already passed in the config file. Defaults to None.
 
         Returns:
-            tuple (str, str): Return IP Address and error message if there is any error.
+            tuple (str, str): Return IP Address and error message if there is any error, else None.
         """
+        if self.allocated_ips.get(fqdn):
+            return self.allocated_ips[fqdn], None
+        if self.dry_run:
+            # No host record is created in a dry run, the IPs to be allocated from IPAM are placeholders
+            if not ip and not subnet:
+                return None, "Niether Subnet or IP was provided to query IPAM"
+            return ip or f"<next available IP in {subnet}>", None
         if ip:
             if self.ipam_obj.check_host_record_exists(ip):
                 self.logger.warning(f"Host record present for given IP {ip}. Skipping host record creation")
@@ -60,14 +90,14 @@ class FoundationScript(Script):
                 _, error = self.ipam_obj.create_host_record(fqdn=fqdn, ip=ip)
                 if error:
                     return None, f"Failed to create host record: {error}"
-            return ip, ""
+            return ip, None
         elif subnet:
             self.logger.info("Fetching Next available free IP from IPAM")
             ip, error = self.ipam_obj.create_host_record_with_next_available_ip(network=subnet, fqdn=fqdn)
             if error:
                 return None, f"Failed to get ip from ipam: {error}"
             self.logger.info(f"Got IP {ip} from IPAM for fqdn {fqdn}")
-            return ip, ""
+            return ip, None
         else:
             return None, "Niether Subnet or IP was provided to query IPAM"
 
@@ -106,19 +136,14 @@ class FoundationScript(Script):
             hypervisor_hostname = node.get("hypervisor_hostname", node_info["hypervisor_hostname"])
             # If there is ipam_obj, fetch IPs from IPAM & Create host record
             if self.ipam_obj:
-                host_ip, error = self.get_ip_and_create_host_record(
-                    fqdn=f"{hypervisor_hostname}.{network['domain']}", subnet=network.get("host_subnet"),
-                    ip=node.get("host_ip"))
+                requests = get_node_ipam_requests({**node, "hypervisor_hostname": hypervisor_hostname}, network)
+                host_ip, error = self.get_ip_and_create_host_record(**requests["host_ip"])
                 if error:
                     return False, f"Failed to update Host IP: {error}"
-                cvm_ip, error = self.get_ip_and_create_host_record(
-                    fqdn=f"{node['node_serial']}-cvm.{network['domain']}", subnet=network.get("host_subnet"),
-                    ip=node.get("cvm_ip"))
+                cvm_ip, error = self.get_ip_and_create_host_record(**requests["cvm_ip"])
                 if error:
                     return False, f"Failed to update CVM IP: {error}"
-                ipmi_ip, error = self.get_ip_and_create_host_record(
-                    fqdn=f"{node['node_serial']}-ipmi.{network['domain']}", subnet=network.get("ipmi_subnet"),
-                    ip=node.get("ipmi_ip"))
+                ipmi_ip, error = self.get_ip_and_create_host_record(**requests["ipmi_ip"])
                 if error:
                     self.logger.warning(f"Failed to update IPMI IP: {error}")
             else:
@@ -145,6 +170,38 @@ class FoundationScript(Script):
                 node_info["network_bond_settings"] = network_bond_settings
         return existing_node_detail_dict, None
 
+    def allocate_site_ips(self, site_info: Dict, imaged_node_obj: ImagedNode, fc_available_node_list: List):
+        """Allocate the node IPs & cluster VIPs of all the clusters of the site from IPAM in bulk, a few IPAM calls
+        per subnet. get_ip_and_create_host_record then returns the allocated IPs
+
+        Args:
+            site_info (Dict): Site information
+            imaged_node_obj (ImagedNode): ImagedNode object
+            fc_available_node_list (List): List of available node in Foundation Central
+        """
+        requests = []
+        for cluster_info in site_info["clusters"]:
+            cluster_info = self.update_cluster_info_with_site_info(cluster_info, site_info)
+            network = cluster_info["network"]
+            if cluster_info["use_existing_network_settings"] or not network:
+                continue
+            cluster_requests = []
+            node_serial_list = [node["node_serial"] for node in cluster_info["node_details"]]
+            existing_node_detail_dict = imaged_node_obj.node_details_by_node_serial(node_serial_list,
+                                                                                    fc_available_node_list)
+            for node in cluster_info["node_details"]:
+                node_info = existing_node_detail_dict.get(node["node_serial"])
+                if not node_info:
+                    continue
+                hypervisor_hostname = node.get("hypervisor_hostname", node_info["hypervisor_hostname"])
+                cluster_requests.extend(
+                    get_node_ipam_requests({**node, "hypervisor_hostname": hypervisor_hostname}, network).values())
+            cluster_requests.append({"fqdn": f"{cluster_info['cluster_name']}.{network['domain']}",
+                                     "subnet": network.get("host_subnet"), "ip": cluster_info.get("cluster_vip")})
+            self.ipam_requests[cluster_info["cluster_name"]] = cluster_requests
+            requests.extend(cluster_requests)
+        self.allocated_ips.update(allocate_ips_from_ipam(self.ipam_obj, self.logger, requests))
+
     def update_cluster_info_with_site_info(self, cluster_info: Dict, site_info: Dict):
         """Update cluster info with site info
 
@@ -164,6 +221,28 @@ class FoundationScript(Script):
         cluster_info["imaging_parameters"] = site_info.get("imaging_parameters")
         return cluster_info
 
+    def get_fc_available_nodes(self, imaged_node_obj: ImagedNode) -> tuple:
+        """Get the available nodes in Foundation Central, listed once per PC and shared by all the sites
+
+        Args:
+            imaged_node_obj (ImagedNode): ImagedNode object
+
+        Returns:
+            tuple (list, str): List of available nodes, Error if any
+        """
+        def list_available_nodes():
+            node_list, list_error = imaged_node_obj.node_details()
+            if list_error:
+                # Not cached, the next site lists again
+                raise Exception(list_error)
+            return node_list
+
+        try:
+            return InventoryCache.get_instance(self.pc_session).get(
+                f"{imaged_node_obj.resource}/STATE_AVAILABLE", list_available_nodes), None
+        except Exception as e:
+            return None, str(e)
+
     def get_fc_deployment_payloads(self, site_info: Dict):
         """Create Foundation Central Deployment payload
 
@@ -174,7 +253,7 @@ class FoundationScript(Script):
             tuple (list, list): List of Single node deployment with imaging, List of FC Deployment payload (with and without imaging)
         """
         imaged_node_obj = ImagedNode(self.pc_session)
-        fc_available_node_list, error = imaged_node_obj.node_details()
+        fc_available_node_list, error = self.get_fc_available_nodes(imaged_node_obj)
 
         if error:
             self.exceptions.append(error)
@@ -183,6 +262,8 @@ class FoundationScript(Script):
         if fc_available_node_list:
             fc_deployment_payload_list = []
             single_node_imaging_deployment_payload_list = []
+            if self.ipam_obj and not self.dry_run:
+                self.allocate_site_ips(site_info, imaged_node_obj, fc_available_node_list)
             for cluster_info in site_info["clusters"]:
                 cluster_info = self.update_cluster_info_with_site_info(cluster_info, site_info)
                 node_serial_list = [node["node_serial"] for node in cluster_info["node_details"]]
@@ -211,7 +292,7 @@ class FoundationScript(Script):
                                     subnet=cluster_info["network"].get("host_subnet"),
                                     ip=cluster_info.get("cluster_vip"))
                                 if cluster_vip_error:
-                                    ip_error += cluster_vip_error
+                                    ip_error = (ip_error or "") + cluster_vip_error
                                 else:
                                     cluster_info["cluster_vip"] = cluster_vip
                         else:
@@ -238,6 +319,9 @@ class FoundationScript(Script):
                             fc_deployment_payload_list.append(fc_payload)
                     else:
                         self.exceptions.append(ip_error)
+                        # The cluster is not deployed, the IPs allocated for it are not used
+                        release_ips_from_ipam(self.ipam_requests.get(cluster_info["cluster_name"], []),
+                                              self.allocated_ips)
             self.logger.debug(f"single_node_imaging_deployment_payload_list: "
                               f"{single_node_imaging_deployment_payload_list}")
             self.logger.debug(f"fc_deployment_payload_list: {fc_deployment_payload_list}")
@@ -247,7 +331,8 @@ class FoundationScript(Script):
 
     def get_imaging_node_deployment_list(self, single_node_imaging_deployment_payload_list: List,
                                          fc_deployment_payload_list: List, site_config: Dict):
-        """Get imaging only FC deployment payload lists & deploy only cluster deployment payload lists for the imaging nodes
+        """Get imaging only FC deployment payload lists & deploy only cluster deployment payload lists for the imaging nodes.
+        The nodes are packed into imaging only deployments by the ImagingPlanner
 
         Args:
             single_node_imaging_deployment_payload_list (List): List of the single node deployment that needs to be imaged
@@ -258,86 +343,65 @@ class FoundationScript(Script):
             tuple: (
                     imaging_only_deployment_list: Image only FC Deployment lists,
                     single_node_imaging_deployment_payload_list: Updated single node deployment list without imaging,
-                    fc_deployment_payload_list: Updated FC deployment list with or without imaging
+                    fc_deployment_payload_list: Updated FC deployment list with or without imaging,
+                    imaging_plan: ImagingPlan, its batches are in the order of imaging_only_deployment_list
                     )
         """
-        image_node_list = []
-        if len(single_node_imaging_deployment_payload_list) > 1:
-            for deployment in single_node_imaging_deployment_payload_list:
-                # todo won't length of nodes_list be just 1
-                for node in deployment["nodes_list"]:
-                    node_data = deepcopy(node)
-                    image_node_list.append(node_data)
-                    node["image_now"] = False
-
-        elif len(single_node_imaging_deployment_payload_list) == 1:
-            image_node_list.append(single_node_imaging_deployment_payload_list[0]["nodes_list"][0])
+        image_units = []
+        if len(single_node_imaging_deployment_payload_list) == 1:
             # Get an imaging deployment to combine with single node imaging deployment payload
             for fc_deployment in fc_deployment_payload_list:
                 if fc_deployment["nodes_list"][0]["image_now"]:
-                    for node in fc_deployment["nodes_list"]:
-                        node_data = deepcopy(node)
-                        image_node_list.append(node_data)
-                        node["image_now"] = False
                     single_node_imaging_deployment_payload_list.append(fc_deployment)
                     fc_deployment_payload_list.remove(fc_deployment)
                     break
-        if len(image_node_list) < 1:
+        for deployment in single_node_imaging_deployment_payload_list:
+            # The nodes of a deployment are imaged together, the deployment then runs without imaging
+            image_units.append(ImagingUnit([deepcopy(node) for node in deployment["nodes_list"]], deployment))
+            for node in deployment["nodes_list"]:
+                node["image_now"] = False
+
+        if not image_units:
             self.exceptions.append("No nodes to image")
-            return None, None, None
-        elif len(image_node_list) == 1:
-            self.exceptions.append("Cannot image a single one node using FC.")
-            return None, None, None
-        else:
-            # Divide into chuck of 'nodes_per_imaging_deployment'
-            # todo single_node_imaging_deployment_payload_list already has image_nodes_list in it, but creating another
-            nodes_per_imaging_deployment = self.data.get("nodes_per_imaging_deployment") \
-                if self.data.get("nodes_per_imaging_deployment") else 3
-            image_nodes_list = [i for i in divide_chunks(image_node_list, nodes_per_imaging_deployment)]
-            if len(image_nodes_list[-1]) == 1:
-                # todo fix this logic?
-                # if nodes_per_imaging_deployment is 2, add the extra node to another deployment
-                if nodes_per_imaging_deployment == 2:
-                    extra_node = image_nodes_list[-1]
-                    image_nodes_list[-2].extend(extra_node)
-                    image_nodes_list.pop(-1)
-                else:
-                    # if nodes_per_imaging_deployment is not 2, add the borrow a node from another deployment
-                    borrow_node = image_nodes_list[-2].pop(-1)
-                    image_nodes_list[-1].append(borrow_node)
-
-            imaging_only_deployment_list = []
-            index = 1
-            imaged_cluster_obj = ImagedCluster(self.pc_session)
-            # todo Use enumerate
-            for nodes_list in image_nodes_list:
-                image_node_spec = imaged_cluster_obj._get_default_spec()
-                image_node_spec["cluster_name"] = "imaging_nodes_set_{0}".format(index)
-                image_node_spec["nodes_list"] = list(nodes_list)
-                image_node_spec["skip_cluster_creation"] = True
-                image_node_spec.update(imaged_cluster_obj.get_aos_ahv_spec(site_config["imaging_parameters"]))
-                image_node_spec["common_network_settings"] = {
-                        "cvm_dns_servers": site_config["name_servers_list"],
-                        "hypervisor_dns_servers": site_config["name_servers_list"],
-                        "cvm_ntp_servers": site_config["ntp_servers_list"],
-                        "hypervisor_ntp_servers": site_config["ntp_servers_list"],
-                    }
-                imaging_only_deployment_list.append(image_node_spec)
-                index += 1
-            return imaging_only_deployment_list, single_node_imaging_deployment_payload_list, fc_deployment_payload_list
+            return None, None, None, None
+        planner = ImagingPlanner(self.imaging_throughput, max_in_flight=self.max_in_flight_deployments,
+                                 max_nodes_per_deployment=self.data.get("nodes_per_imaging_deployment"))
+        try:
+            imaging_plan = planner.plan(image_units, fc_deployment_payload_list)
+        except Exception as e:
+            self.exceptions.append(str(e))
+            return None, None, None, None
+        self.logger.info(f"Site {site_config['site_name']}: {imaging_plan.describe()}")
+
+        imaging_only_deployment_list = []
+        imaged_cluster_obj = ImagedCluster(self.pc_session)
+        for index, batch in enumerate(imaging_plan.batches, start=1):
+            image_node_spec = imaged_cluster_obj._get_default_spec()
+            image_node_spec["cluster_name"] = "imaging_nodes_set_{0}".format(index)
+            image_node_spec["nodes_list"] = batch.nodes
+            image_node_spec["skip_cluster_creation"] = True
+            image_node_spec.update(imaged_cluster_obj.get_aos_ahv_spec(site_config["imaging_parameters"]))
+            image_node_spec["common_network_settings"] = {
+                    "cvm_dns_servers": site_config["name_servers_list"],
+                    "hypervisor_dns_servers": site_config["name_servers_list"],
+                    "cvm_ntp_servers": site_config["ntp_servers_list"],
+                    "hypervisor_ntp_servers": site_config["ntp_servers_list"],
+                }
+            imaging_only_deployment_list.append(image_node_spec)
+        return (imaging_only_deployment_list, single_node_imaging_deployment_payload_list, fc_deployment_payload_list,
+                imaging_plan)
 
     def get_post_imaging_batch_scripts(self, deployments_to_run: List, fc_deployment_logger: logging.getLogger):
-        """Get batch sripts to run post imaging scripts & FC deployment scripts
+        """Get batch sripts to run post imaging scripts, the FC deployments are then submitted with submit_deployments
 
         Args:
             deployments_to_run (List): FC Deployment list post imaging
             fc_deployment_logger (logging.getLogger): Logger handler to use for logging
 
         Returns:
-            tuple: Batchscripts for post imaging & FC deployment to run
+            BatchScript: Batchscript for post imaging to run
         """
         post_imaging_scripts_op = BatchScript()
-        post_imaging_deployment_op = BatchScript()
         update_fc_heartbeat_interval_op = BatchScript(parallel=True, max_workers=10)
         if self.data.get("test_enable_one_node"):
             enable_one_node_op = BatchScript(parallel=True, max_workers=10)
@@ -351,29 +415,51 @@ class FoundationScript(Script):
                 if self.data.get("test_enable_one_node"):
                     enable_one_node_op.add(EnableOneNode(node["cvm_ip"], self.cvm_username, self.cvm_password,
                                                          fc_deployment_logger=fc_deployment_logger))
-            post_imaging_deployment_op.add(ImageClusterScript(pc_session=self.pc_session,
-                                                              cluster_data=image_node_deployment,
-                                                              fc_deployment_logger=fc_deployment_logger))
         post_imaging_scripts_op.add(update_fc_heartbeat_interval_op)
         if self.data.get("test_enable_one_node"):
             post_imaging_scripts_op.add(enable_one_node_op)
-        return post_imaging_scripts_op, post_imaging_deployment_op
+        return post_imaging_scripts_op
+
+    def get_deployment_poller(self) -> DeploymentPoller:
+        """Get the poller of the Foundation Central of the block, shared by the sites of the block
+
+        Returns:
+            DeploymentPoller: Poller to submit & monitor the deployments
+        """
+        return DeploymentPoller.get_instance(self.pc_session, max_in_flight=self.max_in_flight_deployments)
 
-    def get_deployment_batch_scripts(self, fc_deployment_payload_list: List, fc_deployment_logger: logging.getLogger) -> BatchScript:
-        """Create batch scripts for FC Deployments
+    def submit_deployments(self, fc_deployment_payload_list: List, fc_deployment_logger: logging.getLogger) -> Dict:
+        """Submit the FC Deployments, and start monitoring them with the poller
 
         Args:
             fc_deployment_payload_list (List): List of FC deployment payloads
             fc_deployment_logger (str): Log handler to use for logging
 
         Returns:
-            BatchScript: Batch script to run
+            dict: Imaged cluster uuid by cluster name, of the submitted deployments
+        """
+        poller = self.get_deployment_poller()
+        scripts = [ImageClusterScript(pc_session=self.pc_session, cluster_data=deployment,
+                                      fc_deployment_logger=fc_deployment_logger)
+                   for deployment in fc_deployment_payload_list]
+        imaged_cluster_uuid_dict = {}
+        for results in WorkerBudget.get_instance().map(
+                lambda script: poller.deploy(script, fc_deployment_logger, on_progress=self.record_progress),
+                scripts, max_workers=self.MAX_PARALLEL_SUBMISSIONS):
+            imaged_cluster_uuid_dict.update(results)
+        return imaged_cluster_uuid_dict
+
+    def record_progress(self, progress: Dict):
+        """Keep the latest progress of a FC deployment, called by the poller every time it changes
+
+        Args:
+            progress (Dict): Progress of the deployment, see DeploymentProgress.to_dict
         """
-        fc_deployment_op = BatchScript(parallel=True, max_workers=10)
-        for deployment in fc_deployment_payload_list:
-            fc_deployment_op.add(ImageClusterScript(pc_session=self.pc_session, cluster_data=deployment,
-                                                    fc_deployment_logger=fc_deployment_logger))
-        return fc_deployment_op
+        self.deployment_progress[progress["cluster_name"]] = progress
+        eta = f", ETA {progress['eta_secs'] // 60} mins" if progress["eta_secs"] is not None else ""
+        stage = f" ({progress['stage']})" if progress["stage"] else ""
+        self.logger.info(f"Cluster {progress['cluster_name']} deployment {progress['state']}: "
+                         f"{progress['percent_complete']}%{stage}{eta}")
 
     def get_imaged_node_deployments_to_run(self, deployment_result: Dict, imaging_deployment_payload_list: List):
         """Get the deployments to run after imaging the nodes. Remove the deployments for failed imaging
@@ -413,7 +499,8 @@ class FoundationScript(Script):
 
     def run_fc_deployments(self, single_node_imaging_deployment_payload_list: List, fc_deployment_payload_list: List,
                            site_config: Dict, block_info: Dict):
-        """Run Foundation Central imaging and cluster deployments
+        """Run Foundation Central imaging and cluster deployments. The cluster deployments of the nodes of an imaging
+        deployment are run as soon as it completes, overlapping with the imaging of the other nodes
 
         Args:
             single_node_imaging_deployment_payload_list (List): List of single node clusters with imaging
@@ -423,19 +510,29 @@ class FoundationScript(Script):
         """
         results = {}
         block_name = block_info["pod_block_name"]
-        imaging_only_deployment_list, imaging_uuid_dict, imaged_cluster_uuid_dict = [], [], []
+        imaging_only_deployment_list, imaging_uuid_dict, imaged_cluster_uuid_dict = [], {}, {}
+        imaging_plan = None
         imaging_log_file = f"{block_name}_{site_config['site_name']}_node_imaging.log"
         deployment_log_file = f"{block_name}_{site_config['site_name']}_deployment.log"
         fc_deployment_logger = get_logger(deployment_log_file, file_name=deployment_log_file)
         fc_imaging_logger = get_logger(imaging_log_file, file_name=imaging_log_file)
 
-        # If there are any single nodes to be imaged, create a separate imaging payload with chunk of nodes
-        # into multiple deployments
+        # If there are any single nodes to be imaged, pack the nodes into imaging only deployments
         if single_node_imaging_deployment_payload_list:
-            imaging_only_deployment_list, imaging_deployment_payload_list, fc_deployment_payload_list = \
+            imaging_only_deployment_list, _, fc_deployment_payload_list, imaging_plan = \
                 self.get_imaging_node_deployment_list(single_node_imaging_deployment_payload_list,
                                                       fc_deployment_payload_list, site_config)
 
+        if self.dry_run:
+            if not imaging_plan:
+                imaging_plan = ImagingPlanner(self.imaging_throughput, max_in_flight=self.max_in_flight_deployments)\
+                    .plan([], fc_deployment_payload_list)
+            self.logger.info(f"Dry run, no deployment submitted for Site {site_config['site_name']}\n"
+                             f"{imaging_plan.describe()}")
+            plan = imaging_plan.to_dict()
+            plan["cluster_deployments"] = [deployment["cluster_name"] for deployment in fc_deployment_payload_list or []]
+            return {site_config["site_name"]: {"result": "DRY_RUN", "plan": plan}}
+
         if imaging_only_deployment_list:
             # Get CVM Credentials for post imaging operations
             cvm_user = block_info.get("cvm_credential")
@@ -444,70 +541,86 @@ class FoundationScript(Script):
             if not self.cvm_username and not self.cvm_password:
                 self.exceptions.append("CVM Credentials are not provided")
             else:
-                # Get batch script to run image only deployments
-                imaging_deployment_op = self.get_deployment_batch_scripts(imaging_only_deployment_list,
-                                                                          fc_imaging_logger)
-                # Run the image only deployment(s)
-                imaging_uuid_dict = imaging_deployment_op.run()
+                # Run the image only deployment(s), in the order of the plan
+                imaging_uuid_dict = self.submit_deployments(imaging_only_deployment_list, fc_imaging_logger)
 
         if fc_deployment_payload_list:
-            # Get batch script to run cluster deployments with or without imaging
-            deployment_op = self.get_deployment_batch_scripts(fc_deployment_payload_list, fc_deployment_logger)
-            # Run the deployments
-            imaged_cluster_uuid_dict = deployment_op.run()
-
-        # Creating Batch script to monitor all the FC deployments
-        monitor_deployment_script = BatchScript(parallel=True, max_workers=40)
+            # Run the cluster deployments with or without imaging
+            imaged_cluster_uuid_dict = self.submit_deployments(fc_deployment_payload_list, fc_deployment_logger)
 
-        # Start FC deployment monitoring
-        if imaging_uuid_dict:
-            for cluster_name, imaged_cluster_uuid in imaging_uuid_dict.items():
-                monitor_deployment_script.add(MonitorDeployment(pc_session=self.pc_session,
-                                                                cluster_name=cluster_name,
-                                                                imaged_cluster_uuid=imaged_cluster_uuid,
-                                                                fc_deployment_logger=fc_imaging_logger))
-        if imaged_cluster_uuid_dict:
-            for cluster_name, imaged_cluster_uuid in imaged_cluster_uuid_dict.items():
-                monitor_deployment_script.add(MonitorDeployment(pc_session=self.pc_session, cluster_name=cluster_name,
-                                                                imaged_cluster_uuid=imaged_cluster_uuid,
-                                                                fc_deployment_logger=fc_deployment_logger))
-        if imaging_uuid_dict or imaged_cluster_uuid_dict:
-            self.logger.info(f"Wait for 15 minutes to monitor deployment status for Block {block_name} "
-                             f"Site {site_config['site_name']}")
-            time.sleep(15 * 60)
-            deployment_result = monitor_deployment_script.run()
-            results.update(deployment_result)
-
-        # Start executing post imaging actions to update interval times in cvms
+        # The poller of the FC monitors the deployments of all the sites, starting 15 minutes after their submission
+        poller = self.get_deployment_poller()
+        self.logger.info(f"Wait for the deployments of Block {block_name} Site {site_config['site_name']}")
+        post_imaging_uuid_dict = {}
         if imaging_uuid_dict:
-            # check the nodes which are re-imaged
-            deployments_to_run = self.get_imaged_node_deployments_to_run(deployment_result,
-                                                                         imaging_deployment_payload_list)
-            if deployments_to_run:
-                post_imaging_scripts_op, post_imaging_deployment_op = (
-                    self.get_post_imaging_batch_scripts(deployments_to_run, fc_deployment_logger))
-                post_imaging_scripts_op.run()
-                self.logger.info("Sleep 5 mins for the nodes to be discovered")
-                time.sleep(5 * 60)
-                post_imaging_uuid_dict = post_imaging_deployment_op.run()
-                self.logger.info(f"Wait for 15 minutes to monitor deployment status for Block {block_name} "
-                                 f"Site {site_config['site_name']}")
-                # todo check if do we really have to wait for 15 mins even for cluster creation after sleeping 5 mins
-                # for heartbeat update as well
-                time.sleep(15 * 60)
-                if post_imaging_uuid_dict:
-                    monitor_deployment_script = BatchScript(parallel=True, max_workers=40)
-                    for cluster_name, imaged_cluster_uuid in post_imaging_uuid_dict.items():
-                        monitor_deployment_script.add(MonitorDeployment(pc_session=self.pc_session,
-                                                                        cluster_name=cluster_name,
-                                                                        imaged_cluster_uuid=imaged_cluster_uuid,
-                                                                        fc_deployment_logger=fc_imaging_logger))
-                    post_imaging_deployment_result = monitor_deployment_script.run()
-                    results.update(post_imaging_deployment_result)
-            else:
-                self.logger.info("No cluster deployments to run after imaging, as imaging failed for the nodes.")
+            batches = {f"imaging_nodes_set_{index}": batch
+                       for index, batch in enumerate(imaging_plan.batches, start=1)}
+            post_imaging_uuid_dict = self.run_post_imaging_deployments(imaging_uuid_dict, batches, results,
+                                                                       fc_deployment_logger, fc_imaging_logger)
+
+        # todo check if do we really have to wait for 15 mins even for cluster creation after sleeping 5 mins
+        # for heartbeat update as well
+        uuids = list(imaged_cluster_uuid_dict.values()) + list(post_imaging_uuid_dict.values())
+        if uuids:
+            results.update(poller.wait(uuids))
         return results
 
+    def run_post_imaging_deployments(self, imaging_uuid_dict: Dict, batches: Dict, results: Dict,
+                                     fc_deployment_logger: logging.getLogger,
+                                     fc_imaging_logger: logging.getLogger) -> Dict:
+        """Wait for the imaging only deployments, and submit the cluster deployments of the nodes of each of them as
+        soon as it completes. The measured imaging durations update the imaging throughput
+
+        Args:
+            imaging_uuid_dict (Dict): Imaged cluster uuid of the imaging only deployments, by name
+            batches (Dict): ImagingBatch of the imaging only deployments, by name
+            results (Dict): Results of the deployments, updated with the imaging results
+            fc_deployment_logger (logging.getLogger): Logger handler of the post imaging scripts
+            fc_imaging_logger (logging.getLogger): Logger handler of the post imaging deployments
+
+        Returns:
+            Dict: Imaged cluster uuid of the post imaging deployments, by cluster name
+        """
+        poller = self.get_deployment_poller()
+        names = {imaged_cluster_uuid: name for name, imaged_cluster_uuid in imaging_uuid_dict.items()}
+        pending = list(names)
+        # (time the nodes are discovered again, deployments to run)
+        to_submit = []
+        post_imaging_uuid_dict = {}
+        while pending or to_submit:
+            timeout = max(0.0, min(ready_at for ready_at, _ in to_submit) - time.time()) if to_submit else None
+            if pending:
+                done = poller.wait_any(pending, timeout)
+            else:
+                time.sleep(timeout)
+                done = []
+
+            for imaged_cluster_uuid in done:
+                pending.remove(imaged_cluster_uuid)
+                batch = batches[names[imaged_cluster_uuid]]
+                imaging_result = poller.wait([imaged_cluster_uuid])
+                results.update(imaging_result)
+                for result in imaging_result.values():
+                    if result["result"] == "COMPLETED" and result.get("progress"):
+                        self.imaging_throughput.record(batch.units[0].hardware_class, len(batch.nodes),
+                                                       result["progress"]["elapsed_secs"])
+                # check the nodes which are re-imaged
+                deployments_to_run = self.get_imaged_node_deployments_to_run(imaging_result, batch.deployments)
+                if deployments_to_run:
+                    # Start executing post imaging actions to update interval times in cvms
+                    self.get_post_imaging_batch_scripts(deployments_to_run, fc_deployment_logger).run()
+                    self.logger.info(f"Wait 5 mins for the nodes of {names[imaged_cluster_uuid]} to be discovered")
+                    to_submit.append((time.time() + 5 * 60, deployments_to_run))
+                else:
+                    self.logger.info(f"No cluster deployments to run after {names[imaged_cluster_uuid]}, "
+                                     f"as imaging failed for the nodes.")
+
+            now = time.time()
+            for ready_at, deployments_to_run in [item for item in to_submit if item[0] <= now]:
+                to_submit.remove((ready_at, deployments_to_run))
+                post_imaging_uuid_dict.update(self.submit_deployments(deployments_to_run, fc_imaging_logger))
+        return post_imaging_uuid_dict
+
     def deploy_site(self, block_info: str, site_config: Dict):
         """Deploy clusters in block-sites
 
@@ -518,8 +631,13 @@ class FoundationScript(Script):
         site_name = site_config["site_name"]
         self.logger.info(f"Start deployment for site {site_name}")
         # Get Foundation Central Deployment Payloads
-        single_node_imaging_deployment_payload_list, fc_deployment_payload_list = (
-            self.get_fc_deployment_payloads(site_config))
+        payloads = self.get_fc_deployment_payloads(site_config)
+        if not payloads:
+            # The reason is already in the exceptions
+            self.exceptions.append(f"Could not create the Foundation Central deployment payloads for site "
+                                   f"{site_name}, skipping its deployment")
+            return {}
+        single_node_imaging_deployment_payload_list, fc_deployment_payload_list = payloads
 
         # Run Foundation Central Deployments for each site
         results = self.run_fc_deployments(single_node_imaging_deployment_payload_list, fc_deployment_payload_list,
@@ -527,6 +645,28 @@ class FoundationScript(Script):
         self.logger.info(json.dumps(results, indent=2))
         return results
 
+    def deploy_sites(self, block_info: Dict, site_config_list: List) -> Dict:
+        """Deploy the sites of a block concurrently, max_parallel_sites at a time. The sites share the FC node
+        inventory and the deployment poller of the block's Foundation Central
+
+        Args:
+            block_info (dict): pod-block info
+            site_config_list (list): Site configurations
+
+        Returns:
+            dict: Results of the deployments of all the sites
+        """
+        overall_result = {}
+        site_results = WorkerBudget.get_instance().map(lambda site_config: self.deploy_site(block_info, site_config),
+                                                       site_config_list, max_workers=self.max_parallel_sites,
+                                                       return_exceptions=True)
+        for site_config, results in zip(site_config_list, site_results):
+            if isinstance(results, Exception):
+                self.exceptions.append(f"Deployment of site {site_config['site_name']} failed: {results}")
+            elif results:
+                overall_result.update(results)
+        return overall_result
+
     def execute(self, **kwargs):
         """Run Image cluster nodes for multiple sites
         """
@@ -539,11 +679,8 @@ class FoundationScript(Script):
                 self.logger.info(f"Starting deployment for sites")
                 self.pc_session = self.data["pc_session"]
 
-                # Looping through sites
-                for site_config in self.sites:
-                    self.data["pod_block_name"] = ""
-                    results = self.deploy_site(self.data, site_config)
-                    overall_result.update(results)
+                self.data["pod_block_name"] = ""
+                overall_result.update(self.deploy_sites(self.data, self.sites))
             except Exception as e:
                 self.exceptions.append(e)
             self.logger.info(json.dumps(overall_result, indent=2))
@@ -558,10 +695,8 @@ class FoundationScript(Script):
                     self.logger.info(f"Start deployment for block {block_info['pod_block_name']}")
                     self.pc_session = block_info["pc_session"]
 
-                    # Looping through sites
-                    for site_config in block_info["edge-sites"]:
-                        results = self.deploy_site(block_info, site_config)
-                        overall_result.update(results)
+                    # Blocks are deployed one after the other, they each have their own PC & CVM credentials
+                    overall_result.update(self.deploy_sites(block_info, block_info["edge-sites"]))
                 except Exception as e:
                     self.exceptions.append(e)
             self.logger.info(json.dumps(overall_result, indent=2))
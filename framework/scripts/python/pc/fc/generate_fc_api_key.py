@@ -11,6 +11,7 @@ class GenerateFcApiKey(Script):
     """
     Class that generates Foundation Central API Key
     """
+    DEPENDS_ON = ["EnableFC"]
     def __init__(self, data: Dict, **kwargs):
         self.status = False
         self.data = data
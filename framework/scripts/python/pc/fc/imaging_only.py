@@ -6,7 +6,8 @@ from framework.scripts.python.helpers.batch_script import BatchScript
 from framework.scripts.python.helpers.fc.imaged_nodes import ImagedNode
 from framework.scripts.python.helpers.fc.monitor_fc_deployment import MonitorDeployment
 from framework.helpers.helper_functions import read_creds
-from framework.helpers.general_utils import update_network_info_in_existing_node_dict, assign_ips_from_ipam
+from framework.helpers.general_utils import (update_network_info_in_existing_node_dict, assign_ips_from_ipam,
+                                            allocate_ips_from_ipam, get_node_ipam_requests, release_ips_from_ipam)
 
 logger = get_logger(__name__)
 
@@ -64,6 +65,17 @@ class Imaging(Script):
                             f"Skipping Imaging for these nodes")
                         continue
 
+                    # Allocate the IPs of all the nodes of the batch from IPAM in bulk
+                    ipam_requests, allocated_ips = [], {}
+                    if self.ipam_obj:
+                        for node in node_list:
+                            node_info = {**existing_node_detail_dict[node["node_serial"]], **node}
+                            if node_info.get("hypervisor_hostname"):
+                                ipam_requests.extend(
+                                    get_node_ipam_requests(node_info, self.data["ipam_config"]).values())
+                        allocated_ips = allocate_ips_from_ipam(self.ipam_obj, self.logger, ipam_requests)
+
+                    ip_assignment_failed = False
                     for node in node_list:
                         node_serial = node["node_serial"]
                         for key, value in node.items():
@@ -78,15 +90,21 @@ class Imaging(Script):
                         if self.ipam_obj:
                             success, error_message = assign_ips_from_ipam(
                                 node_info=existing_node_detail_dict[node_serial], ipam_config=self.data["ipam_config"],
-                                ipam_obj=self.ipam_obj, logger_obj=self.logger
+                                ipam_obj=self.ipam_obj, logger_obj=self.logger, allocated_ips=allocated_ips
                             )
                             if not success:
                                 self.logger.error(f"Failed to assign IPs from IPAM for node {node['node_serial']}: {error_message}")
                                 self.exceptions.append(error_message)
+                                ip_assignment_failed = True
                                 break
 
                         existing_node_detail_dict[node_serial]["image_now"] = True # Set image_now to True in Payload for FC Imaging
 
+                    if ip_assignment_failed:
+                        # Skip imaging the batch, the IPs allocated for its nodes are not used
+                        release_ips_from_ipam(ipam_requests, allocated_ips)
+                        continue
+
                     imaging_data = {
                         "nodes_list": list(existing_node_detail_dict.values()),
                         "aos_package_url": batch["imaging_parameters"]["aos_package_url"],
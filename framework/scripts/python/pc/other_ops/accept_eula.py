@@ -10,6 +10,7 @@ class AcceptEulaPc(Script):
     """
     Accept Eula
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.data = data
         self.pc_session = self.data["pc_session"]
@@ -10,6 +10,7 @@ class UpdatePulsePc(Script):
     """
     Update Pulse
     """
+
     def __init__(self, data: Dict, **kwargs):
         self.data = data
         self.pc_session = self.data["pc_session"]
@@ -2,6 +2,7 @@ from abc import abstractmethod
 from framework.helpers.log_utils import get_logger
 from framework.scripts.python.script import Script
 from framework.scripts.python.helpers.v3.prism_central import PrismCentral
+from framework.scripts.python.helpers.pc_batch_op import get_batch_options
 from packaging.version import parse
 
 import importlib
@@ -71,12 +72,20 @@ class PcScript(Script):
             # Import helper for entity using v4
             module = f"framework.scripts.python.helpers.v4.{ENTITY_VERSION_MAP[entity][1]}"
             cls = getattr(importlib.import_module(module),entity)
-            return cls(self.v4_api_util)
+            helper = cls(self.v4_api_util)
         else:
             # Import helper for entity using v3
             module = f"framework.scripts.python.helpers.v3.{ENTITY_VERSION_MAP[entity][1]}"
             cls = getattr(importlib.import_module(module),entity)
-            return cls(self.pc_session)
+            helper = cls(self.pc_session)
+
+        # Batch calls of the helper, e.g. batch_create, use the options in "pc_batch" of the config
+        batch_op = getattr(helper, "batch_op", None)
+        if batch_op:
+            for option, value in get_batch_options(self.data).items():
+                if hasattr(batch_op, option):
+                    setattr(batch_op, option, value)
+        return helper
 
     @abstractmethod
     def execute(self, **kwargs):
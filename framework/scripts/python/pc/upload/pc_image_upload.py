@@ -1,6 +1,7 @@
 from typing import Dict
 
 from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.chunked_upload import get_upload_options
 from framework.scripts.python.helpers.v3.image import Image
 from framework.scripts.python.script import Script
 from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
@@ -22,20 +23,34 @@ class PcImageUpload(Script):
     def execute(self, **kwargs):
         try:
             if self.data.get("images"):
-                image_config_list = self.data.get("images")
                 image_upload = Image(session=self.pc_session)
+                upload_options = get_upload_options(self.data)
 
                 # Get Exisiting image list from PC
                 existing_image_list = [image.get('status', {}).get('name') for image in image_upload.list()]
 
-                # Check if Image already exists in PC & remove the config from config list
-                for image_config in image_config_list:
-                    if image_config["name"] in existing_image_list:
-                        image_config_list.remove(image_config)
+                # Check if Image already exists in PC & remove the config from config list, unless the upload of
+                # its file was interrupted
+                image_config_list = []
+                for image_config in self.data.get("images"):
+                    if image_config["name"] in existing_image_list and not (
+                            image_config.get("source") and image_upload.is_upload_pending(
+                                image_config["name"], image_config["source"], upload_options.get("state_dir"))):
                         logger.warning(f"Image {image_config['name']} already exists")
+                        continue
+                    image_config_list.append(image_config)
+
+                # Local files are uploaded in chunks, one at a time
+                for image_config in [image_config for image_config in image_config_list if image_config.get("source")]:
+                    try:
+                        self.logger.info(f"Uploading Image {image_config['name']!r} from {image_config['source']!r}")
+                        image_upload.file_upload(image_config, **upload_options)
+                    except Exception as e:
+                        self.exceptions.append(f"Failed to upload the Image {image_config['name']!r}: {e}")
 
                 # Upload images to PC clusters
-                task_uuid_list = image_upload.url_upload(image_config_list)
+                url_config_list = [image_config for image_config in image_config_list if not image_config.get("source")]
+                task_uuid_list = image_upload.url_upload(url_config_list) if url_config_list else []
                 if task_uuid_list:
                     app_response, status = TaskMonitor(self.pc_session,
                                                        task_uuid_list=task_uuid_list).monitor()
@@ -1,6 +1,7 @@
 from typing import Dict
 
 from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.chunked_upload import get_upload_options
 from framework.scripts.python.helpers.v3.ova import Ova
 from framework.scripts.python.script import Script
 from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
@@ -22,19 +23,33 @@ class PcOVAUpload(Script):
     def execute(self, **kwargs):
         try:
             if self.data.get("ovas"):
-                ova_config_list = self.data.get("ovas")
                 ova_upload = Ova(session=self.pc_session)
+                upload_options = get_upload_options(self.data)
 
                 # Get Existing OVA list from PC
                 existing_ova_list = [ova["info"]["name"] for ova in ova_upload.list()]
-                # Check if OVA already exists in PC & remove the config from config list
-                for ova_config in ova_config_list:
-                    if ova_config["name"] in existing_ova_list:
-                        ova_config_list.remove(ova_config)
+                # Check if OVA already exists in PC & remove the config from config list, unless the upload of its
+                # file was interrupted
+                ova_config_list = []
+                for ova_config in self.data.get("ovas"):
+                    if ova_config["name"] in existing_ova_list and not (
+                            ova_config.get("source") and ova_upload.is_upload_pending(
+                                ova_config["name"], ova_config["source"], upload_options.get("state_dir"))):
                         logger.warning(f"OVA {ova_config['name']} already exists")
+                        continue
+                    ova_config_list.append(ova_config)
+
+                # Local files are uploaded in chunks, one at a time
+                for ova_config in [ova_config for ova_config in ova_config_list if ova_config.get("source")]:
+                    try:
+                        self.logger.info(f"Uploading OVA {ova_config['name']!r} from {ova_config['source']!r}")
+                        ova_upload.file_upload(ova_config, **upload_options)
+                    except Exception as e:
+                        self.exceptions.append(f"Failed to upload the OVA {ova_config['name']!r}: {e}")
 
                 # Upload OVAs to PC clusters
-                task_uuid_list = ova_upload.url_upload(ova_config_list)
+                url_config_list = [ova_config for ova_config in ova_config_list if not ova_config.get("source")]
+                task_uuid_list = ova_upload.url_upload(url_config_list) if url_config_list else []
                 if task_uuid_list:
                     pc_task_monitor = TaskMonitor(self.pc_session,
                                                   task_uuid_list=task_uuid_list)
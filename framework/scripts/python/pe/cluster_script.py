@@ -1,10 +1,11 @@
 import threading
 import multiprocessing
-import concurrent.futures
 from abc import abstractmethod
-from typing import Dict
+from typing import Dict, Optional
 from framework.helpers.log_utils import get_logger
 from framework.scripts.python.script import Script
+from framework.scripts.python.helpers.section_state import get_hash
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
 
 logger = get_logger(__name__)
 
@@ -18,14 +19,16 @@ class ClusterScript(Script):
         self.parallel = parallel
         super(ClusterScript, self).__init__(**kwargs)
         self.results["clusters"] = {}
-        # Set the value of max_workers based on the number of CPU cores
+        # Set the value of max_workers based on the number of CPU cores, the threads are borrowed from the
+        # process-wide WorkerBudget
         self.max_workers = multiprocessing.cpu_count() + 4
 
     def execute(self, **kwargs):
         if self.parallel:
             try:
-                with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    executor.map(self.execute_single_cluster, self.pe_clusters.keys(), self.pe_clusters.values())
+                WorkerBudget.get_instance().map(self.execute_single_cluster, self.pe_clusters.keys(),
+                                                self.pe_clusters.values(), max_workers=self.max_workers,
+                                                host=lambda ip, _: ip, return_exceptions=True)
             except Exception as e:
                 self.exceptions.append(e)
         else:
@@ -37,8 +40,9 @@ class ClusterScript(Script):
 
     def verify(self, **kwargs):
         if self.parallel:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                executor.map(self.verify_single_cluster, self.pe_clusters.keys(), self.pe_clusters.values())
+            WorkerBudget.get_instance().map(self.verify_single_cluster, self.pe_clusters.keys(),
+                                            self.pe_clusters.values(), max_workers=self.max_workers,
+                                            host=lambda ip, _: ip, return_exceptions=True)
         else:
             try:
                 for cluster_ip, cluster_details in self.pe_clusters.items():
@@ -46,6 +50,24 @@ class ClusterScript(Script):
             except Exception as e:
                 self.exceptions.append(e)
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        """
+        Fingerprint of all the clusters, None if the script can't tell for any of them
+        """
+        fingerprints = {}
+        for cluster_ip, cluster_details in self.pe_clusters.items():
+            fingerprint = self.get_cluster_fingerprint(cluster_ip, cluster_details)
+            if fingerprint is None:
+                return None
+            fingerprints[cluster_ip] = fingerprint
+        return get_hash(fingerprints)
+
+    def get_cluster_fingerprint(self, cluster_ip: str, cluster_details: Dict) -> Optional[str]:
+        """
+        Fingerprint of the state of the cluster the script applies its section to, None if the script can't tell
+        """
+        return None
+
     @abstractmethod
     def execute_single_cluster(self, cluster_ip: str, cluster_details: Dict):
         pass
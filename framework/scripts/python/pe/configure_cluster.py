@@ -5,7 +5,8 @@ from framework.scripts.python.pe.create.add_ad_server_pe import AddAdServerPe
 from framework.scripts.python.pe.create.create_container_pe import CreateContainerPe
 # from framework.scripts.python.pc.create.create_pc_subnets import CreateSubnetsPc
 from framework.scripts.python.pe.create.create_rolemapping_pe import CreateRoleMappingPe
-from framework.scripts.python.helpers.batch_script import BatchScript
+from framework.scripts.python.helpers.section_state import SectionStateStore
+from framework.scripts.python.helpers.workflow_script import WorkflowScript
 from framework.scripts.python.pe.other_ops.accept_eula import AcceptEulaPe
 from framework.scripts.python.pe.other_ops.change_system_password import ChangeDefaultAdminPasswordPe
 from framework.scripts.python.pe.other_ops.open_replication_ports_clusters import OpenRepPort
@@ -44,43 +45,44 @@ class ClusterConfig(Script):
         if not self.data.get("vault_to_use"):
             self.data["vault_to_use"] = self.global_data.get("vault_to_use")
 
-        cluster_batch_scripts = BatchScript(results_key=self.results_key)
+        # Every cluster goes through the workflow on its own, a slow cluster doesn't hold back the others
+        cluster_workflow = WorkflowScript(results_key=self.results_key,
+                                          state_store=SectionStateStore.from_config(self.data, self.global_data))
+        for cluster_ip, cluster_details in self.data.get("clusters", {}).items():
+            cluster_data = {**self.data, "clusters": {cluster_ip: cluster_details}}
 
-        # Initial cluster config in all clusters
-        cluster_batch_scripts.add(
-            ChangeDefaultAdminPasswordPe(self.data, log_file=self.log_file)
-        )
+            # Initial cluster config
+            password_node = cluster_workflow.add(
+                ChangeDefaultAdminPasswordPe(cluster_data, log_file=self.log_file), scope=cluster_ip,
+                endpoint=cluster_ip)
 
-        # Add Auth, AcceptEulaPe, UpdatePulsePe, Register PE to PC, Create containers, Add NTP, Add Name servers,
-        # CreateSubnetPe -> needs ChangeDefaultAdminPasswordPe
-        # Don't know if we can execute OpenRepPort, before or with ChangeDefaultAdminPasswordPe, so keeping it here
-        main_cluster_batch_scripts = BatchScript(parallel=True)
-        main_cluster_batch_scripts.add_all([
-            AcceptEulaPe(self.data, log_file=self.log_file),
-            UpdatePulsePe(self.data, log_file=self.log_file),
-            AddAdServerPe(self.data, log_file=self.log_file),
-            OpenRepPort(self.data, log_file=self.log_file),
-            CreateContainerPe(self.data, log_file=self.log_file),
-            AddNtpServersPe(self.data, log_file=self.log_file),
-            AddNameServersPe(self.data, log_file=self.log_file),
-            CreateSubnetPe(self.data, log_file=self.log_file),
-            HaReservation(self.data, log_file=self.log_file),
-            RebuildCapacityReservation(self.data, log_file=self.log_file)
-        ])
-        if not self.data.get("skip_pc_registration") and self.data.get("pc_ip") and self.data.get("pc_credential"):
-            main_cluster_batch_scripts.add(RegisterToPc(self.data, log_file=self.log_file))
-        cluster_batch_scripts.add(main_cluster_batch_scripts)
+            # Add Auth, AcceptEulaPe, UpdatePulsePe, Register PE to PC, Create containers, Add NTP, Add Name servers,
+            # CreateSubnetPe -> needs ChangeDefaultAdminPasswordPe
+            # Don't know if we can execute OpenRepPort, before or with ChangeDefaultAdminPasswordPe, so keeping it here
+            # Update DSIP -> fails if we update DSIP with Auth
+            # Add Role-mappings -> needs AddAdServer
+            # Register PE to PC -> needs UpdateDsip
+            # These dependencies are declared in the DEPENDS_ON of the scripts
+            main_cluster_scripts = [
+                AcceptEulaPe(cluster_data, log_file=self.log_file),
+                UpdatePulsePe(cluster_data, log_file=self.log_file),
+                AddAdServerPe(cluster_data, log_file=self.log_file),
+                OpenRepPort(cluster_data, log_file=self.log_file),
+                CreateContainerPe(cluster_data, log_file=self.log_file),
+                AddNtpServersPe(cluster_data, log_file=self.log_file),
+                AddNameServersPe(cluster_data, log_file=self.log_file),
+                CreateSubnetPe(cluster_data, log_file=self.log_file),
+                HaReservation(cluster_data, log_file=self.log_file),
+                RebuildCapacityReservation(cluster_data, log_file=self.log_file),
+                UpdateDsip(cluster_data, log_file=self.log_file),
+                CreateRoleMappingPe(cluster_data, log_file=self.log_file)
+            ]
+            if not self.data.get("skip_pc_registration") and self.data.get("pc_ip") and self.data.get("pc_credential"):
+                main_cluster_scripts.append(RegisterToPc(cluster_data, log_file=self.log_file))
+            cluster_workflow.add_all(main_cluster_scripts, scope=cluster_ip, depends_on=[password_node],
+                                     endpoint=cluster_ip)
 
-        # Update DSIP -> needs ChangeDefaultAdminPasswordPe, fails if we update DSIP with Auth
-        # Add Role-mappings -> needs AddAdServer
-        primary_cluster_batch_scripts = BatchScript(parallel=True)
-        primary_cluster_batch_scripts.add_all([
-            UpdateDsip(self.data, log_file=self.log_file),
-            CreateRoleMappingPe(self.data, log_file=self.log_file)
-        ])
-        cluster_batch_scripts.add(primary_cluster_batch_scripts)
-
-        self.results.update(cluster_batch_scripts.run())
+        self.results.update(cluster_workflow.run())
         self.data["json_output"] = self.results
 
     def verify(self):
@@ -1,6 +1,7 @@
-from typing import Dict
+from typing import Dict, Optional
 from framework.helpers.log_utils import get_logger
 from framework.scripts.python.pe.cluster_script import ClusterScript
+from framework.scripts.python.helpers.section_state import get_hash
 from framework.scripts.python.helpers.v1.cluster import Cluster
 
 logger = get_logger(__name__)
@@ -10,6 +11,8 @@ class AddNameServersPe(ClusterScript):
     """
     Class that adds nameservers in PE
     """
+    SECTION_KEYS = ["name_servers_list"]
+
     def __init__(self, data: Dict, **kwargs):
         super(AddNameServersPe, self).__init__(data, **kwargs)
         self.logger = self.logger or logger
@@ -38,6 +41,9 @@ class AddNameServersPe(ClusterScript):
         except Exception as e:
             self.exceptions.append(e)
 
+    def get_cluster_fingerprint(self, cluster_ip: str, cluster_details: Dict) -> Optional[str]:
+        return get_hash(sorted(Cluster(cluster_details["pe_session"]).get_name_servers()))
+
     def verify_single_cluster(self, cluster_ip: str, cluster_details: Dict):
         try:
             if not cluster_details.get("name_servers_list"):
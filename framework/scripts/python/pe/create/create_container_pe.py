@@ -1,5 +1,6 @@
-from typing import Dict
+from typing import Dict, Optional
 from framework.scripts.python.pe.cluster_script import ClusterScript
+from framework.scripts.python.helpers.section_state import get_hash
 from framework.scripts.python.helpers.v1.container import Container
 from framework.helpers.log_utils import get_logger
 
@@ -10,6 +11,7 @@ class CreateContainerPe(ClusterScript):
     """
     Create Storage container in PE
     """
+    SECTION_KEYS = ["containers"]
 
     def __init__(self, data: Dict, **kwargs):
         super(CreateContainerPe, self).__init__(data, **kwargs)
@@ -51,6 +53,10 @@ class CreateContainerPe(ClusterScript):
                                    f"{cluster_info!r} with the error: {e}")
             return
 
+    def get_cluster_fingerprint(self, cluster_ip: str, cluster_details: Dict) -> Optional[str]:
+        # Containers are only created, never updated
+        return get_hash(sorted(container.get("name") for container in Container(cluster_details["pe_session"]).read()))
+
     def verify_single_cluster(self, cluster_ip: str, cluster_details: Dict):
         # Check if containers were created
         try:
@@ -10,6 +10,9 @@ class CreateRoleMappingPe(ClusterScript):
     """
     The Script to create role mapping in PE clusters
     """
+    # Role-mappings need the directory service
+    DEPENDS_ON = ["AddAdServerPe"]
+
     LOAD_TASK = False
     DEFAULT_ROLE_MAPPINGS = [
         {
@@ -10,6 +10,7 @@ from framework.scripts.python.helpers.v1.container import Container
 from framework.scripts.python.helpers.v2.network import Network
 from framework.scripts.python.helpers.v2.vm import VM
 from framework.scripts.python.helpers.cvm.ssh_cvm import SSHCvm
+from framework.scripts.python.helpers.cvm.software_distributor import SoftwareDistributor
 from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor as TaskMonitor
 from framework.helpers.rest_utils import RestAPIUtil
 from framework.helpers.log_utils import get_logger
@@ -29,7 +30,7 @@ class DeployPC(ClusterScript):
     Methods:
         __init__(self, data: Dict, **kwargs): Initializes the DeployPC object with the provided data.
         execute_single_cluster(self, cluster_ip: str, cluster_details: dict): Deploys Prism Central in a single cluster.
-        upload_pc_software(self, cvm_ip: str, cvm_username: str, cvm_password: str, pc_config: dict): Downloads and uploads PC software to PE.
+        upload_pc_software(self, cvm_ip: str, cvm_username: str, cvm_password: str, pc_config: dict, software_distributor: SoftwareDistributor): Downloads and uploads PC software to PE.
         verify_single_cluster(self, cluster_ip: str, cluster_details: Dict): Verifies if the deployed PC is accessible.
         check_cluster_vip_access(self, cluster_vip: str): Checks if the Cluster VIP is accessible.
     """
@@ -47,6 +48,10 @@ class DeployPC(ClusterScript):
         self.data = data
         super(DeployPC, self).__init__(data, **kwargs)
         self.logger = self.logger or logger
+        # The PC software is downloaded once from the web server and shared by the CVMs of the clusters
+        software_distribution = self.data.get("pc_software_distribution") or {}
+        self.software_distributor = SoftwareDistributor(**software_distribution) if (
+            software_distribution.get("mode", SoftwareDistributor.DIRECT) != SoftwareDistributor.DIRECT) else None
 
     def execute_single_cluster(self, cluster_ip: str, cluster_details: dict):
         """
@@ -152,7 +157,8 @@ class DeployPC(ClusterScript):
                             # Download & upload PC software to PE
                             upload_status, upload_error_message, deploy_pc_config = \
                                 self.upload_pc_software(cluster_ip, cluster_details["cvm_username"],
-                                                        cluster_details["cvm_password"], deploy_pc_config)
+                                                        cluster_details["cvm_password"], deploy_pc_config,
+                                                        software_distributor=self.software_distributor)
                         except Exception as e:
                             self.exceptions.append(f"Uploading PC software failed with the error: {e}")
                             continue
@@ -260,7 +266,8 @@ class DeployPC(ClusterScript):
                                    f"with the error: {e}")
 
     @staticmethod
-    def upload_pc_software(cvm_ip: str, cvm_username: str, cvm_password: str, pc_config: dict):
+    def upload_pc_software(cvm_ip: str, cvm_username: str, cvm_password: str, pc_config: dict,
+                           software_distributor: SoftwareDistributor = None):
         """
         Downloads and uploads PC software to PE.
 
@@ -269,6 +276,7 @@ class DeployPC(ClusterScript):
             cvm_username (str): The username for the CVM.
             cvm_password (str): The password for the CVM.
             pc_config (dict): A dictionary containing the PC configuration.
+            software_distributor (SoftwareDistributor, optional): Distributor of the PC software shared by the CVMs.
 
         Returns:
             tuple: A tuple containing the upload status, upload error message, and the updated PC configuration.
@@ -282,7 +290,7 @@ class DeployPC(ClusterScript):
 
         upload_status, upload_error_message = ssh_cvm.upload_pc_deploy_software(
             pc_config["pc_version"], metadata_file_url, file_url, md5sum=md5sum,
-            delete_existing_software=delete_existing_software)
+            delete_existing_software=delete_existing_software, distributor=software_distributor)
         return upload_status, upload_error_message, pc_config
 
     def verify_single_cluster(self, cluster_ip: str, cluster_details: Dict):
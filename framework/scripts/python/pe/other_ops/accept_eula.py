@@ -11,6 +11,7 @@ class AcceptEulaPe(ClusterScript):
     """
     Accept Eula
     """
+
     def __init__(self, data: Dict, **kwargs):
         super(AcceptEulaPe, self).__init__(data, **kwargs)
         self.logger = self.logger or logger
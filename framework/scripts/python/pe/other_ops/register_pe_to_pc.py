@@ -15,6 +15,9 @@ class RegisterToPc(ClusterScript):
     """
     Class that takes multiple clusters and registers them to PC
     """
+    # PC registration needs the data services IP of the cluster
+    DEPENDS_ON = ["UpdateDsip"]
+
     SYNC_TIME = 300
     DEFAULT_USERNAME = "admin"
     DEFAULT_SYSTEM_PASSWORD = "Nutanix/4u"
@@ -116,7 +119,7 @@ class RegisterToPc(ClusterScript):
             cluster_uuid = cluster_details["cluster_info"]["uuid"]
 
             pc_cluster = PcCluster(self.pc_session)
-            pc_cluster.get_pe_info_list()
+            pc_cluster.get_pe_info_list(refresh=True)
             pc_cluster_uuids = pc_cluster.name_uuid_map.values()
 
             if cluster_uuid in pc_cluster_uuids:
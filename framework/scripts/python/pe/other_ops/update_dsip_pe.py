@@ -10,6 +10,9 @@ class UpdateDsip(ClusterScript):
     """
     Update DSIP for the input PE clusters
     """
+    # DSIP update fails if it runs along with AddAdServerPe
+    DEPENDS_ON = ["AddAdServerPe"]
+
     def __init__(self, data: Dict, **kwargs):
         super(UpdateDsip, self).__init__(data, **kwargs)
         self.logger = self.logger or logger
@@ -1,7 +1,11 @@
-from typing import Dict
+from typing import Dict, List
 from framework.helpers.log_utils import get_logger
 from framework.scripts.python.helpers.state_monitor.progress_monitor import TaskMonitor
+from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor
 from framework.scripts.python.helpers.v2.image import Image
+from framework.scripts.python.helpers.v3.cluster import Cluster as PcCluster
+from framework.scripts.python.helpers.v3.image import Image as PcImage
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
 from framework.scripts.python.pe.cluster_script import ClusterScript
 
 logger = get_logger(__name__)
@@ -10,12 +14,27 @@ logger = get_logger(__name__)
 class UploadImagePe(ClusterScript):
     """
     The Script to Upload Image in PE clusters
+
+    With image_distribution "pc", the images needed by the clusters registered to the PC are uploaded once through
+    PC, placed on all the clusters needing them with initial_placement_ref_list, and all the upload tasks are tracked
+    by one PC task monitor. The images of the clusters not registered to the PC are uploaded directly in PE.
     """
+    PC_DISTRIBUTION = "pc"
 
     def __init__(self, data: Dict, **kwargs):
         super(UploadImagePe, self).__init__(data, **kwargs)
         self.logger = self.logger or logger
         self.task_uuid_list = []
+        # cluster_ip -> names of the images uploaded through PC, not uploaded again in PE
+        self.pc_uploaded_images: Dict[str, set] = {}
+
+    def execute(self, **kwargs):
+        if self.data.get("image_distribution") == self.PC_DISTRIBUTION and self.data.get("pc_session"):
+            try:
+                self.__upload_through_pc(self.data["pc_session"])
+            except Exception as e:
+                self.exceptions.append(f"Failed to upload the Images through PC: {e}")
+        super(UploadImagePe, self).execute(**kwargs)
 
     def execute_single_cluster(self, cluster_ip: str, cluster_details: Dict):
         # Only for parallel runs
@@ -27,11 +46,15 @@ class UploadImagePe(ClusterScript):
             'name' in cluster_details['cluster_info']) else f"{cluster_ip}"
 
         try:
-            if cluster_details.get("images"):
+            images = [image for image in cluster_details.get("images") or []
+                      if image["name"] not in self.pc_uploaded_images.get(cluster_ip, set())]
+            if images:
                 image_op = Image(session=pe_session)
                 image_name_list = [image["name"] for image in image_op.read()]
+                # Tasks of this cluster, monitored with the session of this cluster
+                task_uuid_list = []
 
-                for image_to_create in cluster_details["images"]:
+                for image_to_create in images:
                     try:
                         image_name = image_to_create['name']
                         if image_name in image_name_list:
@@ -48,7 +71,7 @@ class UploadImagePe(ClusterScript):
                         if response.get("task_uuid"):
                             self.logger.info(f"Submitted task {response['task_uuid']!r} for uploading of Image "
                                              f"{image_name!r}")
-                            self.task_uuid_list.append(response["task_uuid"])
+                            task_uuid_list.append(response["task_uuid"])
                         else:
                             self.exceptions.append(f"Could not upload the Image {image_name!r}. Error: {response}")
                     except Exception as e:
@@ -56,8 +79,9 @@ class UploadImagePe(ClusterScript):
                                                f"{cluster_info!r} with the error: {e}")
 
                 # Monitor the tasks
-                if self.task_uuid_list:
-                    task_op = TaskMonitor(pe_session, task_uuid_list=self.task_uuid_list)
+                if task_uuid_list:
+                    self.task_uuid_list.extend(task_uuid_list)
+                    task_op = TaskMonitor(pe_session, task_uuid_list=task_uuid_list)
                     task_op.DEFAULT_CHECK_INTERVAL_IN_SEC = 30
                     task_op.DEFAULT_TIMEOUT_IN_SEC = 3600
                     app_response, status = task_op.monitor()
@@ -67,13 +91,75 @@ class UploadImagePe(ClusterScript):
                     if not status:
                         self.exceptions.append(f"Timed out. Uploading some or all Images in {cluster_info!r} "
                                                f"didn't happen in the prescribed timeframe")
-            else:
+            elif not cluster_details.get("images"):
                 self.logger.info(f"No Images specified in {cluster_info!r} to upload. Skipping...")
         except Exception as e:
             self.exceptions.append(f"{type(self).__name__} failed for the cluster "
                                    f"{cluster_info!r} with the error: {e}")
             return
 
+    def __upload_through_pc(self, pc_session):
+        pc_cluster = PcCluster(pc_session)
+        pc_cluster.get_pe_info_list()
+        clusters = {cluster_ip: cluster_details for cluster_ip, cluster_details in self.pe_clusters.items()
+                    if cluster_details.get("images") and pc_cluster.ip_uuid_map.get(cluster_ip)}
+        if not clusters:
+            return
+
+        # Images missing in every cluster, read in parallel
+        missing_images = WorkerBudget.get_instance().map(
+            self.__get_missing_images, clusters.keys(), clusters.values(), max_workers=self.max_workers,
+            host=lambda ip, _: ip, return_exceptions=True)
+
+        # The same image (name, url & checksum) is uploaded once for all the clusters needing it
+        uploads: Dict[tuple, Dict] = {}
+        for cluster_ip, images in zip(clusters.keys(), missing_images):
+            if isinstance(images, Exception):
+                self.logger.warning(f"Couldn't list the Images of {cluster_ip!r}, uploading them in PE: {images}")
+                continue
+            for image in images:
+                key = (image["name"], image["url"], image.get("checksum"))
+                upload = uploads.setdefault(key, {
+                    "name": image["name"],
+                    "description": image.get("annotation", ""),
+                    "image_type": image.get("image_type") or "DISK_IMAGE",
+                    "url": image["url"],
+                    "checksum": image.get("checksum"),
+                    "checksum_algorithm": image.get("checksum_algorithm"),
+                    "cluster_uuid_list": [],
+                    "cluster_ip_list": []
+                })
+                upload["cluster_uuid_list"].append(pc_cluster.ip_uuid_map[cluster_ip])
+                upload["cluster_ip_list"].append(cluster_ip)
+        if not uploads:
+            return
+
+        for upload in uploads.values():
+            self.logger.info(f"Uploading Image {upload['name']!r} through PC to {len(upload['cluster_ip_list'])} "
+                             f"cluster(s) {upload['cluster_ip_list']}")
+        task_uuid_list = PcImage(pc_session).url_upload(list(uploads.values()))
+        for upload in uploads.values():
+            for cluster_ip in upload["cluster_ip_list"]:
+                self.pc_uploaded_images.setdefault(cluster_ip, set()).add(upload["name"])
+        if not task_uuid_list:
+            return
+        self.task_uuid_list.extend(task_uuid_list)
+        # All the uploads are tracked by one monitor
+        task_op = PcTaskMonitor(pc_session, task_uuid_list=task_uuid_list)
+        task_op.DEFAULT_CHECK_INTERVAL_IN_SEC = 30
+        task_op.DEFAULT_TIMEOUT_IN_SEC = 3600
+        app_response, status = task_op.monitor()
+        if app_response:
+            self.exceptions.append(f"Some tasks have failed. {app_response}")
+        if not status:
+            self.exceptions.append("Timed out. Uploading some or all Images through PC didn't happen in the "
+                                   "prescribed timeframe")
+
+    @staticmethod
+    def __get_missing_images(cluster_ip: str, cluster_details: Dict) -> List[Dict]:
+        image_name_list = [image.get("name") for image in Image(session=cluster_details["pe_session"]).read()]
+        return [image for image in cluster_details["images"] if image["name"] not in image_name_list]
+
     def verify_single_cluster(self, cluster_ip: str, cluster_details: Dict):
         # Check if network is created in PE
         try:
@@ -1,11 +1,19 @@
 import threading
 from abc import abstractmethod, ABC
+from typing import Optional
 from framework.helpers.log_utils import get_logger
 
 logger = get_logger(__name__)
 
 
 class Script(ABC):
+    # Names of the scripts that need to complete before this script, when run in a WorkflowScript
+    DEPENDS_ON = []
+    # Config keys the script applies. With a SectionStateStore, the script is skipped if these keys & the remote
+    # state didn't change since its last verified run. Only declared by the scripts that implement
+    # get_remote_fingerprint, the other scripts are always run
+    SECTION_KEYS = []
+
     def __init__(self, **kwargs):
         # If log_file is passed create a new logger and a file handler with the specified log file
         self.logger = get_logger(kwargs['log_file'], file_name=kwargs['log_file']) if kwargs.get('log_file') else None
@@ -44,6 +52,12 @@ class Script(ABC):
                 self.logger.info(self.results)
         return self.results
 
+    def get_remote_fingerprint(self) -> Optional[str]:
+        """
+        Fingerprint of the remote state the script applies its section to, None if the script can't tell
+        """
+        return None
+
     @abstractmethod
     def execute(self, **kwargs):
         pass
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import threading
+import pytest
+from aiohttp import web
+
+from framework.helpers import async_rest_utils
+from framework.helpers.async_rest_utils import AsyncRestAPIUtil, AsyncConnectionPool, EventLoopThread
+from framework.helpers.exception_utils import RestError, ResponseError
+from tests.unit.config.test_data import *
+
+
+class LocalServer:
+    """
+    aiohttp server running on localhost in its own thread
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.fail_count = 0
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self.runner = None
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    async def handler(self, request):
+        body = await request.read() if request.path != "/api/upload" else b""
+        self.calls.append((request.method, request.path, request.headers.get("Authorization"), body))
+        if request.path == "/api/json":
+            return web.json_response(json.loads(GET_RESPONSE))
+        if request.path == "/api/text":
+            return web.Response(text='{"result": "success"}', content_type="text/plain")
+        if request.path == "/api/empty":
+            return web.Response(status=204)
+        if request.path == "/api/bad_gateway":
+            return web.Response(text="<Response [502]>", content_type="text/plain")
+        if request.path == "/api/unauthorized":
+            return web.Response(status=401, text="Unauthorized")
+        if request.path == "/api/flaky":
+            if self.fail_count:
+                self.fail_count -= 1
+                return web.Response(status=503)
+            return web.json_response({"status": "ok"})
+        if request.path == "/api/upload":
+            post = await request.post()
+            return web.json_response({"fields": sorted(post.keys()), "file": post["file"].file.read().decode()})
+        return web.Response(status=404, text="Not Found")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def __enter__(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self.loop).result()
+        return self
+
+    def __exit__(self, *args):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class TestAsyncRestAPIUtil:
+    """
+    Test class for the AsyncRestAPIUtil class.
+    """
+
+    @pytest.fixture()
+    def server(self):
+        with LocalServer() as server:
+            yield server
+
+    @pytest.fixture()
+    def rest_util_obj(self, server):
+        return AsyncRestAPIUtil("127.0.0.1", user="user", pwd="pwd", port=server.port, secured=False)
+
+    def test_get_json(self, rest_util_obj, server):
+        assert rest_util_obj.get("api/json") == json.loads(GET_RESPONSE)
+        assert server.calls[0][0] == "GET"
+        assert server.calls[0][2].startswith("Basic ")
+
+    def test_get_text_parsed_as_json(self, rest_util_obj):
+        assert rest_util_obj.get("api/text") == {"result": "success"}
+
+    def test_post_put_patch_delete(self, rest_util_obj, server):
+        rest_util_obj.post("api/json", data=API_PAYLOAD)
+        rest_util_obj.put("api/json", data=API_PAYLOAD)
+        rest_util_obj.patch("api/json", data=API_PAYLOAD)
+        rest_util_obj.delete("api/json")
+        assert [call[0] for call in server.calls] == ["POST", "PUT", "PATCH", "DELETE"]
+        assert json.loads(server.calls[0][3]) == API_PAYLOAD
+
+    def test_empty_response(self, rest_util_obj):
+        assert rest_util_obj.delete("api/empty") == ""
+
+    def test_unauthorized(self, rest_util_obj):
+        with pytest.raises(RestError) as e:
+            rest_util_obj.get("api/unauthorized")
+        assert e.value.error == "HTTPError"
+        assert "Unauthorized. Please check your credentials." in e.value.message
+
+    def test_not_found(self, rest_util_obj):
+        with pytest.raises(RestError) as e:
+            rest_util_obj.get("api/missing")
+        assert "'code': 404" in e.value.message
+
+    def test_bad_gateway_text(self, rest_util_obj):
+        with pytest.raises(ResponseError) as e:
+            rest_util_obj.get("api/bad_gateway")
+        assert e.value.error == "BadGateway"
+
+    def test_connection_error(self, monkeypatch):
+        monkeypatch.setattr(async_rest_utils, "retry_total", 0)
+        rest_util_obj = AsyncRestAPIUtil("127.0.0.1", user=None, pwd=None, port=1, secured=False)
+        with pytest.raises(RestError) as e:
+            rest_util_obj.get("api/json", timeout=1)
+        assert e.value.error == "HTTPError"
+
+    def test_retry_on_status(self, rest_util_obj, server, monkeypatch):
+        monkeypatch.setattr(async_rest_utils, "backoff_factor", 0)
+        server.fail_count = 2
+        assert rest_util_obj.get("api/flaky") == {"status": "ok"}
+        assert len(server.calls) == 3
+
+    def test_upload_file(self, rest_util_obj, tmp_path):
+        source = tmp_path / "blob.json"
+        source.write_text('{"a": 1}')
+        with open(source, "rb") as f:
+            response = rest_util_obj.post("api/upload", data={"name": "test"}, jsonify=False,
+                                          files={"file": ("blob", f, "application/json")})
+        assert response == {"fields": ["file", "name"], "file": '{"a": 1}'}
+
+    def test_await_from_another_loop(self, rest_util_obj, server):
+        async def make_calls():
+            return await asyncio.gather(*[rest_util_obj.async_get("api/json") for _ in range(50)])
+
+        responses = asyncio.run(make_calls())
+        assert len(responses) == 50
+        assert all(response == json.loads(GET_RESPONSE) for response in responses)
+
+    def test_shared_pool(self, server):
+        first = AsyncRestAPIUtil("127.0.0.1", user="user", pwd="pwd", port=server.port, secured=False)
+        second = AsyncRestAPIUtil("127.0.0.1", user="user", pwd="pwd", port=server.port, secured=False)
+        other_creds = AsyncRestAPIUtil("127.0.0.1", user="user", pwd="other", port=server.port, secured=False)
+        first.get("api/json")
+        size = AsyncConnectionPool.size()
+        second.get("api/json")
+        assert AsyncConnectionPool.size() == size
+        other_creds.get("api/json")
+        assert AsyncConnectionPool.size() == size + 1
+
+    def test_blocking_call_from_shared_loop(self, rest_util_obj):
+        loop_thread = EventLoopThread.get_instance()
+
+        async def blocking_call():
+            rest_util_obj.get("api/json")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run_coroutine_threadsafe(blocking_call(), loop_thread.loop).result()
+
+    def test_prepare_url(self):
+        rest_util_obj = AsyncRestAPIUtil(**REST_ARGS)
+        assert rest_util_obj.prepare_url(REST_URI) == f"https://1.1.1.1:9440/{REST_URI}"
+        assert async_rest_utils.get_client_timeout((5, 300)).sock_read == 300
+
+    def test_max_in_flight(self, server):
+        rest_util_obj = AsyncRestAPIUtil("127.0.0.1", user="user", pwd="pwd", port=server.port, secured=False,
+                                         max_in_flight=2)
+
+        async def make_calls():
+            return await asyncio.gather(*[rest_util_obj.async_get("api/json") for _ in range(10)])
+
+        assert len(asyncio.run(make_calls())) == 10
+        assert rest_util_obj._AsyncRestAPIUtil__in_flight._value == 2
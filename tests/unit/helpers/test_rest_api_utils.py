@@ -4,6 +4,9 @@ import requests
 import responses 
 import requests_mock
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from unittest.mock import patch, MagicMock
 from framework.helpers.rest_utils import RestAPIUtil, rest_api_call
@@ -220,4 +223,24 @@ class TestRestAPIUtil:
             rest_util_obj = RestAPIUtil(**REST_ARGS)
             with pytest.raises(RestError) as e:
                 rest_util_obj.delete(REST_URI)
-            assert e.value.error == 'HTTPError'
\ No newline at end of file
+            assert e.value.error == 'HTTPError'
+    def test_max_in_flight(self):
+        lock = threading.Lock()
+        in_flight = {"current": 0, "max": 0}
+
+        def slow_response(request, context):
+            with lock:
+                in_flight["current"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["current"])
+            time.sleep(0.02)
+            with lock:
+                in_flight["current"] -= 1
+            return {"status": "ok"}
+
+        with requests_mock.Mocker() as request_mocker:
+            request_mocker.get(f"https://1.1.1.1:9440/{REST_URI}", json=slow_response)
+            rest_util_obj = RestAPIUtil(**REST_ARGS, max_in_flight=2)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                responses_list = list(executor.map(lambda _: rest_util_obj.get(REST_URI), range(8)))
+        assert all(response == {"status": "ok"} for response in responses_list)
+        assert in_flight["max"] == 2
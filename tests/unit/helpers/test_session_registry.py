@@ -0,0 +1,104 @@
+import copy
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+# framework.scripts.python has to be imported before helper_functions
+import framework.scripts.python  # noqa: F401
+from framework.helpers.async_rest_utils import AsyncRestAPIUtil
+from framework.helpers.helper_functions import create_pc_objects, create_pe_objects
+from framework.helpers.rest_utils import RestAPIUtil
+from framework.helpers.session_registry import SessionRegistry
+
+GLOBAL_DATA = {
+    "vault_to_use": "local",
+    "vaults": {
+        "local": {
+            "credentials": {
+                "pc_user": {"username": "admin", "password": "pc_pwd"},
+                "pe_user": {"username": "admin", "password": "pe_pwd"},
+            }
+        }
+    }
+}
+
+
+class TestSessionRegistry:
+    """
+    Test class for the SessionRegistry class.
+    """
+
+    @pytest.fixture(autouse=True)
+    def clear_registry(self):
+        SessionRegistry.clear()
+        yield
+        SessionRegistry.clear()
+
+    def test_same_endpoint_reuses_session(self):
+        first = SessionRegistry.get_session("1.1.1.1", user="admin", pwd="pwd", port="9440")
+        second = SessionRegistry.get_session("1.1.1.1", user="admin", pwd="pwd", port="9440")
+        assert isinstance(first, RestAPIUtil)
+        assert first is second
+        metrics = SessionRegistry.get_metrics()
+        assert metrics["sessions_created"] == 1
+        assert metrics["sessions_reused"] == 1
+
+    def test_different_credential_gets_new_session(self):
+        first = SessionRegistry.get_session("1.1.1.1", user="admin", pwd="pwd", port="9440")
+        second = SessionRegistry.get_session("1.1.1.1", user="admin", pwd="other", port="9440")
+        third = SessionRegistry.get_session("1.1.1.2", user="admin", pwd="pwd", port="9440")
+        assert first is not second
+        assert first is not third
+        assert SessionRegistry.get_metrics()["sessions_created"] == 3
+
+    def test_async_transport(self):
+        session = SessionRegistry.get_session("1.1.1.1", user="admin", pwd="pwd", port="9440", transport="async")
+        assert isinstance(session, AsyncRestAPIUtil)
+        assert session is not SessionRegistry.get_session("1.1.1.1", user="admin", pwd="pwd", port="9440")
+
+    def test_invalid_transport(self):
+        with pytest.raises(Exception) as e:
+            SessionRegistry.get_session("1.1.1.1", user="admin", pwd="pwd", transport="invalid")
+        assert "Invalid rest transport" in str(e.value)
+
+    def test_v4_api_client_reuse(self):
+        first = SessionRegistry.get_v4_api_client("1.1.1.1", "9440", "admin", "pwd")
+        second = SessionRegistry.get_v4_api_client("1.1.1.1", "9440", "admin", "pwd")
+        assert first is second
+        metrics = SessionRegistry.get_metrics()
+        assert metrics["v4_api_clients_created"] == 1
+        assert metrics["v4_api_clients_reused"] == 1
+
+    def test_concurrent_get_session(self):
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            sessions = list(executor.map(
+                lambda _: SessionRegistry.get_session("1.1.1.1", user="admin", pwd="pwd", port="9440"), range(100)))
+        assert all(session is sessions[0] for session in sessions)
+        assert SessionRegistry.get_metrics()["sessions_created"] == 1
+
+    def test_connections_opened(self):
+        SessionRegistry.get_session("1.1.1.1", user="admin", pwd="pwd", port="9440")
+        # No request is made yet, so no connection is opened
+        assert SessionRegistry.get_metrics()["connections_opened"] == 0
+
+    def test_deepcopy_shares_session(self):
+        data = {"pc_ip": "1.1.1.1", "pc_credential": "pc_user"}
+        create_pc_objects(data, global_data=GLOBAL_DATA)
+        data_copy = copy.deepcopy(data)
+        assert data_copy["pc_session"] is data["pc_session"]
+        assert data_copy["v4_api_util"] is data["v4_api_util"]
+
+    def test_create_pc_objects_reuses_session(self):
+        first_block = {"pc_ip": "1.1.1.1", "pc_credential": "pc_user"}
+        second_block = {"pc_ip": "1.1.1.1", "pc_credential": "pc_user"}
+        create_pc_objects(first_block, global_data=GLOBAL_DATA)
+        create_pc_objects(second_block, global_data=GLOBAL_DATA)
+        assert first_block["pc_session"] is second_block["pc_session"]
+        assert first_block["v4_api_util"] is second_block["v4_api_util"]
+
+    def test_create_pe_objects_reuses_session(self):
+        site = {"pe_credential": "pe_user", "clusters": {"1.1.1.10": {"name": "cluster-01"}}}
+        create_pe_objects(site, global_data=GLOBAL_DATA)
+        site_copy = {"pe_credential": "pe_user", "clusters": {"1.1.1.10": {"name": "cluster-01"}}}
+        create_pe_objects(site_copy, global_data=GLOBAL_DATA)
+        assert site["clusters"]["1.1.1.10"]["pe_session"] is site_copy["clusters"]["1.1.1.10"]["pe_session"]
+        assert SessionRegistry.get_metrics()["sessions_created"] == 1
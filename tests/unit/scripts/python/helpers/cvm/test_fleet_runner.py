@@ -0,0 +1,105 @@
+import threading
+import time
+import pytest
+from framework.scripts.python.helpers.cvm.fleet_runner import CvmFleetRunner
+from framework.scripts.python.helpers.cvm.ssh_cvm import SSHCvm
+
+
+class TestCvmFleetRunner:
+    @pytest.fixture
+    def hosts(self):
+        return [f"10.0.0.{index}" for index in range(10)]
+
+    def test_run(self, mocker, hosts):
+        def update_resolv_conf(ssh_cvm, nameserver):
+            if ssh_cvm.cvm_ip == "10.0.0.3":
+                return False, "Permission denied"
+            return True, None
+
+        mocker.patch.object(SSHCvm, "update_resolv_conf", autospec=True, side_effect=update_resolv_conf)
+        runner = CvmFleetRunner(hosts, "nutanix", "password")
+        results = runner.run("update_resolv_conf", nameserver="10.0.0.100")
+
+        assert results["10.0.0.3"]["status"] == CvmFleetRunner.FAILED
+        assert results["10.0.0.3"]["error"] == "Permission denied"
+        assert results["10.0.0.1"]["status"] == CvmFleetRunner.SUCCEEDED
+        assert runner.get_summary() == {"SUCCEEDED": 9, "FAILED": 1, "SKIPPED": 0, "aborted": False}
+
+    def test_result_formats(self, mocker):
+        mocker.patch.object(SSHCvm, "get_foundation_version", return_value=(True, "foundation-5.6"))
+        mocker.patch.object(SSHCvm, "enable_replication_ports", return_value=("output", "timed out"))
+        runner = CvmFleetRunner(["10.0.0.1"])
+        assert runner.run("get_foundation_version")["10.0.0.1"]["output"] == "foundation-5.6"
+        result = runner.run("enable_replication_ports")["10.0.0.1"]
+        assert (result["status"], result["output"], result["error"]) == (CvmFleetRunner.FAILED, "output", "timed out")
+        with pytest.raises(Exception, match="is not a helper of SSHCvm"):
+            runner.run("rm_rf")
+
+    def test_run_command(self, mocker, hosts):
+        mocker.patch.object(SSHCvm, "get_ssh_connection")
+        mocker.patch.object(SSHCvm, "close_ssh_connection")
+        mock_execute = mocker.patch.object(SSHCvm, "execute_command",
+                                           return_value=("foundation-5.6\r\n__fleet_rc=0\r\n", ""))
+        results = CvmFleetRunner(hosts).run_command("cat ~/foundation/foundation_version")
+        assert {result["output"] for result in results.values()} == {"foundation-5.6"}
+        assert {result["status"] for result in results.values()} == {CvmFleetRunner.SUCCEEDED}
+        assert mock_execute.call_args.kwargs["command"] == 'cat ~/foundation/foundation_version\necho "__fleet_rc=$?"'
+
+    def test_run_command_exit_status(self, mocker):
+        # With a pty, the errors of the command are in its stdout, only the exit status tells it failed
+        outputs = {
+            "10.0.0.1": ("cat: foundation_version: No such file or directory\r\n__fleet_rc=1\r\n", ""),
+            "10.0.0.2": ("partial output", ""),
+            "10.0.0.3": ("__fleet_rc=0\r\n", "")
+        }
+        mocker.patch.object(SSHCvm, "get_ssh_connection")
+        mocker.patch.object(SSHCvm, "close_ssh_connection")
+        mocker.patch.object(SSHCvm, "execute_command", autospec=True,
+                            side_effect=lambda ssh_cvm, **kwargs: outputs[ssh_cvm.cvm_ip])
+        results = CvmFleetRunner(list(outputs)).run_command("cat foundation_version")
+
+        assert results["10.0.0.1"]["status"] == CvmFleetRunner.FAILED
+        assert results["10.0.0.1"]["error"] == "The command exited with the status 1"
+        assert results["10.0.0.1"]["output"] == "cat: foundation_version: No such file or directory"
+        assert results["10.0.0.2"]["status"] == CvmFleetRunner.FAILED
+        assert (results["10.0.0.3"]["status"], results["10.0.0.3"]["output"]) == (CvmFleetRunner.SUCCEEDED, "")
+
+    def test_bounded_concurrency(self, mocker, hosts):
+        running, max_running, lock = [0], [0], threading.Lock()
+
+        def get_foundation_version(ssh_cvm):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return True, "5.6"
+
+        mocker.patch.object(SSHCvm, "get_foundation_version", autospec=True, side_effect=get_foundation_version)
+        runner = CvmFleetRunner(hosts, max_parallel=3, batch_size=4)
+        results = runner.run("get_foundation_version")
+        assert 1 < max_running[0] <= 3
+        assert [result["batch"] for result in results.values()] == [1] * 4 + [2] * 4 + [3] * 2
+
+    def test_max_failures(self, mocker, hosts):
+        mocker.patch.object(SSHCvm, "update_cvm_foundation", side_effect=Exception("Download failed"))
+        runner = CvmFleetRunner(hosts, max_parallel=1, batch_size=4, max_failures=1)
+        results = runner.run("update_cvm_foundation", "http://foundation.tar.gz")
+        # Stopped in the first batch, the second failure exceeds the threshold
+        assert runner.get_summary() == {"SUCCEEDED": 0, "FAILED": 2, "SKIPPED": 8, "aborted": True}
+        assert results["10.0.0.0"]["error"] == "Download failed"
+
+    def test_max_failure_percent(self, mocker, hosts):
+        def get_foundation_version(ssh_cvm):
+            return (False, "Not reachable") if ssh_cvm.cvm_ip in ["10.0.0.0", "10.0.0.5"] else (True, "5.6")
+
+        mocker.patch.object(SSHCvm, "get_foundation_version", autospec=True, side_effect=get_foundation_version)
+        # 1 of the 2 CVMs of the canary batch failed
+        runner = CvmFleetRunner(hosts, batch_size=2, max_failure_percent=40)
+        runner.run("get_foundation_version")
+        assert runner.get_summary() == {"SUCCEEDED": 1, "FAILED": 1, "SKIPPED": 8, "aborted": True}
+        # 2 of the 10 CVMs failed
+        runner = CvmFleetRunner(hosts, batch_size=5, max_failure_percent=20)
+        runner.run("get_foundation_version")
+        assert runner.get_summary() == {"SUCCEEDED": 8, "FAILED": 2, "SKIPPED": 0, "aborted": False}
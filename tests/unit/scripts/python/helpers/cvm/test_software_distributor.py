@@ -0,0 +1,193 @@
+import hashlib
+import io
+import threading
+from types import SimpleNamespace
+import pytest
+from framework.scripts.python.helpers.cvm.ssh_cvm import SSHCvm
+from framework.scripts.python.helpers.cvm.software_distributor import RateLimiter, SoftwareDistributor
+
+CONTENT = b"pc-software" * 1000
+MD5SUM = hashlib.md5(CONTENT).hexdigest()
+URL = "http://web-server/pc.2024.1.tar"
+REMOTE_PATH = "/home/nutanix/pc.2024.1.tar"
+
+
+class FakeRemoteFile(io.BytesIO):
+    """SFTPFile writing to the files of the fake CVM on close"""
+
+    def __init__(self, files, path, mode):
+        super().__init__(files.get(path, b"") if "r" in mode or "a" in mode else b"")
+        if "a" in mode:
+            self.seek(0, io.SEEK_END)
+        self.files, self.path, self.mode = files, path, mode
+
+    def set_pipelined(self, pipelined):
+        pass
+
+    def prefetch(self, file_size=None):
+        pass
+
+    def close(self):
+        if "r" not in self.mode:
+            self.files[self.path] = self.getvalue()
+        super().close()
+
+
+class FakeSFTP:
+    def __init__(self, files):
+        self.files = files
+
+    def stat(self, path):
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return SimpleNamespace(st_size=len(self.files[path]))
+
+    def open(self, path, mode):
+        return FakeRemoteFile(self.files, path, mode)
+
+    def close(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self, files):
+        self.files = files
+
+    def open_sftp(self):
+        return FakeSFTP(self.files)
+
+
+class FakeCvm(SSHCvm):
+    """SSHCvm with the SSH layer replaced by the files of the CVM in memory"""
+
+    def __init__(self, cvm_ip, files=None, download_error=None):
+        super().__init__(cvm_ip, "nutanix", "password")
+        self.files = files or {}
+        self.download_error = download_error
+        self.downloads = 0
+
+    def get_ssh_connection(self, ip, username, password):
+        return FakeClient(self.files)
+
+    def execute_command(self, ssh_obj, command, timeout=60):
+        command = command.split(";", 1)[1].strip()
+        if command.startswith("wget"):
+            self.downloads += 1
+            if self.download_error:
+                return "", self.download_error
+            self.files[REMOTE_PATH] = CONTENT
+            return "", ""
+        algorithm, path = command.split()
+        if path not in self.files:
+            return "", f"{algorithm}: {path}: No such file or directory"
+        return f"{hashlib.new(algorithm[:-3], self.files[path]).hexdigest()}  {path}", ""
+
+
+class TestSoftwareDistributor:
+    def test_peer(self):
+        cvms = [FakeCvm(f"10.0.0.{index}") for index in range(6)]
+        distributor = SoftwareDistributor(mode="peer", max_uploads_per_source=1)
+        threads = [threading.Thread(target=distributor.distribute, args=(cvm, URL, MD5SUM)) for cvm in cvms]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(cvm.files[REMOTE_PATH] == CONTENT for cvm in cvms)
+        # Downloaded once from the web server, the other CVMs copied it from the CVMs having it
+        assert sum(cvm.downloads for cvm in cvms) == 1
+        assert distributor.get_metrics()["copies"] == 5
+        assert distributor.get_metrics()["origin_downloads"] == 1
+
+    def test_resume(self):
+        seed = FakeCvm("10.0.0.1")
+        partial = FakeCvm("10.0.0.2", files={REMOTE_PATH: CONTENT[:1000]})
+        distributor = SoftwareDistributor(mode="peer")
+        assert distributor.distribute(seed, URL, MD5SUM) == (True, None)
+        assert distributor.distribute(partial, URL, MD5SUM) == (True, None)
+        assert partial.files[REMOTE_PATH] == CONTENT
+        metrics = distributor.get_metrics()
+        assert (metrics["resumed_copies"], metrics["copied_bytes"]) == (1, len(CONTENT) - 1000)
+
+    def test_resume_other_file(self):
+        seed = FakeCvm("10.0.0.1")
+        # Partial copy of another file, the resumed copy doesn't match the source
+        partial = FakeCvm("10.0.0.2", files={REMOTE_PATH: b"x" * 1000})
+        distributor = SoftwareDistributor(mode="peer")
+        assert distributor.distribute(seed, URL, MD5SUM) == (True, None)
+        assert distributor.distribute(partial, URL, MD5SUM) == (True, None)
+        assert partial.files[REMOTE_PATH] == CONTENT
+        metrics = distributor.get_metrics()
+        assert (metrics["copies"], metrics["resumed_copies"]) == (2, 1)
+        assert metrics["copied_bytes"] == 2 * len(CONTENT) - 1000
+
+    def test_copied_file_is_verified(self, tmp_path):
+        (tmp_path / "pc.2024.1.tar").write_bytes(CONTENT)
+        # Same size as the file, other content
+        cvm = FakeCvm("10.0.0.1", files={REMOTE_PATH: b"x" * len(CONTENT)})
+        assert SoftwareDistributor(mode="cache", cache_dir=str(tmp_path)).distribute(cvm, URL, MD5SUM) == (True, None)
+        assert cvm.files[REMOTE_PATH] == CONTENT
+
+    def test_seed_failure(self):
+        failed = FakeCvm("10.0.0.1", download_error="Connection refused")
+        distributor = SoftwareDistributor(mode="peer")
+        assert distributor.distribute(failed, URL, MD5SUM) == (False, "Connection refused")
+        # The next CVM seeds the file instead
+        seed, peer = FakeCvm("10.0.0.2"), FakeCvm("10.0.0.3")
+        assert distributor.distribute(seed, URL, MD5SUM) == (True, None)
+        assert distributor.distribute(peer, URL, MD5SUM) == (True, None)
+        assert (seed.downloads, peer.downloads) == (1, 0)
+
+    def test_md5sum_mismatch(self):
+        distributor = SoftwareDistributor(mode="peer")
+        status, error = distributor.distribute(FakeCvm("10.0.0.1"), URL, "0" * 32)
+        assert not status
+        assert "md5sum of file does not match" in error
+
+    def test_cache(self, mocker, tmp_path):
+        response = mocker.MagicMock(status_code=200)
+        response.iter_content.return_value = [CONTENT[:5000], CONTENT[5000:]]
+        response.__enter__.return_value = response
+        get = mocker.patch("framework.scripts.python.helpers.cvm.software_distributor.requests.get",
+                           return_value=response)
+        cvms = [FakeCvm(f"10.0.0.{index}") for index in range(3)]
+        distributor = SoftwareDistributor(mode="cache", cache_dir=str(tmp_path))
+        for cvm in cvms:
+            assert distributor.distribute(cvm, URL, MD5SUM) == (True, None)
+
+        assert all(cvm.files[REMOTE_PATH] == CONTENT and not cvm.downloads for cvm in cvms)
+        assert (tmp_path / "pc.2024.1.tar").read_bytes() == CONTENT
+        assert get.call_count == 1
+        # The cache is reused by the next run
+        SoftwareDistributor(mode="cache", cache_dir=str(tmp_path)).distribute(FakeCvm("10.0.0.9"), URL, MD5SUM)
+        assert get.call_count == 1
+
+    def test_cache_resume(self, mocker, tmp_path):
+        (tmp_path / "pc.2024.1.tar.part").write_bytes(CONTENT[:5000])
+        response = mocker.MagicMock(status_code=206)
+        response.iter_content.return_value = [CONTENT[5000:]]
+        response.__enter__.return_value = response
+        get = mocker.patch("framework.scripts.python.helpers.cvm.software_distributor.requests.get",
+                           return_value=response)
+        cvm = FakeCvm("10.0.0.1")
+        assert SoftwareDistributor(mode="cache", cache_dir=str(tmp_path)).distribute(cvm, URL, MD5SUM) == (True, None)
+        assert get.call_args.kwargs["headers"] == {"Range": "bytes=5000-"}
+        assert cvm.files[REMOTE_PATH] == CONTENT
+
+    def test_invalid_config(self):
+        with pytest.raises(Exception, match="Invalid software distribution mode"):
+            SoftwareDistributor(mode="torrent")
+        with pytest.raises(Exception, match="cache_dir is required"):
+            SoftwareDistributor(mode="cache")
+
+
+class TestRateLimiter:
+    def test_consume(self, mocker):
+        sleep = mocker.patch("framework.scripts.python.helpers.cvm.software_distributor.time.sleep")
+        limiter = RateLimiter(bytes_per_sec=1000)
+        limiter.consume(1000)
+        sleep.assert_not_called()
+        limiter.consume(500)
+        assert sleep.call_args.args[0] == pytest.approx(0.5, abs=0.05)
+        RateLimiter().consume(10 ** 9)
+        assert sleep.call_count == 1
@@ -0,0 +1,161 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from framework.helpers.rest_utils import RestAPIUtil
+from framework.scripts.python.helpers.fc.deployment_poller import DeploymentPoller, WatchedDeployment
+from framework.scripts.python.helpers.fc.imaged_clusters import ImagedCluster
+from framework.scripts.python.helpers.fc.monitor_fc_deployment import MonitorDeployment
+
+
+def get_imaged_cluster(percent_complete: int, stopped: bool, uuid: str = "", stage: str = ""):
+    return {"imaged_cluster_uuid": uuid,
+            "cluster_status": {"imaging_stopped": stopped, "aggregate_percent_complete": percent_complete,
+                               "cluster_progress_details": {"status": stage}, "node_progress_details": None}}
+
+
+class FakeDeployment:
+    """ImageClusterScript submitting the deployment of one cluster"""
+
+    def __init__(self, cluster_name: str, running: dict, lock: threading.Lock):
+        self.cluster_name = cluster_name
+        self.running = running
+        self.lock = lock
+
+    def run(self):
+        with self.lock:
+            self.running[f"uuid-{self.cluster_name}"] = 0
+        return {self.cluster_name: f"uuid-{self.cluster_name}"}
+
+
+class TestDeploymentPoller:
+    @pytest.fixture
+    def poller(self, mocker):
+        DeploymentPoller.clear()
+        mocker.patch.object(MonitorDeployment, "verify")
+        yield DeploymentPoller(MagicMock(spec=RestAPIUtil), interval=0, initial_delay=0)
+        DeploymentPoller.clear()
+
+    def test_get_instance(self):
+        DeploymentPoller.clear()
+        session = MagicMock(spec=RestAPIUtil)
+        poller = DeploymentPoller.get_instance(session, max_in_flight=2)
+        assert DeploymentPoller.get_instance(session) is poller
+        assert DeploymentPoller.get_instance(MagicMock(spec=RestAPIUtil)) is not poller
+        DeploymentPoller.clear()
+
+    def test_deploy_and_wait(self, poller, mocker):
+        running, lock = {}, threading.Lock()
+
+        def list_imaged_clusters():
+            # Each deployment completes on its third poll
+            with lock:
+                imaged_clusters = []
+                for uuid in running:
+                    running[uuid] += 1
+                    imaged_clusters.append(get_imaged_cluster(100 if running[uuid] >= 3 else 50 * running[uuid],
+                                                              running[uuid] >= 3, uuid, f"stage-{running[uuid]}"))
+                return imaged_clusters
+
+        mock_list = mocker.patch.object(ImagedCluster, "list_imaged_clusters", side_effect=list_imaged_clusters)
+        mock_read = mocker.patch.object(ImagedCluster, "read")
+        progress = []
+        poller.subscribe(progress.append)
+        uuids = {}
+        # The poller polls once all the deployments are submitted
+        with poller.condition:
+            for index in range(5):
+                uuids.update(poller.deploy(FakeDeployment(f"cluster-{index}", running, lock), MagicMock()))
+
+        results = poller.wait(list(uuids.values()))
+        assert {name: result["result"] for name, result in results.items()} == \
+            {f"cluster-{index}": "COMPLETED" for index in range(5)}
+        assert results["cluster-0"]["progress"]["percent_complete"] == 100
+        assert results["cluster-0"]["progress"]["stage"] == "stage-3"
+        # One list call per poll, for all the deployments
+        assert mock_list.call_count == 3
+        mock_read.assert_not_called()
+        assert poller.get_metrics()["in_flight"] == 0
+        assert [event["state"] for event in progress if event["cluster_name"] == "cluster-0"] == \
+            ["SUBMITTED", "PENDING", "PENDING", "COMPLETED"]
+
+    def test_not_listed_deployment_is_read(self, poller, mocker):
+        mocker.patch.object(ImagedCluster, "list_imaged_clusters", return_value=[])
+        mock_read = mocker.patch.object(ImagedCluster, "read", return_value=get_imaged_cluster(100, True, "uuid-1"))
+        monitor = MonitorDeployment(pc_session=poller.imaging.session, cluster_name="cluster-1",
+                                    imaged_cluster_uuid="uuid-1", fc_deployment_logger=MagicMock())
+        on_progress = MagicMock()
+        poller.watch(monitor, on_progress)
+        assert poller.wait(["uuid-1"])["cluster-1"]["result"] == "COMPLETED"
+        mock_read.assert_called_once_with("uuid-1")
+        assert on_progress.call_args[0][0]["state"] == "COMPLETED"
+
+    def test_adaptive_interval(self, mocker):
+        poller = DeploymentPoller(MagicMock(spec=RestAPIUtil), interval=60, initial_delay=0, min_interval=10)
+        get_interval = poller._DeploymentPoller__get_interval
+        monitor = MonitorDeployment(pc_session=poller.imaging.session, cluster_name="cluster-1",
+                                    imaged_cluster_uuid="uuid-1", fc_deployment_logger=MagicMock())
+        deployment = WatchedDeployment(monitor, 0)
+        mock_time = mocker.patch("time.time", return_value=1000)
+        deployment.progress.update("PENDING", 10, "")
+        assert get_interval(deployment.progress) == 60
+        mock_time.return_value = 1060
+        # 15% in 60 secs, the ETA is 300 secs
+        deployment.progress.update("PENDING", 25, "")
+        assert deployment.progress.eta_secs == 300
+        assert get_interval(deployment.progress) == 60
+        mock_time.return_value = 1090
+        # 75% in 90 secs, the ETA is 18 secs
+        deployment.progress.update("PENDING", 85, "")
+        assert get_interval(deployment.progress) == 18
+        deployment.progress.update("PENDING", 95, "")
+        assert get_interval(deployment.progress) == 10
+
+    def test_max_in_flight(self, mocker):
+        DeploymentPoller.clear()
+        mocker.patch.object(MonitorDeployment, "verify")
+        poller = DeploymentPoller(MagicMock(spec=RestAPIUtil), max_in_flight=2, interval=0, initial_delay=0)
+        running, lock = {}, threading.Lock()
+        mocker.patch.object(ImagedCluster, "list_imaged_clusters",
+                            side_effect=lambda: [get_imaged_cluster(100, True, f"uuid-cluster-{index}")
+                                                 for index in range(6)])
+
+        threads = [threading.Thread(target=poller.deploy, args=(FakeDeployment(f"cluster-{index}", running, lock),
+                                                                MagicMock()))
+                   for index in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results = poller.wait([f"uuid-cluster-{index}" for index in range(6)])
+
+        assert len(results) == 6
+        assert poller.get_metrics()["submitted"] == 6
+        assert poller.get_metrics()["max_in_flight"] <= 2
+
+    def test_failed_deployment_releases_slot(self, mocker):
+        poller = DeploymentPoller(MagicMock(spec=RestAPIUtil), max_in_flight=1, interval=0, initial_delay=0)
+        failed_script = MagicMock()
+        failed_script.run.return_value = {}
+        assert poller.deploy(failed_script, MagicMock()) == {}
+        assert poller.deploy(failed_script, MagicMock()) == {}
+        assert poller.get_metrics()["submitted"] == 0
+
+    def test_failed_read(self, poller, mocker):
+        mocker.patch.object(ImagedCluster, "list_imaged_clusters", side_effect=Exception("FC not reachable"))
+        mocker.patch.object(ImagedCluster, "read", side_effect=Exception("FC not reachable"))
+        monitor = MonitorDeployment(pc_session=poller.imaging.session, cluster_name="cluster-1",
+                                    imaged_cluster_uuid="uuid-1", fc_deployment_logger=MagicMock())
+        poller.watch(monitor)
+        results = poller.wait(["uuid-1"])
+        assert results["cluster-1"]["result"] == "FAILED"
+        assert results["cluster-1"]["status"] == "FC not reachable"
+
+    def test_wait_any(self, poller, mocker):
+        mocker.patch.object(ImagedCluster, "list_imaged_clusters", return_value=[
+            get_imaged_cluster(100, True, "uuid-1"), get_imaged_cluster(50, False, "uuid-2")])
+        for index in [1, 2]:
+            poller.watch(MonitorDeployment(pc_session=poller.imaging.session, cluster_name=f"cluster-{index}",
+                                           imaged_cluster_uuid=f"uuid-{index}", fc_deployment_logger=MagicMock()))
+        assert poller.wait_any(["uuid-1", "uuid-2"]) == ["uuid-1"]
+        assert poller.wait_any(["uuid-2"], timeout=0.1) == []
+        assert poller.wait(["uuid-1"])["cluster-1"]["result"] == "COMPLETED"
@@ -368,3 +368,12 @@ class TestImagedCluster:
             }, None)
         
 
+
+    def test_list_imaged_clusters(self, imaged_cluster, mocker):
+        mock_list = mocker.patch.object(ImagedCluster, "list", side_effect=[[{"imaged_cluster_uuid": "1"},
+                                                                             {"imaged_cluster_uuid": "2"}],
+                                                                            [{"imaged_cluster_uuid": "3"}]])
+        assert imaged_cluster.list_imaged_clusters(page_size=2) == [{"imaged_cluster_uuid": "1"},
+                                                                    {"imaged_cluster_uuid": "2"},
+                                                                    {"imaged_cluster_uuid": "3"}]
+        mock_list.assert_called_with(data={"filters": {"archived": False}, "length": 2, "offset": 2})
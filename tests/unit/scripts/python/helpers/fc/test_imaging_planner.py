@@ -0,0 +1,87 @@
+import json
+import pytest
+from framework.scripts.python.helpers.fc.imaging_planner import (ImagingPlanner, ImagingThroughput, ImagingUnit,
+                                                                 get_hardware_class, get_locality)
+
+
+def get_unit(index: int, model: str = "NX-1065", subnet: int = 0) -> ImagingUnit:
+    node = {"node_serial": f"node-{index}", "model": model, "hypervisor_ip": f"10.{subnet}.0.{index + 2}",
+            "hypervisor_netmask": "255.255.255.0", "image_now": True}
+    return ImagingUnit([node], {"cluster_name": f"cluster-{index}", "nodes_list": [dict(node, image_now=False)]})
+
+
+class TestImagingThroughput:
+    def test_default_model(self):
+        throughput = ImagingThroughput(setup_secs=1000, per_node_secs=100)
+        assert throughput.estimate("NX-1065", 3) == 1300
+
+    def test_fitted_model(self, tmp_path):
+        history_file = str(tmp_path / "history.json")
+        throughput = ImagingThroughput(history_file=history_file)
+        throughput.record("NX-1065", 2, 1400)
+        throughput.record("NX-1065", 4, 1800)
+        assert throughput.get_model("NX-1065") == (1000, 200)
+        # Other classes keep the defaults
+        assert throughput.estimate("NX-8035", 2) == ImagingThroughput.DEFAULT_SETUP_IN_SEC + \
+            2 * ImagingThroughput.DEFAULT_PER_NODE_IN_SEC
+        with open(history_file) as f:
+            assert json.load(f) == {"NX-1065": [[2, 1400], [4, 1800]]}
+        # Loaded by the next run
+        assert ImagingThroughput(history_file=history_file).estimate("NX-1065", 3) == 1600
+
+    def test_scaled_model(self):
+        throughput = ImagingThroughput(setup_secs=1000, per_node_secs=100)
+        throughput.record("NX-1065", 2, 2400)
+        assert throughput.estimate("NX-1065", 2) == 2400
+        assert throughput.estimate("NX-1065", 4) == 2800
+
+
+class TestImagingPlanner:
+    def test_node_attributes(self):
+        node = {"hypervisor_ip": "10.1.2.3", "hypervisor_netmask": "255.255.0.0", "block_serial": "block-1"}
+        assert get_locality(node) == "10.1.0.0/16"
+        assert get_locality({"block_serial": "block-1"}) == "block-1"
+        assert get_hardware_class({"hardware_attributes": {"model": "NX-8035"}}) == "NX-8035"
+        assert get_hardware_class({}) == "default"
+
+    def test_single_node(self):
+        with pytest.raises(Exception, match="Cannot image a single one node"):
+            ImagingPlanner().plan([get_unit(0)])
+
+    def test_unlimited_slots(self):
+        plan = ImagingPlanner().plan([get_unit(index) for index in range(10)])
+        # Every deployment runs at once, the smallest deployments are the fastest
+        assert [len(batch.nodes) for batch in plan.batches] == [2] * 5
+        assert sum(len(batch.deployments) for batch in plan.batches) == 10
+
+    def test_limited_slots(self):
+        units = [get_unit(index) for index in range(40)]
+        plan = ImagingPlanner(max_in_flight=4).plan(units)
+        assert sorted(node["node_serial"] for batch in plan.batches for node in batch.nodes) == \
+            sorted(unit.nodes[0]["node_serial"] for unit in units)
+        assert all(2 <= len(batch.nodes) <= ImagingPlanner.DEFAULT_MAX_NODES_PER_DEPLOYMENT for batch in plan.batches)
+        assert plan.makespan < ImagingPlanner(max_in_flight=4, max_nodes_per_deployment=2).plan(units).makespan
+        assert [batch.start for batch in plan.batches] == sorted(batch.start for batch in plan.batches)
+
+    def test_hardware_class_and_locality(self):
+        units = [get_unit(index, model="NX-1065" if index % 2 else "NX-8035", subnet=index // 4) for index in range(8)]
+        plan = ImagingPlanner(max_in_flight=4).plan(units)
+        for batch in plan.batches:
+            assert len({unit.hardware_class for unit in batch.units}) == 1
+            assert len({unit.locality for unit in batch.units}) == 1
+
+    def test_leftovers_imaged_together(self):
+        units = [get_unit(0), get_unit(1), get_unit(2, subnet=1), get_unit(3, subnet=2)]
+        plan = ImagingPlanner(max_in_flight=2).plan(units)
+        assert sorted(len(batch.nodes) for batch in plan.batches) == [2, 2]
+
+    def test_cluster_deployments_share_slots(self):
+        units = [get_unit(index) for index in range(4)]
+        cluster_deployments = [{"cluster_name": f"cluster-{index}", "nodes_list": [{"image_now": False}]}
+                               for index in range(4)]
+        planner = ImagingPlanner(max_in_flight=2)
+        assert planner.plan(units, cluster_deployments).makespan > planner.plan(units).makespan
+        plan = planner.plan([], cluster_deployments)
+        assert not plan.batches
+        assert plan.makespan == 2 * ImagingPlanner.DEFAULT_CLUSTER_CREATION_IN_SEC
+        assert plan.to_dict()["predicted_duration_mins"] == 40
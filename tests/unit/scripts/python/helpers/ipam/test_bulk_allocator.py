@@ -0,0 +1,179 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from framework.helpers.general_utils import allocate_ips_from_ipam, release_ips_from_ipam
+from framework.scripts.python.helpers.ipam.bulk_allocator import BulkAllocator, ReservationLedger
+
+
+class FakeIpam:
+    """
+    IPAM with a few free IPs per subnet. Like Infoblox, the free IPs are not reserved till a host record is created
+    """
+
+    def __init__(self, fail_bulk_create=False, partial_bulk_create=False, fail_bulk_get=False):
+        self.lock = threading.Lock()
+        self.records = {}
+        self.calls = []
+        self.fail_bulk_create = fail_bulk_create
+        self.fail_bulk_get = fail_bulk_get
+        # The records are created, but the multi-request returns an error
+        self.partial_bulk_create = partial_bulk_create
+
+    def __free_ips(self, subnet, exclude):
+        prefix = subnet.rsplit(".", 1)[0]
+        used = set(self.records.values()) | set(exclude)
+        return [f"{prefix}.{i}" for i in range(10, 250) if f"{prefix}.{i}" not in used]
+
+    def get_host_records(self, fqdn_list):
+        self.calls.append("get_host_records")
+        if self.fail_bulk_get:
+            return None, "multi-request failed"
+        return {fqdn: self.records[fqdn] for fqdn in fqdn_list if fqdn in self.records}, None
+
+    def check_host_records_exist(self, ip_list):
+        self.calls.append("check_host_records_exist")
+        return {ip for ip in ip_list if ip in self.records.values()}, None
+
+    def get_next_available_ips(self, network, num, exclude_ip_list=[]):
+        self.calls.append("get_next_available_ips")
+        return self.__free_ips(network, exclude_ip_list)[:num], None
+
+    def create_host_records(self, host_records):
+        self.calls.append("create_host_records")
+        if self.fail_bulk_create:
+            return False, "multi-request failed"
+        with self.lock:
+            for fqdn, ip in host_records.items():
+                if ip in self.records.values():
+                    return False, f"IP {ip} already in use"
+            self.records.update(host_records)
+        if self.partial_bulk_create:
+            return False, "multi-request timed out"
+        return True, None
+
+    def get_host_record(self, fqdn):
+        self.calls.append("get_host_record")
+        return [{"name": fqdn, "ipv4addrs": [{"ipv4addr": self.records[fqdn]}]}] if fqdn in self.records else []
+
+    def create_host_record_with_next_available_ip(self, network, fqdn, exclude_ip_list=[]):
+        self.calls.append("create_host_record_with_next_available_ip")
+        with self.lock:
+            ip = self.__free_ips(network, exclude_ip_list)[0]
+            self.records[fqdn] = ip
+        return ip, None
+
+    def check_host_record_exists(self, ip):
+        return ip in self.records.values()
+
+    def create_host_record(self, fqdn, ip):
+        self.records[fqdn] = ip
+        return True, None
+
+
+def node_requests(site, count):
+    requests = []
+    for i in range(count):
+        requests.append({"fqdn": f"{site}-host{i}.test.com", "subnet": "10.0.0.0/24"})
+        requests.append({"fqdn": f"{site}-cvm{i}.test.com", "subnet": "10.0.0.0/24"})
+        requests.append({"fqdn": f"{site}-ipmi{i}.test.com", "subnet": "10.1.0.0/24"})
+    return requests
+
+
+class TestBulkAllocator:
+    """
+    Test class for the BulkAllocator class.
+    """
+
+    @pytest.fixture(autouse=True)
+    def clear_ledger(self):
+        ReservationLedger.clear()
+        yield
+        ReservationLedger.clear()
+
+    def test_calls_scale_with_subnets(self):
+        ipam = FakeIpam()
+        results = BulkAllocator(ipam).allocate(node_requests("site1", 16))
+        assert len(results) == 48
+        assert all(error is None for _, error in results.values())
+        assert len({ip for ip, _ in results.values()}) == 48
+        # One lookup, then one free IP query and one multi-request per subnet
+        assert ipam.calls == ["get_host_records"] + ["get_next_available_ips", "create_host_records"] * 2
+
+    def test_existing_and_given_ips(self):
+        ipam = FakeIpam()
+        ipam.records = {"existing.test.com": "10.0.0.10", "other.test.com": "10.0.0.11"}
+        results = BulkAllocator(ipam).allocate([
+            {"fqdn": "existing.test.com", "subnet": "10.0.0.0/24"},
+            {"fqdn": "given.test.com", "ip": "10.0.0.100"},
+            {"fqdn": "reused.test.com", "ip": "10.0.0.11"},
+            {"fqdn": "new.test.com", "subnet": "10.0.0.0/24"},
+            {"fqdn": "new.test.com", "subnet": "10.0.0.0/24"},
+            {"fqdn": "invalid.test.com"}
+        ])
+        assert results["existing.test.com"] == ("10.0.0.10", None)
+        assert results["given.test.com"] == ("10.0.0.100", None)
+        assert results["reused.test.com"] == ("10.0.0.11", None)
+        assert results["new.test.com"] == ("10.0.0.12", None)
+        assert results["invalid.test.com"][0] is None
+        assert ipam.records["given.test.com"] == "10.0.0.100"
+        assert "reused.test.com" not in ipam.records
+
+    def test_fallback_on_bulk_failure(self):
+        ipam = FakeIpam(fail_bulk_create=True)
+        ledger = ReservationLedger()
+        results = BulkAllocator(ipam, ledger=ledger).allocate(node_requests("site1", 2))
+        assert all(error is None for _, error in results.values())
+        assert ipam.calls.count("create_host_record_with_next_available_ip") == 6
+        assert sorted(ledger.get_reserved("10.1.0.0/24")) == ["10.1.0.10", "10.1.0.11"]
+
+    def test_fallback_reuses_created_records(self):
+        ipam = FakeIpam(partial_bulk_create=True)
+        requests = node_requests("site1", 2)
+        results = BulkAllocator(ipam).allocate(requests)
+        assert all(error is None for _, error in results.values())
+        # The host records created by the failed bulk call are looked up, not created again
+        assert ipam.calls.count("get_host_record") == 6
+        assert "create_host_record_with_next_available_ip" not in ipam.calls
+        assert {fqdn: ip for fqdn, (ip, _) in results.items()} == ipam.records
+        assert len(ipam.records) == len({request["fqdn"] for request in requests})
+
+    def test_existing_records_looked_up_one_at_a_time(self):
+        ipam = FakeIpam(fail_bulk_get=True)
+        ipam.records = {"site1-host0.test.com": "10.0.0.50"}
+        requests = node_requests("site1", 2)
+        results = BulkAllocator(ipam).allocate(requests)
+        assert all(error is None for _, error in results.values())
+        # No second host record for the fqdn that already has one
+        assert results["site1-host0.test.com"] == ("10.0.0.50", None)
+        assert ipam.calls.count("get_host_record") == len(requests)
+        assert len(ipam.records) == len(requests)
+
+    def test_release_unused_ips(self):
+        ipam = FakeIpam()
+        ipam.records = {"existing.test.com": "10.0.0.10"}
+        requests = node_requests("site1", 1) + [{"fqdn": "given.test.com", "ip": "10.0.0.100"}]
+        allocated_ips = allocate_ips_from_ipam(ipam, MagicMock(), requests)
+        ledger = ReservationLedger.get_instance()
+        assert ledger.get_reserved("10.0.0.0/24") == ["10.0.0.11", "10.0.0.12"]
+
+        release_ips_from_ipam(requests, allocated_ips)
+        assert ledger.get_reserved("10.0.0.0/24") == []
+        assert ledger.get_reserved("10.1.0.0/24") == []
+
+    def test_concurrent_sites_dont_overlap(self):
+        ipam = FakeIpam()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda site: BulkAllocator(ipam).allocate(node_requests(site, 4)),
+                                        [f"site{i}" for i in range(8)]))
+        ips = [ip for result in results for ip, _ in result.values()]
+        assert None not in ips
+        assert len(ips) == len(set(ips)) == 96
+
+    def test_ledger(self):
+        ledger = ReservationLedger.get_instance()
+        assert ledger is ReservationLedger.get_instance()
+        ledger.reserve("10.0.0.0/24", ["10.0.0.2", "10.0.0.1"])
+        ledger.release("10.0.0.0/24", ["10.0.0.2"])
+        assert ledger.get_reserved("10.0.0.0/24") == ["10.0.0.1"]
+        assert ledger.subnet_lock("10.0.0.0/24") is ledger.subnet_lock("10.0.0.0/24")
@@ -68,3 +68,34 @@ class TestInfoblox:
         }
         mock_create.assert_called_once_with(endpoint="record:host?_return_fields%2B=name,ipv4addrs&_return_as_object=1", data=payload)
 
+
+    @patch.object(Infoblox, 'create')
+    def test_get_host_records(self, mock_create, infoblox):
+        mock_create.return_value = [[{"ipv4addrs": [{"ipv4addr": "192.168.1.2"}]}], []]
+        host_records, error = infoblox.get_host_records(["Host1.example.com", "host2.example.com"])
+        assert host_records == {"Host1.example.com": "192.168.1.2"}
+        assert error is None
+        payload = [
+            {"method": "GET", "object": "record:host", "data": {"name": "host1.example.com"}},
+            {"method": "GET", "object": "record:host", "data": {"name": "host2.example.com"}}
+        ]
+        mock_create.assert_called_once_with(endpoint="request", data=payload)
+
+    @patch.object(Infoblox, 'create')
+    @patch.object(Infoblox, 'read')
+    def test_get_next_available_ips(self, mock_read, mock_create, infoblox):
+        mock_read.return_value = [{"_ref": "network/ZG5z:192.168.1.0/24/default"}]
+        mock_create.return_value = {"ips": ["192.168.1.2", "192.168.1.3"]}
+        ip_list, error = infoblox.get_next_available_ips("192.168.1.0/24", 2, ["192.168.1.1"])
+        assert ip_list == ["192.168.1.2", "192.168.1.3"]
+        assert error is None
+        mock_read.assert_called_once_with(endpoint="network?network=192.168.1.0/24")
+        mock_create.assert_called_once_with(
+            endpoint="network/ZG5z:192.168.1.0/24/default?_function=next_available_ip",
+            data={"num": 2, "exclude": ["192.168.1.1"]})
+
+    @patch.object(Infoblox, 'create', side_effect=Exception("IP in use"))
+    def test_create_host_records_error(self, mock_create, infoblox):
+        success, error = infoblox.create_host_records({"host1.example.com": "192.168.1.2"})
+        assert success is False
+        assert "IP in use" in str(error)
@@ -29,7 +29,7 @@ class TestIPAM:
         ip_address, error = ipam.create_host_record_with_next_available_ip(network, fqdn)
         assert ip_address == "192.168.1.2"
         assert error is None
-        mock_create_host_record.assert_called_once_with(network, fqdn, [])
+        mock_create_host_record.assert_called_once_with(network, fqdn, None)
 
     @patch.object(IPMAMapping.IPAM_VENDOR_MAPPING["infoblox"], 'check_host_record_exists')
     def test_check_host_record_exists(self, mock_check_host_record, ipam):
@@ -0,0 +1,103 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from framework.scripts.python.helpers.ipam.bulk_allocator import BulkAllocator, ReservationLedger
+from framework.scripts.python.helpers.ipam.ipam import IPAM, IPMAMapping
+from framework.scripts.python.helpers.ipam.ipam_vendor import IpamVendor
+from framework.scripts.python.helpers.ipam.local_ipam import LocalIpam
+
+
+class TestLocalIpam:
+    """
+    Test class for the LocalIpam class.
+    """
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "ipam.db")
+
+    @pytest.fixture
+    def local_ipam(self, db_path):
+        return LocalIpam(db_path)
+
+    def test_host_records(self, local_ipam):
+        assert local_ipam.create_host_record_with_next_available_ip("10.0.0.0/24", "Host1.test.com") == \
+            ("10.0.0.2", None)
+        assert local_ipam.create_host_record_with_next_available_ip("10.0.0.0/24", "host1.test.com") == \
+            ("10.0.0.2", None)
+        assert local_ipam.get_host_record("HOST1.test.com") == [
+            {"name": "host1.test.com", "ipv4addrs": [{"ipv4addr": "10.0.0.2"}]}]
+        assert local_ipam.create_host_record("host2.test.com", "10.0.0.3") == (True, None)
+        assert local_ipam.check_host_record_exists("10.0.0.3")
+        success, error = local_ipam.create_host_record("host3.test.com", "10.0.0.3")
+        assert not success
+        assert "UNIQUE" in str(error)
+
+    def test_next_available_ips(self, local_ipam):
+        local_ipam.create_host_record("host1.test.com", "10.0.0.3")
+        assert local_ipam.get_next_available_ips("10.0.0.0/29", 3, ["10.0.0.4"]) == \
+            (["10.0.0.2", "10.0.0.5", "10.0.0.6"], None)
+        # Free IPs are not reserved
+        assert local_ipam.get_next_available_ips("10.0.0.0/29", 1) == (["10.0.0.2"], None)
+        ip_list, error = local_ipam.get_next_available_ips("10.0.0.0/29", 5)
+        assert ip_list is None
+        assert "Cannot find 5 available IP address(es)" in error
+
+    def test_create_host_records_is_atomic(self, local_ipam):
+        local_ipam.create_host_record("host1.test.com", "10.0.0.2")
+        success, _ = local_ipam.create_host_records({"host2.test.com": "10.0.0.3", "host3.test.com": "10.0.0.2"})
+        assert not success
+        assert local_ipam.get_host_records(["host2.test.com", "HOST1.test.com"]) == \
+            ({"HOST1.test.com": "10.0.0.2"}, None)
+        assert local_ipam.check_host_records_exist(["10.0.0.2", "10.0.0.3"]) == ({"10.0.0.2"}, None)
+        assert local_ipam.get_next_available_ips("10.0.0.0/24", 1) == (["10.0.0.3"], None)
+
+    def test_runs_sharing_the_file(self, db_path):
+        runs = [LocalIpam(db_path) for _ in range(4)]
+
+        def allocate(index):
+            return [runs[index % 4].create_host_record_with_next_available_ip("10.0.0.0/24", f"host{index}-{i}")[0]
+                    for i in range(10)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            ips = [ip for result in executor.map(allocate, range(8)) for ip in result]
+        assert None not in ips
+        assert len(set(ips)) == 80
+        # Records of the other runs are part of the bitmap
+        assert runs[0].get_next_available_ips("10.0.0.0/24", 1) == (["10.0.0.82"], None)
+
+    def test_ipam_local_vendor(self, db_path):
+        ReservationLedger.clear()
+        ipam = IPAM(vendor="local", ipam_address=db_path, username=None, password=None)
+        requests = [{"fqdn": f"host{i}.test.com", "subnet": "10.0.0.0/22"} for i in range(1000)]
+        results = BulkAllocator(ipam).allocate(requests)
+        assert len({ip for ip, _ in results.values()}) == 1000
+        assert ipam.check_host_record_exists("10.0.3.233")
+
+    def test_register_vendor(self):
+        class OtherIpam(IpamVendor):
+            def get_host_record(self, fqdn):
+                return [{"name": fqdn, "ipv4addrs": [{"ipv4addr": "10.0.0.2"}]}] if fqdn == "host1" else []
+
+            def create_host_record(self, fqdn, ip):
+                return True, None
+
+            def check_host_record_exists(self, ip):
+                return ip == "10.0.0.2"
+
+            def create_host_record_with_next_available_ip(self, network, fqdn, exclude_ip_list=None):
+                return "10.0.0.3", None
+
+            def __init__(self, address, username, password):
+                pass
+
+        IPMAMapping.register("other", OtherIpam)
+        try:
+            ipam = IPAM(vendor="other", ipam_address="", username=None, password=None)
+            # Bulk methods default to one record at a time
+            assert ipam.get_host_records(["host1", "host2"]) == ({"host1": "10.0.0.2"}, None)
+            assert ipam.check_host_records_exist(["10.0.0.2", "10.0.0.3"]) == ({"10.0.0.2"}, None)
+            assert ipam.get_next_available_ips("10.0.0.0/24", 2)[0] is None
+        finally:
+            IPMAMapping.IPAM_VENDOR_MAPPING.pop("other")
+        with pytest.raises(Exception):
+            IPMAMapping.register("other", object)
@@ -0,0 +1,63 @@
+import pytest
+from framework.scripts.python.helpers.ipam.ipam import IPAM
+from framework.scripts.python.helpers.ipam.ipam_benchmark import run_benchmark
+from framework.scripts.python.helpers.ipam.wapi_stand_in import WapiStandIn
+
+
+class TestWapiStandIn:
+    """
+    Test class for the WapiStandIn class, driven by the Infoblox client
+    """
+
+    @pytest.fixture
+    def wapi(self):
+        with WapiStandIn(networks=["10.0.0.0/29"]) as wapi:
+            yield wapi
+
+    @pytest.fixture
+    def ipam(self, wapi):
+        return IPAM(vendor="infoblox", ipam_address=wapi.address, username="admin", password="admin",
+                    port=wapi.port, secured=False)
+
+    def test_host_records(self, ipam):
+        assert ipam.create_host_record_with_next_available_ip("10.0.0.0/29", "host1.test.com") == ("10.0.0.2", None)
+        # Existing record is reused
+        assert ipam.create_host_record_with_next_available_ip("10.0.0.0/29", "HOST1.test.com") == ("10.0.0.2", None)
+        assert ipam.create_host_record("host2.test.com", "10.0.0.4") == (True, None)
+        assert ipam.check_host_record_exists("10.0.0.4")
+        assert not ipam.check_host_record_exists("10.0.0.5")
+        assert ipam.get_host_record("host2.test.com")[0]["ipv4addrs"][0]["ipv4addr"] == "10.0.0.4"
+
+    def test_next_available_ips(self, ipam):
+        ipam.create_host_record("host1.test.com", "10.0.0.3")
+        assert ipam.get_next_available_ips("10.0.0.0/29", 2, ["10.0.0.2"]) == (["10.0.0.4", "10.0.0.5"], None)
+        ip_list, error = ipam.get_next_available_ips("10.0.0.0/29", 5)
+        assert ip_list is None
+        assert "Cannot find 5 available IP address(es)" in error
+
+    def test_multi_request_is_atomic(self, ipam, wapi):
+        ipam.create_host_record("host1.test.com", "10.0.0.2")
+        success, error = ipam.create_host_records({"host2.test.com": "10.0.0.3", "host3.test.com": "10.0.0.2"})
+        assert not success
+        assert "already used" in str(error)
+        assert ipam.get_host_records(["host2.test.com", "host1.test.com"]) == ({"host1.test.com": "10.0.0.2"}, None)
+        assert ipam.check_host_records_exist(["10.0.0.2", "10.0.0.3"]) == ({"10.0.0.2"}, None)
+        assert wapi.get_metrics()["calls_by_object"]["POST request"] == 3
+
+    def test_benchmark(self):
+        bulk = run_benchmark(20, bulk=True, sites=2, latency=0)
+        per_record = run_benchmark(20, bulk=False, sites=2, latency=0)
+        assert bulk["ips"] == per_record["ips"] == 20 * 3 + 6
+        # A few calls per subnet and site, instead of two per IP
+        assert bulk["calls"] == 2 * 7
+        assert per_record["calls"] == 2 * per_record["ips"]
+        assert set(bulk["latency_ms"]) == {"p50", "p90", "p99"}
+
+    def test_benchmark_assign_ips_from_ipam(self):
+        bulk = run_benchmark(20, bulk=True, sites=2, latency=0, path="nodes")
+        per_record = run_benchmark(20, bulk=False, sites=2, latency=0, path="nodes")
+        assert bulk["path"] == per_record["path"] == "nodes"
+        assert bulk["ips"] == per_record["ips"] == 20 * 3 + 6
+        # A few calls per subnet and cluster (3 clusters per site), instead of two per IP
+        assert bulk["calls"] == 6 * 7
+        assert per_record["calls"] == 2 * per_record["ips"]
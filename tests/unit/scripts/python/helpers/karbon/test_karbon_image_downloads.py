@@ -0,0 +1,91 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from framework.helpers.rest_utils import RestAPIUtil
+from framework.scripts.python.helpers.karbon.karbon_image import KarbonImage
+from framework.scripts.python.helpers.karbon.karbon_image_downloads import KarbonImageDownloads
+
+IMAGES = [
+    {"version": "ntnx-1.0", "uuid": "image-1", "status": KarbonImage.AVAILABLE},
+    {"version": "ntnx-2.0", "uuid": "image-2", "status": KarbonImage.DOWNLOADED}
+]
+
+
+@pytest.fixture
+def session():
+    KarbonImageDownloads.clear()
+    yield MagicMock(spec=RestAPIUtil)
+    KarbonImageDownloads.clear()
+
+
+class TestKarbonImageDownloads:
+    @patch.object(KarbonImage, "get_image_status", return_value={"status": KarbonImage.COMPLETE})
+    @patch.object(KarbonImage, "download", return_value={"image_uuid": "download-1"})
+    @patch.object(KarbonImage, "list", return_value=IMAGES)
+    def test_download_once(self, mock_list, mock_download, mock_status, session):
+        downloads = KarbonImageDownloads.get_instance(session)
+        images = []
+        threads = [threading.Thread(target=lambda: images.append(downloads.wait_for_image("ntnx-1.0", timeout=10)))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [image["status"] for image in images] == [KarbonImage.DOWNLOADED] * 3
+        mock_download.assert_called_once_with("image-1")
+        mock_status.assert_called_with("download-1")
+        # Already downloaded images are not downloaded again, the images are listed once per PC
+        assert downloads.wait_for_image("ntnx-2.0")["uuid"] == "image-2"
+        assert KarbonImageDownloads.get_instance(session) is downloads
+        mock_list.assert_called_once()
+        metrics = downloads.get_metrics()
+        assert (metrics["downloads"], metrics["already_downloaded"], metrics["shared_waits"]) == (1, 1, 2)
+
+    @patch.object(KarbonImage, "download", return_value={"error": "failed"})
+    @patch.object(KarbonImage, "list", return_value=IMAGES)
+    def test_failures(self, mock_list, mock_download, session):
+        downloads = KarbonImageDownloads.get_instance(session)
+        with pytest.raises(Exception, match="'ntnx-3.0' version is not available"):
+            downloads.wait_for_image("ntnx-3.0")
+        with pytest.raises(Exception, match="Downloading the os-image 'ntnx-1.0' failed"):
+            downloads.wait_for_image("ntnx-1.0")
+
+        # The failed downloads are not cached, they are tried again
+        mock_download.return_value = {"image_uuid": "download-1"}
+        with patch.object(KarbonImage, "get_image_status", return_value={"status": KarbonImage.COMPLETE}):
+            assert downloads.wait_for_image("ntnx-1.0", timeout=10)["status"] == KarbonImage.DOWNLOADED
+        assert mock_download.call_count == 2
+
+    def test_get_instance(self, session):
+        downloads = KarbonImageDownloads.get_instance(session, max_parallel_deployments=2)
+        assert KarbonImageDownloads.get_instance(session) is downloads
+        assert downloads.max_parallel_deployments == 2
+        assert KarbonImageDownloads.get_instance(session, max_parallel_deployments=3) is downloads
+        assert KarbonImageDownloads.get_instance(session, max_parallel_deployments=1) is downloads
+        # The largest value passed is used
+        assert downloads.max_parallel_deployments == 3
+        assert KarbonImageDownloads.get_instance(MagicMock(spec=RestAPIUtil)) is not downloads
+
+    def test_passed_value_replaces_default(self, session):
+        downloads = KarbonImageDownloads.get_instance(session)
+        assert downloads.max_parallel_deployments == KarbonImageDownloads.DEFAULT_MAX_PARALLEL_DEPLOYMENTS
+        KarbonImageDownloads.get_instance(session, max_parallel_deployments=2)
+        assert downloads.max_parallel_deployments == 2
+
+    def test_deployment_slot(self, session):
+        downloads = KarbonImageDownloads.get_instance(session, max_parallel_deployments=2)
+
+        def deploy():
+            with downloads.deployment_slot():
+                time.sleep(0.05)
+
+        threads = [threading.Thread(target=deploy) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics = downloads.get_metrics()
+        assert (metrics["deployments"], metrics["max_active_deployments"], metrics["active_deployments"]) == (5, 2, 0)
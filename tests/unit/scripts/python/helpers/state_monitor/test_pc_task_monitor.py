@@ -2,6 +2,7 @@ import pytest
 from framework.scripts.python.helpers.state_monitor.pc_task_monitor import PcTaskMonitor
 from framework.helpers.rest_utils import RestAPIUtil
 from framework.scripts.python.helpers.state_monitor.state_monitor import StateMonitor
+from framework.scripts.python.helpers.state_monitor.task_tracker import TaskTracker
 from framework.scripts.python.helpers.v3.task import Task
 from unittest.mock import MagicMock
 
@@ -32,6 +33,8 @@ class TestPcTaskMonitor:
             {"status": "FAILED", "uuid":"test_uuid4"}, {"status": "COMPLETED", "uuid":"test_uuid5"}
             ]
         assert pc_task_monitor.check_status() == ("[{'status': 'FAILED', 'uuid': 'test_uuid2'}, {'status': 'FAILED', 'uuid': 'test_uuid4'}]", True)
+        # Terminal tasks are remembered by the tracker, so start with a new one
+        pc_task_monitor.task_tracker = TaskTracker(pc_task_monitor.task_op)
         mock_task_poll.return_value = [
             {"status": "COMPLETED", "uuid":"test_uuid1"}, {"status": "COMPLETED", "uuid":"test_uuid2"}, {"status": "COMPLETED", "uuid":"test_uuid3"},
             {"status": "COMPLETED", "uuid":"test_uuid4"}, {"status": "COMPLETED", "uuid":"test_uuid5"}
@@ -0,0 +1,149 @@
+import threading
+import pytest
+from framework.scripts.python.helpers.state_monitor.poll_scheduler import PollScheduler, PollEntry
+from framework.scripts.python.helpers.state_monitor.state_monitor import StateMonitor
+
+
+class CountingMonitor(StateMonitor):
+    """
+    Monitor that matches the target status after "polls_needed" checks
+    """
+    MIN_CHECK_INTERVAL_IN_SEC = 0.01
+    MAX_CHECK_INTERVAL_IN_SEC = 0.05
+    JITTER = 0
+
+    def __init__(self, polls_needed=1, key=None):
+        self.polls_needed = polls_needed
+        self.key = key
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_poll_key(self):
+        return self.key
+
+    def check_status(self):
+        with self.lock:
+            self.calls += 1
+            return self.calls, self.calls >= self.polls_needed
+
+
+class FailingMonitor(StateMonitor):
+    MIN_CHECK_INTERVAL_IN_SEC = 0.01
+
+    def check_status(self):
+        raise Exception("query failed")
+
+
+class TestPollScheduler:
+    """
+    Test class for the PollScheduler class.
+    """
+
+    @pytest.fixture()
+    def scheduler(self):
+        return PollScheduler(max_workers=4)
+
+    def test_poll_till_matched(self, scheduler):
+        monitor = CountingMonitor(polls_needed=3)
+        handle = scheduler.submit(monitor)
+        assert handle.future.result(timeout=5) == (3, True)
+        assert monitor.calls == 3
+        assert scheduler.get_metrics()["outstanding"] == 0
+
+    def test_wait_wakes_up_after_every_poll(self, scheduler):
+        monitor = CountingMonitor(polls_needed=3)
+        handle = scheduler.submit(monitor)
+        assert not handle.wait(5)
+        assert handle.last_response == 1
+        while not handle.wait(5):
+            pass
+        assert handle.result() == (3, True)
+
+    def test_same_key_is_coalesced(self, scheduler):
+        monitors = [CountingMonitor(polls_needed=3, key="same") for _ in range(10)]
+        handles = [scheduler.submit(monitor) for monitor in monitors]
+        results = [handle.future.result(timeout=5) for handle in handles]
+        assert all(result == (3, True) for result in results)
+        # Only the first monitor makes the query
+        assert monitors[0].calls == 3
+        assert all(monitor.calls == 0 for monitor in monitors[1:])
+        assert scheduler.get_metrics()["coalesced"] == 9
+
+    def test_different_keys_are_not_coalesced(self, scheduler):
+        monitors = [CountingMonitor(polls_needed=2, key=i) for i in range(3)] + [CountingMonitor(polls_needed=2)]
+        handles = [scheduler.submit(monitor) for monitor in monitors]
+        for handle in handles:
+            handle.future.result(timeout=5)
+        assert all(monitor.calls == 2 for monitor in monitors)
+
+    def test_cancel_stops_polling(self, scheduler):
+        monitor = CountingMonitor(polls_needed=10 ** 6)
+        handle = scheduler.submit(monitor)
+        handle.wait(5)
+        handle.cancel()
+        assert scheduler.get_metrics()["outstanding"] == 0
+        calls = monitor.calls
+        threading.Event().wait(0.2)
+        # At most the poll in flight when cancelled
+        assert monitor.calls <= calls + 1
+        assert not handle.done()
+
+    def test_exception_is_propagated(self, scheduler):
+        handle = scheduler.submit(FailingMonitor())
+        with pytest.raises(Exception) as e:
+            handle.future.result(timeout=5)
+        assert "query failed" in str(e.value)
+
+    def test_callback(self, scheduler):
+        done = threading.Event()
+        scheduler.submit(CountingMonitor(polls_needed=2), callback=lambda future: done.set())
+        assert done.wait(5)
+
+    def test_interval_backs_off_without_progress(self):
+        monitor = CountingMonitor()
+        monitor.get_progress = lambda response: "same"
+        entry = PollEntry(monitor, None)
+        intervals = []
+        for polls in range(1, 7):
+            entry.polls = polls
+            intervals.append(PollScheduler._next_interval(entry, None))
+        assert intervals[0] == pytest.approx(0.01)
+        assert intervals[1] == pytest.approx(0.015)
+        assert intervals[-1] == pytest.approx(0.05)
+
+    def test_interval_reset_on_progress(self):
+        monitor = CountingMonitor()
+        entry = PollEntry(monitor, None)
+        entry.polls = 5
+        entry.interval = 0.05
+        entry.last_progress = 1
+        assert PollScheduler._next_interval(entry, 2) == pytest.approx(0.01)
+
+    def test_interval_shorter_near_completion(self):
+        monitor = CountingMonitor()
+        monitor.get_completion = lambda response: response
+        entry = PollEntry(monitor, None)
+        entry.polls = 2
+        entry.last_progress = 0.1
+        assert PollScheduler._next_interval(entry, 0.5) == pytest.approx(0.01)
+        assert PollScheduler._next_interval(entry, 0.9) == pytest.approx(0.005)
+
+    def test_monitor_uses_scheduler(self):
+        monitor = CountingMonitor(polls_needed=3)
+        assert monitor.monitor() == (3, True)
+        assert monitor.monitor(query_retries=False) is True
+
+    def test_default_intervals(self):
+        class DefaultMonitor(StateMonitor):
+            DEFAULT_CHECK_INTERVAL_IN_SEC = 30
+
+            def check_status(self):
+                return None, True
+
+        monitor = DefaultMonitor()
+        # Never polled less often than the DEFAULT_CHECK_INTERVAL_IN_SEC, more often only close to completion
+        assert monitor.get_min_check_interval() == 30
+        assert monitor.get_min_check_interval(0.5) == 30
+        assert monitor.get_min_check_interval(0.9) == 15
+        assert monitor.get_max_check_interval() == 30
+        assert monitor.get_poll_key() is None
@@ -0,0 +1,70 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from framework.helpers.rest_utils import RestAPIUtil
+from framework.scripts.python.helpers.state_monitor.task_monitor import PcBatchTaskMonitor, PcTaskMonitor
+from framework.scripts.python.helpers.state_monitor.task_tracker import TaskTracker
+
+
+class FakeTaskOp:
+    """
+    Task op where the "failed" tasks fail and the other ones succeed
+    """
+
+    def __init__(self, failed=None):
+        self.session = MagicMock(spec=RestAPIUtil)
+        self.failed = set(failed or [])
+        self.polled = threading.Event()
+        self.calls = []
+
+    def poll(self, task_uuid_list, poll_timeout_secs=30):
+        self.calls.append(list(task_uuid_list))
+        self.polled.set()
+        return [{"uuid": uuid, "status": "FAILED" if uuid in self.failed else "SUCCEEDED"}
+                for uuid in task_uuid_list]
+
+
+class TestPcBatchTaskMonitor:
+    @pytest.fixture(autouse=True)
+    def clear_trackers(self):
+        TaskTracker.clear()
+        yield
+        TaskTracker.clear()
+
+    def test_chunks_monitored_as_they_complete(self):
+        task_op = FakeTaskOp(failed=["uuid3"])
+
+        def task_uuid_chunks():
+            yield ["uuid1", "uuid2"]
+            # The tasks of the first chunk are polled while the next chunk is in flight
+            assert task_op.polled.wait(10)
+            yield []
+            yield ["uuid3"]
+
+        monitor = PcBatchTaskMonitor(task_op.session, task_op=task_op)
+        response, status = monitor.monitor(task_uuid_chunks())
+        assert status
+        assert "uuid3" in response and "uuid1" not in response
+        assert monitor.task_uuid_list == ["uuid1", "uuid2", "uuid3"]
+        assert sorted(task_op.calls[0]) == ["uuid1", "uuid2"]
+
+    def test_no_tasks(self):
+        task_op = FakeTaskOp()
+        assert PcBatchTaskMonitor(task_op.session, task_op=task_op).monitor(iter([])) == (None, True)
+        assert not task_op.calls
+
+    def test_timeout(self, mocker):
+        task_op = FakeTaskOp()
+        mocker.patch.object(task_op, "poll", return_value=[])
+        mocker.patch("framework.scripts.python.helpers.state_monitor.task_monitor.PcTaskMonitor.DEFAULT_TIMEOUT_IN_SEC",
+                     0.1)
+        assert PcBatchTaskMonitor(task_op.session, task_op=task_op).monitor([["uuid1"]]) == (None, False)
+
+    def test_completion(self):
+        task_op = FakeTaskOp()
+        monitor = PcTaskMonitor(task_op.session, task_op=task_op, task_uuid_list=["uuid1", "uuid2"])
+        assert monitor.get_completion(None) == 0
+        monitor.completed_task_list = ["uuid1"]
+        monitor.failed_task_list = ["uuid2"]
+        assert monitor.get_completion(None) == 1
+        assert PcTaskMonitor(task_op.session, task_op=task_op, task_uuid_list=[]).get_completion(None) is None
@@ -0,0 +1,98 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from framework.helpers.rest_utils import RestAPIUtil
+from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor
+from framework.scripts.python.helpers.state_monitor.task_tracker import TaskTracker
+from framework.scripts.python.helpers.v3.task import Task
+
+
+class FakeTaskOp:
+    """
+    Task op where "running" tasks are never returned by poll
+    """
+
+    def __init__(self, running=None, delay=0):
+        self.session = MagicMock(spec=RestAPIUtil)
+        self.running = set(running or [])
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def poll(self, task_uuid_list, poll_timeout_secs=30):
+        with self.lock:
+            self.calls.append(list(task_uuid_list))
+        if self.delay:
+            threading.Event().wait(self.delay)
+        return [{"uuid": uuid, "status": "SUCCEEDED"} for uuid in task_uuid_list if uuid not in self.running]
+
+
+class TestTaskTracker:
+    """
+    Test class for the TaskTracker class.
+    """
+
+    @pytest.fixture(autouse=True)
+    def clear_trackers(self):
+        TaskTracker.clear()
+        yield
+        TaskTracker.clear()
+
+    def test_terminal_tasks_not_polled_again(self):
+        task_op = FakeTaskOp(running=["uuid3"])
+        tracker = TaskTracker(task_op)
+        completed = tracker.poll(["uuid1", "uuid2", "uuid3"])
+        assert [task["uuid"] for task in completed] == ["uuid1", "uuid2"]
+        tracker.poll(["uuid1", "uuid2", "uuid3"])
+        assert task_op.calls[1] == ["uuid3"]
+        assert tracker.get_metrics()["terminal_hits"] == 2
+
+    def test_all_terminal_makes_no_call(self):
+        task_op = FakeTaskOp()
+        tracker = TaskTracker(task_op)
+        tracker.poll(["uuid1"])
+        assert tracker.poll(["uuid1"]) == [{"uuid": "uuid1", "status": "SUCCEEDED"}]
+        assert len(task_op.calls) == 1
+
+    def test_concurrent_callers_share_poll_calls(self):
+        task_op = FakeTaskOp(delay=0.1)
+        tracker = TaskTracker(task_op)
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            results = list(executor.map(lambda i: tracker.poll([f"uuid{i}"]), range(20)))
+        assert all(result == [{"uuid": f"uuid{i}", "status": "SUCCEEDED"}] for i, result in enumerate(results))
+        # One caller polls first, the rest are merged in the next round
+        assert len(task_op.calls) < 20
+        assert sorted(uuid for call in task_op.calls for uuid in call) == sorted(f"uuid{i}" for i in range(20))
+
+    def test_batches_are_chunked(self):
+        task_op = FakeTaskOp()
+        tracker = TaskTracker(task_op)
+        tracker.poll([f"uuid{i}" for i in range(250)])
+        assert [len(call) for call in task_op.calls] == [100, 100, 50]
+
+    def test_error_is_raised(self):
+        task_op = FakeTaskOp()
+        task_op.poll = MagicMock(side_effect=Exception("poll failed"))
+        tracker = TaskTracker(task_op)
+        with pytest.raises(Exception) as e:
+            tracker.poll(["uuid1"])
+        assert "poll failed" in str(e.value)
+        assert not tracker.polling
+
+    def test_same_session_same_tracker(self):
+        session = MagicMock(spec=RestAPIUtil)
+        assert TaskTracker.get_instance(Task(session)) is TaskTracker.get_instance(Task(session))
+        assert TaskTracker.get_instance(Task(session)) is not TaskTracker.get_instance(
+            Task(MagicMock(spec=RestAPIUtil)))
+
+    def test_monitors_share_tracker(self, mocker):
+        session = MagicMock(spec=RestAPIUtil)
+        mock_task_poll = mocker.patch.object(Task, 'poll')
+        mock_task_poll.return_value = [{"uuid": "uuid1", "status": "SUCCEEDED"}]
+        first = PcTaskMonitor(session, task_uuid_list=["uuid1"])
+        second = PcTaskMonitor(session, task_uuid_list=["uuid1"])
+        assert first.task_tracker is second.task_tracker
+        assert first.check_status() == (None, True)
+        assert second.check_status() == (None, True)
+        assert mock_task_poll.call_count == 1
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from framework.scripts.python.helpers.batch_script import BatchScript
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
 from framework.scripts.python.script import Script
 
 class TestBatchScripts:
@@ -86,7 +87,7 @@ class TestBatchScripts:
         script2.run.assert_called_once()
 
     def test_parallel_execute(self, batch_script, mocker):
-        mock_executor = mocker.patch("concurrent.futures.ThreadPoolExecutor")
+        mock_map = mocker.patch.object(WorkerBudget, "map")
         script1 = MagicMock()
         script1.run.return_value = {"result1": "value1"}
         script2 = MagicMock()
@@ -95,11 +96,11 @@ class TestBatchScripts:
         batch_script.add(script1)
         batch_script.add(script2)
 
-        mock_executor.return_value.__enter__.return_value.map.return_value = [script1.run(), script2.run()]
+        mock_map.return_value = [script1.run(), script2.run()]
 
         batch_script._parallel_execute()
 
         assert batch_script.results == {"result1": "value1", "result2": "value2"}
         script1.run.assert_called_once()
         script2.run.assert_called_once()
-        mock_executor.assert_called_once_with(max_workers=batch_script.max_workers)
\ No newline at end of file
+        assert mock_map.call_args.kwargs == {"max_workers": batch_script.max_workers}
@@ -0,0 +1,124 @@
+import hashlib
+import pytest
+from unittest.mock import MagicMock
+from framework.helpers.rest_utils import RestAPIUtil
+from framework.scripts.python.helpers.chunked_upload import ChunkedUpload, MiB, get_upload_options
+from framework.scripts.python.helpers.entity import Entity
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "image.qcow2"
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+class Receiver:
+    """
+    Server side of the upload, fails the chunks at the offsets in fail_at once each
+    """
+    def __init__(self, fail_at=None, interrupt_at=None):
+        self.data = bytearray()
+        self.fail_at = set(fail_at or [])
+        self.interrupt_at = interrupt_at
+        self.offsets = []
+
+    def __call__(self, chunk, offset, total_size):
+        if offset == self.interrupt_at:
+            self.interrupt_at = None
+            raise KeyboardInterrupt
+        if offset in self.fail_at:
+            self.fail_at.remove(offset)
+            raise Exception("Connection reset")
+        assert offset == len(self.data)
+        self.offsets.append(offset)
+        self.data.extend(chunk)
+
+
+class TestChunkedUpload:
+    def test_upload(self, source):
+        receiver = Receiver()
+        metrics = ChunkedUpload(source, receiver, chunk_size=1000, checksum_algorithm="sha1").upload()
+        assert bytes(receiver.data) == CONTENT
+        assert receiver.offsets == list(range(0, len(CONTENT), 1000))
+        assert metrics["bytes_sent"] == len(CONTENT) and metrics["resumed_from"] == 0
+        assert metrics["checksum"] == hashlib.sha1(CONTENT).hexdigest()
+
+    def test_retry_chunk(self, source, mocker):
+        mock_sleep = mocker.patch("framework.scripts.python.helpers.chunked_upload.time.sleep")
+        receiver = Receiver(fail_at=[2000])
+        metrics = ChunkedUpload(source, receiver, chunk_size=1000, retry_interval=1).upload()
+        assert bytes(receiver.data) == CONTENT
+        assert metrics["retries"] == 1
+        mock_sleep.assert_called_once_with(1)
+
+        with pytest.raises(Exception, match="after 0 retries"):
+            ChunkedUpload(source, Receiver(fail_at=[0]), chunk_size=1000, max_retries=0).upload()
+
+    def test_resume(self, source, tmp_path):
+        state_dir = str(tmp_path / "state")
+        receiver = Receiver(interrupt_at=3000)
+        upload = ChunkedUpload(source, receiver, chunk_size=1000, state_dir=state_dir, checksum_algorithm="sha1")
+        with pytest.raises(KeyboardInterrupt):
+            upload.upload()
+        assert upload.is_pending()
+
+        # Only the chunks not uploaded yet are sent, the checksum is of the whole file
+        metrics = ChunkedUpload(source, receiver, chunk_size=1000, state_dir=state_dir,
+                                checksum_algorithm="sha1").upload()
+        assert bytes(receiver.data) == CONTENT
+        assert metrics["resumed_from"] == 3000 and metrics["bytes_sent"] == len(CONTENT) - 3000
+        assert metrics["checksum"] == hashlib.sha1(CONTENT).hexdigest()
+        assert not upload.is_pending()
+
+    def test_resume_changed_file(self, source, tmp_path):
+        state_dir = str(tmp_path / "state")
+        with pytest.raises(KeyboardInterrupt):
+            ChunkedUpload(source, Receiver(interrupt_at=3000), chunk_size=1000, state_dir=state_dir).upload()
+
+        # The saved offset is of another version of the file
+        with open(source, "ab") as f:
+            f.write(b"more")
+        receiver = Receiver()
+        metrics = ChunkedUpload(source, receiver, chunk_size=1000, state_dir=state_dir).upload()
+        assert metrics["resumed_from"] == 0 and bytes(receiver.data) == CONTENT + b"more"
+
+    def test_server_offset(self, source, tmp_path):
+        receiver = Receiver()
+        receiver.data.extend(CONTENT[:4000])
+        metrics = ChunkedUpload(source, receiver, chunk_size=1000, get_offset=lambda: 4000).upload()
+        assert metrics["resumed_from"] == 4000 and bytes(receiver.data) == CONTENT
+
+    def test_upload_options(self, tmp_path):
+        assert get_upload_options({}) == {}
+        options = get_upload_options({"project_root": str(tmp_path)},
+                                     {"file_upload": {"state_dir": "state", "chunk_size_mib": 4, "max_retries": 0}})
+        assert options == {"state_dir": str(tmp_path / "state"), "chunk_size": 4 * MiB, "max_retries": 0}
+
+
+class TestEntityUpload:
+    @pytest.fixture
+    def entity(self):
+        session = MagicMock(spec=RestAPIUtil)
+        session.prepare_url.side_effect = lambda uri: f"https://10.0.0.1:9440/{uri}"
+        return Entity(session=session, resource_type="api/nutanix/v3/images")
+
+    def test_upload_chunked(self, entity, source):
+        metrics = entity.upload_chunked(source, uuid="image-1", endpoint="file", chunk_size=4096)
+        assert metrics["bytes_sent"] == len(CONTENT)
+        calls = entity.session.put.call_args_list
+        assert [call.args[0] for call in calls] == ["api/nutanix/v3/images/image-1/file"] * 3
+        assert [call.kwargs["headers"]["Content-Range"] for call in calls] == [
+            "bytes 0-4095/10240", "bytes 4096-8191/10240", "bytes 8192-10239/10240"]
+        assert b"".join(call.kwargs["data"] for call in calls) == CONTENT
+
+    def test_upload_pending(self, entity, source, tmp_path):
+        state_dir = str(tmp_path / "state")
+        entity.session.put.side_effect = [None, KeyboardInterrupt]
+        with pytest.raises(KeyboardInterrupt):
+            entity.upload_chunked(source, uuid="image-1", endpoint="file", chunk_size=4096, state_dir=state_dir,
+                                  key=entity.get_upload_key("image", source))
+        assert entity.is_upload_pending("image", source, state_dir)
+        assert not entity.is_upload_pending("other-image", source, state_dir)
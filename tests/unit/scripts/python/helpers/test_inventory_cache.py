@@ -0,0 +1,200 @@
+import threading
+import time
+from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from framework.helpers.rest_utils import RestAPIUtil
+from framework.scripts.python.helpers.inventory_cache import InventoryCache
+from framework.scripts.python.helpers.state_monitor.task_monitor import PcTaskMonitor
+from framework.scripts.python.helpers.state_monitor.task_tracker import TaskTracker
+from framework.scripts.python.helpers.v3.application import Application
+from framework.scripts.python.helpers.v3.category import Category
+from framework.scripts.python.helpers.v3.cluster import Cluster
+from framework.scripts.python.helpers.v3.image import Image
+
+CLUSTERS = [
+    {
+        "spec": {"name": "cluster1"},
+        "metadata": {"uuid": "uuid1"},
+        "status": {"resources": {"config": {"service_list": ["AOS"]}, "network": {"external_ip": "1.1.1.1"}}}
+    },
+    {
+        "status": {"name": "pc", "resources": {"config": {"service_list": ["PRISM_CENTRAL"]}, "network": {}}},
+        "metadata": {"uuid": "uuid2"}
+    }
+]
+
+
+class TestInventoryCache:
+    """
+    Test class for the InventoryCache class.
+    """
+
+    @pytest.fixture(autouse=True)
+    def clear_caches(self):
+        InventoryCache.clear()
+        TaskTracker.clear()
+        yield
+        InventoryCache.clear()
+
+    def test_listed_once(self):
+        cache = InventoryCache()
+        loader = MagicMock(return_value=CLUSTERS)
+        assert cache.get("/clusters", loader) == CLUSTERS
+        assert cache.get_by_name("/clusters", "pc", loader)["metadata"]["uuid"] == "uuid2"
+        assert cache.get_by_uuid("/clusters", "uuid1", loader)["spec"]["name"] == "cluster1"
+        assert loader.call_count == 1
+        assert cache.get_metrics() == {"hits": 2, "misses": 1, "invalidations": 0, "collections": 1}
+
+    def test_lookup_miss_lists_again(self):
+        cache = InventoryCache()
+        loader = MagicMock(side_effect=[CLUSTERS[:1], CLUSTERS])
+        cache.get("/clusters", loader)
+        # Created outside the scripts after the snapshot was listed
+        assert cache.get_by_name("/clusters", "pc", loader)["metadata"]["uuid"] == "uuid2"
+        assert loader.call_count == 2
+        # Not listed twice if the snapshot was listed for the lookup
+        cache.invalidate()
+        loader = MagicMock(return_value=CLUSTERS)
+        assert cache.get_by_uuid("/clusters", "missing", loader) is None
+        assert loader.call_count == 1
+
+    def test_callers_get_copies(self):
+        cache = InventoryCache()
+        loader = MagicMock(return_value=CLUSTERS)
+        cache.get_by_name("/clusters", "cluster1", loader)["spec"]["name"] = "modified"
+        cache.get("/clusters", loader).clear()
+        assert cache.get_by_name("/clusters", "cluster1", loader)["spec"]["name"] == "cluster1"
+
+    def test_ttl(self):
+        cache = InventoryCache(ttl=0.01)
+        loader = MagicMock(return_value=[])
+        cache.get("/clusters", loader)
+        time.sleep(0.02)
+        cache.get("/clusters", loader)
+        assert loader.call_count == 2
+
+    def test_refresh(self):
+        cache = InventoryCache()
+        loader = MagicMock(return_value=[])
+        cache.get("/clusters", loader)
+        cache.get("/clusters", loader, refresh=True)
+        assert loader.call_count == 2
+
+    def test_invalidate(self):
+        cache = InventoryCache()
+        loader = MagicMock(return_value=[])
+        for collection in ["/categories", "/categories/values", "/images"]:
+            cache.get(collection, loader)
+        cache.invalidate("/categories")
+        assert list(cache.snapshots) == ["/images"]
+        cache.invalidate()
+        assert not cache.snapshots
+
+    def test_invalidated_while_listing_is_not_cached(self):
+        cache = InventoryCache()
+
+        def loader():
+            cache.invalidate("/images")
+            return []
+
+        cache.get("/images", loader)
+        assert "/images" not in cache.snapshots
+
+    def test_concurrent_callers_list_once(self):
+        cache = InventoryCache()
+        calls = []
+
+        def loader():
+            calls.append(threading.current_thread())
+            time.sleep(0.05)
+            return CLUSTERS
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(lambda _: cache.get("/clusters", loader), range(10)))
+        assert len(calls) == 1
+        assert all(result == CLUSTERS for result in results)
+
+    def test_get_pe_info_list(self, mocker):
+        session = MagicMock(spec=RestAPIUtil)
+        mock_list = mocker.patch.object(Cluster, "list", return_value=CLUSTERS)
+        for _ in range(3):
+            cluster = Cluster(session)
+            cluster.get_pe_info_list()
+        assert cluster.name_uuid_map == {"cluster1": "uuid1"}
+        assert mock_list.call_count == 1
+        cluster.get_pe_info_list(refresh=True)
+        assert mock_list.call_count == 2
+        # Another PC has its own inventory
+        Cluster(MagicMock(spec=RestAPIUtil)).get_pe_info_list()
+        assert mock_list.call_count == 3
+
+    def test_get_entity_by_name(self, mocker):
+        session = MagicMock(spec=RestAPIUtil)
+        mock_list = mocker.patch.object(Image, "list", return_value=[{"spec": {"name": "image1"},
+                                                                      "metadata": {"uuid": "uuid1"}}])
+        image = Image(session)
+        assert image.get_uuid_by_name("image1") == "uuid1"
+        assert mock_list.call_count == 1
+        # A name not in the snapshot is listed again
+        assert image.get_entity_by_name("image2") is None
+        assert mock_list.call_count == 2
+        # Filtered lookups are not cached
+        image.get_entity_by_name("image1", filter="name==image1")
+        assert mock_list.call_count == 3
+
+    def test_not_cached_by_default(self, mocker):
+        mock_list = mocker.patch.object(Application, "list", return_value=[{"status": {"name": "app1"},
+                                                                            "metadata": {"uuid": "uuid1"}}])
+        application = Application(MagicMock(spec=RestAPIUtil))
+        for _ in range(2):
+            assert application.get_uuid_by_name("app1") == "uuid1"
+        assert mock_list.call_count == 2
+
+    def test_mutations_invalidate(self, mocker):
+        session = MagicMock(spec=RestAPIUtil)
+        mock_list = mocker.patch.object(Image, "list", return_value=[])
+        image = Image(session)
+        image.get_entity_by_name("image1")
+        image.create(data={})
+        image.get_entity_by_name("image1")
+        session.post.return_value = {"api_response_list": []}
+        image.batch_op.batch([{"operation": "POST"}])
+        image.get_entity_by_name("image1")
+        assert mock_list.call_count == 3
+
+    def test_categories_with_values(self, mocker):
+        session = MagicMock(spec=RestAPIUtil)
+        mock_list = mocker.patch.object(Category, "list", return_value=[{"name": "category1"}])
+        mocker.patch.object(Category, "get_values", return_value=[{"value": "value1"}])
+        category = Category(session)
+        assert category.categories_with_values() == [{"name": "category1", "values": ["value1"]}]
+        assert category.categories_with_values() == [{"name": "category1", "values": ["value1"]}]
+        assert mock_list.call_count == 1
+        category.create_category("category2")
+        category.categories_with_values()
+        assert mock_list.call_count == 2
+
+    def test_task_completion_invalidates(self, mocker):
+        session = MagicMock(spec=RestAPIUtil)
+        cache = InventoryCache.get_instance(session)
+        cache.get("/images", MagicMock(return_value=[]))
+        task_op = MagicMock()
+        task_op.session = session
+        task_op.poll.return_value = [{"uuid": "uuid1", "status": "SUCCEEDED"}]
+        assert PcTaskMonitor(session, task_uuid_list=["uuid1"], task_op=task_op).check_status() == (None, True)
+        assert not cache.snapshots
+
+    def test_v4_task_completion_invalidates(self):
+        session, client = MagicMock(spec=RestAPIUtil), MagicMock()
+        cache = InventoryCache.get_instance(client)
+        cache.get("prism/v4.0/config/categories/values", MagicMock(return_value=[]))
+        # v4 Task helper, the categories created by the tasks are cached per API client
+        task_op = MagicMock()
+        task_op.client = client
+        task_op.poll.side_effect = [[], [{"uuid": "uuid1", "status": "SUCCEEDED"}]]
+        monitor = PcTaskMonitor(session, task_uuid_list=["uuid1"], task_op=task_op)
+        assert monitor.check_status() == (None, False)
+        assert cache.snapshots
+        assert monitor.check_status() == (None, True)
+        assert not cache.snapshots
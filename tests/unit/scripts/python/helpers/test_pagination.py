@@ -0,0 +1,105 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from framework.helpers.rest_utils import RestAPIUtil
+from framework.scripts.python.helpers.pagination import iter_pages
+from framework.scripts.python.helpers.pc_entity_v3 import PcEntity
+
+
+class FakePages:
+    """
+    Returns "total" entities in pages, and records the offsets fetched at a time
+    """
+
+    def __init__(self, total, delay=0.02):
+        self.total = total
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.offsets = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(self, offset, page_size=10):
+        with self.lock:
+            self.offsets.append(offset)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return list(range(offset, min(offset + page_size, self.total)))
+
+
+class TestPagination:
+    """
+    Test class for the pagination helpers.
+    """
+
+    def test_pages_in_order(self):
+        fetch_page = FakePages(total=100)
+        pages = list(iter_pages(fetch_page, range(0, 100, 10), page_size=10, max_in_flight=3))
+
+        assert [entity for page in pages for entity in page] == list(range(100))
+        assert fetch_page.max_in_flight == 3
+
+    def test_stops_after_short_page(self):
+        fetch_page = FakePages(total=25)
+        pages = list(iter_pages(fetch_page, range(0, 1000, 10), page_size=10, max_in_flight=2))
+
+        assert [entity for page in pages for entity in page] == list(range(25))
+        # The window is bounded, only the pages in flight when the short page is seen are fetched after it
+        assert len(fetch_page.offsets) <= 4
+
+    def test_stream_is_lazy(self):
+        fetch_page = FakePages(total=1000, delay=0)
+        pages = iter_pages(fetch_page, range(0, 1000, 10), page_size=10, max_in_flight=2)
+        assert next(pages) == list(range(10))
+        pages.close()
+        assert len(fetch_page.offsets) <= 3
+
+    def test_error_is_raised(self):
+        def fetch_page(offset):
+            if offset == 20:
+                raise Exception("page failed")
+            return list(range(10))
+
+        with pytest.raises(Exception) as e:
+            list(iter_pages(fetch_page, range(0, 100, 10), page_size=10))
+        assert "page failed" in str(e.value)
+
+    @staticmethod
+    def mock_list_api(mocker, fetch_page):
+        """
+        v3 list API over the entities of fetch_page, with their total_matches
+        """
+        session = MagicMock(spec=RestAPIUtil)
+        session.post.side_effect = lambda uri, data, **kwargs: {
+            "entities": fetch_page(data["offset"], data["length"]),
+            "metadata": {"total_matches": fetch_page.total, "length": data["length"]}
+        }
+        mocker.patch.object(PcEntity, "V3_LIST_CHUNKSIZE", 100)
+        return PcEntity(session)
+
+    def test_pc_entity_list(self, mocker):
+        fetch_page = FakePages(total=1234)
+        pc_entity = self.mock_list_api(mocker, fetch_page)
+
+        # All the matching entities by default, the pages after the first one are fetched concurrently
+        assert pc_entity.list() == list(range(1234))
+        assert fetch_page.offsets[0] == 0
+        assert sorted(fetch_page.offsets) == list(range(0, 1300, 100))
+        assert fetch_page.max_in_flight > 1
+        # Only "length" entities if passed
+        fetch_page.offsets.clear()
+        assert pc_entity.list(offset=100, length=250) == list(range(100, 350))
+        assert sorted(fetch_page.offsets) == [100, 200, 300]
+
+    def test_pc_entity_list_single_page(self, mocker):
+        fetch_page = FakePages(total=50)
+        pc_entity = self.mock_list_api(mocker, fetch_page)
+
+        assert pc_entity.list(sort_order="ASCENDING", custom_filters={"power_state": "ON"}) == []
+        assert pc_entity.list(sort_order="ASCENDING") == list(range(50))
+        assert pc_entity.session.post.call_count == 2
+        assert pc_entity.session.post.call_args.kwargs["data"]["sort_order"] == "ASCENDING"
@@ -1,6 +1,8 @@
+import threading
+import time
 import pytest
 from unittest.mock import MagicMock, patch
-from framework.scripts.python.helpers.pc_batch_op import PcBatchOp, get_task_uuid_list
+from framework.scripts.python.helpers.pc_batch_op import PcBatchOp, get_batch_options, get_task_uuid_list
 from framework.helpers.rest_utils import RestAPIUtil
 
 @pytest.fixture
@@ -125,4 +127,63 @@ class TestPcBatchOp:
                 assert str(e) == "Cannot get task list to monitor for the batch call!: Expecting value: line 1 column 1 (char 0)"
             finally:
                 if task_uuid_list is None:
-                    mock_logger.return_value.error.assert_called_once()
\ No newline at end of file
+                    mock_logger.return_value.error.assert_called_once()
+    def test_batch_in_flight(self, session):
+        pc_batch_op = PcBatchOp(session, resource_type="/entities", kind="test-kind", max_in_flight=4)
+        lock = threading.Lock()
+        in_flight = {"current": 0, "max": 0}
+
+        def post(uri, data, timeout):
+            with lock:
+                in_flight["current"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["current"])
+            # Later chunks complete first
+            time.sleep(0.05 / (data["api_request_list"][0] // 60 + 1))
+            with lock:
+                in_flight["current"] -= 1
+            return {"api_response_list": [{"request": request} for request in data["api_request_list"]]}
+
+        session.post.side_effect = post
+        response = pc_batch_op.batch(list(range(500)))
+        assert session.post.call_count == 9
+        assert response == [{"request": request} for request in range(500)]
+        assert 1 < in_flight["max"] <= 4
+
+    def test_batch_create_in_flight(self, session):
+        pc_batch_op = PcBatchOp(session, resource_type="/entities", kind="test-kind", max_in_flight=2)
+        session.post.side_effect = lambda uri, data, timeout: {
+            "api_response_list": [
+                {"api_response": {"status": {"execution_context": {"task_uuid": request["body"]["spec"]["name"]}}}}
+                for request in data["api_request_list"]
+            ]
+        }
+        response = pc_batch_op.batch_create([{"spec": {"name": f"uuid{i}"}} for i in range(70)])
+        assert response == [f"uuid{i}" for i in range(70)]
+        assert session.post.call_count == 2
+
+    def test_iter_batch_create(self, session):
+        pc_batch_op = PcBatchOp(session, resource_type="/entities", kind="test-kind")
+        session.post.side_effect = lambda uri, data, timeout: {
+            "api_response_list": [
+                {"api_response": {"status": {"execution_context": {"task_uuid": request["body"]["spec"]["name"]}}}}
+                for request in data["api_request_list"]
+            ]
+        }
+        chunks = pc_batch_op.iter_batch_create([{"spec": {"name": f"uuid{i}"}} for i in range(70)])
+        # The next chunk is only submitted once the Task UUIDs of the first one are consumed
+        assert next(chunks) == [f"uuid{i}" for i in range(60)]
+        assert session.post.call_count == 1
+        assert list(chunks) == [[f"uuid{i}" for i in range(60, 70)]]
+
+    def test_get_batch_options(self):
+        assert get_batch_options({}) == {}
+        assert get_batch_options({"pc_batch": {"max_in_flight": 4}}) == {"max_in_flight": 4}
+        assert get_batch_options({"pc_batch": {"max_in_flight": 4, "chunk_size": 2}}) == \
+            {"max_in_flight": 4, "chunk_size": 2}
+
+    def test_batch_chunk_failure(self, session):
+        pc_batch_op = PcBatchOp(session, resource_type="/entities", kind="test-kind", max_in_flight=2)
+        session.post.side_effect = Exception("batch failed")
+        with pytest.raises(Exception) as e:
+            pc_batch_op.batch(list(range(200)))
+        assert "batch failed" in str(e.value)
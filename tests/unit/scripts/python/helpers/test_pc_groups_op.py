@@ -129,4 +129,46 @@ class TestPcGroupsOp:
         assert result[0]["uuid"] == "mock_id_1"
         assert result[0]["name"] == "mock_value_1"
         assert result[1]["uuid"] == "mock_id_2"
-        assert result[1]["name"] == "mock_value_2"
\ No newline at end of file
+        assert result[1]["name"] == "mock_value_2"
+    def test_list_entities_pages(self, pc_groups_op, mock_session):
+        def groups_response(uri, data):
+            offset = data["group_member_offset"]
+            count = min(data["group_member_count"], 1200 - offset)
+            return {
+                "group_results": [{
+                    "entity_results": [{"entity_id": f"uuid{offset + i}", "data": []} for i in range(count)],
+                    "total_entity_count": 1200
+                }]
+            }
+
+        mock_session.post.side_effect = groups_response
+        result = pc_groups_op.list_entities(entity_type="event", attributes=["title"])
+
+        assert [entity["uuid"] for entity in result] == [f"uuid{i}" for i in range(1200)]
+        offsets = sorted(call.kwargs["data"]["group_member_offset"] for call in mock_session.post.call_args_list)
+        assert offsets == [0, 500, 1000]
+
+    def test_list_events_stream(self, pc_groups_op, mock_response):
+        pc_groups_op._PcGroupsOp__groups_post_call = MagicMock(return_value=mock_response)
+        result = pc_groups_op.list_events(1625097600000000, stream=True)
+
+        assert not isinstance(result, list)
+        assert [entity["uuid"] for entity in result] == ["mock_id_1", "mock_id_2"]
+
+    def test_list_audits_stream_pages(self, pc_groups_op, mock_session):
+        def groups_response(uri, data):
+            offset = data["group_member_offset"]
+            count = min(data["group_member_count"], 1200 - offset)
+            return {
+                "group_results": [{
+                    "entity_results": [{"entity_id": f"uuid{offset + i}", "data": []} for i in range(count)],
+                    "total_entity_count": 1200,
+                    "filtered_entity_count": 1200
+                }]
+            }
+
+        mock_session.post.side_effect = groups_response
+        result = pc_groups_op.list_audits(1625097600000000, stream=True)
+
+        assert next(result)["uuid"] == "uuid0"
+        assert [entity["uuid"] for entity in result] == [f"uuid{i}" for i in range(1, 1200)]
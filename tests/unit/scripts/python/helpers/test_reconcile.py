@@ -0,0 +1,84 @@
+from framework.scripts.python.helpers.reconcile import Change, Reconciler, get_differences, get_entity_state, \
+    get_spec_differences
+
+
+class Model:
+    """v4 SDK model"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def to_dict(self):
+        return dict(self.kwargs)
+
+
+class TestGetDifferences:
+    def test_subset(self):
+        desired = {"name": "ag", "description": None, "ip_address_block_list": [{"ip": "10.0.0.0", "prefix_length": 24}]}
+        current = {"name": "ag", "uuid": "1", "ip_address_block_list": [{"ip": "10.0.0.0", "prefix_length": 24}]}
+        # Unset desired fields & fields only set by PC are ignored
+        assert get_differences(desired, current) == []
+        current["ip_address_block_list"][0]["prefix_length"] = 16
+        assert get_differences(desired, current) == ["ip_address_block_list"]
+        assert get_differences({"description": "web"}, current) == ["description"]
+
+    def test_list_order(self):
+        desired = {"service_list": [{"protocol": "TCP"}, {"protocol": "UDP"}]}
+        assert get_differences(desired, {"service_list": [{"protocol": "UDP"}, {"protocol": "TCP"}]}) == []
+        assert get_differences(desired, {"service_list": [{"protocol": "UDP"}]}) == ["service_list"]
+
+    def test_spec_differences(self):
+        desired = {"api_version": "3.1.0", "metadata": {"kind": "recovery_plan"}, "spec": {"name": "rp",
+                                                                                           "description": "dr"}}
+        current = {"api_version": "3.1", "spec": {"name": "rp", "description": "old"}, "status": {}}
+        assert get_spec_differences(desired, current) == ["spec.description"]
+
+
+class TestReconciler:
+    def test_plan(self, mocker):
+        load_current = mocker.MagicMock(return_value=[
+            {"address_group": {"name": "ag-1", "description": "web"}, "uuid": "1"},
+            {"address_group": {"name": "ag-2", "description": "db"}, "uuid": "2"},
+            {"address_group": {"name": "ag-3"}, "uuid": "3"},
+        ])
+        reconciler = Reconciler("Address groups", load_current,
+                                get_state=lambda entity: get_entity_state(entity, "address_group"), prune=True)
+        plan = reconciler.plan({"ag-1": {"name": "ag-1", "description": "web"},
+                                "ag-2": {"name": "ag-2", "description": "app"},
+                                "ag-4": {"name": "ag-4"}})
+
+        assert plan.summary() == {"NO_OP": ["ag-1"], "UPDATE": ["ag-2"], "CREATE": ["ag-4"], "DELETE": ["ag-3"]}
+        assert plan.updates[0].differences == ["description"]
+        assert plan.creates[0].desired == {"name": "ag-4"}
+        assert not plan.is_converged
+        # Listed once, the verification is served from the snapshot
+        assert reconciler.exists("ag-1") and not reconciler.exists("ag-4")
+        load_current.assert_called_once()
+        reconciler.exists("ag-4", refresh=True)
+        assert load_current.call_count == 2
+
+    def test_converged(self):
+        reconciler = Reconciler("Service groups", lambda: [Model(name="sg-1", ext_id="1", description=None,
+                                                                 service_list=[{"protocol": "TCP"}])])
+        plan = reconciler.plan({"sg-1": Model(name="sg-1", service_list=[{"protocol": "TCP"}])})
+        assert plan.is_converged
+        assert plan.get_changes(Change.NO_OP)[0].current["ext_id"] == "1"
+
+    def test_custom_compare(self):
+        def get_missing_values(desired, current):
+            return [value for value in desired["values"] if value not in current["values"]]
+
+        reconciler = Reconciler("Categories", lambda: [{"name": "Env", "values": ["prod", "dev", "qa"]}],
+                                compare=get_missing_values)
+        plan = reconciler.plan({"Env": {"values": ["prod", "stage"]}})
+        assert (plan.updates[0].name, plan.updates[0].differences) == ("Env", ["stage"])
+
+    def test_fingerprint(self):
+        categories = [{"name": "Env", "values": ["prod"]}, {"name": "App", "values": ["web"]}]
+        reconciler = Reconciler("Categories", lambda: categories)
+        fingerprint = reconciler.get_fingerprint(["Env"])
+        # Only the configured entities are part of the fingerprint
+        categories.append({"name": "Owner", "values": ["ops"]})
+        assert reconciler.get_fingerprint(["Env"], refresh=True) == fingerprint
+        categories[0]["values"].append("dev")
+        assert reconciler.get_fingerprint(["Env"], refresh=True) != fingerprint
@@ -0,0 +1,139 @@
+import pytest
+from unittest.mock import MagicMock
+from framework.helpers.log_utils import get_logger
+from framework.scripts.python.helpers.batch_script import BatchScript
+from framework.scripts.python.helpers.section_state import SectionStateStore, get_hash, get_section_inputs
+from framework.scripts.python.helpers.v1.cluster import Cluster
+from framework.scripts.python.helpers.workflow_script import WorkflowScript
+from framework.scripts.python.pe.create.add_ntp_server_pe import AddNtpServersPe
+from framework.scripts.python.script import Script
+
+
+class NtpScript(Script):
+    SECTION_KEYS = ["ntp_servers_list"]
+
+    def __init__(self, data, fingerprint=None, status="PASS", **kwargs):
+        self.data = data
+        self.fingerprint = fingerprint
+        self.status = status
+        self.runs = 0
+        super(NtpScript, self).__init__(**kwargs)
+        self.logger = get_logger(__name__)
+
+    def execute(self, **kwargs):
+        self.runs += 1
+
+    def verify(self, **kwargs):
+        self.results["Add_NTP_servers"] = self.status
+
+    def get_remote_fingerprint(self):
+        return self.fingerprint
+
+
+@pytest.fixture
+def store(tmp_path):
+    SectionStateStore.clear()
+    yield SectionStateStore.get_instance(str(tmp_path / "sections.db"))
+    SectionStateStore.clear()
+
+
+class TestSectionStateStore:
+    def test_skip_unchanged(self, store):
+        data = {"ntp_servers_list": ["0.pool.ntp.org"]}
+        script = NtpScript(data, fingerprint="a")
+        assert store.run(script, "10.0.0.1") == {"Add_NTP_servers": "PASS"}
+
+        # Same config & remote state, the recorded results are returned
+        rerun = NtpScript(data, fingerprint="a")
+        assert store.run(rerun, "10.0.0.1") == {"Add_NTP_servers": "PASS"}
+        assert rerun.runs == 0
+        # Recorded per endpoint
+        other = NtpScript(data, fingerprint="a")
+        store.run(other, "10.0.0.2")
+        assert other.runs == 1
+        assert store.get_metrics() == {"skipped": 1, "applied": 2, "failed": 0}
+
+    def test_changes(self, store):
+        data = {"ntp_servers_list": ["0.pool.ntp.org"]}
+        store.run(NtpScript(data, fingerprint="a"), "10.0.0.1")
+
+        # Remote state changed outside of the config
+        drifted = NtpScript(data, fingerprint="b")
+        store.run(drifted, "10.0.0.1")
+        assert drifted.runs == 1
+
+        # Config changed
+        changed = NtpScript({"ntp_servers_list": ["1.pool.ntp.org"]}, fingerprint="b")
+        store.run(changed, "10.0.0.1")
+        assert changed.runs == 1
+
+    def test_failed_run(self, store):
+        data = {"ntp_servers_list": ["0.pool.ntp.org"]}
+        store.run(NtpScript(data, fingerprint="a", status="FAIL"), "10.0.0.1")
+        assert store.get_record("10.0.0.1", "NtpScript")["outcome"] == SectionStateStore.FAILED
+        retry = NtpScript(data, fingerprint="a")
+        store.run(retry, "10.0.0.1")
+        assert retry.runs == 1
+
+    def test_without_fingerprint(self, store):
+        data = {"ntp_servers_list": ["0.pool.ntp.org"]}
+        store.run(NtpScript(data), "10.0.0.1")
+        # The remote state can't be checked, the section is applied again
+        rerun = NtpScript(data)
+        store.run(rerun, "10.0.0.1")
+        assert rerun.runs == 1
+        assert store.get_metrics() == {"skipped": 0, "applied": 2, "failed": 0}
+
+    def test_cluster_fingerprint(self, store, mocker):
+        mock_add = mocker.patch.object(Cluster, "add_ntp_servers", return_value={"value": True})
+        mock_get = mocker.patch.object(Cluster, "get_ntp_servers", return_value=["0.pool.ntp.org"])
+        data = {"clusters": {"10.0.0.1": {"ntp_servers_list": ["0.pool.ntp.org"], "pe_session": MagicMock(),
+                                          "cluster_info": {}}}}
+        for _ in range(2):
+            results = store.run(AddNtpServersPe(data, parallel=False), "10.0.0.1")
+        assert results["clusters"]["10.0.0.1"] == {"NtpServers": {"0.pool.ntp.org": "PASS"}}
+        assert mock_add.call_count == 1
+
+        # The NTP servers of the cluster changed outside of the config
+        mock_get.return_value = ["0.pool.ntp.org", "1.pool.ntp.org"]
+        store.run(AddNtpServersPe(data, parallel=False), "10.0.0.1")
+        assert mock_add.call_count == 2
+
+    def test_without_section(self, store):
+        script = NtpScript({"ntp_servers_list": []})
+        script.SECTION_KEYS = []
+        store.run(script, "10.0.0.1")
+        store.run(script, "10.0.0.1")
+        assert script.runs == 2
+        assert store.get_record("10.0.0.1", "NtpScript") is None
+
+    def test_from_config(self, tmp_path):
+        assert SectionStateStore.from_config({}) is None
+        store = SectionStateStore.from_config({"project_root": str(tmp_path)},
+                                              global_data={"section_state": {"path": "state.db"}})
+        assert store.path == str(tmp_path / "state.db")
+        assert SectionStateStore.from_config({"section_state": {"path": str(tmp_path / "state.db")}}) is store
+        SectionStateStore.clear()
+
+
+class TestSectionInputs:
+    def test_inputs(self):
+        data = {"ntp_servers_list": ["a"], "clusters": {"10.0.0.1": {"ntp_servers_list": ["b"], "name": "c1"}}}
+        inputs = get_section_inputs(NtpScript(data))
+        assert inputs == {"script": "NtpScript", "section": {"ntp_servers_list": ["a"]},
+                          "clusters": {"10.0.0.1": {"ntp_servers_list": ["b"]}}}
+        assert get_hash({"a": 1, "b": [1, 2]}) == get_hash({"b": [1, 2], "a": 1})
+
+    def test_batch_script(self, store):
+        data = {"ntp_servers_list": ["0.pool.ntp.org"]}
+        for _ in range(2):
+            batch = BatchScript(state_store=store, endpoint="10.0.0.1")
+            batch.add(NtpScript(data, fingerprint="a"))
+            batch.run()
+        assert batch.script_list[0].runs == 0
+
+        workflow = WorkflowScript(state_store=store)
+        script = NtpScript(data, fingerprint="a")
+        workflow.add(script, endpoint="10.0.0.1")
+        assert workflow.run() == {"Add_NTP_servers": "PASS"}
+        assert script.runs == 0
@@ -1,7 +1,10 @@
+import os
+import time
 import pytest
 import paramiko
 from unittest.mock import MagicMock, Mock
 from framework.scripts.python.helpers.ssh_entity import SSHEntity
+from framework.scripts.python.helpers.ssh_pool import SSHConnectionPool
 from framework.helpers.log_utils import get_logger
 
 logger = get_logger(__name__)
@@ -13,10 +16,12 @@ class TestSSHEntity:
         self.username = "test_username"
         self.password = "test_password"
         self.logger = MagicMock()
-        return SSHEntity(
+        SSHConnectionPool.clear()
+        yield SSHEntity(
             ip=self.ip, username=self.username,
             password=self.password
         )
+        SSHConnectionPool.clear()
 
     def test_ssh_entity_init(self, ssh_entity):
         assert ssh_entity.ip == self.ip
@@ -39,7 +44,12 @@ class TestSSHEntity:
         mock_ssh.connect.assert_called_once_with(
             ssh_entity.ip, username=ssh_entity.username, password=ssh_entity.password)
         assert connection == mock_ssh
-        
+
+        # The connection is reused while its transport is active
+        assert ssh_entity.get_ssh_connection(ssh_entity.ip, ssh_entity.username, ssh_entity.password) == mock_ssh
+        mock_ssh_client.assert_called_once()
+        mock_ssh.get_transport.return_value.is_active.return_value = False
+
         # Test AuthenticationException
         mock_ssh_client.side_effect = [paramiko.ssh_exception.AuthenticationException("Authentication failed")]
         ssh_entity.get_ssh_connection(
@@ -65,35 +75,76 @@ class TestSSHEntity:
     def test_execute_command(self, mocker, ssh_entity):
         mock_ssh = MagicMock()
         mock_stdout = MagicMock()
-        mock_stderr = MagicMock()
         mock_channel = MagicMock()
-        
-        # Set up channel closed attribute to eventually stop the loop
-        def close_channel():
-            mock_channel.closed = True
-            return False
-        
-        # To simulate select.select behavior
-        def mock_select(rlist, wlist, xlist, timeout):
-            if mock_channel in rlist:
-                return ([mock_channel], [], [])
-            return ([], [], [])
-        
-        mock_ssh.exec_command.return_value = (Mock(), mock_stdout, mock_stderr)
+
+        mock_ssh.exec_command.return_value = (Mock(), mock_stdout, MagicMock())
         mock_stdout.channel = mock_channel
-        mock_stderr.channel = mock_channel
-        mock_channel.recv_ready.side_effect = [True, False, close_channel()]
-        mock_channel.recv.side_effect = [b'output', b'']
-        mock_channel.recv_stderr_ready.side_effect = [True, False]
+        mock_channel.closed = True
+        mock_channel.recv_ready.side_effect = [True, False, False]
+        mock_channel.recv.return_value = b'output'
+        mock_channel.recv_stderr_ready.side_effect = [True, False, False]
         mock_channel.recv_stderr.return_value = b'error'
-        mock_channel.fileno.return_value = 1
-
-        mocker.patch('select.select', side_effect=mock_select)
 
         stdout, stderr = ssh_entity.execute_command(mock_ssh, "ls")
 
         assert stdout == "output"
         assert stderr == "error"
+        mock_channel.shutdown_write.assert_called_once()
+        mock_channel.close.assert_called_once()
+
+    def test_execute_command_timeout(self, ssh_entity):
+        mock_ssh = MagicMock()
+        mock_stdout = MagicMock()
+        mock_channel = MagicMock()
+        mock_ssh.exec_command.return_value = (Mock(), mock_stdout, MagicMock())
+        mock_stdout.channel = mock_channel
+        mock_channel.closed = False
+        mock_channel.recv_ready.return_value = False
+        mock_channel.recv_stderr_ready.return_value = False
+        mock_channel.exit_status_ready.return_value = False
+        read_fd, write_fd = os.pipe()
+        mock_channel.fileno.return_value = read_fd
+
+        # No output for the idle timeout
+        with pytest.raises(TimeoutError, match="No output from command 'sleep 60' for 0.1 secs"):
+            ssh_entity.execute_command(mock_ssh, "sleep 60", idle_timeout=0.1)
+        mock_channel.close.assert_called_once()
+        os.close(read_fd)
+        os.close(write_fd)
+
+    def test_execute_command_waits_for_exit(self, mocker, ssh_entity):
+        mocker.patch("framework.scripts.python.helpers.ssh_stream.SSHCommandLoop.POLL_INTERVAL_IN_SEC", 0.05)
+        mock_ssh = MagicMock()
+        mock_stdout = MagicMock()
+        mock_channel = MagicMock()
+        mock_ssh.exec_command.return_value = (Mock(), mock_stdout, MagicMock())
+        mock_stdout.channel = mock_channel
+        mock_channel.closed = False
+        mock_channel.recv_ready.return_value = False
+        mock_channel.recv_stderr_ready.return_value = False
+        # Silent for longer than the timeout before exiting
+        exit_time = time.time() + 0.3
+        mock_channel.exit_status_ready.side_effect = lambda: time.time() >= exit_time
+        read_fd, write_fd = os.pipe()
+        mock_channel.fileno.return_value = read_fd
+
+        assert ssh_entity.execute_command(mock_ssh, "sleep 0.3", timeout=0.1) == ("", "")
+        os.close(read_fd)
+        os.close(write_fd)
+
+    def test_stream_command(self, ssh_entity):
+        mock_ssh = MagicMock()
+        mock_stdout = MagicMock()
+        mock_channel = MagicMock()
+        mock_ssh.exec_command.return_value = (Mock(), mock_stdout, MagicMock())
+        mock_stdout.channel = mock_channel
+        mock_channel.closed = True
+        mock_channel.recv_ready.side_effect = [True, True, False, False]
+        mock_channel.recv.side_effect = [b'Uploading\r\n50', b'%\r\nCompleted']
+        mock_channel.recv_stderr_ready.return_value = False
+
+        assert list(ssh_entity.stream_command(mock_ssh, "ncli software upload")) == \
+            ["Uploading", "50%", "Completed"]
 
     def test_get_interactive_shell(self, mocker, ssh_entity):
         mock_ssh = MagicMock()
@@ -115,6 +166,7 @@ class TestSSHEntity:
         mock_channel = MagicMock()
         mock_channel.recv_ready.side_effect = [True, False]
         mock_channel.recv.return_value = b'pattern'
+        mock_channel.recv_stderr_ready.return_value = False
 
         response = ssh_entity.execute_on_interactive_channel(mock_channel, "command", "pattern")
 
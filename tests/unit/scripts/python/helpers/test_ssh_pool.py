@@ -0,0 +1,111 @@
+import threading
+import time
+import paramiko
+import pytest
+from unittest.mock import MagicMock
+from framework.scripts.python.helpers.ssh_entity import SSHEntity
+from framework.scripts.python.helpers.ssh_pool import SSHConnectionPool
+
+
+class TestSSHConnectionPool:
+    @pytest.fixture
+    def mock_ssh_client(self, mocker):
+        SSHConnectionPool.clear()
+        yield mocker.patch.object(paramiko, "SSHClient", side_effect=lambda: MagicMock())
+        SSHConnectionPool.clear()
+
+    def test_get_client(self, mock_ssh_client):
+        pool = SSHConnectionPool(keepalive=10)
+        client = pool.get_client("10.0.0.1", "nutanix", "password")
+        client.connect.assert_called_once_with("10.0.0.1", username="nutanix", password="password")
+        client.get_transport.return_value.set_keepalive.assert_called_once_with(10)
+        # One transport per (host, username, password)
+        assert pool.get_client("10.0.0.1", "nutanix", "password") is client
+        assert pool.get_client("10.0.0.1", "admin", "password") is not client
+        assert pool.get_client("10.0.0.2", "nutanix", "password") is not client
+        assert pool.get_metrics()["connects"] == 3
+        assert pool.get_metrics()["reuses"] == 1
+
+    def test_other_password_is_not_reused(self, mock_ssh_client):
+        pool = SSHConnectionPool()
+        client = pool.get_client("10.0.0.1", "nutanix", "password")
+        other_client = pool.get_client("10.0.0.1", "nutanix", "other-password")
+        assert other_client is not client
+        other_client.connect.assert_called_once_with("10.0.0.1", username="nutanix", password="other-password")
+        assert pool.get_client("10.0.0.1", "nutanix", "password") is client
+        # The passwords are not kept in the pool
+        assert all("password" not in part for key in pool.connections for part in key[1:])
+
+    def test_dead_transport_is_replaced(self, mock_ssh_client):
+        pool = SSHConnectionPool()
+        client = pool.get_client("10.0.0.1", "nutanix", "password")
+        client.get_transport.return_value.is_active.return_value = False
+        new_client = pool.get_client("10.0.0.1", "nutanix", "password")
+        assert new_client is not client
+        client.close.assert_called_once()
+        assert pool.get_metrics()["reconnects"] == 1
+
+    def test_concurrent_get_client_connects_once(self, mock_ssh_client):
+        pool = SSHConnectionPool()
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(pool.get_client("10.0.0.1", "nutanix", "password")))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert mock_ssh_client.call_count == 1
+        assert len({id(client) for client in clients}) == 1
+
+    def test_idle_connection_is_closed(self, mock_ssh_client):
+        pool = SSHConnectionPool(idle_timeout=0.05)
+        client = pool.get_client("10.0.0.1", "nutanix", "password")
+        with pool.channel(client):
+            time.sleep(0.1)
+            # A client running a command is not idle
+            pool.get_client("10.0.0.2", "nutanix", "password")
+            client.close.assert_not_called()
+        time.sleep(0.1)
+        pool.get_client("10.0.0.2", "nutanix", "password")
+        client.close.assert_called_once()
+        assert pool.get_metrics()["evictions"] == 2
+
+    def test_release(self, mock_ssh_client):
+        pool = SSHConnectionPool()
+        client = pool.get_client("10.0.0.1", "nutanix", "password")
+        assert pool.release(client)
+        client.close.assert_not_called()
+        assert not pool.release(MagicMock())
+        pool.close_all()
+        client.close.assert_called_once()
+        assert pool.get_metrics()["connections"] == 0
+
+    def test_concurrent_commands(self, mock_ssh_client, mocker):
+        SSHConnectionPool.configure(max_channels_per_host=2)
+        ssh_entity = SSHEntity("10.0.0.1", "nutanix", "password")
+        client = ssh_entity.get_ssh_connection(ssh_entity.ip, ssh_entity.username, ssh_entity.password)
+        running, max_running, lock = [0], [0], threading.Lock()
+
+        def execute_command(ssh_obj, command, timeout, idle_timeout):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return command, ""
+
+        mocker.patch.object(SSHEntity, "_SSHEntity__execute_command", side_effect=execute_command)
+        commands = [f"command-{index}" for index in range(6)]
+        results = {}
+        threads = [threading.Thread(target=lambda command=command: results.update(
+            {command: ssh_entity.execute_command(client, command)})) for command in commands]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == {command: (command, "") for command in commands}
+        # Concurrent commands on the channels of one transport, at most max_channels_per_host at a time
+        assert 1 < max_running[0] <= 2
+        assert mock_ssh_client.call_count == 1
+        assert SSHConnectionPool.get_instance().get_metrics()["channels"] == 6
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from typing import List, Optional
+from framework.scripts.python.helpers.ssh_stream import ChannelSession, OutputBuffer, SSHCommandLoop
+
+
+class FakeChannel:
+    """paramiko Channel, the data is fed by the test, select wakes up on its fileno"""
+
+    def __init__(self, stdout: Optional[List[bytes]] = None, stderr: Optional[List[bytes]] = None,
+                 exit_status: Optional[int] = None):
+        self.stdout = list(stdout or [])
+        self.stderr = list(stderr or [])
+        self.exit_status = exit_status
+        self.closed = False
+        self.lock = threading.Lock()
+        self.read_fd, self.write_fd = os.pipe()
+        self.recv_calls = 0
+
+    def feed(self, data: bytes, exit_status: Optional[int] = None):
+        with self.lock:
+            self.stdout.append(data)
+            self.exit_status = exit_status
+        os.write(self.write_fd, b"x")
+
+    def fileno(self):
+        return self.read_fd
+
+    def recv_ready(self):
+        with self.lock:
+            return bool(self.stdout)
+
+    def recv_stderr_ready(self):
+        with self.lock:
+            return bool(self.stderr)
+
+    def recv(self, size):
+        self.recv_calls += 1
+        with self.lock:
+            data = self.stdout.pop(0)
+            if not self.stdout:
+                # Same as paramiko, the fileno is not readable once the buffer is empty
+                os.set_blocking(self.read_fd, False)
+                try:
+                    os.read(self.read_fd, 1024)
+                except BlockingIOError:
+                    pass
+            return data
+
+    def recv_stderr(self, size):
+        with self.lock:
+            return self.stderr.pop(0)
+
+    def exit_status_ready(self):
+        return self.exit_status is not None
+
+    def close(self):
+        self.closed = True
+
+
+class TestOutputBuffer:
+    def test_feed(self):
+        buffer = OutputBuffer()
+        assert buffer.feed(b"line 1\r\nline") == ("line 1\r\nline", ["line 1"])
+        # Multibyte character split across two reads
+        euro = "€".encode()
+        assert buffer.feed(b" 2 " + euro[:1]) == (" 2 ", [])
+        assert buffer.feed(euro[1:] + b"\nline 3") == ("€\nline 3", ["line 2 €"])
+        assert buffer.flush() == ["line 3"]
+        assert buffer.getvalue() == "line 1\r\nline 2 €\nline 3"
+
+    def test_max_bytes(self):
+        buffer = OutputBuffer(max_bytes=4)
+        buffer.feed(b"abc")
+        buffer.feed(b"def")
+        assert buffer.getvalue() == "cdef"
+        assert buffer.truncated_bytes == 2
+
+
+class TestSSHCommandLoop:
+    def test_command_output(self):
+        channel = FakeChannel([b"out", b"put\nsecond"], [b"error"], exit_status=0)
+        lines = []
+        loop = SSHCommandLoop()
+        session = loop.add("cvm", channel, on_line=lines.append)
+        assert list(loop.iter_lines()) == [("cvm", "output"), ("cvm", "second")]
+        assert session.state == ChannelSession.EXITED
+        assert (session.stdout, session.stderr) == ("output\nsecond", "error")
+        assert lines == ["output", "second"]
+
+    def test_pattern_split_across_reads(self):
+        channel = FakeChannel([b"Genesis sta", b"rted on pids [1]"])
+        loop = SSHCommandLoop()
+        session = loop.add("cvm", channel, pattern="Genesis started on pids", timeout=5)
+        loop.run()
+        assert session.state == ChannelSession.MATCHED
+
+    def test_pattern_count(self):
+        channel = FakeChannel([b"updated\nupdated\n"])
+        loop = SSHCommandLoop()
+        session = loop.add("cvm", channel, pattern="updated", count=3, timeout=0.2)
+
+        def feed():
+            time.sleep(0.05)
+            channel.feed(b"updated\n")
+
+        threading.Thread(target=feed).start()
+        start_time = time.time()
+        loop.run()
+        assert session.state == ChannelSession.MATCHED
+        # Woken up by the output, not by the timeout
+        assert time.time() - start_time < 0.2
+
+    def test_timeout(self):
+        channel = FakeChannel([b"no match"])
+        loop = SSHCommandLoop()
+        session = loop.add("cvm", channel, pattern="Genesis started on pids", timeout=0.1)
+        start_time = time.time()
+        loop.run()
+        assert session.state == ChannelSession.TIMED_OUT
+        assert 0.1 <= time.time() - start_time < 1
+        # Sleeps in select instead of polling the channel
+        assert channel.recv_calls == 1
+
+    def test_many_sessions(self):
+        loop = SSHCommandLoop()
+        channels = {f"cvm-{index}": FakeChannel() for index in range(20)}
+        for key, channel in channels.items():
+            loop.add(key, channel, until_output=True, timeout=5)
+
+        def feed():
+            for key, channel in channels.items():
+                channel.feed(f"{key} stopped\n".encode())
+
+        threading.Thread(target=feed).start()
+        lines = sorted(loop.iter_lines())
+        assert lines == sorted((key, f"{key} stopped") for key in channels)
+        assert all(session.state == ChannelSession.MATCHED for session in loop.sessions.values())
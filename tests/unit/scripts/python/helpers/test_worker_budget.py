@@ -0,0 +1,120 @@
+import threading
+import time
+import pytest
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
+
+
+class ConcurrencyCounter:
+    """
+    Records the maximum number of calls running at a time
+    """
+
+    def __init__(self, duration=0.02):
+        self.duration = duration
+        self.lock = threading.Lock()
+        self.current = 0
+        self.max = 0
+
+    def __call__(self, *args):
+        with self.lock:
+            self.current += 1
+            self.max = max(self.max, self.current)
+        time.sleep(self.duration)
+        with self.lock:
+            self.current -= 1
+        return args
+
+
+class TestWorkerBudget:
+    """
+    Test class for the WorkerBudget class.
+    """
+
+    def test_results_in_order(self):
+        budget = WorkerBudget(max_workers=4)
+        assert budget.map(lambda x, y: x * y, range(10), range(10)) == [x * x for x in range(10)]
+        assert budget.map(lambda x: x, []) == []
+
+    def test_global_budget(self):
+        budget = WorkerBudget(max_workers=3)
+        counter = ConcurrencyCounter()
+        budget.map(counter, range(20))
+        # The caller and the 3 helpers of the budget
+        assert counter.max == 4
+        assert budget.get_metrics()["free_workers"] == 3
+
+    def test_map_max_workers(self):
+        budget = WorkerBudget(max_workers=8)
+        counter = ConcurrencyCounter()
+        budget.map(counter, range(20), max_workers=2)
+        assert counter.max == 2
+
+    def test_nested_maps_do_not_deadlock(self):
+        budget = WorkerBudget(max_workers=2)
+        counter = ConcurrencyCounter(duration=0.01)
+
+        def outer(i):
+            return sum(len(result) for result in budget.map(counter, range(5)))
+
+        assert budget.map(outer, range(6)) == [5] * 6
+        # Threads are never more than the caller and the budget
+        assert counter.max <= 3
+        assert budget.get_metrics()["helpers_denied"] > 0
+
+    def test_max_per_host(self):
+        budget = WorkerBudget(max_workers=8, max_per_host=2)
+        counter = ConcurrencyCounter()
+        hosts = ["1.1.1.1"] * 6
+        budget.map(counter, hosts, host=lambda ip: ip)
+        assert counter.max == 2
+        assert budget.get_metrics()["host_wait_secs"] > 0
+
+    def test_nested_same_host_takes_one_slot(self):
+        budget = WorkerBudget(max_workers=4, max_per_host=1)
+
+        def outer(ip):
+            return budget.map(lambda x: x, [ip, ip], host=lambda x: x)
+
+        assert budget.map(outer, ["1.1.1.1"], host=lambda ip: ip) == [["1.1.1.1", "1.1.1.1"]]
+
+    def test_exceptions(self):
+        budget = WorkerBudget(max_workers=4)
+
+        def func(i):
+            if i in (3, 5):
+                raise Exception(f"failed {i}")
+            return i
+
+        with pytest.raises(Exception) as e:
+            budget.map(func, range(8))
+        assert str(e.value) == "failed 3"
+        results = budget.map(func, range(8), return_exceptions=True)
+        assert isinstance(results[5], Exception)
+        assert results[:3] == [0, 1, 2]
+        # Every item is run even if some fail
+        assert budget.get_metrics()["items"] == 16
+
+    def test_metrics(self):
+        budget = WorkerBudget(max_workers=1)
+        budget.map(ConcurrencyCounter(), range(4))
+        metrics = budget.get_metrics()
+        assert metrics["maps"] == 1
+        assert metrics["max_queued"] == 4
+        assert metrics["queued"] == 0
+        assert metrics["max_queue_wait_secs"] > 0
+
+    def test_configure(self):
+        budget = WorkerBudget.configure(max_workers=5)
+        assert WorkerBudget.get_instance() is budget
+        assert budget.max_workers == 5
+
+    def test_submit(self):
+        budget = WorkerBudget(max_workers=1)
+        counter = ConcurrencyCounter(duration=0.05)
+        future = budget.submit(counter, 1, host="1.1.1.1")
+        # The only helper is busy
+        assert budget.submit(counter, 2) is None
+        assert future.result() == (1,)
+        assert budget.submit(counter, 3).result() == (3,)
+        metrics = budget.get_metrics()
+        assert (metrics["helpers"], metrics["helpers_denied"], metrics["free_workers"]) == (2, 1, 1)
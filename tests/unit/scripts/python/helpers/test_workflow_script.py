@@ -0,0 +1,203 @@
+import threading
+import time
+import pytest
+from framework.scripts.python.helpers.worker_budget import WorkerBudget
+from framework.scripts.python.helpers.workflow_script import WorkflowScript
+from framework.scripts.python.script import Script
+
+
+class RecordingScript(Script):
+    """
+    Script that records when it runs
+    """
+
+    def __init__(self, name, events, duration=0.0, result=None, fail=False):
+        super(RecordingScript, self).__init__()
+        self.name = name
+        self.events = events
+        self.duration = duration
+        self.result = result
+        self.fail = fail
+
+    def run(self, **kwargs):
+        self.events.append(("start", self.name))
+        time.sleep(self.duration)
+        self.events.append(("end", self.name))
+        if self.fail:
+            raise Exception(f"{self.name} failed")
+        return self.result
+
+    def execute(self, **kwargs):
+        pass
+
+    def verify(self, **kwargs):
+        pass
+
+
+class DependantScript(RecordingScript):
+    DEPENDS_ON = ["first"]
+
+
+def index(events, event, name):
+    return events.index((event, name))
+
+
+class TestWorkflowScript:
+    """
+    Test class for the WorkflowScript class.
+    """
+
+    def test_depends_on(self):
+        events = []
+        workflow = WorkflowScript(max_workers=4)
+        first = workflow.add(RecordingScript("first", events, duration=0.05))
+        workflow.add(RecordingScript("second", events), depends_on=[first])
+        workflow.add(RecordingScript("independent", events))
+        workflow.run()
+        assert index(events, "end", "first") < index(events, "start", "second")
+        assert index(events, "start", "independent") < index(events, "end", "first")
+
+    def test_declared_dependency_in_scope(self):
+        events = []
+        workflow = WorkflowScript(max_workers=4)
+        workflow.add(RecordingScript("first", events, duration=0.05), scope="cluster1")
+        workflow.add(DependantScript("dependant", events), scope="cluster1")
+        workflow.add(RecordingScript("first", events), scope="cluster2")
+        workflow.run()
+        assert workflow.nodes["cluster1/dependant"].prerequisites == {"cluster1/first"}
+        assert index(events, "end", "first") < index(events, "start", "dependant")
+
+    def test_missing_dependency_is_ignored(self):
+        events = []
+        workflow = WorkflowScript()
+        workflow.add(DependantScript("dependant", events))
+        workflow.run()
+        assert ("end", "dependant") in events
+
+    def test_resources(self):
+        events = []
+        workflow = WorkflowScript(max_workers=4)
+        workflow.add(RecordingScript("site1", events, duration=0.02), provides=["clusters"])
+        workflow.add(RecordingScript("site2", events, duration=0.05), provides=["clusters"])
+        workflow.add(RecordingScript("pc", events), requires=["clusters"])
+        workflow.run()
+        assert index(events, "end", "site2") < index(events, "start", "pc")
+        assert workflow.nodes["pc"].prerequisites == {"site1", "site2"}
+
+    def test_cycle(self):
+        workflow = WorkflowScript()
+        workflow.add(RecordingScript("a", []), depends_on=["b"])
+        workflow.add(RecordingScript("b", []), depends_on=["a"])
+        with pytest.raises(Exception) as e:
+            workflow.run()
+        assert "Cyclic dependency" in str(e.value)
+
+    def test_duplicate_name(self):
+        workflow = WorkflowScript()
+        workflow.add(RecordingScript("a", []))
+        with pytest.raises(Exception):
+            workflow.add(RecordingScript("a", []))
+
+    def test_critical_path_first(self):
+        events = []
+        workflow = WorkflowScript(max_workers=1)
+        workflow.add(RecordingScript("short", events))
+        head = workflow.add(RecordingScript("head", events))
+        middle = workflow.add(RecordingScript("middle", events), depends_on=[head])
+        workflow.add(RecordingScript("tail", events), depends_on=[middle])
+        workflow.run()
+        assert workflow.nodes["head"].priority == 3
+        assert events[0] == ("start", "head")
+
+    def test_max_per_endpoint(self):
+        lock = threading.Lock()
+        usage = {"current": 0, "max": 0}
+
+        class EndpointScript(RecordingScript):
+            def run(self, **kwargs):
+                with lock:
+                    usage["current"] += 1
+                    usage["max"] = max(usage["max"], usage["current"])
+                time.sleep(0.02)
+                with lock:
+                    usage["current"] -= 1
+
+        workflow = WorkflowScript(max_workers=8, max_per_endpoint=2)
+        workflow.add_all([EndpointScript(f"script{i}", []) for i in range(6)], endpoint="1.1.1.1")
+        workflow.add(EndpointScript("other", []), endpoint="2.2.2.2")
+        workflow.run()
+        assert usage["max"] == 3
+        assert all(node.status == "COMPLETED" for node in workflow.nodes.values())
+
+    def test_results_and_failures(self):
+        events = []
+        workflow = WorkflowScript(results_key="pod")
+        failed = workflow.add(RecordingScript("failed", events, fail=True))
+        workflow.add(RecordingScript("site", events, result={"site": {"clusters": {}}}), depends_on=[failed],
+                     results_path=["block"])
+        workflow.add(RecordingScript("pc", events, result={"pc": "PASS"}), results_path=["block"])
+        assert workflow.run() == {"pod": {"block": {"site": {"clusters": {}}, "pc": "PASS"}}}
+        assert workflow.nodes["failed"].status == "FAILED"
+
+    def test_script_exceptions(self):
+        class ErrorScript(RecordingScript):
+            def run(self, **kwargs):
+                # Script.run catches the errors of execute in the exceptions and returns normally
+                self.exceptions.append(f"{self.name} failed")
+                return super(ErrorScript, self).run(**kwargs)
+
+        workflow = WorkflowScript()
+        workflow.add(ErrorScript("pc", []), group="block1")
+        workflow.add(RecordingScript("site", []), group="block1")
+        workflow.run()
+        assert workflow.nodes["pc"].status == "FAILED"
+        assert workflow.nodes["site"].status == "COMPLETED"
+        assert workflow.get_group_report()["block1"]["failed"] == ["pc"]
+
+    def test_timings(self):
+        workflow = WorkflowScript()
+        workflow.add(RecordingScript("a", [], duration=0.02))
+        workflow.run()
+        timing = workflow.get_timings()[0]
+        assert timing["name"] == "a"
+        assert timing["status"] == "COMPLETED"
+        assert timing["duration"] >= 0.02
+
+    def test_max_active_groups(self):
+        events = []
+        workflow = WorkflowScript(max_workers=8, max_active_groups=1)
+        for block in ["block1", "block2"]:
+            first = workflow.add(RecordingScript(f"{block}-site", events, duration=0.02), scope=block, group=block)
+            workflow.add(RecordingScript(f"{block}-pc", events, duration=0.02), scope=block, depends_on=[first],
+                         group=block)
+        workflow.run()
+        started = [name for event, name in events if event == "start"]
+        # The second block starts only once the first one is complete
+        assert started[0].split("-")[0] == started[1].split("-")[0]
+        first_block = started[0].split("-")[0]
+        assert index(events, "end", f"{first_block}-pc") < index(events, "start", started[2])
+
+    def test_group_report(self):
+        workflow = WorkflowScript()
+        workflow.add(RecordingScript("site", [], duration=0.02), group="block1")
+        workflow.add(RecordingScript("pc", [], fail=True), group="block1")
+        workflow.add(RecordingScript("other", []))
+        workflow.run()
+        report = workflow.get_group_report()
+        assert list(report) == ["block1"]
+        assert report["block1"]["scripts"] == 2
+        assert report["block1"]["failed"] == ["pc"]
+        assert report["block1"]["duration"] >= 0.02
+
+    def test_worker_budget(self, mocker):
+        # The nodes run on the helpers of the budget, the workflow thread runs a node when there is no free helper
+        budget = WorkerBudget(max_workers=1)
+        mocker.patch.object(WorkerBudget, "get_instance", return_value=budget)
+        events = []
+        workflow = WorkflowScript(max_workers=4)
+        workflow.add_all([RecordingScript(f"script{i}", events, duration=0.02) for i in range(4)])
+        workflow.run()
+        assert all(node.status == "COMPLETED" for node in workflow.nodes.values())
+        metrics = budget.get_metrics()
+        assert metrics["helpers"] >= 1 and metrics["helpers_denied"] >= 1
+        assert metrics["free_workers"] == 1
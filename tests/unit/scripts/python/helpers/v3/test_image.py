@@ -220,3 +220,75 @@ class TestImage:
 
         mock_batch_create.assert_called_once_with(request_payload_list=expected_payload_list)
         assert response == [{"status": "success"}]
+
+    @patch('framework.scripts.python.helpers.v3.image.PcCluster')
+    def test_url_upload_cluster_uuid_list(self, MockPcCluster, image, mocker):
+        image_config_list = [
+            {
+                'name': 'image_name',
+                'image_type': 'DISK_IMAGE',
+                'url': 'http://where-the-file-is-present',
+                'cluster_uuid_list': ['uuid1', 'uuid2'],
+                'checksum': 'abcd'
+            }
+        ]
+
+        expected_payload_list = [
+            {
+                "spec": {
+                    "name": "image_name",
+                    "description": "",
+                    "resources": {
+                        "image_type": "DISK_IMAGE",
+                        "source_uri": "http://where-the-file-is-present",
+                        "initial_placement_ref_list": [
+                            {'kind': 'cluster', 'uuid': 'uuid1'},
+                            {'kind': 'cluster', 'uuid': 'uuid2'}
+                        ],
+                        "checksum": {
+                            "checksum_algorithm": "SHA_256",
+                            "checksum_value": "abcd"
+                        }
+                    }
+                },
+                "metadata": {
+                    "kind": "image"
+                }
+            }
+        ]
+
+        mock_batch_create = mocker.patch.object(image.batch_op, 'batch_create', return_value=["task1"])
+
+        response = image.url_upload(image_config_list)
+
+        # The clusters are not listed when their uuids are known
+        MockPcCluster.return_value.get_pe_info_list.assert_not_called()
+        mock_batch_create.assert_called_once_with(request_payload_list=expected_payload_list)
+        assert response == ["task1"]
+
+    @patch('framework.scripts.python.helpers.v3.image.PcTaskMonitor')
+    def test_file_upload(self, MockPcTaskMonitor, image, mocker, tmp_path):
+        source = tmp_path / "image.qcow2"
+        source.write_bytes(b"image" * 100)
+        image_config = {
+            'name': 'image_name',
+            'image_type': 'DISK_IMAGE',
+            'source': str(source),
+            'cluster_uuid_list': ['uuid1']
+        }
+        MockPcTaskMonitor.return_value.monitor.return_value = (None, True)
+        mocker.patch.object(image, 'get_entity_by_name', return_value=None)
+        mock_create = mocker.patch.object(image, 'create', return_value={
+            "metadata": {"uuid": "image-uuid"}, "status": {"execution_context": {"task_uuid": "task1"}}})
+        mock_upload = mocker.patch.object(image, 'upload_chunked', return_value={"bytes_sent": 500})
+
+        response = image.file_upload(image_config, chunk_size=100)
+
+        payload = mock_create.call_args.kwargs["data"]
+        assert "source_uri" not in payload["spec"]["resources"]
+        assert payload["spec"]["resources"]["initial_placement_ref_list"] == [{'kind': 'cluster', 'uuid': 'uuid1'}]
+        # The file is uploaded once the image is created
+        MockPcTaskMonitor.assert_called_once_with(self.session, task_uuid_list=["task1"])
+        mock_upload.assert_called_once_with(str(source), uuid="image-uuid", endpoint="file", chunk_size=100,
+                                            key=image.get_upload_key("image_name", str(source)))
+        assert response == {"bytes_sent": 500, "uuid": "image-uuid"}
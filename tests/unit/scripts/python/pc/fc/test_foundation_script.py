@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import MagicMock
+from framework.scripts.python.helpers.fc.imaged_clusters import ImagedCluster
+from framework.scripts.python.pc.fc.foundation_script import FoundationScript
+
+AVAILABLE_NODES = [{"node_serial": "serial-1", "hypervisor_hostname": "host-1", "hypervisor_ip": "10.0.0.11",
+                    "cvm_ip": "10.0.0.21", "ipmi_ip": "10.0.1.11"}]
+
+
+@pytest.fixture
+def site_config():
+    return {
+        "site_name": "site1",
+        "use_existing_network_settings": False,
+        "re-image": False,
+        "name_servers_list": [],
+        "ntp_servers_list": [],
+        "network": {"domain": "example.com", "host_subnet": "10.0.0.0/24", "host_gateway": "10.0.0.1",
+                    "ipmi_subnet": "10.0.1.0/24"},
+        "clusters": [{"cluster_name": "cluster1", "cluster_size": 1, "node_details": [{"node_serial": "serial-1"}]}]
+    }
+
+
+class TestFoundationScript:
+    def test_dry_run_does_not_allocate_ips(self, mocker, site_config):
+        ipam = MagicMock()
+        script = FoundationScript({"dry_run": True, "ipam_session": ipam})
+        script.pc_session = MagicMock()
+        mocker.patch.object(FoundationScript, "get_fc_available_nodes", return_value=(AVAILABLE_NODES, None))
+        mock_allocate = mocker.patch("framework.scripts.python.pc.fc.foundation_script.allocate_ips_from_ipam")
+        mock_payload = mocker.patch.object(ImagedCluster, "create_fc_deployment_payload",
+                                           return_value=({"cluster_name": "cluster1"}, None))
+
+        _, fc_deployment_payload_list = script.get_fc_deployment_payloads(site_config)
+
+        assert fc_deployment_payload_list == [{"cluster_name": "cluster1"}]
+        assert not script.exceptions
+        # No host record is created in IPAM, the IPs are placeholders
+        mock_allocate.assert_not_called()
+        ipam.create_host_record.assert_not_called()
+        ipam.create_host_record_with_next_available_ip.assert_not_called()
+        node = list(mock_payload.call_args.args[1])[0]
+        assert node["cvm_ip"] == "<next available IP in 10.0.0.0/24>"
+        assert node["ipmi_ip"] == "<next available IP in 10.0.1.0/24>"
+
+    def test_deploy_site_without_payloads(self, mocker, site_config):
+        script = FoundationScript({})
+        script.pc_session = MagicMock()
+        mocker.patch.object(FoundationScript, "get_fc_available_nodes", return_value=(None, "FC is not reachable"))
+        mock_run = mocker.patch.object(FoundationScript, "run_fc_deployments")
+
+        assert script.deploy_site({"pod_block_name": "block1"}, site_config) == {}
+        mock_run.assert_not_called()
+        assert script.exceptions == ["FC is not reachable", "Could not create the Foundation Central deployment "
+                                                            "payloads for site site1, skipping its deployment"]